@@ -0,0 +1,36 @@
+"""
+AGUA geometry engine: batched distance, exp/log and geodesics on H4, S3, E5
+and their product
+
+Every map takes arrays of points with the coordinates on the last axis and
+evaluates the whole batch in one call:
+
+    from agua_geometry import AGUA, GeodesicCache
+    p, q = AGUA.random(10_000), AGUA.random(10_000)
+    d = AGUA.distance(p, q)                      # [10000]
+    paths = GeodesicCache().paths(AGUA, p, q)    # [10000, 32, 14], cached
+
+MANIFOLDS maps each manifold's name to its instance.
+"""
+
+from typing import Dict
+
+from .geodesic_cache import DEFAULT_MAX_BYTES, DEFAULT_SAMPLES, GeodesicCache
+from .manifolds import E5, H4, S3, Euclidean, Hyperboloid, Manifold, Sphere
+from .product import AGUA, ProductManifold
+
+__version__ = "0.1.0"
+
+MANIFOLDS: Dict[str, Manifold] = {m.name: m for m in (H4, S3, E5, AGUA)}
+
+
+def manifold(name: str) -> Manifold:
+    """One of the AGUA manifolds by name (H4, S3, E5 or H4xS3xE5)"""
+    try:
+        return MANIFOLDS[name]
+    except KeyError:
+        raise KeyError(f"Unknown manifold {name}; expected one of {tuple(MANIFOLDS)}") from None
+
+
+__all__ = ["AGUA", "DEFAULT_MAX_BYTES", "DEFAULT_SAMPLES", "E5", "Euclidean", "GeodesicCache", "H4", "Hyperboloid",
+           "MANIFOLDS", "Manifold", "ProductManifold", "S3", "Sphere", "manifold"]
@@ -0,0 +1,216 @@
+"""
+Memory-bounded LRU cache of sampled geodesic paths
+
+Paths live in one slab of arrays per (manifold, sample count): endpoints
+[capacity, 2D], paths [capacity, samples, D] and a last-used tick per slot. A
+dict maps a 64-bit hash of each endpoint pair to its slot, so looking up a
+batch is one dict probe per row and everything else (checking the endpoints,
+gathering the paths, touching the ticks) is a vectorized gather. A hit is only
+accepted when the stored endpoints match the query bit for bit, so a hit always
+returns the path that would have been computed. Misses in a batch are
+deduplicated and computed together in one vectorized geodesic call.
+
+Live entries never exceed `max_bytes`. When an insert would overflow it, the
+least recently used entries across all slabs are evicted in bulk, down to
+`1 - EVICT_SLACK` of the budget, so eviction is amortized over many inserts.
+Slabs grow by doubling and keep freed slots for reuse, so up to twice the live
+bytes may be reserved. Results are copied out of the cache, so callers may
+modify them freely.
+"""
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from .manifolds import Manifold, _as_float
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SAMPLES = 32
+
+# Fraction of the budget freed beyond what an overflowing insert needs
+EVICT_SLACK = 0.1
+
+# Per-entry cost beyond the slab rows: the dict slot and its int key and value
+_ENTRY_OVERHEAD = 120
+
+_MIN_CAPACITY = 64
+_MULTIPLIER = np.uint64(0x100000001B3)
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+def _row_hashes(rows: np.ndarray) -> List[int]:
+    """FNV-style 64-bit hash of each row's bits"""
+    bits = rows.view(np.uint64)
+    h = np.full(len(rows), 0xCBF29CE484222325, dtype=np.uint64)
+    for column in bits.T:
+        h = (h ^ column) * _MULTIPLIER
+    h ^= h >> np.uint64(33)
+    return (h * _MIX).tolist()
+
+
+class _Slab:
+    """Entries of one (manifold, samples) pair in growable arrays"""
+
+    __slots__ = ("samples", "dim", "entry_bytes", "slots", "keys", "ticks", "endpoints", "paths", "free")
+
+    def __init__(self, samples: int, dim: int):
+        self.samples = samples
+        self.dim = dim
+        self.entry_bytes = (2 * dim + samples * dim) * 8 + 16 + _ENTRY_OVERHEAD
+        self.slots: Dict[int, int] = {}
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.ticks = np.zeros(0, dtype=np.int64)
+        self.endpoints = np.zeros((0, 2 * dim))
+        self.paths = np.zeros((0, samples, dim))
+        self.free: List[int] = []
+
+    @property
+    def live(self) -> int:
+        return len(self.ticks) - len(self.free)
+
+    def _grow(self, needed: int):
+        capacity = len(self.ticks)
+        new_capacity = max(2 * capacity, capacity + needed, _MIN_CAPACITY)
+        grow = new_capacity - capacity
+        self.keys = np.concatenate([self.keys, np.zeros(grow, dtype=np.uint64)])
+        self.ticks = np.concatenate([self.ticks, np.full(grow, -1, dtype=np.int64)])
+        self.endpoints = np.concatenate([self.endpoints, np.zeros((grow, 2 * self.dim))])
+        self.paths = np.concatenate([self.paths, np.zeros((grow, self.samples, self.dim))])
+        self.free.extend(range(new_capacity - 1, capacity - 1, -1))
+
+    def allocate(self, count: int) -> np.ndarray:
+        if len(self.free) < count:
+            self._grow(count - len(self.free))
+        taken = self.free[len(self.free) - count:]
+        del self.free[len(self.free) - count:]
+        return np.array(taken, dtype=np.intp)
+
+    def release(self, slots: np.ndarray):
+        for key, slot in zip(self.keys[slots].tolist(), slots.tolist()):
+            if self.slots.get(key) == slot:
+                del self.slots[key]
+        self.ticks[slots] = -1
+        self.free.extend(slots.tolist())
+
+    def clear(self):
+        self.slots.clear()
+        self.ticks[:] = -1
+        self.free = list(range(len(self.ticks) - 1, -1, -1))
+
+
+class GeodesicCache:
+    """LRU cache of geodesic paths with a memory budget. Safe to use from several threads."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "collisions": 0, "uncacheable": 0}
+        self._slabs: Dict[Tuple[str, int, int], _Slab] = {}
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(slab.live for slab in self._slabs.values())
+
+    def _evict(self, needed: int):
+        """Free at least `needed` bytes, least recently used entries first"""
+        slabs = [slab for slab in self._slabs.values() if slab.live]
+        live = [np.flatnonzero(slab.ticks >= 0) for slab in slabs]
+        owner = np.concatenate([np.full(len(slots), i) for i, slots in enumerate(live)])
+        slots = np.concatenate(live)
+        order = np.argsort(np.concatenate([slab.ticks[s] for slab, s in zip(slabs, live)]), kind="stable")
+        sizes = np.array([slab.entry_bytes for slab in slabs])[owner[order]]
+        victims = order[:int(np.searchsorted(np.cumsum(sizes), needed)) + 1]
+        for i, slab in enumerate(slabs):
+            mine = slots[victims[owner[victims] == i]]
+            if mine.size:
+                slab.release(mine)
+                self.nbytes -= mine.size * slab.entry_bytes
+        self.stats["evictions"] += int(victims.size)
+
+    def _insert(self, slab: _Slab, keys: List[int], endpoints: np.ndarray, paths: np.ndarray):
+        if slab.entry_bytes > self.max_bytes:
+            self.stats["uncacheable"] += len(keys)
+            return
+        fit = self.max_bytes // slab.entry_bytes
+        if len(keys) > fit:
+            self.stats["uncacheable"] += len(keys) - fit
+            keys, endpoints, paths = keys[-fit:], endpoints[-fit:], paths[-fit:]
+
+        # A key already present (a hash collision) has its slot overwritten
+        existing = np.array([slab.slots.get(key, -1) for key in keys], dtype=np.intp)
+        overflow = self.nbytes + int((existing < 0).sum()) * slab.entry_bytes - self.max_bytes
+        if overflow > 0:
+            self._evict(overflow + int(EVICT_SLACK * self.max_bytes))
+            existing = np.array([slab.slots.get(key, -1) for key in keys], dtype=np.intp)
+        fresh = existing < 0
+        slots = existing
+        slots[fresh] = slab.allocate(int(fresh.sum()))
+        self.nbytes += int(fresh.sum()) * slab.entry_bytes
+
+        slab.keys[slots] = np.array(keys, dtype=np.uint64)
+        slab.endpoints[slots] = endpoints
+        slab.paths[slots] = paths
+        slab.ticks[slots] = self._clock
+        slab.slots.update(zip(keys, slots.tolist()))
+
+    def paths(self, manifold: Manifold, p: Any, q: Any, samples: int = DEFAULT_SAMPLES) -> np.ndarray:
+        """[batch, samples, D] geodesics from the rows of p to the rows of q (either may be one point)"""
+        p, q = _as_float(p), _as_float(q)
+        shape = np.broadcast_shapes(p.shape, q.shape)
+        d = shape[-1]
+        endpoints = np.concatenate([np.broadcast_to(p, shape).reshape(-1, d),
+                                    np.broadcast_to(q, shape).reshape(-1, d)], axis=-1)
+        keys = _row_hashes(endpoints)
+        out = np.empty((len(keys), samples, d))
+
+        with self._lock:
+            slab = self._slabs.get((manifold.name, samples, d))
+            if slab is None:
+                slab = self._slabs[(manifold.name, samples, d)] = _Slab(samples, d)
+            self._clock += 1
+            get = slab.slots.get
+            slots = np.array([get(key, -1) for key in keys], dtype=np.intp)
+            found = np.flatnonzero(slots >= 0)
+            same = (slab.endpoints[slots[found]].view(np.uint64) == endpoints[found].view(np.uint64)).all(axis=-1)
+            hits = found[same]
+            out[hits] = slab.paths[slots[hits]]
+            slab.ticks[slots[hits]] = self._clock
+            self.stats["hits"] += int(hits.size)
+            self.stats["misses"] += len(keys) - int(hits.size)
+            self.stats["collisions"] += int(found.size - hits.size)
+
+        missed = np.ones(len(keys), dtype=bool)
+        missed[hits] = False
+        rows = np.flatnonzero(missed)
+        if rows.size:
+            # Distinct endpoint pairs only, so duplicates within the batch are computed once
+            pairs = endpoints[rows].view(np.dtype((np.void, endpoints.itemsize * 2 * d))).ravel()
+            _, first, inverse = np.unique(pairs, return_index=True, return_inverse=True)
+            unique_rows = rows[first]
+            computed = manifold.geodesic(endpoints[unique_rows, :d], endpoints[unique_rows, d:],
+                                         np.linspace(0.0, 1.0, samples))
+            out[rows] = computed[inverse.ravel()]
+            with self._lock:
+                self._insert(slab, [keys[row] for row in unique_rows.tolist()], endpoints[unique_rows], computed)
+        return out.reshape(shape[:-1] + (samples, d))
+
+    def path(self, manifold: Manifold, p: Any, q: Any, samples: int = DEFAULT_SAMPLES) -> np.ndarray:
+        """[samples, D] geodesic from p to q"""
+        return self.paths(manifold, _as_float(p)[None], _as_float(q)[None], samples)[0]
+
+    def clear(self):
+        """Drop every entry; the slab arrays are kept for reuse"""
+        with self._lock:
+            for slab in self._slabs.values():
+                slab.clear()
+            self.nbytes = 0
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "entries": len(self), "nbytes": self.nbytes, "max_bytes": self.max_bytes,
+                    "hit_rate": self.stats["hits"] / lookups if lookups else 0.0}
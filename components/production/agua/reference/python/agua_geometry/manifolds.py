@@ -0,0 +1,315 @@
+"""
+Constant-curvature manifolds (hyperboloid_manifold_h4, s3_sphere_geometry, e5_euclidean_space)
+
+Points and tangent vectors are arrays in ambient coordinates with the coordinate
+on the last axis, so a [batch, ambient_dim] array is a batch of points and every
+map works on the whole batch in one call. Leading dimensions broadcast: a single
+base point can be paired with a batch of targets.
+
+The closed forms are evaluated in their well-conditioned variants (half-angle
+distances, atan2 and asinh for the log maps, series for sin(x)/x near zero), so
+nearby and antipodal points keep full precision.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Below this norm, sin(x)/x and sinh(x)/x are evaluated by their two-term series
+_SERIES_NORM = 1e-4
+
+DEFAULT_TOLERANCE = 1e-12
+
+
+def _as_float(x: Any) -> np.ndarray:
+    return np.asarray(x, dtype=float)
+
+
+def _sinc(x: np.ndarray) -> np.ndarray:
+    """sin(x) / x"""
+    return np.sinc(x / np.pi)
+
+
+def _sinhc(x: np.ndarray) -> np.ndarray:
+    """sinh(x) / x"""
+    small = np.abs(x) < _SERIES_NORM
+    safe = np.where(small, 1.0, x)
+    return np.where(small, 1.0 + x * x / 6.0, np.sinh(safe) / safe)
+
+
+def _unit(v: np.ndarray, norm: np.ndarray) -> np.ndarray:
+    """v / norm, with zero vectors left at zero"""
+    return v / np.where(norm > 0, norm, 1.0)[..., None]
+
+
+class Manifold:
+    """A Riemannian manifold embedded in R^ambient_dim.
+
+    Subclasses implement the ambient inner product, the exponential and
+    logarithmic maps and parallel transport; geodesics and the remaining maps
+    are built from those.
+    """
+
+    name = "manifold"
+    curvature = 0.0
+
+    def __init__(self, dim: int):
+        if dim < 1:
+            raise ValueError(f"Dimension must be at least 1, got {dim}")
+        self.dim = dim
+        self.ambient_dim = dim
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.dim})"
+
+    def inner(self, u: Any, v: Any) -> np.ndarray:
+        """Metric inner product of tangent vectors (ambient coordinates)"""
+        return np.einsum("...i,...i->...", _as_float(u), _as_float(v))
+
+    def norm(self, v: Any) -> np.ndarray:
+        return np.sqrt(np.maximum(self.inner(v, v), 0.0))
+
+    def distance(self, p: Any, q: Any) -> np.ndarray:
+        raise NotImplementedError
+
+    def pairwise_distance(self, a: Any, b: Any) -> np.ndarray:
+        """[m, n] distances between the rows of a [m, D] and b [n, D]"""
+        raise NotImplementedError
+
+    def exp(self, p: Any, v: Any) -> np.ndarray:
+        raise NotImplementedError
+
+    def log(self, p: Any, q: Any) -> np.ndarray:
+        raise NotImplementedError
+
+    def parallel_transport(self, p: Any, q: Any, v: Any) -> np.ndarray:
+        """Transport v from T_p to T_q along the geodesic joining them"""
+        raise NotImplementedError
+
+    def project(self, x: Any) -> np.ndarray:
+        """Nearest point of the manifold to an ambient point"""
+        raise NotImplementedError
+
+    def to_tangent(self, p: Any, v: Any) -> np.ndarray:
+        """Component of an ambient vector tangent at p"""
+        return _as_float(v)
+
+    def contains(self, x: Any, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+        return np.all(np.isfinite(_as_float(x)), axis=-1)
+
+    def origin(self) -> np.ndarray:
+        return np.zeros(self.ambient_dim)
+
+    def geodesic(self, p: Any, q: Any, t: Any) -> np.ndarray:
+        """Points gamma(t) of the geodesic with gamma(0) = p and gamma(1) = q.
+
+        p and q are [..., D] and t is [k]; the result is [..., k, D]. The log
+        map is taken once per pair, whatever the number of samples.
+        """
+        p = _as_float(p)
+        v = self.log(p, q)
+        t = _as_float(t)
+        return self.exp(p[..., None, :], t[:, None] * v[..., None, :])
+
+    def midpoint(self, p: Any, q: Any) -> np.ndarray:
+        return self.exp(p, 0.5 * self.log(p, q))
+
+    def random(self, n: int, rng: Optional[np.random.Generator] = None, scale: float = 1.0) -> np.ndarray:
+        """n points: the exponential map at the origin of Gaussian tangent vectors with spread `scale`"""
+        rng = rng or np.random.default_rng()
+        origin = self.origin()
+        v = self.to_tangent(origin, rng.standard_normal((n, self.ambient_dim)) * scale)
+        return self.exp(origin, v)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "dim": self.dim, "ambient_dim": self.ambient_dim, "curvature": self.curvature}
+
+
+class Euclidean(Manifold):
+    """Flat space E^n; exp and log are translation and difference"""
+
+    curvature = 0.0
+
+    def __init__(self, dim: int = 5):
+        super().__init__(dim)
+        self.name = f"E{dim}"
+
+    def distance(self, p: Any, q: Any) -> np.ndarray:
+        return np.linalg.norm(_as_float(q) - _as_float(p), axis=-1)
+
+    def pairwise_distance(self, a: Any, b: Any) -> np.ndarray:
+        a, b = _as_float(a), _as_float(b)
+        squared = (a * a).sum(-1)[:, None] + (b * b).sum(-1)[None, :] - 2.0 * a @ b.T
+        return np.sqrt(np.maximum(squared, 0.0))
+
+    def exp(self, p: Any, v: Any) -> np.ndarray:
+        return _as_float(p) + _as_float(v)
+
+    def log(self, p: Any, q: Any) -> np.ndarray:
+        return _as_float(q) - _as_float(p)
+
+    def parallel_transport(self, p: Any, q: Any, v: Any) -> np.ndarray:
+        return np.broadcast_to(_as_float(v), np.broadcast_shapes(np.shape(p), np.shape(q), np.shape(v))).copy()
+
+    def project(self, x: Any) -> np.ndarray:
+        return _as_float(x).copy()
+
+    def geodesic(self, p: Any, q: Any, t: Any) -> np.ndarray:
+        p = _as_float(p)[..., None, :]
+        return p + _as_float(t)[:, None] * (_as_float(q)[..., None, :] - p)
+
+
+class Sphere(Manifold):
+    """Unit sphere S^n in R^(n+1); S^3 is the unit quaternions"""
+
+    curvature = 1.0
+
+    def __init__(self, dim: int = 3):
+        super().__init__(dim)
+        self.ambient_dim = dim + 1
+        self.name = f"S{dim}"
+
+    def distance(self, p: Any, q: Any) -> np.ndarray:
+        """Arc length in [0, pi]: 2 atan2(|p - q|, |p + q|), exact for near and antipodal points.
+
+        s3_sphere_geometry writes the formula with |<p, q>|, which identifies antipodal quaternions,
+        but its tests (d(p, -p) = pi) and its exp/log maps use the arc length on the sphere itself.
+        """
+        p, q = _as_float(p), _as_float(q)
+        return 2.0 * np.arctan2(np.linalg.norm(p - q, axis=-1), np.linalg.norm(p + q, axis=-1))
+
+    def pairwise_distance(self, a: Any, b: Any) -> np.ndarray:
+        """One matrix product; nearby pairs lose precision to arccos (about 1e-8 absolute)"""
+        return np.arccos(np.clip(_as_float(a) @ _as_float(b).T, -1.0, 1.0))
+
+    def exp(self, p: Any, v: Any) -> np.ndarray:
+        p, v = _as_float(p), _as_float(v)
+        theta = np.linalg.norm(v, axis=-1)[..., None]
+        return np.cos(theta) * p + _sinc(theta) * v
+
+    def log(self, p: Any, q: Any) -> np.ndarray:
+        """Undefined at the antipode, where every direction is a geodesic; returns 0 there"""
+        p, q = _as_float(p), _as_float(q)
+        cos = np.einsum("...i,...i->...", p, q)
+        u = q - cos[..., None] * p
+        sin = np.linalg.norm(u, axis=-1)
+        return _unit(u, sin) * np.arctan2(sin, cos)[..., None]
+
+    def parallel_transport(self, p: Any, q: Any, v: Any) -> np.ndarray:
+        p, q, v = _as_float(p), _as_float(q), _as_float(v)
+        denominator = 1.0 + np.einsum("...i,...i->...", p, q)
+        coefficient = np.einsum("...i,...i->...", q, v) / np.where(denominator > 0, denominator, np.inf)
+        return v - coefficient[..., None] * (p + q)
+
+    def project(self, x: Any) -> np.ndarray:
+        x = _as_float(x)
+        return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+    def to_tangent(self, p: Any, v: Any) -> np.ndarray:
+        p, v = _as_float(p), _as_float(v)
+        return v - np.einsum("...i,...i->...", p, v)[..., None] * p
+
+    def contains(self, x: Any, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+        x = _as_float(x)
+        return np.abs(np.einsum("...i,...i->...", x, x) - 1.0) < tolerance
+
+    def origin(self) -> np.ndarray:
+        origin = np.zeros(self.ambient_dim)
+        origin[0] = 1.0
+        return origin
+
+    def antipode(self, p: Any) -> np.ndarray:
+        return -_as_float(p)
+
+
+class Hyperboloid(Manifold):
+    """Hyperbolic space H^n as the future sheet <x, x>_L = -1, x0 > 0 of R^(n+1) with the
+    Lorentz metric diag(-1, 1, ..., 1)"""
+
+    curvature = -1.0
+
+    def __init__(self, dim: int = 4):
+        super().__init__(dim)
+        self.ambient_dim = dim + 1
+        self.name = f"H{dim}"
+
+    def inner(self, u: Any, v: Any) -> np.ndarray:
+        """Lorentz inner product -u0 v0 + u1 v1 + ... + un vn"""
+        u, v = _as_float(u), _as_float(v)
+        return np.einsum("...i,...i->...", u[..., 1:], v[..., 1:]) - u[..., 0] * v[..., 0]
+
+    def distance(self, p: Any, q: Any) -> np.ndarray:
+        """Rapidity arccosh(-<p, q>_L), evaluated as 2 asinh(|p - q|_L / 2) for nearby points where
+        arccosh loses half the digits"""
+        p, q = _as_float(p), _as_float(q)
+        cosh = -self.inner(p, q)
+        chord = np.sqrt(np.maximum(self.inner(p - q, p - q), 0.0))
+        return np.where(cosh > 2.0, np.arccosh(np.maximum(cosh, 1.0)), 2.0 * np.arcsinh(chord / 2.0))
+
+    def pairwise_distance(self, a: Any, b: Any) -> np.ndarray:
+        """One matrix product; nearby pairs lose precision to arccosh (about 1e-8 absolute)"""
+        a, b = _as_float(a), _as_float(b)
+        cosh = np.outer(a[:, 0], b[:, 0]) - a[:, 1:] @ b[:, 1:].T
+        return np.arccosh(np.maximum(cosh, 1.0))
+
+    def exp(self, p: Any, v: Any) -> np.ndarray:
+        """x0 is recomputed from the spatial coordinates, so results satisfy the hyperboloid constraint
+        to rounding however far the step goes"""
+        p, v = _as_float(p), _as_float(v)
+        rapidity = self._tangent_norm(p, v)[..., None]
+        return self.lift((np.cosh(rapidity) * p + _sinhc(rapidity) * v)[..., 1:])
+
+    def log(self, p: Any, q: Any) -> np.ndarray:
+        """The direction is re-projected onto T_p, since q + <p, q>_L p cancels heavily far from the
+        origin, and the length is the well-conditioned distance"""
+        p, q = _as_float(p), _as_float(q)
+        u = self.to_tangent(p, q + self.inner(p, q)[..., None] * p)
+        return _unit(u, self._tangent_norm(p, u)) * self.distance(p, q)[..., None]
+
+    def _tangent_norm(self, p: np.ndarray, v: np.ndarray) -> np.ndarray:
+        """|v|_L for v in T_p as sqrt(|v|^2 + |p ^ v|^2) / x0 over the spatial coordinates: -v0^2 + |v|^2
+        cancels to nothing far from the origin, where both terms grow like x0^2"""
+        p_spatial, v_spatial = p[..., 1:], v[..., 1:]
+        wedge = p_spatial[..., :, None] * v_spatial[..., None, :]
+        wedge = wedge - np.swapaxes(wedge, -1, -2)
+        squared = np.einsum("...i,...i->...", v_spatial, v_spatial) + 0.5 * (wedge ** 2).sum(axis=(-2, -1))
+        return np.sqrt(squared) / p[..., 0]
+
+    def parallel_transport(self, p: Any, q: Any, v: Any) -> np.ndarray:
+        p, q, v = _as_float(p), _as_float(q), _as_float(v)
+        coefficient = self.inner(q, v) / (1.0 - self.inner(p, q))
+        return v + coefficient[..., None] * (p + q)
+
+    def project(self, x: Any) -> np.ndarray:
+        """x / sqrt(-<x, x>_L) for timelike x (h4_project_to_hyperboloid); NaN otherwise"""
+        x = _as_float(x)
+        squared = -self.inner(x, x)
+        with np.errstate(invalid="ignore"):
+            return x / np.sqrt(np.where(squared > 0, squared, np.nan))[..., None]
+
+    def lift(self, spatial: Any) -> np.ndarray:
+        """The point above spatial coordinates (x1, ..., xn): x0 = sqrt(1 + |x|^2)"""
+        spatial = _as_float(spatial)
+        x0 = np.sqrt(1.0 + np.einsum("...i,...i->...", spatial, spatial))
+        return np.concatenate([x0[..., None], spatial], axis=-1)
+
+    def to_tangent(self, p: Any, v: Any) -> np.ndarray:
+        p, v = _as_float(p), _as_float(v)
+        return v + self.inner(p, v)[..., None] * p
+
+    def contains(self, x: Any, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+        """h4_validate_point: |<x, x>_L + 1| < tolerance and x0 > 0. The tolerance is relative to
+        x0^2, since that is the size of the terms that cancel"""
+        x = _as_float(x)
+        scale = np.maximum(x[..., 0] ** 2, 1.0)
+        return (np.abs(self.inner(x, x) + 1.0) < tolerance * scale) & (x[..., 0] > 0)
+
+    def origin(self) -> np.ndarray:
+        origin = np.zeros(self.ambient_dim)
+        origin[0] = 1.0
+        return origin
+
+
+H4 = Hyperboloid(4)
+S3 = Sphere(3)
+E5 = Euclidean(5)
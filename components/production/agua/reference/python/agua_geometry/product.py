@@ -0,0 +1,127 @@
+"""
+Product manifolds (product_manifold, agua_product_manifold_spec)
+
+A point of M1 x ... x Mk is the concatenation of its factor points along the
+last axis. Every map splits its inputs into factor views (no copies), applies
+the factor's map to the whole batch and concatenates; distance is
+sqrt(d1^2 + ... + dk^2), the standard Riemannian product metric.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .manifolds import DEFAULT_TOLERANCE, E5, H4, S3, Manifold, _as_float
+
+
+class ProductManifold(Manifold):
+    """Riemannian product of factor manifolds"""
+
+    def __init__(self, factors: Sequence[Manifold], name: Optional[str] = None):
+        if not factors:
+            raise ValueError("A product manifold needs at least one factor")
+        self.factors = tuple(factors)
+        self.dim = sum(factor.dim for factor in self.factors)
+        self.ambient_dim = sum(factor.ambient_dim for factor in self.factors)
+        self.name = name or "x".join(factor.name for factor in self.factors)
+        self._bounds = np.cumsum([0] + [factor.ambient_dim for factor in self.factors])
+
+    def __repr__(self) -> str:
+        return f"ProductManifold({', '.join(map(repr, self.factors))})"
+
+    @property
+    def curvature(self) -> List[float]:
+        return [factor.curvature for factor in self.factors]
+
+    def split(self, x: Any) -> List[np.ndarray]:
+        """Factor components of points or tangent vectors (views)"""
+        x = _as_float(x)
+        if x.shape[-1] != self.ambient_dim:
+            raise ValueError(f"Expected {self.ambient_dim} ambient coordinates for {self.name}, got {x.shape[-1]}")
+        return [x[..., start:stop] for start, stop in zip(self._bounds[:-1], self._bounds[1:])]
+
+    def join(self, parts: Sequence[Any]) -> np.ndarray:
+        """Concatenate factor components (product_point_creation)"""
+        if len(parts) != len(self.factors):
+            raise ValueError(f"Expected {len(self.factors)} components for {self.name}, got {len(parts)}")
+        parts = [_as_float(part) for part in parts]
+        shape = np.broadcast_shapes(*(part.shape[:-1] for part in parts))
+        return np.concatenate([np.broadcast_to(part, shape + part.shape[-1:]) for part in parts], axis=-1)
+
+    def factor_index(self, name: str) -> int:
+        for i, factor in enumerate(self.factors):
+            if factor.name == name:
+                return i
+        raise KeyError(f"{self.name} has no factor {name}")
+
+    def component(self, x: Any, name: str) -> np.ndarray:
+        """Projection onto one factor (h4_projection, s3_projection, e5_projection)"""
+        return self.split(x)[self.factor_index(name)]
+
+    def embed(self, x: Any, name: str, base: Optional[Any] = None) -> np.ndarray:
+        """Points of one factor placed in the product at `base` (default: the origin) in the others"""
+        index = self.factor_index(name)
+        parts = self.split(self.origin() if base is None else base)
+        parts[index] = x
+        return self.join(parts)
+
+    def _map(self, method: str, *arrays: Any) -> np.ndarray:
+        split = [self.split(array) for array in arrays]
+        return self.join([getattr(factor, method)(*(parts[i] for parts in split))
+                          for i, factor in enumerate(self.factors)])
+
+    def inner(self, u: Any, v: Any) -> np.ndarray:
+        return sum(factor.inner(a, b) for factor, a, b in zip(self.factors, self.split(u), self.split(v)))
+
+    def factor_distances(self, p: Any, q: Any) -> np.ndarray:
+        """[..., k] distance in each factor"""
+        return np.stack([factor.distance(a, b) for factor, a, b in zip(self.factors, self.split(p), self.split(q))],
+                        axis=-1)
+
+    def distance(self, p: Any, q: Any) -> np.ndarray:
+        return np.sqrt((self.factor_distances(p, q) ** 2).sum(-1))
+
+    def pairwise_distance(self, a: Any, b: Any) -> np.ndarray:
+        squared = 0.0
+        for factor, a_part, b_part in zip(self.factors, self.split(a), self.split(b)):
+            squared = squared + factor.pairwise_distance(a_part, b_part) ** 2
+        return np.sqrt(squared)
+
+    def exp(self, p: Any, v: Any) -> np.ndarray:
+        return self._map("exp", p, v)
+
+    def log(self, p: Any, q: Any) -> np.ndarray:
+        return self._map("log", p, q)
+
+    def parallel_transport(self, p: Any, q: Any, v: Any) -> np.ndarray:
+        return self._map("parallel_transport", p, q, v)
+
+    def project(self, x: Any) -> np.ndarray:
+        return self._map("project", x)
+
+    def to_tangent(self, p: Any, v: Any) -> np.ndarray:
+        return self._map("to_tangent", p, v)
+
+    def geodesic(self, p: Any, q: Any, t: Any) -> np.ndarray:
+        return np.concatenate([factor.geodesic(a, b, t) for factor, a, b
+                               in zip(self.factors, self.split(p), self.split(q))], axis=-1)
+
+    def contains(self, x: Any, tolerance: float = DEFAULT_TOLERANCE) -> np.ndarray:
+        return np.logical_and.reduce([factor.contains(part, tolerance)
+                                      for factor, part in zip(self.factors, self.split(x))])
+
+    def origin(self) -> np.ndarray:
+        return np.concatenate([factor.origin() for factor in self.factors])
+
+    def random(self, n: int, rng: Optional[np.random.Generator] = None, scale: float = 1.0) -> np.ndarray:
+        rng = rng or np.random.default_rng()
+        return self.join([factor.random(n, rng, scale) for factor in self.factors])
+
+    def describe(self) -> Dict[str, Any]:
+        description = super().describe()
+        description["factors"] = [factor.describe() for factor in self.factors]
+        return description
+
+
+# The 12-dimensional AGUA space H4 x S3 x E5 (14 ambient coordinates)
+AGUA = ProductManifold((H4, S3, E5))
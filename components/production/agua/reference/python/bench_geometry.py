@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Geometry Benchmarks - Throughput of the batched manifold maps in points/sec
+
+Every map of every AGUA manifold (H4, S3, E5 and the H4 x S3 x E5 product) is
+timed on batches of random points. Throughput is points per second: pairs for
+the two-point maps, pairs of the m x m matrix for pairwise distances, and
+geodesics for the path cache, which is timed cold (every path computed) and
+warm (every path a hit).
+
+    python bench_geometry.py
+    python bench_geometry.py --manifolds H4 S3 --batches 10000 1000000
+    python bench_geometry.py --json results.json
+
+--json also writes a `benchmarks` section in the live analyzer's result format
+(one entry per manifold, map and batch size).
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from agua_geometry import MANIFOLDS, GeodesicCache, Manifold
+
+DEFAULT_BATCHES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 5
+GEODESIC_SAMPLES = 16
+
+# Random points are drawn at this spread around the origin, where the maps are well conditioned
+POINT_SCALE = 0.5
+
+OPERATIONS = ("distance", "exp", "log", "geodesic", "parallel_transport", "pairwise_distance", "cached_geodesic")
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """Best of `repeat` runs in seconds, after one warmup run"""
+    func()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _calls(manifold: Manifold, n: int, rng: np.random.Generator) -> Dict[str, Any]:
+    """Operation -> (zero-argument call, points it processes)"""
+    p = manifold.random(n, rng, POINT_SCALE)
+    q = manifold.random(n, rng, POINT_SCALE)
+    v = manifold.log(p, q)
+    w = manifold.to_tangent(p, rng.standard_normal(p.shape))
+    t = np.linspace(0.0, 1.0, GEODESIC_SAMPLES)
+    m = max(1, int(np.sqrt(n)))
+    return {
+        "distance": (lambda: manifold.distance(p, q), n),
+        "exp": (lambda: manifold.exp(p, v), n),
+        "log": (lambda: manifold.log(p, q), n),
+        "geodesic": (lambda: manifold.geodesic(p, q, t), n),
+        "parallel_transport": (lambda: manifold.parallel_transport(p, q, w), n),
+        "pairwise_distance": (lambda: manifold.pairwise_distance(p[:m], q[:m]), m * m),
+    }
+
+
+def bench_cache(manifold: Manifold, n: int, rng: np.random.Generator, repeat: int) -> Dict[str, float]:
+    """Seconds for n paths through an empty cache and through one that already holds them all"""
+    p = manifold.random(n, rng, POINT_SCALE)
+    q = manifold.random(n, rng, POINT_SCALE)
+    path_bytes = GEODESIC_SAMPLES * manifold.ambient_dim * 8
+    cache = GeodesicCache(max_bytes=2 * n * (path_bytes + 512))
+
+    cold = float("inf")
+    for _ in range(repeat):
+        cache.clear()
+        start = time.perf_counter()
+        cache.paths(manifold, p, q, GEODESIC_SAMPLES)
+        cold = min(cold, time.perf_counter() - start)
+    warm = time_call(lambda: cache.paths(manifold, p, q, GEODESIC_SAMPLES), repeat)
+    return {"cold": cold, "warm": warm}
+
+
+def run(names: List[str], batches: List[int], repeat: int) -> Dict[str, List[Dict[str, Any]]]:
+    rng = np.random.default_rng(0)
+    results = {}
+    for name in names:
+        manifold = MANIFOLDS[name]
+        print(f"[Bench] {name}...")
+        rows = []
+        for n in batches:
+            for operation, (call, points) in _calls(manifold, n, rng).items():
+                seconds = time_call(call, repeat)
+                rows.append({"operation": operation, "batch": n, "points": points, "ms": round(seconds * 1000, 6),
+                             "points_per_sec": round(points / seconds, 1)})
+            cache = bench_cache(manifold, n, rng, repeat)
+            rows.append({"operation": "cached_geodesic", "batch": n, "points": n,
+                         "ms": round(cache["warm"] * 1000, 6), "points_per_sec": round(n / cache["warm"], 1),
+                         "cold_ms": round(cache["cold"] * 1000, 6),
+                         "cold_points_per_sec": round(n / cache["cold"], 1)})
+        results[name] = rows
+    return results
+
+
+def _rate(value: float) -> str:
+    for unit, scale in (("G", 1e9), ("M", 1e6), ("k", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f}{unit}"
+    return f"{value:.0f}"
+
+
+def print_summary(results: Dict[str, List[Dict[str, Any]]], batches: List[int]):
+    header = "".join(f"{n:>12,d}" for n in batches)
+    for name, rows in results.items():
+        print(f"\n{name} (points/sec by batch size)")
+        print(f"  {'operation':24s}{header}")
+        for operation in OPERATIONS:
+            by_batch = {row["batch"]: row for row in rows if row["operation"] == operation}
+            print(f"  {operation:24s}" + "".join(f"{_rate(by_batch[n]['points_per_sec']):>12s}" for n in batches))
+            if operation == "cached_geodesic":
+                print(f"  {'  (cold)':24s}"
+                      + "".join(f"{_rate(by_batch[n]['cold_points_per_sec']):>12s}" for n in batches))
+
+
+def to_benchmark_results(results: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Warm timings in the live analyzer's benchmark result shape"""
+    benchmarks = {}
+    for name, rows in results.items():
+        for row in rows:
+            operation = f"{name}.{row['operation']}"
+            benchmarks[f"{operation}@{row['batch']}"] = {"operation": operation, "size": row["batch"],
+                                                         "wall_ms": {"median": row["ms"]},
+                                                         "points_per_sec": row["points_per_sec"]}
+    return benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the throughput of the AGUA manifold maps")
+    parser.add_argument("--manifolds", nargs="+", default=list(MANIFOLDS), help="Manifolds to benchmark")
+    parser.add_argument("--batches", nargs="+", type=int, default=list(DEFAULT_BATCHES), help="Points per call")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per cell (best is kept)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.manifolds if name not in MANIFOLDS]
+    if unknown:
+        print(f"❌ Unknown manifold(s): {', '.join(unknown)}; expected one of {', '.join(MANIFOLDS)}")
+        sys.exit(1)
+    batches = sorted(args.batches)
+    results = run(args.manifolds, batches, args.repeat)
+    print_summary(results, batches)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"batches": batches, "manifolds": results, "benchmarks": to_benchmark_results(results)},
+                      f, indent=2)
+        print(f"\n✓ Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Geodesic cache: hits return the computed path, only for bit-identical endpoints, within the byte budget"""
+
+import numpy as np
+import pytest
+
+from agua_geometry import AGUA, H4, GeodesicCache
+from agua_geometry import geodesic_cache
+
+SAMPLES = 4
+
+
+def _entry_bytes(m, samples=SAMPLES):
+    return geodesic_cache._Slab(samples, m.ambient_dim).entry_bytes
+
+
+def test_hits_return_the_computed_paths():
+    rng = np.random.default_rng(1)
+    p, q = AGUA.random(20, rng), AGUA.random(20, rng)
+    cache = GeodesicCache()
+    expected = AGUA.geodesic(p, q, np.linspace(0.0, 1.0, SAMPLES))
+
+    first = cache.paths(AGUA, p, q, SAMPLES)
+    assert np.array_equal(first, expected) and cache.stats["misses"] == 20
+    first[:] = 0.0  # results are copies
+    again = cache.paths(AGUA, p[::-1], q[::-1], SAMPLES)
+    assert np.array_equal(again, expected[::-1]) and cache.stats["hits"] == 20
+    assert np.array_equal(cache.path(AGUA, p[3], q[3], SAMPLES), expected[3])
+    assert len(cache) == 20 and cache.nbytes == 20 * _entry_bytes(AGUA)
+
+
+def test_duplicates_in_a_batch_are_computed_once():
+    rng = np.random.default_rng(2)
+    p, q = H4.random(3, rng), H4.random(3, rng)
+    cache = GeodesicCache()
+    paths = cache.paths(H4, p[[0, 1, 0, 2, 1]], q[[0, 1, 0, 2, 1]], SAMPLES)
+    assert np.array_equal(paths[0], paths[2]) and np.array_equal(paths[1], paths[4])
+    assert len(cache) == 3
+
+
+def test_endpoints_must_match_bit_for_bit(monkeypatch):
+    rng = np.random.default_rng(3)
+    p, q = H4.random(1, rng), H4.random(1, rng)
+    cache = GeodesicCache()
+    cache.paths(H4, p, q, SAMPLES)
+
+    nudged = p.copy()
+    nudged[0, 1] = np.nextafter(nudged[0, 1], np.inf)
+    cache.paths(H4, nudged, q, SAMPLES)
+    assert cache.stats["hits"] == 0 and cache.stats["misses"] == 2
+
+    # Every pair hashes alike: the stored endpoints still tell them apart
+    monkeypatch.setattr(geodesic_cache, "_row_hashes", lambda rows: [0] * len(rows))
+    colliding = GeodesicCache()
+    colliding.paths(H4, p, q, SAMPLES)
+    path = colliding.paths(H4, nudged, q, SAMPLES)
+    assert np.array_equal(path, H4.geodesic(nudged, q, np.linspace(0.0, 1.0, SAMPLES)))
+    assert colliding.stats["collisions"] == 1 and colliding.stats["hits"] == 0
+    assert colliding.paths(H4, nudged, q, SAMPLES) is not None and colliding.stats["hits"] == 1
+
+
+def test_eviction_keeps_the_budget_and_recent_entries():
+    rng = np.random.default_rng(4)
+    p, q = AGUA.random(12, rng), AGUA.random(12, rng)
+    entry = _entry_bytes(AGUA)
+    cache = GeodesicCache(max_bytes=10 * entry)
+
+    cache.paths(AGUA, p[:8], q[:8], SAMPLES)
+    cache.paths(AGUA, p[:2], q[:2], SAMPLES)  # recently used
+    cache.paths(AGUA, p[8:], q[8:], SAMPLES)
+    assert cache.stats["evictions"] > 0
+    assert cache.nbytes == len(cache) * entry <= cache.max_bytes
+
+    hits = cache.stats["hits"]
+    cache.paths(AGUA, p[:2], q[:2], SAMPLES)
+    cache.paths(AGUA, p[8:], q[8:], SAMPLES)
+    assert cache.stats["hits"] == hits + 6
+
+    small = GeodesicCache(max_bytes=3 * entry)
+    small.paths(AGUA, p, q, SAMPLES)
+    assert len(small) == 3 and small.stats["uncacheable"] == 9
+    tiny = GeodesicCache(max_bytes=entry - 1)
+    assert np.array_equal(tiny.paths(AGUA, p[:2], q[:2], SAMPLES), AGUA.geodesic(p[:2], q[:2],
+                                                                              np.linspace(0.0, 1.0, SAMPLES)))
+    assert len(tiny) == 0 and tiny.stats["uncacheable"] == 2
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+    with pytest.raises(ValueError):
+        GeodesicCache(max_bytes=0)
@@ -0,0 +1,64 @@
+"""Manifold maps agree with each other on batches: exp inverts log, |log| is the distance, transport is an isometry"""
+
+import numpy as np
+import pytest
+
+from agua_geometry import AGUA, E5, H4, S3, manifold
+
+MANIFOLDS = [H4, S3, E5, AGUA]
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+
+@pytest.mark.parametrize("m", MANIFOLDS, ids=lambda m: m.name)
+def test_exp_inverts_log(m, rng):
+    p, q = m.random(200, rng), m.random(200, rng)
+    assert np.allclose(m.exp(p, m.log(p, q)), q, atol=1e-9)
+    v = m.log(p, q)
+    assert np.allclose(m.log(p, m.exp(p, v)), v, atol=1e-9)
+
+
+@pytest.mark.parametrize("m", MANIFOLDS, ids=lambda m: m.name)
+def test_distance_is_norm_of_log(m, rng):
+    p, q = m.random(200, rng), m.random(200, rng)
+    assert np.allclose(m.norm(m.log(p, q)), m.distance(p, q), rtol=1e-10, atol=1e-12)
+    assert np.allclose(m.distance(p, p), 0.0)
+    assert np.allclose(m.pairwise_distance(p[:5], q[:7]), m.distance(p[:5, None], q[None, :7]), atol=1e-6)
+
+
+@pytest.mark.parametrize("m", MANIFOLDS, ids=lambda m: m.name)
+def test_parallel_transport_preserves_norm(m, rng):
+    p, q = m.random(200, rng), m.random(200, rng)
+    v = m.to_tangent(p, rng.standard_normal(p.shape))
+    moved = m.parallel_transport(p, q, v)
+    assert np.allclose(m.norm(moved), m.norm(v), rtol=1e-9)
+    assert np.allclose(m.to_tangent(q, moved), moved, atol=1e-8)  # tangent at q
+
+
+def test_exp_stays_on_h4(rng):
+    origin = H4.origin()
+    for scale in (1e-8, 1.0, 5.0):
+        v = H4.to_tangent(origin, rng.standard_normal((500, 5)) * scale)
+        points = H4.exp(origin, v)
+        assert H4.contains(points).all()
+        assert H4.contains(H4.midpoint(points, H4.random(500, rng, scale))).all()
+    assert not H4.contains(np.array([1.0, 1.0, 0.0, 0.0, 0.0])).any()
+    assert not H4.contains(-origin).any()
+
+
+def test_nearby_and_antipodal_points_keep_precision():
+    p = S3.origin()
+    assert S3.distance(p, S3.antipode(p)) == pytest.approx(np.pi)
+    step = np.array([0.0, 1e-12, 0.0, 0.0])
+    assert H4.distance(H4.origin(), H4.exp(H4.origin(), np.array([0.0, 1e-12, 0.0, 0.0, 0.0]))) == \
+        pytest.approx(1e-12, rel=1e-9)
+    assert S3.distance(p, S3.exp(p, step)) == pytest.approx(1e-12, rel=1e-9)
+
+
+def test_manifold_by_name():
+    assert manifold("H4xS3xE5") is AGUA
+    with pytest.raises(KeyError, match="Unknown manifold"):
+        manifold("H3")
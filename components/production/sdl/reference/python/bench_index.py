@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Index Benchmarks - Recall and latency of the IVF index at 10^5 to 10^7 points
+
+For each size, clustered points on the chosen manifold are written to a .npy
+file in chunks and the index is bulk-built from it memory-mapped, then saved
+and loaded back. Queries are perturbed copies of held-out points. Recall@k is
+measured against exact neighbours from a flat scan, and per-query latency at
+each nprobe. Incremental inserts are timed on 1% more points.
+
+    python bench_index.py
+    python bench_index.py --manifold H4xS3xE5 --sizes 100000 1000000
+    python bench_index.py --nprobe 1 8 32 --json results.json
+
+The 10^7 run needs about 1 GB of disk for H4 and several minutes, mostly for
+the exact ground truth. --json also writes a `benchmarks` section in the live
+analyzer's result format (one entry per size and nprobe).
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+try:
+    import agua_geometry  # noqa: F401
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "agua" / "reference" / "python"))
+
+from agua_geometry import MANIFOLDS, Manifold
+from sdl_index import IVFIndex, flat_search
+
+DEFAULT_SIZES = (100_000, 1_000_000, 10_000_000)
+DEFAULT_NPROBE = (1, 4, 16, 64)
+DEFAULT_QUERIES = 100
+K = 10
+CHUNK = 1 << 18
+
+# Points are drawn around this many cluster centres (real embeddings are clustered, uniform noise is not)
+CLUSTERS = 1000
+CENTRE_SCALE = 1.0
+CLUSTER_SPREAD = 0.1
+QUERY_SPREAD = 0.05
+
+
+def _around(manifold: Manifold, centres: np.ndarray, spread: float, rng: np.random.Generator) -> np.ndarray:
+    """Gaussian tangent noise drawn at the origin and transported to each centre, so its size does not depend
+    on where the centre is"""
+    origin = manifold.origin()
+    noise = manifold.to_tangent(origin, spread * rng.standard_normal(centres.shape))
+    return manifold.exp(centres, manifold.parallel_transport(origin, centres, noise))
+
+
+def write_points(manifold: Manifold, path: Path, n: int, rng: np.random.Generator) -> np.ndarray:
+    """n clustered points written to a .npy file in chunks; returns it memory-mapped"""
+    centres = manifold.random(CLUSTERS, rng, CENTRE_SCALE)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=float, shape=(n, manifold.ambient_dim))
+    for start in range(0, n, CHUNK):
+        count = min(CHUNK, n - start)
+        out[start:start + count] = _around(manifold, centres[rng.integers(0, CLUSTERS, count)], CLUSTER_SPREAD, rng)
+    out.flush()
+    return np.load(path, mmap_mode="r")
+
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(np.intersect1d(f, t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def bench_size(manifold: Manifold, n: int, nprobes: List[int], queries: int, workdir: Path,
+               rng: np.random.Generator) -> Dict[str, Any]:
+    points = write_points(manifold, workdir / "points.npy", n + queries, rng)
+    query_points = _around(manifold, np.asarray(points[n:]), QUERY_SPREAD, rng)
+    points = points[:n]
+
+    start = time.perf_counter()
+    index = IVFIndex.build(manifold, points, directory=workdir / "index")
+    build_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index = IVFIndex.load(workdir / "index")
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, truth = flat_search(manifold, points, query_points, K, chunk=CHUNK)
+    flat_s = time.perf_counter() - start
+
+    row = {"size": n, "nlist": index.nlist, "build_s": round(build_s, 3), "build_points_per_sec": round(n / build_s, 1),
+           "load_ms": round(load_s * 1000, 3), "flat_ms_per_query": round(flat_s * 1000 / queries, 3), "search": []}
+    for nprobe in nprobes:
+        index.search(query_points[:1], K, nprobe)
+        latencies = []
+        found = []
+        for query in query_points:
+            start = time.perf_counter()
+            found.append(index.search(query, K, nprobe)[1][0])
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1000
+        row["search"].append({"nprobe": nprobe, "recall": round(recall(np.array(found), truth), 4),
+                              "p50_ms": round(float(np.median(latencies)), 4),
+                              "p99_ms": round(float(np.percentile(latencies, 99)), 4),
+                              "qps": round(1000 / latencies.mean(), 1)})
+
+    extra = _around(manifold, np.asarray(points[rng.integers(0, n, max(1, n // 100))]), CLUSTER_SPREAD, rng)
+    start = time.perf_counter()
+    for batch in np.array_split(extra, max(1, len(extra) // 1000)):
+        index.add(batch)
+    insert_s = time.perf_counter() - start
+    row["insert_points_per_sec"] = round(len(extra) / insert_s, 1)
+    row["merges"] = index.stats["merges"]
+    del index, points
+    return row
+
+
+def run(manifold: Manifold, sizes: List[int], nprobes: List[int], queries: int,
+        workdir: Path) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(0)
+    rows = []
+    for n in sizes:
+        print(f"[Bench] {manifold.name} @ {n:,d} points...")
+        with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+            rows.append(bench_size(manifold, n, nprobes, queries, Path(tmp), rng))
+    return rows
+
+
+def print_summary(name: str, rows: List[Dict[str, Any]]):
+    for row in rows:
+        print(f"\n{name} @ {row['size']:,d} points, {row['nlist']} lists: built in {row['build_s']:.1f}s "
+              f"({row['build_points_per_sec']:,.0f} points/sec), loaded in {row['load_ms']:.1f} ms, "
+              f"{row['insert_points_per_sec']:,.0f} inserts/sec, flat scan {row['flat_ms_per_query']:.1f} ms/query")
+        print(f"  {'nprobe':>8s}{'recall@' + str(K):>12s}{'p50 ms':>10s}{'p99 ms':>10s}{'qps':>10s}")
+        for search in row["search"]:
+            print(f"  {search['nprobe']:>8d}{search['recall']:>12.4f}{search['p50_ms']:>10.3f}{search['p99_ms']:>10.3f}"
+                  f"{search['qps']:>10.0f}")
+
+
+def to_benchmark_results(name: str, rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Median query latencies in the live analyzer's benchmark result shape"""
+    benchmarks = {}
+    for row in rows:
+        for search in row["search"]:
+            operation = f"sdl_index.{name}.search.nprobe{search['nprobe']}"
+            benchmarks[f"{operation}@{row['size']}"] = {"operation": operation, "size": row["size"],
+                                                        "wall_ms": {"median": search["p50_ms"]},
+                                                        "recall": search["recall"]}
+    return benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark recall and latency of the SDL IVF index")
+    parser.add_argument("--manifold", default="H4", help="Manifold the points live on")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Indexed points")
+    parser.add_argument("--nprobe", nargs="+", type=int, default=list(DEFAULT_NPROBE), help="Lists probed per query")
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES, help="Queries per size")
+    parser.add_argument("--workdir", type=Path, help="Directory for the point and index files (default: temp)")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    if args.manifold not in MANIFOLDS:
+        print(f"❌ Unknown manifold {args.manifold}; expected one of {', '.join(MANIFOLDS)}")
+        sys.exit(1)
+    if args.workdir:
+        args.workdir.mkdir(parents=True, exist_ok=True)
+    sizes = sorted(args.sizes)
+    rows = run(MANIFOLDS[args.manifold], sizes, args.nprobe, args.queries, args.workdir)
+    print_summary(args.manifold, rows)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"manifold": args.manifold, "k": K, "sizes": rows,
+                       "benchmarks": to_benchmark_results(args.manifold, rows)}, f, indent=2)
+        print(f"\n✓ Results saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
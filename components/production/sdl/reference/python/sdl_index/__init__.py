@@ -0,0 +1,21 @@
+"""
+SDL approximate nearest-neighbour index over AGUA embeddings (H4, S3, E5 and
+their product)
+
+    from agua_geometry import AGUA
+    from sdl_index import IVFIndex
+    index = IVFIndex.build(AGUA, np.load("embeddings.npy", mmap_mode="r"), directory="index/")
+    distances, ids = index.search(queries, k=10, nprobe=16)
+    index.add(new_points)
+    index = IVFIndex.load("index/")           # no rebuild; points stay memory-mapped
+
+Requires agua_geometry (components/production/agua/reference/python) on the
+import path.
+"""
+
+from .ivf import (DEFAULT_NPROBE, IVFIndex, default_nlist, flat_search, kmeans,
+                  manifold_from_description)
+
+__version__ = "0.1.0"
+
+__all__ = ["DEFAULT_NPROBE", "IVFIndex", "default_nlist", "flat_search", "kmeans", "manifold_from_description"]
@@ -0,0 +1,329 @@
+"""
+Inverted-file (IVF) nearest-neighbour index over AGUA manifold embeddings
+(sdl_indexing_system: IVF / GEOMETRIC algorithms)
+
+Points are clustered into `nlist` lists by k-means under the manifold's own
+metric; centroids are the projected ambient means (the Lorentzian centroid on
+H4, the extrinsic mean on S3, the mean on E5, per factor on a product). A query
+ranks the centroids and scans the `nprobe` nearest lists exactly, so recall is
+tuned at query time without a rebuild.
+
+The quantizer has two levels: about sqrt(nlist) coarse centroids, each owning
+a block of fine centroids. A point is assigned to the nearest fine centroid of
+its nearest coarse centroid, so building costs about 2 sqrt(nlist) distances per
+point instead of nlist. Queries rank every fine centroid directly.
+
+Storage is CSR: points sorted by list in one [n, D] array with `offsets`, so a
+list is a contiguous slice and a probe is a slice read. Bulk builds stream the
+input in chunks, so it may be a memory-mapped array, and can write the sorted
+arrays straight to .npy files in a directory. Saved indices load with
+np.load(mmap_mode="r") and are searchable at once. Inserts go to an in-memory
+delta that searches also scan; it is merged into the lists once it outgrows
+`DELTA_FRACTION` of the index, or by compact().
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agua_geometry import Euclidean, Hyperboloid, Manifold, ProductManifold, Sphere
+
+FORMAT_VERSION = 1
+DEFAULT_NPROBE = 16
+DEFAULT_CHUNK = 1 << 16
+KMEANS_ITERATIONS = 8
+
+# Training sample: this many points per list, at most MAX_TRAINING_SAMPLE
+SAMPLE_PER_LIST = 32
+MAX_TRAINING_SAMPLE = 1 << 18
+
+# The delta is merged into the lists once it holds this fraction of the indexed points
+DELTA_FRACTION = 0.125
+MIN_DELTA_MERGE = 4096
+
+ARRAY_FILES = ("coarse", "centroids", "blocks", "offsets", "points", "ids")
+
+
+def default_nlist(n: int) -> int:
+    """4 sqrt(n) lists, the usual IVF rule of thumb"""
+    return int(max(1, min(n, round(4 * np.sqrt(n)))))
+
+
+def manifold_from_description(description: Dict[str, Any]) -> Manifold:
+    """Rebuild a manifold from Manifold.describe()"""
+    if "factors" in description:
+        return ProductManifold([manifold_from_description(factor) for factor in description["factors"]])
+    curvature = description["curvature"]
+    kind = Hyperboloid if curvature < 0 else Sphere if curvature > 0 else Euclidean
+    return kind(description["dim"])
+
+
+def _nearest(manifold: Manifold, points: np.ndarray, centroids: np.ndarray, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    labels = np.empty(len(points), dtype=np.int64)
+    for start in range(0, len(points), chunk):
+        block = np.asarray(points[start:start + chunk], dtype=float)
+        labels[start:start + chunk] = manifold.pairwise_distance(block, centroids).argmin(axis=1)
+    return labels
+
+
+def kmeans(manifold: Manifold, points: np.ndarray, k: int, rng: np.random.Generator,
+           iterations: int = KMEANS_ITERATIONS) -> np.ndarray:
+    """k centroids by Lloyd's algorithm under the manifold metric; a centroid is the manifold projection
+    of its members' ambient mean, and an empty cluster keeps its previous centroid"""
+    k = min(k, len(points))
+    centroids = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest(manifold, points, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=points[:, j], minlength=k) for j in range(points.shape[1])],
+                        axis=1)
+        filled = counts > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = manifold.project(sums[filled] / counts[filled, None])
+        usable = np.all(np.isfinite(means), axis=1)
+        centroids[np.flatnonzero(filled)[usable]] = means[usable]
+    return centroids
+
+
+def flat_search(manifold: Manifold, points: np.ndarray, queries: np.ndarray, k: int = 10,
+                chunk: int = DEFAULT_CHUNK) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact k nearest neighbours by a chunked scan of every point (the FLAT algorithm); used as ground truth"""
+    queries = np.atleast_2d(np.asarray(queries, dtype=float))
+    best_d = np.full((len(queries), 0), np.inf)
+    best_i = np.zeros((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(points), chunk):
+        block = np.asarray(points[start:start + chunk], dtype=float)
+        d = manifold.distance(queries[:, None, :], block[None, :, :])
+        best_d = np.concatenate([best_d, d], axis=1)
+        best_i = np.concatenate([best_i, np.broadcast_to(np.arange(start, start + len(block)), d.shape)], axis=1)
+        if best_d.shape[1] > k:
+            keep = np.argpartition(best_d, k - 1, axis=1)[:, :k]
+            best_d = np.take_along_axis(best_d, keep, axis=1)
+            best_i = np.take_along_axis(best_i, keep, axis=1)
+    order = np.argsort(best_d, axis=1)
+    return np.take_along_axis(best_d, order, axis=1), np.take_along_axis(best_i, order, axis=1)
+
+
+class IVFIndex:
+    """Approximate nearest-neighbour index under an AGUA manifold metric"""
+
+    def __init__(self, manifold: Manifold, coarse: np.ndarray, centroids: np.ndarray, blocks: np.ndarray,
+                 offsets: np.ndarray, points: np.ndarray, ids: np.ndarray):
+        self.manifold = manifold
+        self.coarse = coarse        # [nc, D] coarse centroids
+        self.centroids = centroids  # [nlist, D] fine centroids, grouped by coarse centroid
+        self.blocks = blocks        # [nc + 1] fine centroids of coarse c are blocks[c]:blocks[c + 1]
+        self.offsets = offsets      # [nlist + 1] points of list l are offsets[l]:offsets[l + 1]
+        self.points = points        # [n, D] sorted by list
+        self.ids = ids              # [n] caller ids, in the same order
+        self._delta_points: List[np.ndarray] = []
+        self._delta_ids: List[np.ndarray] = []
+        self._delta_lists: List[np.ndarray] = []
+        self.stats = {"built_s": 0.0, "merges": 0}
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def delta_size(self) -> int:
+        return sum(len(ids) for ids in self._delta_ids)
+
+    def __len__(self) -> int:
+        return len(self.ids) + self.delta_size
+
+    # Quantizer
+
+    @classmethod
+    def _train(cls, manifold: Manifold, sample: np.ndarray, nlist: int,
+               rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n_coarse = max(1, int(round(np.sqrt(nlist))))
+        coarse = kmeans(manifold, sample, n_coarse, rng)
+        labels = _nearest(manifold, sample, coarse)
+        members = np.bincount(labels, minlength=len(coarse))
+        # Fine centroids are shared out in proportion to each coarse cell's share of the sample
+        quota = np.where(members > 0, np.maximum(1, np.round(nlist * members / len(sample))), 0).astype(int)
+        quota = np.minimum(quota, members)
+        kept = np.flatnonzero(quota)  # a coarse centroid that attracted no sample has no fine centroids to offer
+        fine = [kmeans(manifold, sample[labels == c], quota[c], rng) for c in kept]
+        blocks = np.concatenate([[0], np.cumsum([len(f) for f in fine])])
+        return coarse[kept], np.concatenate(fine), blocks
+
+    def assign(self, points: Any, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+        """List of each point: the nearest fine centroid under its nearest coarse centroid"""
+        points = np.asarray(points, dtype=float)
+        top = _nearest(self.manifold, points, self.coarse, chunk)
+        lists = np.empty(len(points), dtype=np.int64)
+        for c in np.unique(top):
+            rows = np.flatnonzero(top == c)
+            start, stop = self.blocks[c], self.blocks[c + 1]
+            lists[rows] = start + _nearest(self.manifold, points[rows], self.centroids[start:stop], chunk)
+        return lists
+
+    # Building
+
+    @classmethod
+    def build(cls, manifold: Manifold, points: np.ndarray, ids: Optional[np.ndarray] = None,
+              nlist: Optional[int] = None, directory: Optional[Path] = None, seed: int = 0,
+              chunk: int = DEFAULT_CHUNK) -> "IVFIndex":
+        """Index [n, D] points, which may be a memory-mapped array; it is read in chunks of `chunk` rows.
+
+        With `directory`, the sorted points and ids are written there as .npy files (never held in memory
+        whole) and the index is saved, ready to load().
+        """
+        start_time = time.perf_counter()
+        n, dim = points.shape
+        if dim != manifold.ambient_dim:
+            raise ValueError(f"Expected {manifold.ambient_dim} coordinates for {manifold.name}, got {dim}")
+        if n == 0:
+            raise ValueError("Cannot build an index over no points")
+        nlist = nlist or default_nlist(n)
+        rng = np.random.default_rng(seed)
+        sample_size = min(n, max(nlist, min(MAX_TRAINING_SAMPLE, SAMPLE_PER_LIST * nlist)))
+        sample = np.asarray(points[np.sort(rng.choice(n, size=sample_size, replace=False))], dtype=float)
+        coarse, centroids, blocks = cls._train(manifold, sample, nlist, rng)
+
+        index = cls(manifold, coarse, centroids, blocks, np.zeros(len(centroids) + 1, dtype=np.int64),
+                    np.zeros((0, dim)), np.zeros(0, dtype=np.int64))
+        lists = np.concatenate([index.assign(points[i:i + chunk], chunk) for i in range(0, n, chunk)])
+        order = np.argsort(lists, kind="stable")
+        index.offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=len(centroids)))])
+
+        if directory is not None:
+            directory = Path(directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            index.points = np.lib.format.open_memmap(directory / "points.npy", mode="w+", dtype=float,
+                                                     shape=(n, dim))
+            index.ids = np.lib.format.open_memmap(directory / "ids.npy", mode="w+", dtype=np.int64, shape=(n,))
+        else:
+            index.points = np.empty((n, dim))
+            index.ids = np.empty(n, dtype=np.int64)
+        for i in range(0, n, chunk):
+            rows = order[i:i + chunk]
+            index.points[i:i + len(rows)] = points[np.sort(rows)][np.argsort(np.argsort(rows))]
+            index.ids[i:i + len(rows)] = rows if ids is None else np.asarray(ids)[rows]
+        index.stats["built_s"] = time.perf_counter() - start_time
+
+        if directory is not None:
+            index.points.flush()
+            index.ids.flush()
+            index._save_quantizer(directory, n)
+        return index
+
+    # Inserts
+
+    def add(self, points: Any, ids: Optional[Any] = None) -> np.ndarray:
+        """Insert points into the delta (merged later); returns their ids, by default continuing from len(self)"""
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        if ids is None:
+            ids = np.arange(len(self), len(self) + len(points), dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(points):
+            raise ValueError(f"Got {len(ids)} ids for {len(points)} points")
+        self._delta_points.append(points)
+        self._delta_ids.append(ids)
+        self._delta_lists.append(self.assign(points))
+        if self.delta_size > max(MIN_DELTA_MERGE, DELTA_FRACTION * len(self.ids)):
+            self.compact()
+        return ids
+
+    def _delta(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if len(self._delta_ids) > 1:
+            self._delta_points = [np.concatenate(self._delta_points)]
+            self._delta_ids = [np.concatenate(self._delta_ids)]
+            self._delta_lists = [np.concatenate(self._delta_lists)]
+        if not self._delta_ids:
+            return np.zeros((0, self.centroids.shape[1])), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return self._delta_points[0], self._delta_ids[0], self._delta_lists[0]
+
+    def compact(self):
+        """Merge the delta into the lists. The merged arrays are in memory (a loaded index's files are not
+        touched until save())."""
+        delta_points, delta_ids, delta_lists = self._delta()
+        if not len(delta_ids):
+            return
+        base_lists = np.repeat(np.arange(self.nlist), np.diff(self.offsets))
+        lists = np.concatenate([base_lists, delta_lists])
+        order = np.argsort(lists, kind="stable")
+        self.points = np.concatenate([np.asarray(self.points), delta_points])[order]
+        self.ids = np.concatenate([np.asarray(self.ids), delta_ids])[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=self.nlist))])
+        self._delta_points, self._delta_ids, self._delta_lists = [], [], []
+        self.stats["merges"] += 1
+
+    # Search
+
+    def search(self, queries: Any, k: int = 10, nprobe: int = DEFAULT_NPROBE) -> Tuple[np.ndarray, np.ndarray]:
+        """[q, k] distances and ids of the approximate k nearest neighbours of each query, nearest first;
+        rows with fewer than k candidates are padded with inf and -1"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=float))
+        nprobe = min(nprobe, self.nlist)
+        probes = np.argpartition(self.manifold.pairwise_distance(queries, self.centroids), nprobe - 1,
+                                 axis=1)[:, :nprobe]
+        delta_points, delta_ids, delta_lists = self._delta()
+        distances = np.full((len(queries), k), np.inf)
+        found = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, (query, lists) in enumerate(zip(queries, probes)):
+            slices = [slice(self.offsets[l], self.offsets[l + 1]) for l in lists]
+            candidates = [self.points[s] for s in slices]
+            candidate_ids = [self.ids[s] for s in slices]
+            if len(delta_ids):
+                in_probe = np.isin(delta_lists, lists)
+                candidates.append(delta_points[in_probe])
+                candidate_ids.append(delta_ids[in_probe])
+            candidates = np.concatenate(candidates)
+            if not len(candidates):
+                continue
+            d = self.manifold.distance(query, candidates)
+            top = np.argpartition(d, k - 1)[:k] if len(d) > k else np.arange(len(d))
+            top = top[np.argsort(d[top])]
+            distances[row, :len(top)] = d[top]
+            found[row, :len(top)] = np.concatenate(candidate_ids)[top]
+        return distances, found
+
+    # Persistence
+
+    def _save_quantizer(self, directory: Path, n: int):
+        for name in ("coarse", "centroids", "blocks", "offsets"):
+            tmp_file = directory / f"{name}.tmp.npy"
+            np.save(tmp_file, np.asarray(getattr(self, name)))
+            os.replace(tmp_file, directory / f"{name}.npy")
+        meta = {"version": FORMAT_VERSION, "algorithm": "IVF", "manifold": self.manifold.describe(),
+                "nlist": self.nlist, "count": n, "files": [f"{name}.npy" for name in ARRAY_FILES]}
+        with open(directory / "index.json", "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def save(self, directory: Path):
+        """Write the index (delta merged) as .npy files and index.json"""
+        self.compact()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ("points", "ids"):
+            tmp_file = directory / f"{name}.tmp.npy"
+            np.save(tmp_file, np.asarray(getattr(self, name)))
+            os.replace(tmp_file, directory / f"{name}.npy")
+        self._save_quantizer(directory, len(self.ids))
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "IVFIndex":
+        """Open a saved index; with mmap the points and ids stay on disk and are paged in as lists are probed"""
+        directory = Path(directory)
+        with open(directory / "index.json", "r") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format {meta.get('version')} in {directory}; "
+                             f"expected {FORMAT_VERSION}")
+        mode = "r" if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mode if name in ("points", "ids") else None)
+                  for name in ARRAY_FILES}
+        return cls(manifold_from_description(meta["manifold"]), **arrays)
+
+    def describe(self) -> Dict[str, Any]:
+        sizes = np.diff(self.offsets)
+        return {"manifold": self.manifold.name, "count": len(self), "nlist": self.nlist,
+                "coarse": len(self.coarse), "delta": self.delta_size,
+                "list_size": {"mean": float(sizes.mean()), "max": int(sizes.max())}, **self.stats}
@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+REFERENCE_DIR = Path(__file__).resolve().parent.parent
+AGUA_DIR = REFERENCE_DIR.parents[2] / "agua" / "reference" / "python"
+
+# sdl_index imports agua_geometry from the agua component's reference implementation
+for path in (str(REFERENCE_DIR), str(AGUA_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
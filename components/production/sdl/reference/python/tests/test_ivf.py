@@ -0,0 +1,88 @@
+"""IVF index on small inputs: recall against the exact scan, inserts, delta merges and saved indices"""
+
+import numpy as np
+import pytest
+
+from agua_geometry import AGUA, H4, S3
+from sdl_index import IVFIndex, flat_search
+from sdl_index import ivf
+
+N = 2000
+
+
+def _recall(found, exact):
+    return np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, exact)])
+
+
+@pytest.mark.parametrize("m", [H4, S3, AGUA], ids=lambda m: m.name)
+def test_recall_against_flat_search(m):
+    rng = np.random.default_rng(0)
+    points, queries = m.random(N, rng), m.random(50, rng)
+    index = IVFIndex.build(m, points, chunk=512)
+    exact_d, exact_i = flat_search(m, points, queries, k=10, chunk=512)
+
+    d, i = index.search(queries, k=10, nprobe=index.nlist)  # every list probed: exact
+    assert np.array_equal(i, exact_i) and np.allclose(d, exact_d)
+    coarse, fine = (_recall(index.search(queries, k=10, nprobe=nprobe)[1], exact_i)
+                    for nprobe in (4, index.nlist // 4))
+    assert coarse <= fine and fine > 0.9
+    assert np.all(np.diff(d, axis=1) >= 0)
+
+
+def test_ids_and_padding():
+    rng = np.random.default_rng(1)
+    points = H4.random(30, rng)
+    index = IVFIndex.build(H4, points, ids=np.arange(30) + 1000, nlist=4)
+    assert len(index) == 30 and sorted(index.ids) == list(range(1000, 1030))
+    d, i = index.search(points[:1], k=40, nprobe=4)
+    assert i[0, 0] == 1000 and d[0, 0] == pytest.approx(0.0, abs=1e-12)
+    assert np.all(i[0, 30:] == -1) and np.all(np.isinf(d[0, 30:]))
+
+
+def test_added_points_are_found_before_the_merge():
+    rng = np.random.default_rng(2)
+    index = IVFIndex.build(H4, H4.random(N, rng))
+    new = H4.random(5, rng)
+    ids = index.add(new)
+    assert list(ids) == list(range(N, N + 5)) and index.delta_size == 5 and index.stats["merges"] == 0
+    d, i = index.search(new, k=1)
+    assert list(i[:, 0]) == list(ids) and np.allclose(d, 0.0, atol=1e-12)
+    with pytest.raises(ValueError, match="ids for"):
+        index.add(new, ids=[1, 2])
+
+
+def test_delta_is_merged_past_its_fraction(monkeypatch):
+    monkeypatch.setattr(ivf, "MIN_DELTA_MERGE", 0)
+    rng = np.random.default_rng(3)
+    index = IVFIndex.build(S3, S3.random(N, rng))
+    threshold = int(ivf.DELTA_FRACTION * N)
+    index.add(S3.random(threshold, rng))
+    assert index.delta_size == threshold and index.stats["merges"] == 0
+
+    new = S3.random(1, rng)
+    index.add(new, ids=[-7])
+    assert index.delta_size == 0 and index.stats["merges"] == 1
+    assert len(index) == len(index.ids) == N + threshold + 1 and index.offsets[-1] == len(index.ids)
+    assert index.search(new, k=1)[1][0, 0] == -7
+    for l in range(index.nlist):  # every point sits in its own list
+        rows = slice(index.offsets[l], index.offsets[l + 1])
+        assert np.all(index.assign(index.points[rows]) == l)
+
+
+def test_saved_index_loads_memory_mapped(tmp_path):
+    rng = np.random.default_rng(4)
+    points, queries = AGUA.random(N, rng), AGUA.random(20, rng)
+    index = IVFIndex.build(AGUA, points)
+    index.add(AGUA.random(10, rng))
+    expected = index.search(queries, k=5)
+    index.save(tmp_path / "index")
+
+    loaded = IVFIndex.load(tmp_path / "index", mmap=True)
+    assert isinstance(loaded.points, np.memmap) and len(loaded) == N + 10
+    for got, want in zip(loaded.search(queries, k=5), expected):
+        assert np.array_equal(got, want)
+
+    streamed = IVFIndex.build(AGUA, points, directory=tmp_path / "built", chunk=300)
+    reopened = IVFIndex.load(tmp_path / "built")
+    for got, want in zip(reopened.search(queries, k=5), streamed.search(queries, k=5)):
+        assert np.array_equal(got, want)
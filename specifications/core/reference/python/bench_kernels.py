@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Kernel Benchmarks - Sweep input size and batch size for the reference kernels
+
+Every kernel with a case below is timed over a grid of n (elements per row) and
+batch (rows per call). The growth of time with n, fitted on a log-log scale at
+the smallest batch, is checked against the `complexity_class` its spec declares:
+a kernel whose measured exponent exceeds the declared one by more than the
+tolerance is reported as a mismatch. The batch sweep shows how much a row costs
+inside a batch compared with calling the kernel on one row at a time.
+
+    python bench_kernels.py                      # every case
+    python bench_kernels.py --only window_function find_peaks
+    python bench_kernels.py --sizes 1024 4096 16384 --batches 1 64 --json results.json
+
+--json writes the sweep plus a `benchmarks` section in the live analyzer's
+result format (one entry per operation and size, batch 1), which its cost model
+calibrates from.
+"""
+
+import re
+import sys
+import math
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import core_kernels
+
+SPEC_DIR = Path(__file__).resolve().parents[2]
+SPEC_FILES = ("core_efficient_math_ops.json", "core_efficient_trajectory_ops.json")
+
+DEFAULT_SIZES = (256, 1024, 4096, 16384)
+DEFAULT_BATCHES = (1, 8, 64)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.35
+# Budget per (case, n, batch) cell; larger cells are skipped rather than run for minutes
+MAX_ELEMENTS = 1 << 18
+
+# Expected log-log slope of time against n for each declared class
+EXPONENTS = {"O(1)": 0.0, "O(log n)": 0.0, "O(n)": 1.0, "O(n log n)": 1.0}
+
+# Elementwise operations declare the cost of one element; a row of n elements is n evaluations, so the
+# measured exponent is expected to be one higher
+PER_ELEMENT = frozenset({"float_compare", "round_to_precision", "complex_to_polar", "gamma", "log_gamma", "digamma",
+                         "erf", "erfc", "slerp"})
+
+Case = Callable[[int, int, np.random.Generator], Tuple[tuple, dict]]
+
+
+def _signal(n, batch, rng):
+    return rng.standard_normal((batch, n))
+
+
+def _sorted(n, batch, rng):
+    return np.cumsum(rng.random((batch, n)) + 0.1, axis=-1)
+
+
+def _points(n, batch, rng, d=3):
+    return np.cumsum(rng.standard_normal((batch, n, d)), axis=-2)
+
+
+# name -> inputs (args, kwargs) for rows of n elements and a batch of rows; None skips a cell that would
+# be too slow or too large
+CASES: Dict[str, Case] = {
+    "window_function": lambda n, b, rng: ((n, "kaiser", 7.0), {}),
+    "find_peaks": lambda n, b, rng: ((_signal(n, b, rng),), {"prominence": 0.5}),
+    "fft_frequency_bins": lambda n, b, rng: ((n,), {}),
+    "fft_shift": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "dwt": lambda n, b, rng: ((_signal(n, b, rng),), {"wavelet": "db4", "level": 4}),
+    "idwt": lambda n, b, rng: ((_signal(n // 2, b, rng), [_signal(n // 2, b, rng)]), {"wavelet": "db4"}),
+    "chebyshev_polynomial": lambda n, b, rng: ((12, _signal(n, b, rng)), {}),
+    "taylor_series": lambda n, b, rng: (("exp", rng.random((b, n)), 8), {}),
+    "interpolate_linear": lambda n, b, rng: ((_sorted(n, b, rng), _signal(n, b, rng), _sorted(16, b, rng) * n / 16), {}),
+    "interpolate_cubic_spline": lambda n, b, rng: ((_sorted(n, b, rng), _signal(n, b, rng), _sorted(n, b, rng)), {}),
+    "spline_interpolation": lambda n, b, rng: ((_sorted(n, b, rng), _signal(n, b, rng)), {}),
+    "float_compare": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng)), {}),
+    "array_allclose": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng)), {}),
+    "replace_nan": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "round_to_precision": lambda n, b, rng: ((_signal(n, b, rng), 3, "up"), {}),
+    "complex_to_polar": lambda n, b, rng: ((_signal(n, b, rng) + 1j * _signal(n, b, rng),), {}),
+    "vector_dot_product": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng)), {}),
+    "vector_norm": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "vector_normalize": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "vector_projection": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng)), {}),
+    "gamma": lambda n, b, rng: ((rng.random((b, n)) * 20 - 5,), {}),
+    "log_gamma": lambda n, b, rng: ((rng.random((b, n)) * 100,), {}),
+    "digamma": lambda n, b, rng: ((rng.random((b, n)) * 20 + 0.1,), {}),
+    "erf": lambda n, b, rng: ((_signal(n, b, rng) * 3,), {}),
+    "erfc": lambda n, b, rng: ((_signal(n, b, rng) * 3,), {}),
+    # The Bessel kernels hold a few hundred quadrature nodes per element
+    "bessel_j": lambda n, b, rng: ((1.5, rng.random((b, n)) * 20), {}) if n * b <= 1 << 14 else None,
+    "bessel_k": lambda n, b, rng: ((0.5, rng.random((b, n)) * 10 + 0.1), {}) if n * b <= 1 << 14 else None,
+    "integrate_trapezoidal": lambda n, b, rng: ((np.sin, np.zeros(b), np.ones(b), n), {}),
+    "integrate_simpson": lambda n, b, rng: ((np.sin, np.zeros(b), np.ones(b), n), {}),
+    # Computing a rule is an O(n^3) eigenproblem, so n stays small
+    "integrate_gauss_legendre": lambda n, b, rng: ((np.sin, np.zeros(b), np.ones(b), n), {}) if n <= 1024 else None,
+    "integrate_monte_carlo": lambda n, b, rng: ((np.sin, np.zeros(b), np.ones(b), n), {"seed": 0}),
+    "integrate_from_samples": lambda n, b, rng: ((_sorted(n, b, rng), _signal(n, b, rng), "simpson"), {}),
+    # The declared O(n) counts evaluations of f, one per dimension, and each costs O(d) here; a row of
+    # n = d * d stencil coordinates therefore holds d = sqrt(n) dimensions
+    "gradient": lambda n, b, rng: ((lambda x: (x * x).sum(axis=-1), _signal(math.isqrt(n), b, rng)), {}),
+    "laplacian": lambda n, b, rng: ((lambda x: (x * x).sum(axis=-1), _signal(math.isqrt(n), b, rng)), {}),
+    "ode_rk4": lambda n, b, rng: ((lambda t, y: -y, rng.random(b), (0.0, 1.0), 1.0 / n), {}),
+    "bvp_finite_difference": lambda n, b, rng: ((np.cos, np.sin, np.exp, (0.0, 1.0), (np.zeros(b), np.ones(b)), n), {}),
+    "mean": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "median": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "mode": lambda n, b, rng: ((rng.integers(0, 50, (b, n)),), {}),
+    "variance": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "skewness": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "kurtosis": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "covariance": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng)), {}),
+    "correlation": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng), "spearman"), {}),
+    "zscore_normalize": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "minmax_normalize": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "outlier_detection_zscore": lambda n, b, rng: ((_signal(n, b, rng),), {"modified": True}),
+    "moving_average": lambda n, b, rng: ((_signal(n, b, rng), 32), {}),
+    "exponential_smoothing": lambda n, b, rng: ((_signal(n, b, rng), 0.1), {}),
+    "histogram_compute": lambda n, b, rng: ((_signal(n, b, rng), 32), {"range": (-4.0, 4.0)}),
+    "normal_pdf": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "normal_cdf": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "normal_ppf": lambda n, b, rng: ((rng.random((b, n)),), {}),
+    "gamma_distribution": lambda n, b, rng: ((rng.random((b, n)) * 10, 2.5, 1.0, "cdf"), {}),
+    "t_distribution": lambda n, b, rng: ((_signal(n, b, rng), 7, "cdf"), {}),
+    "beta_distribution": lambda n, b, rng: ((rng.random((b, n)), 2.0, 3.0, "cdf"), {}),
+    "weibull_distribution": lambda n, b, rng: ((rng.random((b, n)) * 3, 1.5, 1.0, "cdf"), {}),
+    "simple_linear_regression": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng)), {}),
+    "r_squared": lambda n, b, rng: ((_signal(n, b, rng), _signal(n, b, rng)), {}),
+    "t_test_one_sample": lambda n, b, rng: ((_signal(n, b, rng), 0.1), {}),
+    "z_test": lambda n, b, rng: ((_signal(n, b, rng), 0.1, 1.0), {}),
+    "confidence_interval_mean": lambda n, b, rng: ((_signal(n, b, rng),), {}),
+    "cubic_spline_interpolate": lambda n, b, rng: ((_points(n, b, rng),), {}),
+    "catmull_rom_spline_create": lambda n, b, rng: ((_points(n, b, rng),), {}),
+    "bezier_curve_control_polygon_length": lambda n, b, rng: (
+        (core_kernels.curves.BezierCurve(_points(n, b, rng)),), {}),
+    "path_reverse": lambda n, b, rng: ((_points(n, b, rng),), {}),
+    "slerp": lambda n, b, rng: ((_unit(rng, b, n), _unit(rng, b, n), rng.random((b, n))), {}),
+    "generate_trapezoidal_velocity_profile": lambda n, b, rng: (
+        (np.zeros((b, 3)), rng.random((b, 3)) * 10, 2.0, 1.0, n), {}),
+}
+
+
+def _unit(rng, batch, n):
+    q = rng.standard_normal((batch, n, 4))
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def declared_classes(spec_dir: Path = SPEC_DIR) -> Dict[str, str]:
+    """complexity_class of every operation in the core efficient specs"""
+    classes = {}
+    for name in SPEC_FILES:
+        spec_file = spec_dir / name
+        if spec_file.exists():
+            with open(spec_file, "r") as f:
+                for op in json.load(f).get("operations", []):
+                    classes[op["name"]] = op.get("complexity_class") or op.get("complexity", "")
+    return classes
+
+
+def _normalize_class(declared: str) -> str:
+    return re.sub(r"\s+", " ", declared.replace("N", "n")).strip()
+
+
+def time_call(func: Callable, args: tuple, kwargs: dict, repeat: int) -> float:
+    """Best of `repeat` runs in milliseconds, after one warmup run (which also fills any caches)"""
+    func(*args, **kwargs)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def fit_exponent(sizes: List[int], times: List[float]) -> Optional[float]:
+    """Slope of log(time) against log(n); None with fewer than two sizes"""
+    if len(sizes) < 2:
+        return None
+    slope, _ = np.polyfit(np.log(sizes), np.log(np.maximum(times, 1e-6)), 1)
+    return float(slope)
+
+
+def run_case(name: str, sizes: List[int], batches: List[int], repeat: int,
+             declared: Optional[str], tolerance: float) -> Dict[str, Any]:
+    # Cached kernels are timed uncached: the check is about the computation, not the cache lookup
+    func = core_kernels.kernel(name)
+    func = getattr(func, "__wrapped__", func)
+    rng = np.random.default_rng(0)
+    cells = []
+    for batch in batches:
+        for n in sizes:
+            if n * batch > MAX_ELEMENTS:
+                continue
+            inputs = CASES[name](n, batch, rng)
+            if inputs is None:
+                continue
+            args, kwargs = inputs
+            cells.append({"n": n, "batch": batch, "ms": round(time_call(func, args, kwargs, repeat), 6)})
+
+    result: Dict[str, Any] = {"declared": declared, "cells": cells}
+    # Fit at the smallest batch that covers at least two sizes. Per-call overhead can only flatten the
+    # slope, so it never causes a false mismatch, while large batches add cache effects that steepen it
+    for batch in sorted(batches):
+        row = [c for c in cells if c["batch"] == batch]
+        if len(row) >= 2:
+            exponent = fit_exponent([c["n"] for c in row], [c["ms"] for c in row])
+            result["fit_batch"] = batch
+            result["exponent"] = round(exponent, 3)
+            break
+
+    expected = EXPONENTS.get(_normalize_class(declared or ""))
+    if expected is not None and name in PER_ELEMENT:
+        expected += 1.0
+    if expected is None or "exponent" not in result:
+        result["status"] = "unchecked"
+    elif result["exponent"] > expected + tolerance:
+        result["status"] = "mismatch"
+    else:
+        result["status"] = "ok"
+
+    # Per-row cost in the largest batch relative to batch 1, at the largest n both have
+    single = {c["n"]: c["ms"] for c in cells if c["batch"] == 1}
+    widest = max(batches)
+    shared = [c for c in cells if c["batch"] == widest and c["n"] in single]
+    if widest > 1 and shared:
+        cell = max(shared, key=lambda c: c["n"])
+        result["batch_speedup"] = round(single[cell["n"]] * widest / cell["ms"], 2) if cell["ms"] else None
+    return result
+
+
+def run(names: List[str], sizes: List[int], batches: List[int], repeat: int,
+        tolerance: float) -> Dict[str, Dict[str, Any]]:
+    declared = declared_classes()
+    results = {}
+    for name in names:
+        print(f"[Bench] {name}...")
+        try:
+            results[name] = run_case(name, sizes, batches, repeat, declared.get(name), tolerance)
+        except Exception as e:
+            results[name] = {"declared": declared.get(name), "status": "error", "error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def print_summary(results: Dict[str, Dict[str, Any]]):
+    print(f"\n{'operation':40s} {'declared':12s} {'exponent':>8s} {'batch x':>8s}  status")
+    for name, result in results.items():
+        exponent = result.get("exponent")
+        speedup = result.get("batch_speedup")
+        print(f"{name:40s} {str(result.get('declared') or '-'):12s} "
+              f"{'-' if exponent is None else f'{exponent:.2f}':>8s} "
+              f"{'-' if speedup is None else f'{speedup:.1f}':>8s}  {result['status']}"
+              + (f" ({result['error']})" if "error" in result else ""))
+    mismatches = [name for name, result in results.items() if result["status"] == "mismatch"]
+    if mismatches:
+        print(f"\n⚠ {len(mismatches)} kernel(s) grow faster than their declared class: {', '.join(mismatches)}")
+
+
+def to_benchmark_results(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Batch-1 cells in the live analyzer's benchmark result shape"""
+    benchmarks = {}
+    for name, result in results.items():
+        for cell in result.get("cells", []):
+            if cell["batch"] == 1:
+                benchmarks[f"{name}@{cell['n']}"] = {"operation": name, "size": cell["n"],
+                                                     "wall_ms": {"median": cell["ms"]}}
+    return benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the reference kernels against their declared complexity")
+    parser.add_argument("--only", nargs="+", help="Operations to benchmark (default: every case)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Row lengths n")
+    parser.add_argument("--batches", nargs="+", type=int, default=list(DEFAULT_BATCHES), help="Rows per call")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per cell (best is kept)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed excess of the fitted exponent over the declared one")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.only or [] if name not in CASES]
+    if unknown:
+        print(f"❌ No benchmark case for: {', '.join(unknown)}")
+        sys.exit(1)
+    names = args.only or list(CASES)
+    results = run(names, sorted(args.sizes), sorted(args.batches), args.repeat, args.tolerance)
+    print_summary(results)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"sizes": sorted(args.sizes), "batches": sorted(args.batches), "kernels": results,
+                       "benchmarks": to_benchmark_results(results)}, f, indent=2)
+        print(f"\n✓ Results saved to {args.json}")
+
+    sys.exit(1 if any(r["status"] in ("mismatch", "error") for r in results.values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Reference NumPy kernels for the core efficient operations
+
+Vectorized implementations of the operations in `core_efficient_math_ops.json`
+and the flat-space curve operations of `core_efficient_trajectory_ops.json`.
+Kernels take batches along leading axes ([batch, n] for 1-D data) and return one
+result per row; coefficients that depend only on hashable parameters (windows,
+wavelet filters, quadrature rules, Bernstein bases) are computed once and cached.
+
+    from core_kernels import kernel
+    window = kernel("window_function")(256, "kaiser", 8.6)
+
+OPERATIONS maps every implemented spec operation name to its kernel.
+"""
+
+from typing import Callable, Dict
+
+from . import approximation, calculus, curves, numerics, special, spectral, statistics
+
+__version__ = "0.1.0"
+
+_MODULES = (spectral, approximation, numerics, special, calculus, statistics, curves)
+
+# Public building blocks that are not spec operations themselves
+_HELPERS = frozenset({"bernstein_basis", "beta_inc", "cubic_spline", "gamma_inc", "gauss_legendre_rule", "max_level",
+                      "working_precision"})
+
+
+def _collect() -> Dict[str, Callable]:
+    operations = {}
+    for module in _MODULES:
+        for name, value in vars(module).items():
+            if name.startswith("_") or name in _HELPERS or isinstance(value, type) or not callable(value):
+                continue
+            if getattr(value, "__module__", None) == module.__name__:
+                operations[name] = value
+    return operations
+
+
+OPERATIONS: Dict[str, Callable] = _collect()
+
+
+def kernel(name: str) -> Callable:
+    """The kernel implementing a spec operation"""
+    try:
+        return OPERATIONS[name]
+    except KeyError:
+        raise KeyError(f"No reference kernel for operation {name}") from None
+
+
+__all__ = ["OPERATIONS", "kernel", "approximation", "calculus", "curves", "numerics", "special", "spectral",
+           "statistics"]
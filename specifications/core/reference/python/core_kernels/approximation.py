@@ -0,0 +1,356 @@
+"""
+Approximation and interpolation kernels (approximation_spec, interpolation_spec)
+
+Data come as x [n] shared by every row or x [batch, n], with y [batch, n]; evaluation
+points as [k] or [batch, k]. A scalar evaluation point gives one value per row.
+"""
+
+from math import factorial
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from ._batch import as_float, locate, solve_tridiagonal
+
+BOUNDARY_CONDITIONS = ("natural", "clamped", "not-a-knot")
+
+
+def chebyshev_polynomial(n: int, x: Any) -> Union[float, np.ndarray]:
+    """T_n(x) by the three-term recurrence, for any x"""
+    x = as_float(x)
+    previous, current = np.ones_like(x), x.copy()
+    if n == 0:
+        return previous
+    for _ in range(n - 1):
+        previous, current = current, 2 * x * current - previous
+    return current
+
+
+def continued_fraction(a: Any, b: Any, max_terms: Optional[int] = None) -> Union[float, np.ndarray]:
+    """b0 + a1/(b1 + a2/(b2 + ...)) by the modified Lentz algorithm; a [..., m], b [..., m + 1]"""
+    a, b = as_float(a), as_float(b)
+    if a.shape[-1] + 1 != b.shape[-1]:
+        raise ValueError("b needs one more term than a (b0 has no numerator)")
+    terms = a.shape[-1] if max_terms is None else min(max_terms, a.shape[-1])
+    tiny = 1e-300
+    value = np.where(b[..., 0] == 0, tiny, b[..., 0])
+    c, d = value.copy(), np.zeros_like(value)
+    for j in range(terms):
+        d = b[..., j + 1] + a[..., j] * d
+        d = 1.0 / np.where(d == 0, tiny, d)
+        c = b[..., j + 1] + a[..., j] / c
+        c = np.where(c == 0, tiny, c)
+        value = value * c * d
+    return value
+
+
+# Analytic derivative sequences f^(k)(a) for the named functions of taylor_series
+_DERIVATIVES: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "exp": lambda a, k: np.exp(a),
+    "sin": lambda a, k: np.sin(a + k * np.pi / 2),
+    "cos": lambda a, k: np.cos(a + k * np.pi / 2),
+    "sinh": lambda a, k: np.sinh(a) if k % 2 == 0 else np.cosh(a),
+    "cosh": lambda a, k: np.cosh(a) if k % 2 == 0 else np.sinh(a),
+    "log": lambda a, k: np.log(a) if k == 0 else (-1.0) ** (k + 1) * factorial(k - 1) / a ** k,
+    "sqrt": lambda a, k: np.prod(0.5 - np.arange(k)) * a ** (0.5 - k),
+    "reciprocal": lambda a, k: (-1.0) ** k * factorial(k) / a ** (k + 1),
+}
+
+
+def taylor_series(function: Union[str, Callable], center: Any, order: int, x: Any = None,
+                  radius: float = 0.5) -> Dict[str, Any]:
+    """Coefficients f^(k)(a)/k! for k = 0..order and, given x, the truncated series at x.
+
+    Named functions use their analytic derivatives. A callable must accept complex arrays; its
+    coefficients come from the Cauchy integral on a circle of `radius` around the centre, one FFT for
+    all centres, so the function must be analytic on that disc.
+    """
+    center = as_float(center)
+    if isinstance(function, str):
+        if function not in _DERIVATIVES:
+            raise ValueError(f"Unknown function {function}; expected one of {sorted(_DERIVATIVES)} or a callable")
+        derivative = _DERIVATIVES[function]
+        coefficients = np.stack([derivative(center, k) / factorial(k) for k in range(order + 1)], axis=-1)
+    else:
+        points = max(2 * (order + 1), 32)
+        theta = 2 * np.pi * np.arange(points) / points
+        samples = function(center[..., None] + radius * np.exp(1j * theta))
+        spectrum = np.fft.fft(samples, axis=-1)[..., :order + 1] / points
+        coefficients = np.real(spectrum) / radius ** np.arange(order + 1)
+
+    result = {"coefficients": coefficients}
+    if x is not None:
+        offset = as_float(x) - center
+        # Horner's rule, highest degree first
+        value = np.zeros(np.broadcast_shapes(offset.shape, center.shape))
+        for k in range(order, -1, -1):
+            value = value * offset + coefficients[..., k]
+        result["value"] = value
+    return result
+
+
+class PiecewiseCubic:
+    """Piecewise cubic a + b s + c s^2 + d s^3, s = x - breaks[i], on each [breaks[i], breaks[i+1]]"""
+
+    __slots__ = ("breaks", "coefficients")
+
+    def __init__(self, breaks: np.ndarray, coefficients: np.ndarray):
+        self.breaks = breaks
+        self.coefficients = coefficients  # [..., n - 1, 4]
+
+    @classmethod
+    def from_slopes(cls, x: np.ndarray, y: np.ndarray, m: np.ndarray) -> "PiecewiseCubic":
+        """Hermite form: values y and first derivatives m at the breaks"""
+        h = np.diff(x, axis=-1)
+        delta = np.diff(y, axis=-1) / h
+        c = (3 * delta - 2 * m[..., :-1] - m[..., 1:]) / h
+        d = (m[..., :-1] + m[..., 1:] - 2 * delta) / h ** 2
+        return cls(x, np.stack([y[..., :-1], m[..., :-1], c, d], axis=-1))
+
+    def __call__(self, x_eval: Any, derivative: int = 0) -> np.ndarray:
+        t = as_float(x_eval)
+        scalar = t.ndim == 0
+        t = t[..., None] if scalar else t
+        lead = np.broadcast_shapes(self.coefficients.shape[:-2], t.shape[:-1]) if self.breaks.ndim == 1 else \
+            np.broadcast_shapes(self.coefficients.shape[:-2], self.breaks.shape[:-1], t.shape[:-1])
+        t = np.broadcast_to(t, lead + t.shape[-1:])
+        i = locate(self.breaks, t)
+        s = t - _gather(self.breaks, i)
+        a, b, c, d = (_gather(self.coefficients[..., j], i) for j in range(4))
+        if derivative == 0:
+            value = a + s * (b + s * (c + s * d))
+        elif derivative == 1:
+            value = b + s * (2 * c + 3 * s * d)
+        elif derivative == 2:
+            value = 2 * c + 6 * s * d
+        else:
+            value = np.broadcast_to(6 * d if derivative == 3 else 0 * d, s.shape)
+        return value[..., 0] if scalar else value
+
+
+def _gather(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """values[..., index] row by row, broadcasting shared values over the batch"""
+    if values.ndim == 1:
+        return values[index]
+    lead = np.broadcast_shapes(values.shape[:-1], index.shape[:-1])
+    return np.take_along_axis(np.broadcast_to(values, lead + values.shape[-1:]),
+                              np.broadcast_to(index, lead + index.shape[-1:]), axis=-1)
+
+
+def _spline_slopes(x: np.ndarray, y: np.ndarray, bc_type: str,
+                   bc_values: Optional[Tuple[float, float]]) -> np.ndarray:
+    """First derivatives at the knots of the C2 interpolating cubic; one tridiagonal solve per row"""
+    if bc_type not in BOUNDARY_CONDITIONS:
+        raise ValueError(f"Unknown boundary condition {bc_type}; expected one of {BOUNDARY_CONDITIONS}")
+    n = y.shape[-1]
+    h = np.broadcast_to(np.diff(x, axis=-1), y.shape[:-1] + (n - 1,))
+    delta = np.diff(y, axis=-1) / h
+    if n == 2:
+        return np.concatenate([delta, delta], axis=-1)
+    if bc_type == "not-a-knot" and n == 3:
+        # Both conditions make the spline a single parabola
+        curvature = (delta[..., 1] - delta[..., 0]) / (h[..., 0] + h[..., 1])
+        return np.stack([delta[..., 0] - curvature * h[..., 0], delta[..., 0] + curvature * h[..., 0],
+                         delta[..., 1] + curvature * h[..., 1]], axis=-1)
+
+    lower = np.zeros(y.shape)
+    diag = np.zeros(y.shape)
+    upper = np.zeros(y.shape)
+    rhs = np.zeros(y.shape)
+    # Interior: continuity of the second derivative
+    lower[..., 1:-1] = h[..., 1:]
+    diag[..., 1:-1] = 2 * (h[..., :-1] + h[..., 1:])
+    upper[..., 1:-1] = h[..., :-1]
+    rhs[..., 1:-1] = 3 * (h[..., 1:] * delta[..., :-1] + h[..., :-1] * delta[..., 1:])
+
+    if bc_type == "natural":
+        diag[..., 0], upper[..., 0], rhs[..., 0] = 2, 1, 3 * delta[..., 0]
+        lower[..., -1], diag[..., -1], rhs[..., -1] = 1, 2, 3 * delta[..., -1]
+    elif bc_type == "clamped":
+        start, end = bc_values if bc_values is not None else (0.0, 0.0)
+        diag[..., 0], rhs[..., 0] = 1, start
+        diag[..., -1], rhs[..., -1] = 1, end
+    else:
+        # Third derivative continuous across the second and the second-to-last knots
+        h0, h1 = h[..., 0], h[..., 1]
+        diag[..., 0], upper[..., 0] = h1, h0 + h1
+        rhs[..., 0] = ((h0 + 2 * (h0 + h1)) * h1 * delta[..., 0] + h0 ** 2 * delta[..., 1]) / (h0 + h1)
+        h0, h1 = h[..., -2], h[..., -1]
+        lower[..., -1], diag[..., -1] = h0 + h1, h0
+        rhs[..., -1] = (h1 ** 2 * delta[..., -2] + (2 * (h0 + h1) + h1) * h0 * delta[..., -1]) / (h0 + h1)
+    return solve_tridiagonal(lower, diag, upper, rhs)
+
+
+def cubic_spline(x_data: Any, y_data: Any, bc_type: str = "natural",
+                 bc_values: Optional[Tuple[float, float]] = None) -> PiecewiseCubic:
+    """C2 interpolating cubic of every row: O(n) setup, O(log n) per evaluation"""
+    x, y = as_float(x_data), as_float(y_data)
+    if x.shape[-1] != y.shape[-1] or x.shape[-1] < 2:
+        raise ValueError("Need matching x and y with at least two points")
+    return PiecewiseCubic.from_slopes(x, y, _spline_slopes(x, y, bc_type or "natural", bc_values))
+
+
+def spline_interpolation(x_points: Any, y_points: Any, boundary: str = "natural") -> Dict[str, Any]:
+    """Cubic spline as its per-interval coefficients [..., n - 1, 4] and an evaluator"""
+    spline = cubic_spline(x_points, y_points, boundary)
+    return {"coefficients": spline.coefficients, "evaluate": spline}
+
+
+def interpolate_cubic_spline(x_data: Any, y_data: Any, x_eval: Any, bc_type: str = "natural",
+                             bc_values: Optional[Tuple[float, float]] = None) -> np.ndarray:
+    return cubic_spline(x_data, y_data, bc_type, bc_values)(x_eval)
+
+
+def interpolate_linear(x_data: Any, y_data: Any, x_eval: Any, extrapolate: bool = False) -> np.ndarray:
+    """Piecewise linear interpolation; NaN outside the data range unless extrapolate"""
+    x, y, t = as_float(x_data), as_float(y_data), as_float(x_eval)
+    scalar = t.ndim == 0
+    t = t[..., None] if scalar else t
+    lead = np.broadcast_shapes(x.shape[:-1], y.shape[:-1], t.shape[:-1])
+    t = np.broadcast_to(t, lead + t.shape[-1:])
+    i = locate(x, t)
+    x0, x1 = _gather(x, i), _gather(x, i + 1)
+    y0, y1 = _gather(y, i), _gather(y, i + 1)
+    value = y0 + (y1 - y0) / (x1 - x0) * (t - x0)
+    if not extrapolate:
+        value = np.where((t < x[..., :1]) | (t > x[..., -1:]), np.nan, value)
+    return value[..., 0] if scalar else value
+
+
+def _solve_symmetric_pentadiagonal(d0: np.ndarray, d1: np.ndarray, d2: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """LDL^T solve of a symmetric positive definite band (diagonal d0, off-diagonals d1[i] = A[i, i+1] and
+    d2[i] = A[i, i+2]); a loop over the rows, vectorized over the batch"""
+    n = d0.shape[-1]
+    diag = np.array(d0, dtype=float)
+    l1 = np.zeros(d1.shape)
+    l2 = np.zeros(d2.shape)
+    z = np.array(rhs, dtype=float)
+    for i in range(n):
+        if i >= 1:
+            diag[..., i] -= l1[..., i - 1] ** 2 * diag[..., i - 1]
+            z[..., i] -= l1[..., i - 1] * z[..., i - 1]
+        if i >= 2:
+            diag[..., i] -= l2[..., i - 2] ** 2 * diag[..., i - 2]
+            z[..., i] -= l2[..., i - 2] * z[..., i - 2]
+        if i < n - 1:
+            coupling = d1[..., i] - (l1[..., i - 1] * l2[..., i - 1] * diag[..., i - 1] if i >= 1 else 0.0)
+            l1[..., i] = coupling / diag[..., i]
+        if i < n - 2:
+            l2[..., i] = d2[..., i] / diag[..., i]
+    z /= diag
+    for i in range(n - 2, -1, -1):
+        z[..., i] -= l1[..., i] * z[..., i + 1]
+        if i < n - 2:
+            z[..., i] -= l2[..., i] * z[..., i + 2]
+    return z
+
+
+def _smoothing_spline(x: np.ndarray, y: np.ndarray, penalty: float) -> PiecewiseCubic:
+    """Natural cubic minimizing sum (y - g)^2 + penalty * integral g''^2 (Reinsch)"""
+    h = np.broadcast_to(np.diff(x, axis=-1), y.shape[:-1] + (y.shape[-1] - 1,))
+    inverse = 1.0 / h
+    # Columns of Q (n x (n - 2)): rows j, j + 1, j + 2 hold u, v, w
+    u, w = inverse[..., :-1], inverse[..., 1:]
+    v = -u - w
+    d0 = (h[..., :-1] + h[..., 1:]) / 3 + penalty * (u ** 2 + v ** 2 + w ** 2)
+    d1 = h[..., 1:-1] / 6 + penalty * (v[..., :-1] * u[..., 1:] + w[..., :-1] * v[..., 1:])
+    d2 = penalty * w[..., :-2] * u[..., 2:]
+    qty = u * y[..., :-2] + v * y[..., 1:-1] + w * y[..., 2:]
+    gamma = _solve_symmetric_pentadiagonal(d0, d1, d2, qty)
+
+    fitted = y.copy()
+    fitted[..., :-2] -= penalty * u * gamma
+    fitted[..., 1:-1] -= penalty * v * gamma
+    fitted[..., 2:] -= penalty * w * gamma
+    second = np.pad(gamma, [(0, 0)] * (gamma.ndim - 1) + [(1, 1)])
+    slopes = np.diff(fitted, axis=-1) / h - h * (2 * second[..., :-1] + second[..., 1:]) / 6
+    curvature = second[..., :-1] / 2
+    jerk = np.diff(second, axis=-1) / (6 * h)
+    return PiecewiseCubic(x, np.stack([fitted[..., :-1], slopes, curvature, jerk], axis=-1))
+
+
+def _blossom_coefficients(spline: PiecewiseCubic, knots: np.ndarray) -> np.ndarray:
+    """B-spline coefficients of a piecewise cubic: its blossom at (t[j+1], t[j+2], t[j+3])"""
+    count = knots.shape[-1] - 4
+    j = np.arange(count)
+    u = np.stack([knots[..., j + 1], knots[..., j + 2], knots[..., j + 3]], axis=-1)
+    # Any polynomial piece under the support gives the same blossom; take the one at the Greville point
+    piece = locate(spline.breaks, u.mean(axis=-1))
+    s = u - _gather(spline.breaks, piece)[..., None]
+    a, b, c, d = (_gather(spline.coefficients[..., k], piece) for k in range(4))
+    e1 = s.sum(axis=-1)
+    e2 = s[..., 0] * s[..., 1] + s[..., 0] * s[..., 2] + s[..., 1] * s[..., 2]
+    e3 = s.prod(axis=-1)
+    return a + b * e1 / 3 + c * e2 / 3 + d * e3
+
+
+def interpolate_bspline(x_data: Any, y_data: Any, degree: int = 3, x_eval: Any = None,
+                        smoothing: Optional[float] = None) -> Dict[str, Any]:
+    """Degree 1 or 3 B-spline through (or, with smoothing > 0, near) the data.
+
+    smoothing is the weight of the curvature penalty (integral of S''^2 against the squared residuals);
+    0 interpolates with not-a-knot ends, any positive weight gives the natural smoothing spline.
+    """
+    x, y = as_float(x_data), as_float(y_data)
+    if degree not in (1, 3):
+        raise ValueError("Only linear (1) and cubic (3) B-splines are supported")
+    if degree == 1:
+        knots = np.concatenate([x[..., :1], x, x[..., -1:]], axis=-1)
+        value = None if x_eval is None else interpolate_linear(x, y, x_eval, extrapolate=True)
+        return {"value": value, "knots": knots, "coefficients": y}
+
+    if smoothing:
+        spline = _smoothing_spline(x, y, smoothing)
+        interior = x[..., 1:-1]
+    else:
+        spline = cubic_spline(x, y, "not-a-knot")
+        interior = x[..., 2:-2]
+    knots = np.concatenate([np.repeat(x[..., :1], 4, axis=-1), interior, np.repeat(x[..., -1:], 4, axis=-1)],
+                           axis=-1)
+    return {"value": None if x_eval is None else spline(x_eval), "knots": knots,
+            "coefficients": _blossom_coefficients(spline, knots)}
+
+
+EXTRAPOLATION_METHODS = ("linear", "polynomial", "exponential", "constant")
+
+
+def extrapolate(x_data: Any, y_data: Any, x_eval: Any, method: str = "linear", degree: int = 2) -> Dict[str, Any]:
+    """Extend the data beyond its range with a fitted model.
+
+    x_data [n] is shared; y_data may be [batch, n]. linear continues the end segment nearest to each
+    point, constant holds the nearest end value, polynomial and exponential are least-squares fits over
+    all the data. confidence decays with the distance beyond the range, measured in data spans.
+    """
+    if method not in EXTRAPOLATION_METHODS:
+        raise ValueError(f"Unknown method {method}; expected one of {EXTRAPOLATION_METHODS}")
+    x, y, t = as_float(x_data), as_float(y_data), as_float(x_eval)
+    scalar = t.ndim == 0
+    t = t[..., None] if scalar else t
+    span = x[-1] - x[0]
+    if method == "constant":
+        value = np.where(t < x[0], y[..., :1], y[..., -1:])
+    elif method == "linear":
+        value = interpolate_linear(x, y, t, extrapolate=True)
+    else:
+        target = y
+        if method == "exponential":
+            if np.any(y <= 0):
+                raise ValueError("Exponential extrapolation needs positive y values")
+            target, degree = np.log(y), 1
+        rows = target.reshape(-1, x.size)
+        fit, *_ = np.linalg.lstsq(np.vander(x, degree + 1), rows.T, rcond=None)
+        fit = fit.T.reshape(target.shape[:-1] + (degree + 1,))
+        value = np.zeros(np.broadcast_shapes(fit.shape[:-1], t.shape[:-1]) + t.shape[-1:])
+        for k in range(degree + 1):
+            value = value * t + fit[..., k:k + 1]
+        if method == "exponential":
+            value = np.exp(value)
+    value = value[..., 0] if scalar else value
+
+    distance = np.maximum(np.maximum(x[0] - t, t - x[-1]), 0) / span
+    warning = ""
+    if np.any(distance > 1):
+        warning = "Extrapolating more than one data span beyond the range; treat values as rough"
+    elif np.any(distance > 0.25):
+        warning = "Extrapolating well beyond the data range"
+    return {"value": value, "confidence": float(np.exp(-np.max(distance))), "warning": warning}
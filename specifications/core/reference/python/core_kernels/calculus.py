@@ -0,0 +1,298 @@
+"""
+Integration, differentiation and differential equation kernels (integration_spec,
+differentiation_spec, differential_equations_spec)
+
+Integrands and derivatives are called once with every node at once, so f must be
+vectorized: f(x) for x of shape [..., n] returns [..., n]. Interval ends a, b (and
+evaluation points x) may be arrays, one per batch row. Vector functions take points
+along the last axis, [..., d] -> [...].
+"""
+
+from math import comb
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from ._batch import as_float, cached, solve_tridiagonal
+
+DERIVATIVE_METHODS = ("forward", "backward", "central")
+SAMPLE_RULES = ("trapezoidal", "simpson")
+
+
+def _nodes(a: Any, b: Any, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """n + 1 equally spaced nodes on every [a, b]: ([..., n + 1], h [...])"""
+    a, b = as_float(a), as_float(b)
+    h = (b - a) / n
+    return a[..., None] + h[..., None] * np.arange(n + 1), h
+
+
+def integrate_trapezoidal(f: Callable, a: Any, b: Any, n: int = 100) -> np.ndarray:
+    x, h = _nodes(a, b, n)
+    y = f(x)
+    return h * (y.sum(axis=-1) - 0.5 * (y[..., 0] + y[..., -1]))
+
+
+def integrate_simpson(f: Callable, a: Any, b: Any, n: int = 100) -> np.ndarray:
+    if n % 2:
+        raise ValueError("Simpson's 1/3 rule needs an even number of intervals")
+    x, h = _nodes(a, b, n)
+    y = f(x)
+    return h / 3 * (y[..., 0] + y[..., -1] + 4 * y[..., 1:-1:2].sum(axis=-1) + 2 * y[..., 2:-1:2].sum(axis=-1))
+
+
+def integrate_simpson38(f: Callable, a: Any, b: Any, n: int = 99) -> np.ndarray:
+    if n % 3:
+        raise ValueError("Simpson's 3/8 rule needs a number of intervals divisible by 3")
+    x, h = _nodes(a, b, n)
+    y = f(x)
+    weights = np.where(np.arange(n + 1) % 3 == 0, 2.0, 3.0)
+    weights[0] = weights[-1] = 1.0
+    return 3 * h / 8 * (y @ weights)
+
+
+@cached()
+def gauss_legendre_rule(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Nodes and weights of the n-point rule on [-1, 1]; cached per n"""
+    return np.polynomial.legendre.leggauss(n)
+
+
+def integrate_gauss_legendre(f: Callable, a: Any, b: Any, n: int = 5) -> np.ndarray:
+    """Exact for polynomials up to degree 2n - 1"""
+    nodes, weights = gauss_legendre_rule(n)
+    a, b = as_float(a), as_float(b)
+    half, centre = (b - a)[..., None] / 2, (a + b)[..., None] / 2
+    return half[..., 0] * (f(half * nodes + centre) @ weights)
+
+
+def integrate_monte_carlo(f: Callable, a: Any, b: Any, n_samples: int = 10000,
+                          seed: Optional[int] = None) -> Dict[str, Any]:
+    a, b = as_float(a), as_float(b)
+    u = np.random.default_rng(seed).random(a.shape + (n_samples,))
+    y = f(a[..., None] + (b - a)[..., None] * u)
+    width = b - a
+    std = y.std(axis=-1, ddof=1) if n_samples > 1 else np.zeros(width.shape)
+    return {"value": width * y.mean(axis=-1), "std_error": np.abs(width) * std / np.sqrt(n_samples),
+            "n_samples": n_samples}
+
+
+def integrate_from_samples(x: Any, y: Any, method: str = "trapezoidal") -> np.ndarray:
+    """Integral of sampled data over [x[0], x[-1]] for any spacing.
+
+    simpson fits a parabola through each pair of intervals (exact for quadratics on uneven
+    grids); an odd interval count closes with the matching partial-parabola correction.
+    """
+    if method not in SAMPLE_RULES:
+        raise ValueError(f"Unknown method {method}; expected one of {SAMPLE_RULES}")
+    x, y = as_float(x), as_float(y)
+    h = np.diff(x, axis=-1)
+    if method == "trapezoidal" or y.shape[-1] < 3:
+        return (h * (y[..., 1:] + y[..., :-1])).sum(axis=-1) / 2
+
+    intervals = h.shape[-1]
+    even = intervals - intervals % 2
+    h0, h1 = h[..., 0:even:2], h[..., 1:even:2]
+    y0, y1, y2 = y[..., 0:even:2], y[..., 1:even + 1:2], y[..., 2:even + 1:2]
+    span = h0 + h1
+    total = (span / 6 * ((2 - h1 / h0) * y0 + span ** 2 / (h0 * h1) * y1 + (2 - h0 / h1) * y2)).sum(axis=-1)
+    if intervals % 2:
+        # Last interval under the parabola through the last three points
+        h0, h1 = h[..., -2], h[..., -1]
+        alpha = (2 * h1 ** 2 + 3 * h0 * h1) / (6 * (h0 + h1))
+        beta = (h1 ** 2 + 3 * h0 * h1) / (6 * h0)
+        eta = h1 ** 3 / (6 * h0 * (h0 + h1))
+        total = total + alpha * y[..., -1] + beta * y[..., -2] - eta * y[..., -3]
+    return total
+
+
+def derivative_forward(f: Callable, x: Any, h: float = 1e-8) -> np.ndarray:
+    x = as_float(x)
+    return (f(x + h) - f(x)) / h
+
+
+def derivative_backward(f: Callable, x: Any, h: float = 1e-8) -> np.ndarray:
+    x = as_float(x)
+    return (f(x) - f(x - h)) / h
+
+
+def derivative_central(f: Callable, x: Any, h: float = 1e-5) -> np.ndarray:
+    x = as_float(x)
+    return (f(x + h) - f(x - h)) / (2 * h)
+
+
+def derivative_second(f: Callable, x: Any, h: float = 1e-4) -> np.ndarray:
+    x = as_float(x)
+    return (f(x + h) - 2 * f(x) + f(x - h)) / h ** 2
+
+
+@cached()
+def _central_stencil(n: int) -> np.ndarray:
+    """Binomial weights of the n-th central difference, offsets -n/2 .. n/2"""
+    return np.array([(-1) ** k * comb(n, k) for k in range(n + 1)], dtype=float)
+
+
+def derivative_higher_order(f: Callable, x: Any, n: int, h: float = 1e-2) -> np.ndarray:
+    """n-th central difference; f is evaluated once on all n + 1 stencil points of every x"""
+    if n < 0:
+        raise ValueError("Derivative order must be non-negative")
+    x = as_float(x)
+    offsets = (n / 2 - np.arange(n + 1)) * h
+    return f(x[..., None] + offsets) @ _central_stencil(n) / h ** n
+
+
+def _axis_steps(x: np.ndarray, h: float) -> np.ndarray:
+    """x + h e_i for every axis i: [..., d, d]"""
+    return x[..., None, :] + h * np.eye(x.shape[-1])
+
+
+def gradient(f: Callable, x: Any, h: float = 1e-5, method: str = "central") -> np.ndarray:
+    """All partial derivatives from one batched call of f per stencil side"""
+    if method not in DERIVATIVE_METHODS:
+        raise ValueError(f"Unknown method {method}; expected one of {DERIVATIVE_METHODS}")
+    x = as_float(x)
+    if method == "central":
+        return (f(_axis_steps(x, h)) - f(_axis_steps(x, -h))) / (2 * h)
+    if method == "forward":
+        return (f(_axis_steps(x, h)) - f(x)[..., None]) / h
+    return (f(x)[..., None] - f(_axis_steps(x, -h))) / h
+
+
+def partial_derivative(f: Callable, x: Any, var_index: int, h: float = 1e-5) -> np.ndarray:
+    x = as_float(x)
+    step = np.zeros(x.shape[-1])
+    step[var_index] = h
+    return (f(x + step) - f(x - step)) / (2 * h)
+
+
+def directional_derivative(f: Callable, x: Any, v: Any, h: float = 1e-5) -> np.ndarray:
+    """Along the unit vector of v, without forming the gradient"""
+    x, v = as_float(x), as_float(v)
+    unit = v / np.linalg.norm(v, axis=-1, keepdims=True)
+    return (f(x + h * unit) - f(x - h * unit)) / (2 * h)
+
+
+def laplacian(f: Callable, x: Any, h: float = 1e-4) -> np.ndarray:
+    x = as_float(x)
+    d = x.shape[-1]
+    return ((f(_axis_steps(x, h)) + f(_axis_steps(x, -h))).sum(axis=-1) - 2 * d * f(x)) / h ** 2
+
+
+def divergence(F: Callable, x: Any, h: float = 1e-5) -> np.ndarray:
+    """Trace of the Jacobian: only the diagonal ∂F_i/∂x_i of each stepped evaluation is kept"""
+    x = as_float(x)
+    forward = np.diagonal(F(_axis_steps(x, h)), axis1=-2, axis2=-1)
+    backward = np.diagonal(F(_axis_steps(x, -h)), axis1=-2, axis2=-1)
+    return (forward - backward).sum(axis=-1) / (2 * h)
+
+
+def _fixed_step(step: Callable, f: Callable, y0: Any, t_span: Tuple[float, float], h: float) -> Dict[str, Any]:
+    """March y' = f(t, y) from t_span[0] to t_span[1]; y0 is a scalar, [batch] or [batch, d] and every
+    row advances in the same call of f. The final step is shortened to land on t_span[1]."""
+    t0, t1 = t_span
+    steps = int(np.ceil((t1 - t0) / h - 1e-9))
+    t = np.minimum(t0 + h * np.arange(steps + 1), t1)
+    y0 = as_float(y0)
+    y = np.empty((steps + 1,) + y0.shape)
+    y[0] = y0
+    for i in range(steps):
+        y[i + 1] = step(f, t[i], y[i], t[i + 1] - t[i])
+    return {"t": t, "y": y}
+
+
+def ode_euler(f: Callable, y0: Any, t_span: Tuple[float, float], h: float) -> Dict[str, Any]:
+    return _fixed_step(lambda f, t, y, h: y + h * f(t, y), f, y0, t_span, h)
+
+
+def _heun(f, t, y, h):
+    slope = f(t, y)
+    return y + h / 2 * (slope + f(t + h, y + h * slope))
+
+
+def ode_euler_improved(f: Callable, y0: Any, t_span: Tuple[float, float], h: float) -> Dict[str, Any]:
+    return _fixed_step(_heun, f, y0, t_span, h)
+
+
+def ode_midpoint(f: Callable, y0: Any, t_span: Tuple[float, float], h: float) -> Dict[str, Any]:
+    return _fixed_step(lambda f, t, y, h: y + h * f(t + h / 2, y + h / 2 * f(t, y)), f, y0, t_span, h)
+
+
+def _rk4(f, t, y, h):
+    k1 = f(t, y)
+    k2 = f(t + h / 2, y + h / 2 * k1)
+    k3 = f(t + h / 2, y + h / 2 * k2)
+    k4 = f(t + h, y + h * k3)
+    return y + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def ode_rk4(f: Callable, y0: Any, t_span: Tuple[float, float], h: float) -> Dict[str, Any]:
+    return _fixed_step(_rk4, f, y0, t_span, h)
+
+
+# Dormand-Prince 5(4)
+_DOPRI_C = np.array([0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1, 1])
+_DOPRI_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+# Fifth-order weights minus the embedded fourth-order ones
+_DOPRI_ERROR = np.array([71 / 57600, 0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40])
+
+
+def ode_rk45(f: Callable, y0: Any, t_span: Tuple[float, float], rtol: float = 1e-6, atol: float = 1e-9,
+             max_step: float = np.inf) -> Dict[str, Any]:
+    """Adaptive Dormand-Prince with FSAL; the whole batch shares one step size, chosen by the worst
+    row's error"""
+    t0, t1 = t_span
+    y = as_float(y0)
+    ts, ys = [t0], [y]
+    t = t0
+    k = f(t, y)
+    h = min(max_step, 0.01 * (t1 - t0))
+    accepted = failed = 0
+
+    while t < t1:
+        h = min(h, t1 - t, max_step)
+        stages = [k]
+        for i in range(1, 6):
+            increment = sum(a * stage for a, stage in zip(_DOPRI_A[i], stages))
+            stages.append(f(t + _DOPRI_C[i] * h, y + h * increment))
+        y_new = y + h * sum(a * stage for a, stage in zip(_DOPRI_A[6], stages))
+        stages.append(f(t + h, y_new))  # also the first stage of the next step
+        error_estimate = h * sum(e * stage for e, stage in zip(_DOPRI_ERROR, stages))
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error = float(np.sqrt(np.mean((error_estimate / scale) ** 2)))
+
+        if error <= 1.0:
+            t, y, k = t + h, y_new, stages[-1]
+            ts.append(t)
+            ys.append(y)
+            accepted += 1
+        else:
+            failed += 1
+        h *= min(5.0, max(0.2, 0.9 * error ** -0.2)) if error > 0 else 5.0
+    return {"t": np.array(ts), "y": np.stack(ys), "n_steps": accepted, "n_failed": failed}
+
+
+def bvp_finite_difference(p: Callable, q: Callable, r: Callable, t_span: Tuple[float, float],
+                          bc: Tuple[Any, Any], n: int = 100) -> Dict[str, Any]:
+    """y'' + p(t) y' + q(t) y = r(t) with Dirichlet values bc; boundary values may be [batch] arrays,
+    and p, q, r are evaluated once on the grid"""
+    t = np.linspace(t_span[0], t_span[1], n + 1)
+    h = t[1] - t[0]
+    inner = t[1:-1]
+    pi, qi, ri = (np.broadcast_to(as_float(g(inner)), inner.shape) for g in (p, q, r))
+    lower = 1 / h ** 2 - pi / (2 * h)
+    diag = -2 / h ** 2 + qi
+    upper = 1 / h ** 2 + pi / (2 * h)
+    start, end = as_float(bc[0]), as_float(bc[1])
+    rhs = np.broadcast_to(ri, np.broadcast_shapes(start.shape, end.shape) + ri.shape).copy()
+    rhs[..., 0] -= lower[0] * start
+    rhs[..., -1] -= upper[-1] * end
+    interior = solve_tridiagonal(lower, diag, upper, rhs)
+    y = np.concatenate([np.broadcast_to(start, rhs.shape[:-1])[..., None], interior,
+                        np.broadcast_to(end, rhs.shape[:-1])[..., None]], axis=-1)
+    return {"t": t, "y": y}
@@ -0,0 +1,493 @@
+"""
+Curve and motion kernels (spline_curves_spec, bezier_curves_spec, curve_analysis_spec,
+path_planning_spec, motion_interpolation_spec, velocity_acceleration_spec)
+
+Points are [..., n, d]: n control or data points in d dimensions, with any leading
+batch dimensions, so one call builds a whole batch of curves. Curves evaluate at
+parameters t of shape [k] (shared) and return [..., k, d]. Only the flat-space
+operations live here; the ones with a curvature parameter belong with the geodesics.
+"""
+
+from math import comb
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ._batch import as_float, cached, solve_tridiagonal
+from .approximation import PiecewiseCubic, _spline_slopes
+
+KNOT_TYPES = ("open_uniform", "uniform")
+CONTINUITY = ("C0", "C1", "G1")
+
+
+class SplineCurve:
+    """Piecewise cubic curve through its points, parameterized by `parameters` (one per point)"""
+
+    __slots__ = ("parameters", "pieces")
+
+    def __init__(self, parameters: np.ndarray, pieces: PiecewiseCubic):
+        self.parameters = parameters
+        self.pieces = pieces  # along the last axis of [..., d, n]
+
+    def __call__(self, t: Any, derivative: int = 0) -> np.ndarray:
+        t = as_float(t)
+        value = self.pieces(t if t.ndim else t[None], derivative)
+        return np.swapaxes(value, -1, -2) if t.ndim else value[..., 0]
+
+    def sample(self, count: int) -> np.ndarray:
+        return self(np.linspace(self.parameters[..., 0].min(), self.parameters[..., -1].max(), count))
+
+
+def _coordinates(points: Any) -> np.ndarray:
+    """[..., n, d] points as [..., d, n] rows, the layout the 1-D kernels batch over"""
+    p = as_float(points)
+    if p.ndim < 2:
+        raise ValueError("Points must be [..., n, d]")
+    return np.swapaxes(p, -1, -2)
+
+
+def _chord_parameters(points: np.ndarray) -> np.ndarray:
+    """Cumulative chord length normalized to [0, 1]; the first batch row's, so parameters stay shared"""
+    rows = points.reshape(-1, *points.shape[-2:])[0]
+    chords = np.linalg.norm(np.diff(rows, axis=0), axis=-1)
+    total = np.concatenate([[0.0], np.cumsum(chords)])
+    return total / total[-1] if total[-1] > 0 else np.linspace(0, 1, rows.shape[0])
+
+
+def cubic_spline_interpolate(points: Any, parameters: Any = None, boundary_condition: str = "natural",
+                             end_derivatives: Any = None) -> SplineCurve:
+    """C2 cubic through the points, chord-length parameterized unless parameters are given"""
+    p = as_float(points)
+    t = _chord_parameters(p) if parameters is None else as_float(parameters)
+    y = _coordinates(p)
+    bc_values = None
+    if end_derivatives is not None:
+        ends = as_float(end_derivatives)  # [..., 2, d]
+        bc_values = (ends[..., 0, :], ends[..., 1, :])
+    if boundary_condition == "periodic":
+        slopes = _periodic_slopes(t, y)
+    elif boundary_condition == "clamped" and bc_values is not None:
+        slopes = _clamped_slopes(t, y, bc_values)
+    else:
+        slopes = _spline_slopes(t, y, boundary_condition, None)
+    return SplineCurve(t, PiecewiseCubic.from_slopes(t, y, slopes))
+
+
+def _clamped_slopes(t: np.ndarray, y: np.ndarray, ends) -> np.ndarray:
+    """Clamped slopes with per-coordinate end derivatives: the tridiagonal system of approximation's
+    clamped case, with the end rows set by the given tangents"""
+    n = y.shape[-1]
+    h = np.broadcast_to(np.diff(t), y.shape[:-1] + (n - 1,))
+    delta = np.diff(y, axis=-1) / h
+    lower, diag, upper, rhs = (np.zeros(y.shape) for _ in range(4))
+    lower[..., 1:-1] = h[..., 1:]
+    diag[..., 1:-1] = 2 * (h[..., :-1] + h[..., 1:])
+    upper[..., 1:-1] = h[..., :-1]
+    rhs[..., 1:-1] = 3 * (h[..., 1:] * delta[..., :-1] + h[..., :-1] * delta[..., 1:])
+    diag[..., 0] = diag[..., -1] = 1.0
+    rhs[..., 0], rhs[..., -1] = ends[0], ends[1]
+    return solve_tridiagonal(lower, diag, upper, rhs)
+
+
+def _periodic_slopes(t: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Slopes of the periodic spline (the last point repeats the first): a cyclic tridiagonal system,
+    solved as a tridiagonal one plus a Sherman-Morrison correction for the two corner entries"""
+    h = np.broadcast_to(np.diff(t), y.shape[:-1] + (y.shape[-1] - 1,))
+    delta = np.diff(y, axis=-1) / h
+    h_prev, delta_prev = np.roll(h, 1, axis=-1), np.roll(delta, 1, axis=-1)
+    # Row i: h[i] m[i-1] + 2 (h[i-1] + h[i]) m[i] + h[i-1] m[i+1], indices mod n - 1
+    lower, upper = h, h_prev
+    diag = 2 * (h_prev + h)
+    rhs = 3 * (h * delta_prev + h_prev * delta)
+    corner_low, corner_high = lower[..., :1], upper[..., -1:]  # A[0, n-2] and A[n-2, 0]
+    gamma = -diag[..., :1]
+    adjusted = diag.copy()
+    adjusted[..., :1] -= gamma
+    adjusted[..., -1:] -= corner_low * corner_high / gamma
+    u = np.zeros(diag.shape)
+    u[..., :1], u[..., -1:] = gamma, corner_high
+    x = solve_tridiagonal(lower, adjusted, upper, rhs)
+    z = solve_tridiagonal(lower, adjusted, upper, u)
+    factor = (x[..., :1] + corner_low / gamma * x[..., -1:]) / (1 + z[..., :1] + corner_low / gamma * z[..., -1:])
+    slopes = x - factor * z
+    return np.concatenate([slopes, slopes[..., :1]], axis=-1)
+
+
+def hermite_spline_create(points: Any, tangents: Any, parameters: Any = None) -> SplineCurve:
+    p = as_float(points)
+    t = np.linspace(0, 1, p.shape[-2]) if parameters is None else as_float(parameters)
+    return SplineCurve(t, PiecewiseCubic.from_slopes(t, _coordinates(p), _coordinates(tangents)))
+
+
+def _wrap(p: np.ndarray) -> np.ndarray:
+    return np.concatenate([p, p[..., :1, :]], axis=-2)
+
+
+def cardinal_spline_create(points: Any, tension: float = 0.5, closed: bool = False) -> SplineCurve:
+    """Tangents (1 - c)(P[i+1] - P[i-1]) / 2 on a uniform parameter, so tension 0 is Catmull-Rom and 1
+    gives straight segments; open ends use one-sided differences"""
+    p = as_float(points)
+    if closed:
+        ahead, behind = np.roll(p, -1, axis=-2), np.roll(p, 1, axis=-2)
+        tangents = _wrap((1 - tension) * (ahead - behind) / 2)
+        p = _wrap(p)
+    else:
+        tangents = np.empty(p.shape)
+        tangents[..., 1:-1, :] = (1 - tension) * (p[..., 2:, :] - p[..., :-2, :]) / 2
+        tangents[..., 0, :] = (1 - tension) * (p[..., 1, :] - p[..., 0, :])
+        tangents[..., -1, :] = (1 - tension) * (p[..., -1, :] - p[..., -2, :])
+    return hermite_spline_create(p, tangents, np.arange(p.shape[-2], dtype=float))
+
+
+def catmull_rom_spline_create(points: Any, tension: float = 0.0, closed: bool = False) -> SplineCurve:
+    return cardinal_spline_create(points, tension, closed)
+
+
+@cached()
+def _binomials(degree: int) -> np.ndarray:
+    return np.array([comb(degree, i) for i in range(degree + 1)], dtype=float)
+
+
+@cached()
+def _bernstein_grid(degree: int, count: int) -> np.ndarray:
+    """Bernstein basis on count uniform parameters of [0, 1]: [count, degree + 1], cached"""
+    return bernstein_basis(degree, np.linspace(0.0, 1.0, count))
+
+
+def bernstein_basis(degree: int, t: Any) -> np.ndarray:
+    t = as_float(t)[..., None]
+    i = np.arange(degree + 1)
+    return _binomials(degree) * t ** i * (1 - t) ** (degree - i)
+
+
+class BezierCurve:
+    """Bezier curve, rational when it has weights; control points [..., n + 1, d]"""
+
+    __slots__ = ("control_points", "weights")
+
+    def __init__(self, control_points: np.ndarray, weights: Optional[np.ndarray] = None):
+        self.control_points = control_points
+        self.weights = weights
+
+    @property
+    def degree(self) -> int:
+        return self.control_points.shape[-2] - 1
+
+    def _combine(self, basis: np.ndarray) -> np.ndarray:
+        if self.weights is None:
+            return basis @ self.control_points
+        weighted = basis * self.weights[..., None, :]
+        return (weighted @ self.control_points) / weighted.sum(axis=-1, keepdims=True)
+
+    def __call__(self, t: Any) -> np.ndarray:
+        return self._combine(bernstein_basis(self.degree, t))
+
+    def sample(self, count: int) -> np.ndarray:
+        """count uniform samples from a cached basis matrix: one matrix product for the whole batch"""
+        return self._combine(_bernstein_grid(self.degree, count))
+
+    def derivative(self) -> "BezierCurve":
+        if self.weights is not None:
+            raise ValueError("The derivative of a rational Bezier curve is not a Bezier curve")
+        return BezierCurve(self.degree * np.diff(self.control_points, axis=-2))
+
+    def split(self, t: float):
+        """De Casteljau at t: the control points of the pieces on [0, t] and [t, 1]"""
+        points = self._homogeneous()
+        left, right = [points[..., 0, :]], [points[..., -1, :]]
+        for _ in range(self.degree):
+            points = (1 - t) * points[..., :-1, :] + t * points[..., 1:, :]
+            left.append(points[..., 0, :])
+            right.append(points[..., -1, :])
+        return (self._from_homogeneous(np.stack(left, axis=-2)),
+                self._from_homogeneous(np.stack(right[::-1], axis=-2)))
+
+    def _homogeneous(self) -> np.ndarray:
+        if self.weights is None:
+            return self.control_points
+        weights = np.broadcast_to(self.weights, self.control_points.shape[:-1])[..., None]
+        return np.concatenate([self.control_points * weights, weights], axis=-1)
+
+    def _from_homogeneous(self, points: np.ndarray) -> "BezierCurve":
+        if self.weights is None:
+            return BezierCurve(points)
+        w = points[..., -1]
+        return BezierCurve(points[..., :-1] / w[..., None], w)
+
+
+def bezier_curve_create(control_points: Any, degree: Optional[int] = None, weights: Any = None) -> BezierCurve:
+    p = as_float(control_points)
+    if degree is not None and degree != p.shape[-2] - 1:
+        raise ValueError(f"A degree {degree} Bezier curve needs {degree + 1} control points, got {p.shape[-2]}")
+    return BezierCurve(p, None if weights is None else as_float(weights))
+
+
+def rational_bezier_create(control_points: Any, weights: Any) -> BezierCurve:
+    w = as_float(weights)
+    if np.any(w <= 0):
+        raise ValueError("Rational Bezier weights must be positive")
+    return BezierCurve(as_float(control_points), w)
+
+
+def bezier_curve_control_polygon_length(curve: BezierCurve) -> np.ndarray:
+    return np.linalg.norm(np.diff(curve.control_points, axis=-2), axis=-1).sum(axis=-1)
+
+
+def bezier_curve_join(curve1: BezierCurve, curve2: BezierCurve, continuity: str = "C0") -> BezierCurve:
+    """Piecewise curve of degree max(p, q) as one control polygon (shared joint point). curve2 is moved
+    so it starts at curve1's end; C1 also sets its first leg to match curve1's end tangent, G1 only its
+    direction."""
+    if continuity not in CONTINUITY:
+        raise ValueError(f"Unknown continuity {continuity}; expected one of {CONTINUITY}")
+    degree = max(curve1.degree, curve2.degree)
+    a = _elevate(curve1.control_points, degree)
+    b = _elevate(curve2.control_points, degree)
+    b = b - b[..., :1, :] + a[..., -1:, :]
+    if continuity != "C0":
+        tangent = a[..., -1, :] - a[..., -2, :]
+        if continuity == "G1":
+            length = np.linalg.norm(b[..., 1, :] - b[..., 0, :], axis=-1, keepdims=True)
+            tangent = tangent / np.linalg.norm(tangent, axis=-1, keepdims=True) * length
+        b[..., 1, :] = b[..., 0, :] + tangent
+    return BezierCurve(np.concatenate([a, b[..., 1:, :]], axis=-2))
+
+
+def _elevate(points: np.ndarray, degree: int) -> np.ndarray:
+    """Raise a Bezier control polygon to `degree` without changing the curve"""
+    while points.shape[-2] - 1 < degree:
+        n = points.shape[-2]
+        i = (np.arange(1, n) / n)[:, None]
+        inner = i * points[..., :-1, :] + (1 - i) * points[..., 1:, :]
+        points = np.concatenate([points[..., :1, :], inner, points[..., -1:, :]], axis=-2)
+    return points
+
+
+class BSplineCurve:
+    """B-spline (rational with weights) evaluated by a vectorized de Boor recursion over all t"""
+
+    __slots__ = ("control_points", "degree", "knots", "weights")
+
+    def __init__(self, control_points: np.ndarray, degree: int, knots: np.ndarray,
+                 weights: Optional[np.ndarray] = None):
+        self.control_points = control_points
+        self.degree = degree
+        self.knots = knots
+        self.weights = weights
+
+    def __call__(self, t: Any) -> np.ndarray:
+        p, knots = self.degree, self.knots
+        points = self.control_points
+        if self.weights is not None:
+            weights = np.broadcast_to(self.weights, points.shape[:-1])[..., None]
+            points = np.concatenate([points * weights, weights], axis=-1)
+        t = np.clip(as_float(t), knots[p], knots[-p - 1])
+        span = np.clip(np.searchsorted(knots, t, side="right") - 1, p, knots.size - p - 2)
+        # d[j] = P[span - p + j]: [..., k, p + 1, d]
+        d = points[..., span[:, None] - p + np.arange(p + 1), :]
+        for r in range(1, p + 1):
+            j = np.arange(r, p + 1)
+            left = knots[span[:, None] - p + j]
+            right = knots[span[:, None] + 1 + j - r]
+            alpha = ((t[:, None] - left) / (right - left))[..., None]
+            d = np.concatenate([d[..., :r, :], (1 - alpha) * d[..., j - 1, :] + alpha * d[..., j, :]], axis=-2)
+        value = d[..., p, :]
+        return value if self.weights is None else value[..., :-1] / value[..., -1:]
+
+    def sample(self, count: int) -> np.ndarray:
+        return self(np.linspace(self.knots[self.degree], self.knots[-self.degree - 1], count))
+
+
+@cached()
+def _default_knots(count: int, degree: int, knot_type: str) -> np.ndarray:
+    """count + degree + 1 knots on [0, 1]; open uniform clamps the ends so the curve meets its end points"""
+    if knot_type == "uniform":
+        return np.linspace(0.0, 1.0, count + degree + 1)
+    interior = np.linspace(0.0, 1.0, count - degree + 1)
+    return np.concatenate([np.zeros(degree), interior, np.ones(degree)])
+
+
+def bspline_curve_create(control_points: Any, degree: int = 3, knots: Any = None,
+                         knot_type: str = "open_uniform") -> BSplineCurve:
+    p = as_float(control_points)
+    count = p.shape[-2]
+    if not 1 <= degree < count:
+        raise ValueError(f"Degree must be between 1 and {count - 1} for {count} control points")
+    if knots is None:
+        if knot_type not in KNOT_TYPES:
+            raise ValueError(f"Unknown knot type {knot_type}; expected one of {KNOT_TYPES}")
+        knots = _default_knots(count, degree, knot_type)
+    knots = as_float(knots)
+    if knots.size != count + degree + 1 or np.any(np.diff(knots) < 0):
+        raise ValueError(f"Need {count + degree + 1} non-decreasing knots")
+    return BSplineCurve(p, degree, knots)
+
+
+def nurbs_curve_create(control_points: Any, weights: Any, degree: int = 3, knots: Any = None) -> BSplineCurve:
+    curve = bspline_curve_create(control_points, degree, knots)
+    w = as_float(weights)
+    if np.any(w <= 0):
+        raise ValueError("NURBS weights must be positive")
+    curve.weights = w
+    return curve
+
+
+def curve_bounding_box(curve: Any, tight: bool = True, tolerance: float = 1e-6) -> Dict[str, np.ndarray]:
+    """Loose: the control points' box (the curve lies in their convex hull). Tight: the end points
+    plus, per coordinate, the roots of the derivative. Bezier roots come from the derivative's own
+    control polygon; other curves are sampled until successive boxes agree within tolerance."""
+    if not tight and isinstance(curve, (BezierCurve, BSplineCurve)):
+        return {"min": curve.control_points.min(axis=-2), "max": curve.control_points.max(axis=-2)}
+    if isinstance(curve, BezierCurve) and curve.weights is None and curve.degree >= 1:
+        derivative = curve.derivative().control_points  # [..., m, d]
+        rows = np.swapaxes(derivative, -1, -2).reshape(-1, derivative.shape[-2])
+        # A degree m - 1 polynomial is fixed by m samples; fit each coordinate's derivative and take its
+        # roots in (0, 1)
+        nodes = np.linspace(0.0, 1.0, rows.shape[-1])
+        samples = bernstein_basis(rows.shape[-1] - 1, nodes) @ rows.T
+        t = [np.array([0.0, 1.0])]
+        if rows.shape[-1] > 1:
+            for column in samples.T:
+                roots = np.roots(np.polyfit(nodes, column, rows.shape[-1] - 1))
+                real = roots[np.abs(roots.imag) < 1e-12].real
+                t.append(real[(real > 0) & (real < 1)])
+        values = curve(np.unique(np.concatenate(t)))
+        return {"min": values.min(axis=-2), "max": values.max(axis=-2)}
+
+    count = 64
+    values = curve.sample(count)
+    low, high = values.min(axis=-2), values.max(axis=-2)
+    while count < 1 << 20:
+        count *= 4
+        values = curve.sample(count)
+        new_low, new_high = values.min(axis=-2), values.max(axis=-2)
+        if np.all(np.abs(new_low - low) <= tolerance) and np.all(np.abs(new_high - high) <= tolerance):
+            return {"min": new_low, "max": new_high}
+        low, high = new_low, new_high
+    return {"min": low, "max": high}
+
+
+def path_reverse(path: Any) -> Any:
+    """Same curve traversed backwards: reversed control polygon (and weights), or reversed samples"""
+    if isinstance(path, BezierCurve):
+        return BezierCurve(path.control_points[..., ::-1, :].copy(),
+                           None if path.weights is None else path.weights[..., ::-1].copy())
+    if isinstance(path, BSplineCurve):
+        knots = path.knots[0] + path.knots[-1] - path.knots[::-1]
+        return BSplineCurve(path.control_points[..., ::-1, :].copy(), path.degree, knots,
+                            None if path.weights is None else path.weights[..., ::-1].copy())
+    return as_float(path)[..., ::-1, :].copy()
+
+
+def path_trim(path: BezierCurve, t_start: float, t_end: float) -> BezierCurve:
+    """The piece of a Bezier curve on [t_start, t_end], reparameterized to [0, 1], by two splits"""
+    if not 0 <= t_start < t_end <= 1:
+        raise ValueError("Need 0 <= t_start < t_end <= 1")
+    _, tail = path.split(t_start)
+    piece, _ = tail.split((t_end - t_start) / (1 - t_start)) if t_start < 1 else (tail, None)
+    return piece
+
+
+def path_waypoint_interpolate(waypoints: Any, method: str = "cubic", velocities: Any = None,
+                              timestamps: Any = None) -> SplineCurve:
+    """linear, cubic (C2 spline) or hermite (C1, with given or Catmull-Rom estimated velocities); the
+    parameter is the timestamp, or chord length when no timestamps are given"""
+    w = as_float(waypoints)
+    t = _chord_parameters(w) if timestamps is None else as_float(timestamps)
+    if method == "linear":
+        y = _coordinates(w)
+        slopes = np.diff(y, axis=-1) / np.diff(t)
+        pieces = np.stack([y[..., :-1], slopes, np.zeros(slopes.shape), np.zeros(slopes.shape)], axis=-1)
+        return SplineCurve(t, PiecewiseCubic(t, pieces))
+    if method == "cubic" and velocities is None:
+        return cubic_spline_interpolate(w, t)
+    if method not in ("cubic", "hermite"):
+        raise ValueError("method must be linear, cubic or hermite")
+    if velocities is None:
+        velocities = np.gradient(w, t, axis=-2)
+    return hermite_spline_create(w, velocities, t)
+
+
+def slerp(q0: Any, q1: Any, t: Any) -> np.ndarray:
+    """Shortest-arc spherical interpolation of unit quaternions [..., 4]; nearly parallel pairs fall
+    back to normalized lerp. t may be a scalar or an array broadcasting against the batch."""
+    q0, q1, t = as_float(q0), as_float(q1), as_float(t)
+    dot = np.einsum("...i,...i->...", q0, q1)
+    q1 = np.where(dot[..., None] < 0, -q1, q1)
+    dot = np.abs(dot)
+    omega = np.arccos(np.clip(dot, -1.0, 1.0))
+    near = dot > 0.9995
+    sin_omega = np.where(near, 1.0, np.sin(omega))
+    a = np.where(near, 1 - t, np.sin((1 - t) * omega) / sin_omega)
+    b = np.where(near, t, np.sin(t * omega) / sin_omega)
+    q = a[..., None] * q0 + b[..., None] * q1
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def _quaternion_multiply(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    w1, x1, y1, z1 = np.moveaxis(p, -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(q, -1, 0)
+    return np.stack([w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2, w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                     w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2, w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2], axis=-1)
+
+
+def _quaternion_log(q: np.ndarray) -> np.ndarray:
+    vector = q[..., 1:]
+    norm = np.linalg.norm(vector, axis=-1, keepdims=True)
+    angle = np.arctan2(norm, q[..., :1])
+    return np.concatenate([np.zeros(q.shape[:-1] + (1,)),
+                           np.divide(vector * angle, norm, out=np.zeros(vector.shape), where=norm > 0)], axis=-1)
+
+
+def _quaternion_exp(q: np.ndarray) -> np.ndarray:
+    vector = q[..., 1:]
+    angle = np.linalg.norm(vector, axis=-1, keepdims=True)
+    scale = np.divide(np.sin(angle), angle, out=np.ones(angle.shape), where=angle > 0)
+    return np.concatenate([np.cos(angle), vector * scale], axis=-1)
+
+
+def squad(quaternions: Any, t: Any, tangent_mode: str = "auto") -> np.ndarray:
+    """C1 spherical spline through keyframes [..., n, 4] at global t in [0, n - 1]; the inner
+    control quaternions s_i = q_i exp(-(log(q_i^-1 q_{i+1}) + log(q_i^-1 q_{i-1})) / 4) are computed
+    once for all keyframes"""
+    q = as_float(quaternions)
+    # Hemisphere-align consecutive keyframes so every segment takes the short arc
+    signs = np.cumprod(np.where(np.einsum("...i,...i->...", q[..., 1:, :], q[..., :-1, :]) < 0, -1.0, 1.0), axis=-1)
+    q = np.concatenate([q[..., :1, :], q[..., 1:, :] * signs[..., None]], axis=-2)
+    inverse = q * np.array([1.0, -1.0, -1.0, -1.0])
+    ahead = np.concatenate([q[..., 1:, :], q[..., -1:, :]], axis=-2)
+    behind = np.concatenate([q[..., :1, :], q[..., :-1, :]], axis=-2)
+    inner = _quaternion_exp(-(_quaternion_log(_quaternion_multiply(inverse, ahead))
+                              + _quaternion_log(_quaternion_multiply(inverse, behind))) / 4)
+    s = _quaternion_multiply(q, inner)
+
+    t = as_float(t)
+    i = np.clip(np.floor(t).astype(int), 0, q.shape[-2] - 2)
+    u = t - i
+    outer = slerp(q[..., i, :], q[..., i + 1, :], u)
+    control = slerp(s[..., i, :], s[..., i + 1, :], u)
+    return slerp(outer, control, 2 * u * (1 - u))
+
+
+def generate_trapezoidal_velocity_profile(start_point: Any, end_point: Any, max_velocity: float,
+                                          acceleration: float, num_samples: int = 100) -> Dict[str, np.ndarray]:
+    """Straight-line move accelerating at `acceleration` up to max_velocity, cruising, then braking;
+    a triangle when the distance is too short to reach cruise speed. Batched over start/end rows,
+    each on its own time grid."""
+    start, end = as_float(start_point), as_float(end_point)
+    delta = end - start
+    distance = np.linalg.norm(delta, axis=-1)
+    peak = np.minimum(max_velocity, np.sqrt(acceleration * distance))
+    ramp = peak / acceleration
+    cruise = np.where(peak > 0, (distance - peak * ramp) / np.where(peak > 0, peak, 1.0), 0.0)
+    duration = 2 * ramp + cruise
+    t = duration[..., None] * np.linspace(0.0, 1.0, num_samples)
+    ramp_, cruise_, peak_, duration_ = (v[..., None] for v in (ramp, cruise, peak, duration))
+    rising, falling = t < ramp_, t > ramp_ + cruise_
+    remaining = duration_ - t
+    speed = np.where(rising, acceleration * t, np.where(falling, acceleration * remaining, peak_))
+    travelled = np.where(rising, acceleration * t ** 2 / 2,
+                         np.where(falling, distance[..., None] - acceleration * remaining ** 2 / 2,
+                                  peak_ * ramp_ / 2 + peak_ * (t - ramp_)))
+    direction = np.divide(delta, distance[..., None], out=np.zeros(delta.shape), where=distance[..., None] > 0)
+    return {"t": t, "position": start[..., None, :] + travelled[..., None] * direction[..., None, :],
+            "velocity": speed, "duration": duration}
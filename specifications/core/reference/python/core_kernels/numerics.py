@@ -0,0 +1,279 @@
+"""
+Numerical utility, vector and matrix kernels (numerical_utilities_spec, vector_operations_spec,
+matrix_operations_spec, special_matrices_spec)
+
+Vector operations work along the last axis, so a [batch, n] array is a batch of vectors.
+"""
+
+import decimal
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+from ._batch import as_float
+
+# Significand bits of the binary formats set_precision can select
+BINARY_FORMATS = ((11, np.float16), (24, np.float32), (53, np.float64), (64, np.longdouble))
+ROUNDING_MODES = ("nearest", "up", "down", "toward_zero", "away_from_zero")
+DTYPES = ("float32", "float64", "complex64", "complex128")
+
+_binary_bits = 53
+
+
+def float_compare(a: Any, b: Any, rel_tol: float = 1e-9, abs_tol: float = 0.0) -> Union[bool, np.ndarray]:
+    """|a - b| <= max(rel_tol * max(|a|, |b|), abs_tol); equal infinities compare equal, NaN never does"""
+    a, b = np.asarray(a), np.asarray(b)
+    with np.errstate(invalid="ignore"):
+        close = np.abs(a - b) <= np.maximum(rel_tol * np.maximum(np.abs(a), np.abs(b)), abs_tol)
+    return close | (np.isinf(a) & (a == b))
+
+
+def array_allclose(a: Any, b: Any, rel_tol: float = 1e-9, abs_tol: float = 0.0) -> Union[bool, np.ndarray]:
+    """float_compare over the last axis: one answer per row"""
+    a, b = np.asarray(a), np.asarray(b)
+    if a.shape[-1:] != b.shape[-1:]:
+        raise ValueError(f"Arrays differ in length: {a.shape[-1:]} and {b.shape[-1:]}")
+    return float_compare(a, b, rel_tol, abs_tol).all(axis=-1)
+
+
+def set_precision(precision: int, mode: str = "decimal") -> Dict[str, Any]:
+    """Set decimal digits (arbitrary_precision_add) or significand bits (overflow/underflow limits);
+    returns the previous setting so it can be restored"""
+    global _binary_bits
+    if mode == "decimal":
+        previous = decimal.getcontext().prec
+        decimal.getcontext().prec = precision
+    elif mode == "binary":
+        if precision > BINARY_FORMATS[-1][0]:
+            raise ValueError(f"Binary precision is limited to {BINARY_FORMATS[-1][0]} bits")
+        previous, _binary_bits = _binary_bits, precision
+    else:
+        raise ValueError("mode must be 'decimal' or 'binary'")
+    return {"precision": previous, "mode": mode}
+
+
+@contextmanager
+def working_precision(precision: int, mode: str = "decimal") -> Iterator[None]:
+    previous = set_precision(precision, mode)
+    try:
+        yield
+    finally:
+        set_precision(previous["precision"], mode)
+
+
+def _binary_format() -> np.finfo:
+    """The smallest binary format with at least the configured significand bits"""
+    return np.finfo(next(dtype for bits, dtype in BINARY_FORMATS if bits >= _binary_bits))
+
+
+def handle_overflow(value: Any, strategy: str = "infinity") -> np.ndarray:
+    """Apply a strategy to values beyond the range of the configured binary format"""
+    value = as_float(value)
+    limit = float(_binary_format().max)
+    with np.errstate(invalid="ignore"):
+        overflow = np.abs(value) > limit
+    if strategy == "infinity":
+        return np.where(overflow, np.copysign(np.inf, value), value)
+    if strategy == "saturate":
+        return np.where(overflow, np.copysign(limit, value), value)
+    if strategy == "wrap":
+        with np.errstate(invalid="ignore"):
+            return np.where(overflow, np.mod(value + limit, 2 * limit) - limit, value)
+    if strategy == "error":
+        if np.any(overflow):
+            raise OverflowError(f"{int(np.count_nonzero(overflow))} value(s) exceed {limit:g}")
+        return value
+    raise ValueError("strategy must be one of saturate, wrap, error, infinity")
+
+
+def handle_underflow(value: Any, strategy: str = "zero") -> np.ndarray:
+    """Apply a strategy to nonzero values below the smallest normal number of the configured format"""
+    value = as_float(value)
+    info = _binary_format()
+    magnitude = np.abs(value)
+    underflow = (magnitude < float(info.tiny)) & (value != 0)
+    if strategy == "zero":
+        return np.where(underflow, np.copysign(0.0, value), value)
+    if strategy == "denormal":
+        # Below the smallest subnormal even gradual underflow ends at zero
+        return np.where(underflow & (magnitude < float(info.smallest_subnormal)), np.copysign(0.0, value), value)
+    if strategy == "error":
+        if np.any(underflow):
+            raise FloatingPointError(f"{int(np.count_nonzero(underflow))} value(s) below {float(info.tiny):g}")
+        return value
+    raise ValueError("strategy must be one of zero, denormal, error")
+
+
+def is_nan(value: Any) -> Union[bool, np.ndarray]:
+    return np.isnan(value)
+
+
+def is_inf(value: Any, sign: str = "any") -> Union[bool, np.ndarray]:
+    if sign == "positive":
+        return np.isposinf(value)
+    if sign == "negative":
+        return np.isneginf(value)
+    return np.isinf(value)
+
+
+def is_finite(value: Any) -> Union[bool, np.ndarray]:
+    return np.isfinite(value)
+
+
+def replace_nan(input: Any, replacement: float = 0.0) -> np.ndarray:
+    x = as_float(input)
+    return np.where(np.isnan(x), replacement, x)
+
+
+def round_to_precision(value: Any, precision: int, mode: str = "nearest") -> np.ndarray:
+    """Round to `precision` decimal places; nearest rounds half to even"""
+    value = as_float(value)
+    if mode == "nearest":
+        return np.round(value, precision)
+    scale = 10.0 ** precision
+    scaled = value * scale
+    if mode == "up":
+        rounded = np.ceil(scaled)
+    elif mode == "down":
+        rounded = np.floor(scaled)
+    elif mode == "toward_zero":
+        rounded = np.trunc(scaled)
+    elif mode == "away_from_zero":
+        rounded = np.copysign(np.ceil(np.abs(scaled)), scaled)
+    else:
+        raise ValueError(f"Unknown rounding mode {mode}; expected one of {ROUNDING_MODES}")
+    return rounded / scale
+
+
+def arbitrary_precision_add(a: Any, b: Any, precision: int = 50) -> Union[str, list]:
+    """Decimal sum with `precision` significant digits; floats enter by their shortest repr, not their
+    binary expansion. Sequences of operands add pairwise."""
+    if isinstance(a, (list, tuple, np.ndarray)):
+        return [arbitrary_precision_add(x, y, precision) for x, y in zip(a, b)]
+    with decimal.localcontext() as context:
+        context.prec = precision
+        return str(decimal.Decimal(str(a)) + decimal.Decimal(str(b)))
+
+
+def complex_from_polar(magnitude: Any, phase: Any) -> np.ndarray:
+    return np.asarray(magnitude) * np.exp(1j * np.asarray(phase))
+
+
+def complex_to_polar(z: Any) -> Dict[str, np.ndarray]:
+    z = np.asarray(z)
+    return {"magnitude": np.abs(z), "phase": np.angle(z)}
+
+
+def complex_conjugate(z: Any) -> np.ndarray:
+    return np.conj(z)
+
+
+def vector_create(elements: Any, dtype: Optional[str] = None) -> np.ndarray:
+    if dtype is not None and dtype not in DTYPES:
+        raise ValueError(f"Unknown dtype {dtype}; expected one of {DTYPES}")
+    return np.array(elements, dtype=dtype)
+
+
+def vector_zeros(n: Union[int, Tuple[int, ...]], dtype: Optional[str] = None) -> np.ndarray:
+    return np.zeros(n, dtype=dtype or "float64")
+
+
+def vector_ones(n: Union[int, Tuple[int, ...]], dtype: Optional[str] = None) -> np.ndarray:
+    return np.ones(n, dtype=dtype or "float64")
+
+
+def vector_random(n: Union[int, Tuple[int, ...]], distribution: str = "uniform", low: float = 0.0,
+                  high: float = 1.0, seed: Optional[int] = None) -> np.ndarray:
+    """Uniform on [low, high), or normal with mean low and standard deviation high"""
+    rng = np.random.default_rng(seed)
+    if distribution == "uniform":
+        return rng.uniform(low, high, n)
+    if distribution == "normal":
+        return rng.normal(low, high, n)
+    if distribution == "standard_normal":
+        return rng.standard_normal(n)
+    raise ValueError("distribution must be uniform, normal or standard_normal")
+
+
+def _same_length(v1: np.ndarray, v2: np.ndarray):
+    if v1.shape[-1:] != v2.shape[-1:]:
+        raise ValueError(f"Vectors differ in dimension: {v1.shape[-1:]} and {v2.shape[-1:]}")
+
+
+def vector_add(v1: Any, v2: Any) -> np.ndarray:
+    v1, v2 = np.asarray(v1), np.asarray(v2)
+    _same_length(v1, v2)
+    return v1 + v2
+
+
+def vector_subtract(v1: Any, v2: Any) -> np.ndarray:
+    v1, v2 = np.asarray(v1), np.asarray(v2)
+    _same_length(v1, v2)
+    return v1 - v2
+
+
+def vector_scalar_multiply(v: Any, scalar: Any) -> np.ndarray:
+    """scalar may be one number or one per batch row"""
+    scalar = np.asarray(scalar)
+    return np.asarray(v) * (scalar[..., None] if scalar.ndim else scalar)
+
+
+def vector_dot_product(v1: Any, v2: Any) -> np.ndarray:
+    v1, v2 = np.asarray(v1), np.asarray(v2)
+    _same_length(v1, v2)
+    return np.einsum("...i,...i->...", v1, v2)
+
+
+def vector_cross_product(v1: Any, v2: Any) -> np.ndarray:
+    v1, v2 = np.asarray(v1), np.asarray(v2)
+    if v1.shape[-1] != 3 or v2.shape[-1] != 3:
+        raise ValueError("The cross product needs 3D vectors")
+    return np.cross(v1, v2)
+
+
+def vector_norm(v: Any, ord: Union[int, float, str] = 2) -> np.ndarray:
+    v = np.asarray(v)
+    if ord in ("inf", np.inf):
+        return np.abs(v).max(axis=-1)
+    if ord == 1:
+        return np.abs(v).sum(axis=-1)
+    if ord in (2, "fro"):
+        return np.sqrt(np.einsum("...i,...i->...", v, np.conj(v)).real)
+    raise ValueError("ord must be 1, 2, 'inf' or 'fro'")
+
+
+def vector_normalize(v: Any, ord: Union[int, float, str] = 2) -> np.ndarray:
+    """Unit vectors; zero vectors stay zero instead of turning into NaN"""
+    v = np.asarray(v)
+    norm = vector_norm(v, ord)[..., None]
+    return np.divide(v, norm, out=np.zeros(np.broadcast_shapes(v.shape, norm.shape), dtype=np.result_type(v, float)),
+                     where=norm > 0)
+
+
+def vector_projection(v: Any, u: Any) -> np.ndarray:
+    v, u = np.asarray(v), np.asarray(u)
+    _same_length(v, u)
+    scale = vector_dot_product(v, u) / vector_dot_product(u, u)
+    return scale[..., None] * u
+
+
+def matrix_trace(A: Any) -> np.ndarray:
+    A = np.asarray(A)
+    if A.ndim < 2 or A.shape[-1] != A.shape[-2]:
+        raise ValueError("matrix_trace needs square matrices")
+    return np.trace(A, axis1=-2, axis2=-1)
+
+
+def diagonal_matrix_create(diagonal: Any, k: int = 0, shape: Optional[Tuple[int, int]] = None) -> np.ndarray:
+    """Matrix with `diagonal` on offset k (above the main diagonal for k > 0); one matrix per batch row"""
+    diagonal = np.asarray(diagonal)
+    m = diagonal.shape[-1]
+    rows, cols = shape or (m + abs(k), m + abs(k))
+    i = np.arange(m) + max(-k, 0)
+    j = np.arange(m) + max(k, 0)
+    if i[-1:].size and (i[-1] >= rows or j[-1] >= cols):
+        raise ValueError(f"A diagonal of {m} elements at offset {k} does not fit shape {(rows, cols)}")
+    out = np.zeros(diagonal.shape[:-1] + (rows, cols), dtype=diagonal.dtype)
+    out[..., i, j] = diagonal
+    return out
@@ -0,0 +1,292 @@
+"""
+Special function kernels (special_functions_spec)
+
+Every function is elementwise over arrays of any shape. Poles and arguments outside
+the domain give NaN or ±inf, as NumPy's own ufuncs do, rather than raising.
+"""
+
+from math import factorial as exact_factorial
+from typing import Any, Union
+
+import numpy as np
+
+from ._batch import as_float, cached
+
+# Lanczos approximation, g = 7, n = 9
+_LANCZOS_G = 7.0
+_LANCZOS = (0.99999999999980993, 676.5203681218851, -1259.1392167224028, 771.32342877765313,
+            -176.61502916214059, 12.507343278686905, -0.13857109526572012, 9.9843695780195716e-6,
+            1.5056327351493116e-7)
+_EULER_GAMMA = 0.5772156649015329
+_ERF_SERIES_TERMS = 40
+_ERFC_FRACTION_TERMS = 100
+_ERF_SWITCH = 1.5  # series below, continued fraction above
+
+
+def _lanczos_sum(z: np.ndarray) -> np.ndarray:
+    total = np.full_like(z, _LANCZOS[0])
+    for k, coefficient in enumerate(_LANCZOS[1:], start=1):
+        total = total + coefficient / (z + k)
+    return total
+
+
+def gamma(x: Any) -> np.ndarray:
+    """Γ(x) for real or complex x: Lanczos for Re x >= 0.5, the reflection formula below"""
+    x = np.asarray(x)
+    x = x.astype(complex) if np.iscomplexobj(x) else as_float(x)
+    reflect = np.real(x) < 0.5
+    z = np.where(reflect, 1 - x, x) - 1
+    t = z + _LANCZOS_G + 0.5
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        value = np.sqrt(2 * np.pi) * t ** (z + 0.5) * np.exp(-t) * _lanczos_sum(z)
+        value = np.where(reflect, np.pi / (np.sin(np.pi * x) * value), value)
+    if not np.iscomplexobj(x):
+        value = np.where((x <= 0) & (x == np.floor(x)), np.nan, value)
+    return value
+
+
+def log_gamma(x: Any) -> np.ndarray:
+    """log|Γ(x)|, without forming Γ(x), so large x do not overflow"""
+    x = as_float(x)
+    reflect = x < 0.5
+    z = np.where(reflect, 1 - x, x) - 1
+    t = z + _LANCZOS_G + 0.5
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 0.5 * np.log(2 * np.pi) + (z + 0.5) * np.log(t) - t + np.log(_lanczos_sum(z))
+        value = np.where(reflect, np.log(np.pi / np.abs(np.sin(np.pi * x))) - value, value)
+    return np.where((x <= 0) & (x == np.floor(x)), np.inf, value)
+
+
+def _gamma_sign(x: np.ndarray) -> np.ndarray:
+    return np.where((x > 0) | (np.floor(-x) % 2 == 1), 1.0, -1.0)
+
+
+def digamma(x: Any) -> np.ndarray:
+    """ψ(x): recurrence up to x >= 6, then the asymptotic series; reflection for x < 0"""
+    x = as_float(x)
+    reflect = x < 0
+    z = np.where(reflect, 1 - x, x)
+    shift = np.zeros_like(z)
+    for _ in range(6):
+        small = z < 6
+        shift = np.where(small, shift - 1 / np.where(small, z, 1), shift)
+        z = np.where(small, z + 1, z)
+    inverse_square = 1 / (z * z)
+    series = np.log(z) - 0.5 / z - inverse_square * (1 / 12 - inverse_square * (1 / 120 - inverse_square * (
+        1 / 252 - inverse_square * (1 / 240 - inverse_square / 132))))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(reflect, series + shift - np.pi / np.tan(np.pi * x), series + shift)
+    return np.where((x <= 0) & (x == np.floor(x)), np.nan, value)
+
+
+def beta(a: Any, b: Any) -> np.ndarray:
+    """B(a, b) = Γ(a)Γ(b)/Γ(a+b) through log_gamma"""
+    a, b = as_float(a), as_float(b)
+    sign = _gamma_sign(a) * _gamma_sign(b) * _gamma_sign(a + b)
+    return sign * np.exp(log_gamma(a) + log_gamma(b) - log_gamma(a + b))
+
+
+def _erf_series(x: np.ndarray) -> np.ndarray:
+    """erf(x) = 2x/√π e^(-x²) Σ (2x²)^n / (1·3···(2n+1)): positive terms, no cancellation"""
+    total = np.zeros_like(x)
+    term = np.ones_like(x)
+    double_square = 2 * x * x
+    for n in range(_ERF_SERIES_TERMS):
+        total += term
+        term = term * double_square / (2 * n + 3)
+    return 2 * x / np.sqrt(np.pi) * np.exp(-x * x) * total
+
+
+def _erfc_fraction(x: np.ndarray) -> np.ndarray:
+    """erfc(x) = e^(-x²)/√π · 1/(x + (1/2)/(x + 1/(x + (3/2)/(x + ...)))) for x > 0, evaluated bottom-up"""
+    tail = x.copy()
+    for k in range(_ERFC_FRACTION_TERMS, 0, -1):
+        tail = x + (k / 2) / tail
+    return np.exp(-x * x) / np.sqrt(np.pi) / tail
+
+
+def erf(x: Any) -> np.ndarray:
+    x = as_float(x)
+    magnitude = np.abs(x)
+    near = magnitude < _ERF_SWITCH
+    value = np.where(near, _erf_series(np.where(near, magnitude, 0)),
+                     1 - _erfc_fraction(np.where(near, _ERF_SWITCH, magnitude)))
+    return np.copysign(value, x)
+
+
+def erfc(x: Any) -> np.ndarray:
+    """1 - erf(x), accurate in the far tail where the difference would cancel"""
+    x = as_float(x)
+    magnitude = np.abs(x)
+    near = magnitude < _ERF_SWITCH
+    upper = np.where(near, 1 - _erf_series(np.where(near, magnitude, 0)),
+                     _erfc_fraction(np.where(near, _ERF_SWITCH, magnitude)))
+    return np.where(x < 0, 2 - upper, upper)
+
+
+@cached(maxsize=1)
+def _factorial_table() -> np.ndarray:
+    """0! .. 170!, every factorial a float64 can hold"""
+    return np.cumprod(np.concatenate([[1.0], np.arange(1.0, 171.0)]))
+
+
+def factorial(n: Any, exact: bool = False) -> Union[int, np.ndarray]:
+    """n! from a cached table (inf past 170!); exact gives Python integers"""
+    if exact:
+        n = np.asarray(n)
+        if n.ndim == 0:
+            return exact_factorial(int(n))
+        return np.array([exact_factorial(int(k)) for k in n.ravel()], dtype=object).reshape(n.shape)
+    n = np.asarray(n)
+    if np.any(n < 0) or np.any(n != np.floor(n)):
+        raise ValueError("factorial needs non-negative integers")
+    table = _factorial_table()
+    index = n.astype(np.int64)
+    return np.where(index < table.size, table[np.minimum(index, table.size - 1)], np.inf)
+
+
+def legendre_polynomial(n: int, x: Any) -> np.ndarray:
+    """P_n(x) by (k+1) P_{k+1} = (2k+1) x P_k - k P_{k-1}"""
+    x = as_float(x)
+    previous, current = np.ones_like(x), x.copy()
+    if n == 0:
+        return previous
+    for k in range(1, n):
+        previous, current = current, ((2 * k + 1) * x * current - k * previous) / (k + 1)
+    return current
+
+
+# Bessel functions. Non-negative orders are computed directly and negative ones reflected. The
+# power series serves J and I where it has no cancellation; otherwise the integral representations
+#   J_v(x) = 1/π ∫_0^π cos(vθ - x sinθ) dθ - sin(vπ)/π ∫_0^∞ e^(-x sinh t - vt) dt
+#   Y_v(x) = 1/π ∫_0^π sin(x sinθ - vθ) dθ - 1/π ∫_0^∞ (e^(vt) + e^(-vt) cos(vπ)) e^(-x sinh t) dt
+#   K_v(x) = ∫_0^∞ e^(-x cosh t) cosh(vt) dt
+# are evaluated by composite Gauss-Legendre quadrature, with panels that follow each element's scale.
+
+_PANEL_NODES = 12
+_OSCILLATION_PANELS = 4    # minimum panels on [0, π]; more as x and v grow
+_UNIFORM_PANELS = 24       # on [0, T]
+_GRADED_PANELS = 20        # halving towards 0, for the e^(-xt) boundary layer of large x
+_TAIL_EXPONENT = 60.0      # integrands are cut off below e^-60 of their scale
+
+
+@cached(maxsize=8)
+def _gauss_legendre(count: int):
+    """Nodes and weights on [0, 1]"""
+    nodes, weights = np.polynomial.legendre.leggauss(count)
+    return (nodes + 1) / 2, weights / 2
+
+
+def _panel_quadrature(breaks: np.ndarray):
+    """Nodes and weights [..., panels * nodes] for sorted panel edges [..., panels + 1]"""
+    nodes, weights = _gauss_legendre(_PANEL_NODES)
+    start = breaks[..., :-1, None]
+    width = np.diff(breaks, axis=-1)[..., None]
+    shape = breaks.shape[:-1] + (-1,)
+    return (start + width * nodes).reshape(shape), (width * weights).reshape(shape)
+
+
+def _oscillatory_quadrature(x: np.ndarray, v: np.ndarray):
+    """Panels on [0, π] fine enough for cos(vθ - x sinθ): a fixed count sized by the largest frequency"""
+    panels = _OSCILLATION_PANELS + int(np.ceil(np.max(np.abs(x) + v, initial=0) / 4))
+    breaks = np.broadcast_to(np.linspace(0, np.pi, panels + 1), x.shape + (panels + 1,))
+    return _panel_quadrature(breaks)
+
+
+def _decay_quadrature(x: np.ndarray, growth: np.ndarray):
+    """Panels on [0, T] for integrands like e^(growth·t - x sinh t): T is past the point where the
+    integrand has fallen by e^-60, panels are uniform on [0, T] plus graded towards 0"""
+    end = np.log(2 * (_TAIL_EXPONENT + 1) / x + 1)
+    for _ in range(3):
+        end = np.log(2 * (_TAIL_EXPONENT + growth * end + 1) / x + 1)
+    uniform = end[..., None] * np.arange(1, _UNIFORM_PANELS + 1) / _UNIFORM_PANELS
+    graded = end[..., None] / _UNIFORM_PANELS * 2.0 ** -np.arange(1, _GRADED_PANELS + 1)
+    breaks = np.sort(np.concatenate([np.zeros(x.shape + (1,)), graded, uniform], axis=-1), axis=-1)
+    return _panel_quadrature(breaks)
+
+
+def _series(v: np.ndarray, x: np.ndarray, sign: float) -> np.ndarray:
+    """Σ sign^k (x/2)^(v+2k) / (k! Γ(v+k+1)) for v >= 0, x > 0; sign -1 for J, +1 for I"""
+    with np.errstate(divide="ignore"):
+        term = np.exp(v * np.log(x / 2) - log_gamma(v + 1))
+    total = term.copy()
+    quarter_square = x * x / 4
+    terms = int(np.max(x, initial=0)) + 30
+    for k in range(1, terms):
+        term = sign * term * quarter_square / (k * (v + k))
+        total += term
+    return total
+
+
+def _bessel_jy(v: np.ndarray, x: np.ndarray):
+    """J_v and Y_v for v >= 0, x > 0"""
+    theta, theta_weights = _oscillatory_quadrature(x, v)
+    phase = v[..., None] * theta - x[..., None] * np.sin(theta)
+    t, t_weights = _decay_quadrature(x, v)
+    decay = np.exp(-x[..., None] * np.sinh(t))
+    j = (np.sum(np.cos(phase) * theta_weights, axis=-1)
+         - np.sin(v * np.pi) * np.sum(decay * np.exp(-v[..., None] * t) * t_weights, axis=-1)) / np.pi
+    with np.errstate(over="ignore", invalid="ignore"):
+        tail = (np.exp(v[..., None] * t - x[..., None] * np.sinh(t))
+                + np.exp(-v[..., None] * t) * np.cos(v * np.pi)[..., None] * decay)
+        y = (np.sum(-np.sin(phase) * theta_weights, axis=-1) - np.sum(tail * t_weights, axis=-1)) / np.pi
+    series = x * x / 4 <= v + 1
+    if np.any(series):
+        j = np.where(series, _series(v, np.where(series, x, 1.0), -1.0), j)
+    return j, y
+
+
+def _bessel_k(v: np.ndarray, x: np.ndarray) -> np.ndarray:
+    t, weights = _decay_quadrature(x, v)
+    with np.errstate(over="ignore", invalid="ignore"):
+        integrand = np.exp(v[..., None] * t - x[..., None] * np.cosh(t)) * (1 + np.exp(-2 * v[..., None] * t)) / 2
+    return np.sum(integrand * weights, axis=-1)
+
+
+def _prepare(n: Any, x: Any):
+    v, x = np.broadcast_arrays(as_float(n), as_float(x))
+    return v, x, np.abs(v), np.where(x > 0, x, 1.0)
+
+
+def _integer(v: np.ndarray) -> np.ndarray:
+    return v == np.round(v)
+
+
+def bessel_j(n: Any, x: Any) -> np.ndarray:
+    """J_n(x) for real order n; negative x only for integer n (J_n(-x) = (-1)^n J_n(x))"""
+    v, x, order, positive = _prepare(n, as_float(x))
+    magnitude = np.where(x != 0, np.abs(x), 1.0)
+    j, y = _bessel_jy(order, magnitude)
+    # J_{-v} = cos(vπ) J_v - sin(vπ) Y_v
+    value = np.where(v < 0, np.cos(order * np.pi) * j - np.where(_integer(v), 0.0, np.sin(order * np.pi) * y), j)
+    value = np.where(x < 0, np.where(_integer(v), np.where(np.round(v) % 2 == 0, 1.0, -1.0) * value, np.nan), value)
+    return np.where(x == 0, np.where(v == 0, 1.0, np.where((v > 0) | _integer(v), 0.0, np.inf)), value)
+
+
+def bessel_y(n: Any, x: Any) -> np.ndarray:
+    """Y_n(x) for x > 0; -inf at 0, NaN below"""
+    v, x, order, positive = _prepare(n, x)
+    j, y = _bessel_jy(order, positive)
+    # Y_{-v} = sin(vπ) J_v + cos(vπ) Y_v
+    value = np.where(v < 0, np.where(_integer(v), 0.0, np.sin(order * np.pi) * j) + np.cos(order * np.pi) * y, y)
+    return np.where(x > 0, value, np.where(x == 0, -np.inf, np.nan))
+
+
+def bessel_i(n: Any, x: Any) -> np.ndarray:
+    """I_n(x) from its positive series; negative x only for integer n"""
+    v, x, order, positive = _prepare(n, x)
+    magnitude = np.where(x != 0, np.abs(x), 1.0)
+    value = _series(order, magnitude, 1.0)
+    # I_{-v} = I_v + (2/π) sin(vπ) K_v
+    fractional = (v < 0) & ~_integer(v)
+    if np.any(fractional):
+        value = value + np.where(fractional, 2 / np.pi * np.sin(order * np.pi) * _bessel_k(order, magnitude), 0.0)
+    value = np.where(x < 0, np.where(_integer(v), np.where(np.round(v) % 2 == 0, 1.0, -1.0) * value, np.nan), value)
+    return np.where(x == 0, np.where(v == 0, 1.0, np.where((v > 0) | _integer(v), 0.0, np.inf)), value)
+
+
+def bessel_k(n: Any, x: Any) -> np.ndarray:
+    """K_n(x) for x > 0 (K_{-n} = K_n); inf at 0, NaN below"""
+    v, x, order, positive = _prepare(n, x)
+    value = _bessel_k(order, positive)
+    return np.where(x > 0, value, np.where(x == 0, np.inf, np.nan))
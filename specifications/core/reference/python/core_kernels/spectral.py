@@ -0,0 +1,245 @@
+"""
+Signal processing, Fourier and wavelet kernels (signal_processing_spec, fourier_spec, wavelets_spec)
+"""
+
+from itertools import product
+from math import comb
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from ._batch import as_float, cached
+
+WINDOW_TYPES = ("rectangular", "hamming", "hanning", "blackman", "kaiser")
+DEFAULT_KAISER_BETA = 8.6  # side lobes comparable to a Blackman window
+
+
+@cached()
+def window_function(length: int, window_type: str = "hanning", beta: Optional[float] = None) -> np.ndarray:
+    """Symmetric window coefficients (w[n] over N-1 intervals); cached per (length, type, beta)"""
+    window_type = {"hann": "hanning"}.get(window_type, window_type)
+    if window_type not in WINDOW_TYPES:
+        raise ValueError(f"Unknown window type {window_type}; expected one of {WINDOW_TYPES}")
+    if length < 1:
+        raise ValueError("Window length must be positive")
+    if length == 1 or window_type == "rectangular":
+        return np.ones(length)
+
+    phase = 2 * np.pi * np.arange(length) / (length - 1)
+    if window_type == "hamming":
+        return 0.54 - 0.46 * np.cos(phase)
+    if window_type == "hanning":
+        return 0.5 * (1 - np.cos(phase))
+    if window_type == "blackman":
+        return 0.42 - 0.5 * np.cos(phase) + 0.08 * np.cos(2 * phase)
+    beta = DEFAULT_KAISER_BETA if beta is None else beta
+    ratio = 2 * np.arange(length) / (length - 1) - 1
+    return np.i0(beta * np.sqrt(1 - ratio ** 2)) / np.i0(beta)
+
+
+def find_peaks(input: Any, height: Optional[float] = None, distance: Optional[int] = None,
+               prominence: Optional[float] = None) -> Union[Dict[str, np.ndarray], List[Dict[str, np.ndarray]]]:
+    """Strict local maxima (x[i-1] < x[i] > x[i+1]) with their heights and prominences.
+
+    A [batch, n] input gives one result per row. Prominences are found for all rows at once: every
+    local maximum (plateaus and edges included) is a barrier, and each peak's left and right bases come
+    from pointer jumping over the barriers up to the nearest strictly higher one, carrying the minimum
+    seen on the way.
+    """
+    x = as_float(input)
+    rows = x.reshape(-1, x.shape[-1])
+    count, n = rows.shape
+
+    # +inf on both sides of every row: a barrier nothing can jump past, and a separator between rows
+    padded = np.pad(rows, ((0, 0), (1, 1)), constant_values=np.inf).ravel()
+    left, mid, right = padded[:-2], padded[1:-1], padded[2:]
+    barrier = np.isinf(mid) | ((mid >= left) & (mid >= right))
+    barrier[0] = barrier[-1] = True
+    nodes = np.flatnonzero(barrier) + 1  # positions in `padded`
+    level = padded[nodes]
+    left_base = _bases(padded, nodes, level)
+    right_base = _bases(padded[::-1], (padded.size - 1 - nodes)[::-1], level[::-1])[::-1]
+
+    strict = np.isfinite(level)
+    strict &= (padded[nodes - 1] < level) & (padded[np.minimum(nodes + 1, padded.size - 1)] < level)
+    flat = nodes[strict]
+    row_of = flat // (n + 2)
+    index = flat % (n + 2) - 1
+    heights = level[strict]
+    prominences = heights - np.maximum(left_base[strict], right_base[strict])
+
+    keep = np.ones(heights.size, dtype=bool)
+    if height is not None:
+        keep &= heights >= height
+    if prominence is not None:
+        keep &= prominences >= prominence
+    row_of, index, heights, prominences = row_of[keep], index[keep], heights[keep], prominences[keep]
+    if distance is not None and distance > 1:
+        keep = _enforce_distance(row_of, index, heights, distance)
+        row_of, index, heights, prominences = row_of[keep], index[keep], heights[keep], prominences[keep]
+
+    splits = np.searchsorted(row_of, np.arange(1, count))
+    results = [{"indices": i, "heights": h, "prominences": p}
+               for i, h, p in zip(np.split(index, splits), np.split(heights, splits), np.split(prominences, splits))]
+    return results[0] if x.ndim == 1 else results
+
+
+def _bases(values: np.ndarray, nodes: np.ndarray, level: np.ndarray) -> np.ndarray:
+    """Minimum of values between each barrier node and the nearest strictly higher node before it"""
+    lowest = np.minimum.reduceat(values, np.concatenate([[0], nodes[:-1]]))
+    lowest = np.minimum(lowest, level)
+    pointer = np.arange(nodes.size) - 1
+    pointer[0] = 0
+    active = np.flatnonzero(pointer >= 0)
+    while active.size:
+        target = pointer[active]
+        jump = (target >= 0) & (level[target] <= level[active]) & (target != active)
+        active = active[jump]
+        target = target[jump]
+        lowest[active] = np.minimum(lowest[active], lowest[target])
+        pointer[active] = np.where(target > 0, pointer[target], -1)
+        active = active[pointer[active] >= 0]
+    return lowest
+
+
+def _enforce_distance(rows: np.ndarray, index: np.ndarray, heights: np.ndarray, distance: int) -> np.ndarray:
+    """Drop peaks closer than `distance` to a higher peak of the same row, highest first"""
+    keep = np.ones(index.size, dtype=bool)
+    if not index.size:
+        return keep
+    # Peaks are ordered by (row, index); spacing rows apart turns both into one sorted key
+    key = rows * (int(index.max()) + 2 * distance) + index
+    for i in np.lexsort((index, -heights)):
+        if keep[i]:
+            lo, hi = np.searchsorted(key, [key[i] - distance + 1, key[i] + distance])
+            keep[lo:i] = False
+            keep[i + 1:hi] = False
+    return keep
+
+
+@cached()
+def fft_frequency_bins(n: int, sample_rate: float = 1.0) -> np.ndarray:
+    """Bin centre frequencies in standard FFT order"""
+    return np.fft.fftfreq(n, d=1.0 / sample_rate)
+
+
+def fft_shift(input: Any, axes: Any = -1) -> np.ndarray:
+    """Move the zero-frequency bin to the centre; along the last axis (each batch row) by default"""
+    return np.fft.fftshift(np.asarray(input), axes=axes)
+
+
+@cached()
+def _daubechies_lowpass(order: int, symmetric: bool = False) -> np.ndarray:
+    """Scaling filter of dbN (minimum phase) or symN (least phase nonlinearity) by spectral factorization.
+
+    symN keeps the root set whose phase deviates least from linear at worst; that reproduces the
+    tabulated symlets except sym7 and sym10, where it picks a different, equally valid set.
+    """
+    # |Q(z)|^2 = P(y), y = (2 - z - 1/z) / 4, P(y) = sum_k C(N-1+k, k) y^k
+    poly = [comb(order - 1 + k, k) for k in range(order)][::-1]
+    roots_y = np.roots(poly) if order > 1 else np.array([])
+    # Each y root gives a reciprocal pair z, 1/z; keep one of each
+    root_pairs = []
+    for y in roots_y:
+        z = (1 - 2 * y) + np.sqrt((1 - 2 * y) ** 2 - 1 + 0j)
+        root_pairs.append((z, 1 / z) if abs(z) < 1 else (1 / z, z))
+
+    def build(chosen):
+        filt = np.real(np.poly(chosen)) if chosen else np.array([1.0])
+        for _ in range(order):
+            filt = np.convolve(filt, [1.0, 1.0])
+        return filt * np.sqrt(2) / filt.sum()
+
+    def nonlinearity(chosen):
+        # (1 + z)^N has exactly linear phase, so only the chosen roots are scored
+        response = np.polyval(np.real(np.poly(chosen))[::-1], np.exp(-1j * frequencies))
+        phase = np.unwrap(np.angle(response))
+        return np.abs(phase - np.polyval(np.polyfit(frequencies, phase, 1), frequencies)).max()
+
+    if not symmetric or order <= 2:  # sym2 is db2
+        return build([inside for inside, _ in root_pairs])
+
+    # Conjugate roots must be chosen together to keep the filter real
+    groups = []
+    for inside, outside in root_pairs:
+        if inside.imag < -1e-12:
+            continue
+        conjugate = abs(inside.imag) > 1e-12
+        groups.append(((inside, np.conj(inside)) if conjugate else (inside,),
+                       (outside, np.conj(outside)) if conjugate else (outside,)))
+    frequencies = np.linspace(0, np.pi, 512)
+    choices = [[root for group, pick in zip(groups, choice) for root in group[pick]]
+               for choice in product((0, 1), repeat=len(groups))]
+    filt = build(min(choices, key=nonlinearity))
+    # A filter and its reverse are equally asymmetric; the tabulated symlets peak just past the centre
+    return filt if np.argmax(np.abs(filt)) == filt.size // 2 else filt[::-1].copy()
+
+
+@cached()
+def wavelet_family(name: str, filter_type: str = "decomposition") -> Dict[str, np.ndarray]:
+    """Orthogonal wavelet filters: haar, db1-db20 and sym2-sym10; highpass g[n] = (-1)^n h[L-1-n]"""
+    if filter_type not in ("decomposition", "reconstruction"):
+        raise ValueError("filter_type must be 'decomposition' or 'reconstruction'")
+    name = name.lower()
+    order = name.lstrip("dbsym")
+    if name == "haar":
+        lowpass = _daubechies_lowpass(1)
+    elif name.startswith("db") and order.isdigit() and 1 <= int(order) <= 20:
+        lowpass = _daubechies_lowpass(int(order))
+    elif name.startswith("sym") and order.isdigit() and 2 <= int(order) <= 10:
+        lowpass = _daubechies_lowpass(int(order), True)
+    else:
+        raise ValueError(f"Unsupported wavelet {name}; expected haar, db1-db20 or sym2-sym10")
+
+    highpass = (-1) ** np.arange(lowpass.size) * lowpass[::-1]
+    if filter_type == "decomposition":
+        return {"lowpass": lowpass[::-1].copy(), "highpass": highpass[::-1].copy()}
+    return {"lowpass": lowpass.copy(), "highpass": highpass.copy()}
+
+
+@cached()
+def _periodic_taps(length: int, taps: int) -> np.ndarray:
+    """(2k + m) mod length for output k and filter tap m"""
+    return (2 * np.arange(length // 2)[:, None] + np.arange(taps)[None, :]) % length
+
+
+def max_level(length: int, taps: int) -> int:
+    return max(int(np.log2(length / (taps - 1))) if taps > 1 else int(np.log2(length)), 1)
+
+
+def dwt(input: Any, wavelet: str = "db4", level: Optional[int] = None) -> Dict[str, Any]:
+    """Multi-level periodized DWT along the last axis.
+
+    Returns the approximation of the coarsest level and the details from the coarsest level to the
+    finest (the order idwt takes). The signal length must be divisible by 2**level.
+    """
+    x = as_float(input)
+    h = wavelet_family(wavelet, "reconstruction")["lowpass"]
+    g = (-1) ** np.arange(h.size) * h[::-1]
+    level = level or max_level(x.shape[-1], h.size)
+    if x.shape[-1] % (1 << level):
+        raise ValueError(f"Signal length {x.shape[-1]} is not divisible by 2**{level}")
+
+    details = []
+    approximation = x
+    for _ in range(level):
+        windows = approximation[..., _periodic_taps(approximation.shape[-1], h.size)]
+        details.append(windows @ g)
+        approximation = windows @ h
+    return {"approximation": approximation, "details": details[::-1]}
+
+
+def idwt(approximation: Any, details: List[Any], wavelet: str = "db4") -> np.ndarray:
+    """Inverse of dwt: details ordered from the coarsest level to the finest"""
+    h = wavelet_family(wavelet, "reconstruction")["lowpass"]
+    g = (-1) ** np.arange(h.size) * h[::-1]
+    x = as_float(approximation)
+    for detail in details:
+        detail = as_float(detail)
+        length = 2 * x.shape[-1]
+        taps = _periodic_taps(length, h.size)
+        out = np.zeros(np.broadcast_shapes(x.shape, detail.shape)[:-1] + (length,))
+        for m in range(h.size):  # for a fixed tap the output positions are distinct
+            out[..., taps[:, m]] += x * h[m] + detail * g[m]
+        x = out
+    return x
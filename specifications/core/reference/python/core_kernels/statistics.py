@@ -0,0 +1,717 @@
+"""
+Statistics kernels (descriptive_stats_spec, stat_utilities_spec, distributions_spec,
+regression_spec, hypothesis_testing_spec)
+
+Samples lie along the last axis, so [batch, n] data gives one statistic per row.
+Distribution functions are elementwise, with parameters broadcasting against x.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ._batch import as_float
+from .special import erfc, log_gamma
+
+DISTRIBUTION_FUNCTIONS = ("pdf", "cdf", "sf", "ppf")
+CORRELATION_METHODS = ("pearson", "spearman", "kendall")
+ALTERNATIVES = ("two-sided", "less", "greater")
+PROPORTION_METHODS = ("wald", "wilson", "clopper-pearson")
+
+_FRACTION_TERMS = 300
+_TINY = 1e-300
+_BISECTION_STEPS = 200
+
+
+def mean(data: Any, weights: Any = None, axis: int = -1) -> np.ndarray:
+    """Two-pass mean: the first pass's residual is added back, recovering most of the rounding"""
+    x = as_float(data)
+    if weights is None:
+        first = x.mean(axis=axis, keepdims=True)
+        return np.squeeze(first + (x - first).mean(axis=axis, keepdims=True), axis=axis)
+    w = np.broadcast_to(as_float(weights), x.shape)
+    return (x * w).sum(axis=axis) / w.sum(axis=axis)
+
+
+def median(data: Any, axis: int = -1) -> np.ndarray:
+    """Selection (np.partition, introselect) of the middle element(s), no full sort"""
+    x = np.moveaxis(as_float(data), axis, -1)
+    n = x.shape[-1]
+    middle = n // 2
+    if n % 2:
+        return np.partition(x, middle, axis=-1)[..., middle]
+    both = np.partition(x, (middle - 1, middle), axis=-1)
+    return (both[..., middle - 1] + both[..., middle]) / 2
+
+
+def mode(data: Any, return_counts: bool = False) -> Union[np.ndarray, List, Tuple]:
+    """Every most frequent value of each row (ascending); sorts once per call for the whole batch"""
+    x = np.sort(np.asarray(data), axis=-1)
+    rows = x.reshape(-1, x.shape[-1])
+    n = rows.shape[-1]
+    starts = np.ones(rows.shape, dtype=bool)
+    starts[:, 1:] = rows[:, 1:] != rows[:, :-1]
+    row_of, column = np.nonzero(starts)
+    flat = row_of * n + column
+    lengths = np.diff(np.append(flat, rows.size))
+    lengths = np.minimum(lengths, (row_of + 1) * n - flat)  # runs end at their row
+    best = np.zeros(rows.shape[0], dtype=lengths.dtype)
+    np.maximum.at(best, row_of, lengths)
+    winners = lengths == best[row_of]
+    splits = np.searchsorted(row_of[winners], np.arange(1, rows.shape[0]))
+    values = np.split(rows.ravel()[flat[winners]], splits)
+    if x.ndim == 1:
+        return (values[0], best[0]) if return_counts else values[0]
+    return (values, best.reshape(x.shape[:-1])) if return_counts else values
+
+
+def variance(data: Any, ddof: int = 0) -> np.ndarray:
+    """Two-pass: mean first, then squared deviations from it"""
+    x = as_float(data)
+    deviations = x - x.mean(axis=-1, keepdims=True)
+    return np.einsum("...i,...i->...", deviations, deviations) / (x.shape[-1] - ddof)
+
+
+def standard_deviation(data: Any, ddof: int = 0) -> np.ndarray:
+    return np.sqrt(variance(data, ddof))
+
+
+def _central_moments(x: np.ndarray, *orders: int) -> List[np.ndarray]:
+    deviations = x - x.mean(axis=-1, keepdims=True)
+    return [(deviations ** k).mean(axis=-1) for k in orders]
+
+
+def skewness(data: Any, bias: bool = True) -> np.ndarray:
+    x = as_float(data)
+    n = x.shape[-1]
+    m2, m3 = _central_moments(x, 2, 3)
+    value = m3 / m2 ** 1.5
+    return value if bias else value * np.sqrt(n * (n - 1)) / (n - 2)
+
+
+def kurtosis(data: Any, fisher: bool = True, bias: bool = True) -> np.ndarray:
+    x = as_float(data)
+    n = x.shape[-1]
+    m2, m4 = _central_moments(x, 2, 4)
+    value = m4 / m2 ** 2 - 3
+    if not bias:
+        value = ((n + 1) * value + 6) * (n - 1) / ((n - 2) * (n - 3))
+    return value if fisher else value + 3
+
+
+def covariance(x: Any, y: Any, ddof: int = 1) -> np.ndarray:
+    x, y = as_float(x), as_float(y)
+    dx = x - x.mean(axis=-1, keepdims=True)
+    dy = y - y.mean(axis=-1, keepdims=True)
+    return (dx * dy).sum(axis=-1) / (x.shape[-1] - ddof)
+
+
+def _ranks(x: np.ndarray) -> np.ndarray:
+    """Average ranks (1-based) along the last axis, ties sharing the mean of their positions"""
+    order = np.argsort(x, axis=-1, kind="stable")
+    ordered = np.take_along_axis(x, order, axis=-1)
+    n = x.shape[-1]
+    new_run = np.ones(x.shape, dtype=bool)
+    new_run[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    position = np.broadcast_to(np.arange(1, n + 1, dtype=float), x.shape)
+    # First and last position of each run, by a running max/min over the run boundaries
+    first = np.maximum.accumulate(np.where(new_run, position, 0), axis=-1)
+    end_run = np.ones(x.shape, dtype=bool)
+    end_run[..., :-1] = new_run[..., 1:]
+    last = np.flip(np.minimum.accumulate(np.flip(np.where(end_run, position, n + 1), -1), axis=-1), -1)
+    ranks = np.empty(x.shape)
+    np.put_along_axis(ranks, order, (first + last) / 2, axis=-1)
+    return ranks
+
+
+def correlation(x: Any, y: Any, method: str = "pearson") -> np.ndarray:
+    """Pearson, Spearman (Pearson of average ranks) or Kendall tau-b.
+
+    Kendall compares all pairs, so it is O(n^2) time and memory per row, unlike the other two.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown method {method}; expected one of {CORRELATION_METHODS}")
+    x, y = as_float(x), as_float(y)
+    if method == "kendall":
+        sx = np.sign(x[..., :, None] - x[..., None, :])
+        sy = np.sign(y[..., :, None] - y[..., None, :])
+        upper = np.triu(np.ones(sx.shape[-2:], dtype=bool), 1)
+        concordance = (sx * sy)[..., upper].sum(axis=-1)
+        tied_x = (sx[..., upper] != 0).sum(axis=-1)
+        tied_y = (sy[..., upper] != 0).sum(axis=-1)
+        return concordance / np.sqrt(tied_x * tied_y)
+    if method == "spearman":
+        x, y = _ranks(x), _ranks(y)
+    dx = x - x.mean(axis=-1, keepdims=True)
+    dy = y - y.mean(axis=-1, keepdims=True)
+    return (dx * dy).sum(axis=-1) / np.sqrt((dx * dx).sum(axis=-1) * (dy * dy).sum(axis=-1))
+
+
+def zscore_normalize(data: Any, axis: int = -1, ddof: int = 0) -> Dict[str, np.ndarray]:
+    """Zero-variance slices normalize to zeros rather than NaN"""
+    x = as_float(data)
+    centre = x.mean(axis=axis, keepdims=True)
+    spread = x.std(axis=axis, ddof=ddof, keepdims=True)
+    normalized = np.divide(x - centre, spread, out=np.zeros(x.shape), where=spread > 0)
+    return {"normalized_data": normalized, "mean": np.squeeze(centre, axis), "std": np.squeeze(spread, axis)}
+
+
+def minmax_normalize(data: Any, feature_range: Tuple[float, float] = (0.0, 1.0),
+                     axis: int = -1) -> Dict[str, np.ndarray]:
+    x = as_float(data)
+    low, high = x.min(axis=axis, keepdims=True), x.max(axis=axis, keepdims=True)
+    unit = np.divide(x - low, high - low, out=np.zeros(x.shape), where=high > low)
+    normalized = feature_range[0] + unit * (feature_range[1] - feature_range[0])
+    return {"normalized_data": normalized, "data_min": np.squeeze(low, axis), "data_max": np.squeeze(high, axis)}
+
+
+def outlier_detection_zscore(data: Any, threshold: float = 3.0, modified: bool = False) -> Dict[str, Any]:
+    """Classic z-scores, or with modified the robust 0.6745 (x - median) / MAD"""
+    x = as_float(data)
+    if modified:
+        centre = median(x)[..., None]
+        mad = median(np.abs(x - centre))[..., None]
+        scores = np.divide(0.6745 * (x - centre), mad, out=np.zeros(x.shape), where=mad > 0)
+    else:
+        scores = zscore_normalize(x)["normalized_data"]
+    mask = np.abs(scores) > threshold
+    outliers = x[mask] if x.ndim == 1 else [row[m] for row, m in zip(x.reshape(-1, x.shape[-1]),
+                                                                     mask.reshape(-1, x.shape[-1]))]
+    return {"outliers": outliers, "outlier_mask": mask, "z_scores": scores}
+
+
+def moving_average(data: Any, window: int, center: bool = False, min_periods: Optional[int] = None) -> np.ndarray:
+    """Running mean from one cumulative sum; windows with fewer than min_periods values (all of
+    `window` by default) are NaN. NaN inputs are skipped rather than spread."""
+    x = as_float(data)
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(x)
+    pad = [(0, 0)] * (x.ndim - 1) + [(1, 0)]
+    sums = np.cumsum(np.pad(np.where(valid, x, 0.0), pad), axis=-1)
+    counts = np.cumsum(np.pad(valid.astype(float), pad), axis=-1)
+    n = x.shape[-1]
+    # Window of output i covers [i - window + 1 + shift, i + shift]
+    shift = (window - 1) // 2 if center else 0
+    end = np.minimum(np.arange(n) + shift + 1, n)
+    start = np.clip(np.arange(n) + shift + 1 - window, 0, n)
+    total = sums[..., end] - sums[..., start]
+    count = counts[..., end] - counts[..., start]
+    return np.where(count >= max(min_periods, 1), total / np.maximum(count, 1), np.nan)
+
+
+def exponential_smoothing(data: Any, alpha: float, initial: Any = None) -> np.ndarray:
+    """s_t = α x_t + (1 - α) s_{t-1}, s_0 = initial (x_0 by default).
+
+    Unrolled, s_t = (1 - α)^t [s_0 + α Σ_k x_k (1 - α)^-k], a cumulative sum; it is taken in blocks
+    short enough that (1 - α)^-k stays far from overflow, so the recurrence costs a handful of
+    NumPy calls instead of one per sample.
+    """
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+    x = as_float(data)
+    if alpha == 1:
+        return x.copy()
+    decay = 1 - alpha
+    block = max(1, int(300 / -np.log10(decay)))
+    state = x[..., 0] if initial is None else np.broadcast_to(as_float(initial), x.shape[:-1])
+    out = np.empty(x.shape)
+    first = 1 if initial is None else 0
+    out[..., 0] = state
+    for start in range(first, x.shape[-1], block):
+        chunk = x[..., start:start + block]
+        k = np.arange(1, chunk.shape[-1] + 1)
+        growth = decay ** -k
+        out[..., start:start + block] = (state[..., None] + alpha * np.cumsum(chunk * growth, axis=-1)) / growth
+        state = out[..., start + chunk.shape[-1] - 1]
+    return out
+
+
+def kfold_split(n_samples: int, n_folds: int = 5, shuffle: bool = False,
+                seed: Optional[int] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Folds of near-equal size (the first n_samples % n_folds one larger)"""
+    if not 2 <= n_folds <= n_samples:
+        raise ValueError("n_folds must be between 2 and n_samples")
+    indices = np.random.default_rng(seed).permutation(n_samples) if shuffle else np.arange(n_samples)
+    sizes = np.full(n_folds, n_samples // n_folds)
+    sizes[:n_samples % n_folds] += 1
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    folds = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        folds.append((np.concatenate([indices[:lo], indices[hi:]]), indices[lo:hi]))
+    return folds
+
+
+def stratified_split(y: Any, test_size: float = 0.2, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Each class contributes round(test_size * count) to the test set, at least one when it has two or
+    more members and never all of them"""
+    labels = np.asarray(y)
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(labels.size)
+    # Group the shuffled indices by class without a Python loop over samples
+    classes, inverse = np.unique(labels[order], return_inverse=True)
+    grouped = order[np.argsort(inverse, kind="stable")]
+    counts = np.bincount(inverse, minlength=classes.size)
+    take = np.rint(test_size * counts).astype(int)
+    take = np.where(counts >= 2, np.clip(take, 1, counts - 1), 0)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(labels.size) - np.repeat(starts, counts)
+    test = rank < np.repeat(take, counts)
+    return np.sort(grouped[~test]), np.sort(grouped[test])
+
+
+def histogram_compute(data: Any, bins: Union[int, Sequence[float], None] = None,
+                      range: Optional[Tuple[float, float]] = None, density: bool = False) -> Dict[str, np.ndarray]:
+    """Counts per bin for every row at once (one bincount over row-offset bin indices); the last bin is
+    closed on the right. Sturges' rule when bins is not given."""
+    x = as_float(data)
+    rows = x.reshape(-1, x.shape[-1])
+    if bins is None:
+        bins = int(np.ceil(np.log2(rows.shape[-1]))) + 1
+    if np.ndim(bins) == 0:
+        low, high = range if range is not None else (float(np.nanmin(x)), float(np.nanmax(x)))
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, int(bins) + 1)
+    else:
+        edges = as_float(bins)
+    count = edges.size - 1
+    index = np.searchsorted(edges, rows, side="right") - 1
+    index = np.where(rows == edges[-1], count - 1, index)
+    inside = (index >= 0) & (index < count)
+    offsets = np.arange(rows.shape[0])[:, None] * count
+    counts = np.bincount((index + offsets)[inside], minlength=rows.shape[0] * count).reshape(rows.shape[0], count)
+    counts = counts.reshape(x.shape[:-1] + (count,))
+    if density:
+        counts = counts / (counts.sum(axis=-1, keepdims=True) * np.diff(edges))
+    return {"counts": counts, "bin_edges": edges, "bin_centers": (edges[:-1] + edges[1:]) / 2}
+
+
+# Regularized incomplete gamma and beta functions: the CDFs of every distribution below
+
+def _lentz(numerator, denominator, start: np.ndarray) -> np.ndarray:
+    """start + a_1/(b_1 + a_2/(b_2 + ...)) by modified Lentz, numerator(m)/denominator(m) for m >= 1,
+    iterating until every element has converged"""
+    value = np.where(start == 0, _TINY, start)
+    c, d = value.copy(), np.zeros_like(value)
+    for m in range(1, _FRACTION_TERMS):
+        a, b = numerator(m), denominator(m)
+        d = b + a * d
+        d = 1 / np.where(d == 0, _TINY, d)
+        c = b + a / c
+        c = np.where(c == 0, _TINY, c)
+        step = c * d
+        value = value * step
+        if np.all(np.abs(step - 1) < 1e-15):
+            break
+    return value
+
+
+def gamma_inc(a: Any, x: Any) -> np.ndarray:
+    """Regularized lower incomplete gamma P(a, x): series below x = a + 1, continued fraction above"""
+    a, x = np.broadcast_arrays(as_float(a), np.maximum(as_float(x), 0.0))
+    series = x < a + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prefactor = np.exp(a * np.log(np.where(x > 0, x, 1.0)) - x - log_gamma(a))
+
+        term = 1 / a
+        total = term.copy()
+        for k in range(1, _FRACTION_TERMS):
+            term = term * x / (a + k)
+            total = total + term
+            if np.all(np.abs(term) <= np.abs(total) * 1e-16):
+                break
+        lower = prefactor * total
+
+        # Q(a, x) = e^-x x^a / Γ(a) · 1/(x + 1 - a - 1(1 - a)/(x + 3 - a - ...))
+        fraction = _lentz(lambda m: np.full(x.shape, 1.0) if m == 1 else -(m - 1) * (m - 1 - a),
+                          lambda m: x + 2 * m - 1 - a, np.zeros(x.shape))
+        upper = prefactor * fraction
+    return np.where(x == 0, 0.0, np.where(series, lower, 1 - upper))
+
+
+def _beta_fraction(a: np.ndarray, b: np.ndarray, x: np.ndarray) -> np.ndarray:
+    def numerator(m):
+        if m == 1:
+            return np.ones_like(x)
+        k = (m - 1) // 2
+        if m % 2 == 0:
+            return -(a + k) * (a + b + k) * x / ((a + 2 * k) * (a + 2 * k + 1))
+        return k * (b - k) * x / ((a + 2 * k - 1) * (a + 2 * k))
+    return _lentz(numerator, lambda m: np.ones_like(x), np.zeros_like(x))
+
+
+def beta_inc(a: Any, b: Any, x: Any) -> np.ndarray:
+    """Regularized incomplete beta I_x(a, b); the continued fraction converges fast below
+    x = (a + 1)/(a + b + 2) and the symmetry I_x(a, b) = 1 - I_{1-x}(b, a) covers the rest"""
+    a, b, x = np.broadcast_arrays(as_float(a), as_float(b), np.clip(as_float(x), 0.0, 1.0))
+    swap = x > (a + 1) / (a + b + 2)
+    a2, b2, x2 = np.where(swap, b, a), np.where(swap, a, b), np.where(swap, 1 - x, x)
+    inside = (x2 > 0) & (x2 < 1)
+    safe = np.where(inside, x2, 0.5)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        front = np.exp(log_gamma(a2 + b2) - log_gamma(a2) - log_gamma(b2)
+                       + a2 * np.log(safe) + b2 * np.log1p(-safe)) / a2
+        value = np.where(inside, front * _beta_fraction(a2, b2, safe), np.where(x2 <= 0, 0.0, 1.0))
+    return np.where(swap, 1 - value, value)
+
+
+def _invert(cdf, p: np.ndarray, low: np.ndarray, high: np.ndarray) -> np.ndarray:
+    """x with cdf(x) = p by bisection, elementwise over a bracketing [low, high]"""
+    for _ in range(_BISECTION_STEPS):
+        middle = (low + high) / 2
+        below = cdf(middle) < p
+        low, high = np.where(below, middle, low), np.where(below, high, middle)
+        if np.all(high - low <= 1e-15 * np.maximum(np.abs(high), 1e-300)):
+            break
+    return (low + high) / 2
+
+
+def _gamma_inc_inverse(a: np.ndarray, p: np.ndarray) -> np.ndarray:
+    a, p = np.broadcast_arrays(as_float(a), as_float(p))
+    high = np.maximum(a, 1.0)
+    while np.any((gamma_inc(a, high) < p) & (p < 1)):
+        high = np.where(gamma_inc(a, high) < p, 2 * high, high)
+    value = _invert(lambda x: gamma_inc(a, x), p, np.zeros(p.shape), high)
+    return np.where(p >= 1, np.inf, np.where(p <= 0, 0.0, value))
+
+
+def _beta_inc_inverse(a: np.ndarray, b: np.ndarray, p: np.ndarray) -> np.ndarray:
+    a, b, p = np.broadcast_arrays(as_float(a), as_float(b), as_float(p))
+    return _invert(lambda x: beta_inc(a, b, x), p, np.zeros(p.shape), np.ones(p.shape))
+
+
+def _check_function(function: str):
+    if function not in DISTRIBUTION_FUNCTIONS:
+        raise ValueError(f"Unknown function {function}; expected one of {DISTRIBUTION_FUNCTIONS}")
+
+
+def normal_pdf(x: Any, mu: Any = 0.0, sigma: Any = 1.0) -> np.ndarray:
+    z = (as_float(x) - mu) / sigma
+    return np.exp(-0.5 * z * z) / (sigma * np.sqrt(2 * np.pi))
+
+
+def normal_cdf(x: Any, mu: Any = 0.0, sigma: Any = 1.0) -> np.ndarray:
+    """Through erfc, which keeps its relative precision in the lower tail"""
+    return 0.5 * erfc(-(as_float(x) - mu) / (sigma * np.sqrt(2)))
+
+
+# Acklam's rational approximation of the standard normal quantile
+_PPF_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02,
+          -3.066479806614716e+01, 2.506628277459239e+00)
+_PPF_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01,
+          -1.328068155288572e+01)
+_PPF_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00,
+          4.374664141464968e+00, 2.938163982698783e+00)
+_PPF_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+_PPF_LOW = 0.02425
+
+
+def normal_ppf(p: Any, mu: Any = 0.0, sigma: Any = 1.0) -> np.ndarray:
+    """Acklam's rational approximation (relative error 1e-9), polished by one Halley step"""
+    p = as_float(p)
+    q = np.clip(np.minimum(p, 1 - p), _TINY, 0.5)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tail = np.sqrt(-2 * np.log(q))
+        tail_value = np.polyval(_PPF_C, tail) / np.polyval(_PPF_D + (1.0,), tail)
+        r = (q - 0.5) ** 2
+        central = (q - 0.5) * np.polyval(_PPF_A, r) / np.polyval(_PPF_B + (1.0,), r)
+    z = np.where(q < _PPF_LOW, tail_value, central)  # the lower-half quantile of q, negative
+    error = normal_cdf(z) - q
+    step = error * np.sqrt(2 * np.pi) * np.exp(z * z / 2)
+    z = z - step / (1 + z * step / 2)
+    z = np.where(p > 0.5, -z, z)
+    z = np.where(p <= 0, -np.inf, np.where(p >= 1, np.inf, z))
+    return mu + sigma * z
+
+
+def uniform_distribution(x: Any, a: float = 0.0, b: float = 1.0, function: str = "pdf") -> np.ndarray:
+    _check_function(function)
+    x = as_float(x)
+    if function == "pdf":
+        return np.where((x >= a) & (x <= b), 1 / (b - a), 0.0)
+    if function == "ppf":
+        return a + x * (b - a)
+    cdf = np.clip((x - a) / (b - a), 0.0, 1.0)
+    return cdf if function == "cdf" else 1 - cdf
+
+
+def exponential_distribution(x: Any, rate: float = 1.0, function: str = "pdf") -> np.ndarray:
+    _check_function(function)
+    x = as_float(x)
+    if function == "ppf":
+        return -np.log1p(-x) / rate
+    positive = np.maximum(x, 0.0)
+    if function == "pdf":
+        return np.where(x >= 0, rate * np.exp(-rate * positive), 0.0)
+    if function == "cdf":
+        return np.where(x >= 0, -np.expm1(-rate * positive), 0.0)
+    return np.where(x >= 0, np.exp(-rate * positive), 1.0)
+
+
+def gamma_distribution(x: Any, shape: Any = 1.0, scale: Any = 1.0, function: str = "pdf") -> np.ndarray:
+    _check_function(function)
+    x, shape, scale = as_float(x), as_float(shape), as_float(scale)
+    if function == "ppf":
+        return scale * _gamma_inc_inverse(shape, x)
+    t = np.maximum(x, 0.0) / scale
+    if function == "pdf":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_density = (shape - 1) * np.log(t) - t - log_gamma(shape) - np.log(scale)
+        return np.where(x > 0, np.exp(log_density),
+                        np.where(x == 0, np.where(shape == 1, 1 / scale, np.where(shape < 1, np.inf, 0.0)), 0.0))
+    cdf = gamma_inc(shape, t)
+    return cdf if function == "cdf" else 1 - cdf
+
+
+def chi_squared_distribution(x: Any, df: Any, function: str = "pdf") -> np.ndarray:
+    return gamma_distribution(x, as_float(df) / 2, 2.0, function)
+
+
+def beta_distribution(x: Any, alpha: Any, beta: Any, function: str = "pdf") -> np.ndarray:
+    _check_function(function)
+    x, alpha, beta = as_float(x), as_float(alpha), as_float(beta)
+    if function == "ppf":
+        return _beta_inc_inverse(alpha, beta, x)
+    if function == "pdf":
+        inside = (x > 0) & (x < 1)
+        safe = np.where(inside, x, 0.5)
+        log_density = ((alpha - 1) * np.log(safe) + (beta - 1) * np.log1p(-safe)
+                       + log_gamma(alpha + beta) - log_gamma(alpha) - log_gamma(beta))
+        return np.where(inside, np.exp(log_density), 0.0)
+    cdf = beta_inc(alpha, beta, x)
+    return cdf if function == "cdf" else 1 - cdf
+
+
+def t_distribution(x: Any, df: Any, function: str = "pdf") -> np.ndarray:
+    """CDF via I_{df/(df+t^2)}(df/2, 1/2), the two-tailed probability beyond |t|"""
+    _check_function(function)
+    x, df = as_float(x), as_float(df)
+    if function == "pdf":
+        return np.exp(log_gamma((df + 1) / 2) - log_gamma(df / 2) - 0.5 * np.log(df * np.pi)
+                      - (df + 1) / 2 * np.log1p(x * x / df))
+    if function == "ppf":
+        tail = 2 * np.minimum(x, 1 - x)
+        z = _beta_inc_inverse(df / 2, np.full(np.shape(df), 0.5), tail)
+        with np.errstate(divide="ignore"):
+            magnitude = np.sqrt(df * (1 - z) / z)
+        return np.where(x < 0.5, -magnitude, magnitude)
+    tail = 0.5 * beta_inc(df / 2, 0.5, df / (df + x * x))
+    cdf = np.where(x < 0, tail, 1 - tail)
+    return cdf if function == "cdf" else 1 - cdf
+
+
+def f_distribution(x: Any, df1: Any, df2: Any, function: str = "pdf") -> np.ndarray:
+    _check_function(function)
+    x, df1, df2 = as_float(x), as_float(df1), as_float(df2)
+    if function == "ppf":
+        z = _beta_inc_inverse(df1 / 2, df2 / 2, x)
+        with np.errstate(divide="ignore"):
+            return df2 * z / (df1 * (1 - z))
+    positive = np.maximum(x, 0.0)
+    if function == "pdf":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_density = (df1 / 2 * np.log(df1 / df2) + (df1 / 2 - 1) * np.log(positive)
+                           - (df1 + df2) / 2 * np.log1p(df1 * positive / df2)
+                           - (log_gamma(df1 / 2) + log_gamma(df2 / 2) - log_gamma((df1 + df2) / 2)))
+        return np.where(x > 0, np.exp(log_density), 0.0)
+    if function == "sf":
+        return np.where(x > 0, beta_inc(df2 / 2, df1 / 2, df2 / (df2 + df1 * positive)), 1.0)
+    return np.where(x > 0, beta_inc(df1 / 2, df2 / 2, df1 * positive / (df1 * positive + df2)), 0.0)
+
+
+def lognormal_distribution(x: Any, mu: Any = 0.0, sigma: Any = 1.0, function: str = "pdf") -> np.ndarray:
+    _check_function(function)
+    x = as_float(x)
+    if function == "ppf":
+        return np.exp(normal_ppf(x, mu, sigma))
+    positive = x > 0
+    log_x = np.log(np.where(positive, x, 1.0))
+    if function == "pdf":
+        return np.where(positive, normal_pdf(log_x, mu, sigma) / np.where(positive, x, 1.0), 0.0)
+    cdf = np.where(positive, normal_cdf(log_x, mu, sigma), 0.0)
+    return cdf if function == "cdf" else 1 - cdf
+
+
+def weibull_distribution(x: Any, shape: Any = 1.0, scale: Any = 1.0, function: str = "pdf") -> np.ndarray:
+    _check_function(function)
+    x, shape, scale = as_float(x), as_float(shape), as_float(scale)
+    if function == "ppf":
+        return scale * (-np.log1p(-x)) ** (1 / shape)
+    t = np.maximum(x, 0.0) / scale
+    if function == "pdf":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            density = shape / scale * t ** (shape - 1) * np.exp(-t ** shape)
+        return np.where(x >= 0, density, 0.0)
+    if function == "cdf":
+        return np.where(x >= 0, -np.expm1(-t ** shape), 0.0)
+    return np.where(x >= 0, np.exp(-t ** shape), 1.0)
+
+
+def simple_linear_regression(x: Any, y: Any, fit_intercept: bool = True) -> Dict[str, np.ndarray]:
+    """Least squares from centred sums, one fit per row"""
+    x, y = as_float(x), as_float(y)
+    n = y.shape[-1]
+    if fit_intercept:
+        x_mean, y_mean = x.mean(axis=-1), y.mean(axis=-1)
+        dx, dy = x - x_mean[..., None], y - y_mean[..., None]
+        sxx = (dx * dx).sum(axis=-1)
+        slope = (dx * dy).sum(axis=-1) / sxx
+        intercept = y_mean - slope * x_mean
+        dof = n - 2
+    else:
+        sxx = (x * x).sum(axis=-1)
+        slope = (x * y).sum(axis=-1) / sxx
+        intercept = np.zeros(slope.shape)
+        x_mean = np.zeros(slope.shape)
+        dof = n - 1
+    residuals = y - (intercept[..., None] + slope[..., None] * x)
+    rss = (residuals * residuals).sum(axis=-1)
+    sigma2 = rss / dof
+    slope_error = np.sqrt(sigma2 / sxx)
+    intercept_error = np.sqrt(sigma2 * (1 / n + x_mean ** 2 / sxx)) if fit_intercept else np.zeros(slope.shape)
+    reference = y - y.mean(axis=-1, keepdims=True) if fit_intercept else y
+    r2 = 1 - rss / (reference * reference).sum(axis=-1)
+    return {"intercept": intercept, "slope": slope, "r_squared": r2,
+            "std_errors": np.stack([intercept_error, slope_error], axis=-1)}
+
+
+def r_squared(y_true: Any, y_pred: Any) -> np.ndarray:
+    y_true, y_pred = as_float(y_true), as_float(y_pred)
+    residual = y_true - y_pred
+    deviation = y_true - y_true.mean(axis=-1, keepdims=True)
+    return 1 - (residual * residual).sum(axis=-1) / (deviation * deviation).sum(axis=-1)
+
+
+def adjusted_r_squared(r_squared: Any, n: Any, p: Any) -> np.ndarray:
+    n, p = as_float(n), as_float(p)
+    return 1 - (1 - as_float(r_squared)) * (n - 1) / (n - p - 1)
+
+
+def residual_analysis(y_true: Any, y_pred: Any, X: Any) -> Dict[str, np.ndarray]:
+    """Leverages are the row norms of Q from a thin QR of the design matrix, [batch, n, p] or [n, p]
+    (a [n] design is a single predictor with an intercept)"""
+    y_true, y_pred, X = as_float(y_true), as_float(y_pred), as_float(X)
+    if X.ndim == y_true.ndim:
+        X = np.stack([np.ones(X.shape), X], axis=-1)
+    n, p = X.shape[-2:]
+    q, _ = np.linalg.qr(X)
+    leverage = (q * q).sum(axis=-1)
+    residuals = y_true - y_pred
+    sigma2 = (residuals * residuals).sum(axis=-1, keepdims=True) / (n - p)
+    standardized = residuals / np.sqrt(sigma2 * (1 - leverage))
+    cooks = standardized ** 2 / p * leverage / (1 - leverage)
+    return {"residuals": residuals, "standardized_residuals": standardized, "leverage": leverage,
+            "cooks_distance": cooks}
+
+
+def p_value_compute(statistic: Any, distribution: str = "normal", df: Any = None,
+                    alternative: str = "two-sided") -> np.ndarray:
+    """Tail probability of a test statistic; chi2 and f are right-tailed whatever alternative says"""
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"Unknown alternative {alternative}; expected one of {ALTERNATIVES}")
+    s = as_float(statistic)
+    if distribution in ("chi2", "chi_squared"):
+        return chi_squared_distribution(s, df, "sf")
+    if distribution == "f":
+        return f_distribution(s, df[0], df[1], "sf")
+    if distribution == "normal":
+        cdf = lambda v: normal_cdf(v)
+    elif distribution == "t":
+        cdf = lambda v: t_distribution(v, df, "cdf")
+    else:
+        raise ValueError(f"Unknown distribution {distribution}; expected normal, t, chi2 or f")
+    if alternative == "less":
+        return cdf(s)
+    if alternative == "greater":
+        return cdf(-s)
+    return np.minimum(2 * cdf(-np.abs(s)), 1.0)
+
+
+def t_test_one_sample(sample: Any, popmean: Any = 0.0, alternative: str = "two-sided") -> Dict[str, np.ndarray]:
+    x = as_float(sample)
+    n = x.shape[-1]
+    statistic = (x.mean(axis=-1) - popmean) / np.sqrt(variance(x, 1) / n)
+    return {"statistic": statistic, "pvalue": p_value_compute(statistic, "t", n - 1, alternative), "df": n - 1}
+
+
+def t_test_paired(sample1: Any, sample2: Any, alternative: str = "two-sided") -> Dict[str, np.ndarray]:
+    return t_test_one_sample(as_float(sample1) - as_float(sample2), 0.0, alternative)
+
+
+def z_test(sample: Any, popmean: Any, popstd: Any, alternative: str = "two-sided") -> Dict[str, np.ndarray]:
+    x = as_float(sample)
+    statistic = (x.mean(axis=-1) - popmean) / (as_float(popstd) / np.sqrt(x.shape[-1]))
+    return {"statistic": statistic, "pvalue": p_value_compute(statistic, "normal", None, alternative)}
+
+
+def anova_one_way(groups: Sequence[Any]) -> Dict[str, Any]:
+    """F test across groups of unequal size; every group may carry the same leading batch shape"""
+    groups = [as_float(g) for g in groups]
+    k = len(groups)
+    sizes = np.array([g.shape[-1] for g in groups])
+    total = sizes.sum()
+    means = [g.mean(axis=-1) for g in groups]
+    grand = sum(g.sum(axis=-1) for g in groups) / total
+    between = sum(size * (m - grand) ** 2 for size, m in zip(sizes, means))
+    within = sum(((g - m[..., None]) ** 2).sum(axis=-1) for g, m in zip(groups, means))
+    df_between, df_within = k - 1, int(total - k)
+    statistic = (between / df_between) / (within / df_within)
+    return {"statistic": statistic, "pvalue": f_distribution(statistic, df_between, df_within, "sf"),
+            "df_between": df_between, "df_within": df_within}
+
+
+def anova_two_way(data: Any, factor_a_levels: int, factor_b_levels: int, replications: int) -> Dict[str, Any]:
+    """Balanced two-factor ANOVA with interaction; data reshapes to [..., a, b, replications]"""
+    x = as_float(data)
+    a, b, r = factor_a_levels, factor_b_levels, replications
+    x = x.reshape(x.shape[:-1] + (a, b, r)) if x.shape[-1:] == (a * b * r,) else x.reshape(x.shape[:-3] + (a, b, r))
+    grand = x.mean(axis=(-3, -2, -1), keepdims=True)
+    cell = x.mean(axis=-1, keepdims=True)
+    mean_a = x.mean(axis=(-2, -1), keepdims=True)
+    mean_b = x.mean(axis=(-3, -1), keepdims=True)
+    ss_a = b * r * ((mean_a - grand) ** 2).sum(axis=(-3, -2, -1))
+    ss_b = a * r * ((mean_b - grand) ** 2).sum(axis=(-3, -2, -1))
+    ss_ab = r * ((cell - mean_a - mean_b + grand) ** 2).sum(axis=(-3, -2, -1))
+    ss_error = ((x - cell) ** 2).sum(axis=(-3, -2, -1))
+    df_a, df_b, df_ab, df_error = a - 1, b - 1, (a - 1) * (b - 1), a * b * (r - 1)
+    mse = ss_error / df_error
+    f_a, f_b, f_ab = ss_a / df_a / mse, ss_b / df_b / mse, ss_ab / df_ab / mse
+    return {"F_A": f_a, "p_A": f_distribution(f_a, df_a, df_error, "sf"),
+            "F_B": f_b, "p_B": f_distribution(f_b, df_b, df_error, "sf"),
+            "F_AB": f_ab, "p_AB": f_distribution(f_ab, df_ab, df_error, "sf"),
+            "df_A": df_a, "df_B": df_b, "df_AB": df_ab, "df_error": df_error}
+
+
+def confidence_interval_mean(sample: Any, confidence: float = 0.95,
+                             popstd: Optional[Any] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """t interval, or the normal interval when the population standard deviation is known"""
+    x = as_float(sample)
+    n = x.shape[-1]
+    centre = x.mean(axis=-1)
+    tail = (1 + confidence) / 2
+    if popstd is None:
+        half = t_distribution(tail, n - 1, "ppf") * np.sqrt(variance(x, 1) / n)
+    else:
+        half = normal_ppf(tail) * as_float(popstd) / np.sqrt(n)
+    return centre - half, centre + half
+
+
+def confidence_interval_proportion(successes: Any, n: Any, confidence: float = 0.95,
+                                   method: str = "wilson") -> Tuple[np.ndarray, np.ndarray]:
+    if method not in PROPORTION_METHODS:
+        raise ValueError(f"Unknown method {method}; expected one of {PROPORTION_METHODS}")
+    k, n = as_float(successes), as_float(n)
+    p = k / n
+    alpha = 1 - confidence
+    if method == "clopper-pearson":
+        lower = np.where(k > 0, _beta_inc_inverse(k, n - k + 1, np.full(k.shape, alpha / 2)), 0.0)
+        upper = np.where(k < n, _beta_inc_inverse(k + 1, n - k, np.full(k.shape, 1 - alpha / 2)), 1.0)
+        return lower, upper
+    z = normal_ppf(1 - alpha / 2)
+    if method == "wald":
+        half = z * np.sqrt(p * (1 - p) / n)
+        return np.clip(p - half, 0, 1), np.clip(p + half, 0, 1)
+    denominator = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denominator
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominator
+    return centre - half, centre + half
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+REFERENCE_DIR = str(Path(__file__).resolve().parent.parent)
+if REFERENCE_DIR not in sys.path:
+    sys.path.insert(0, REFERENCE_DIR)
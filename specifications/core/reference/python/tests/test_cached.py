@@ -0,0 +1,35 @@
+"""Cached kernels keep their signatures: keywords and defaults work and share one cache entry"""
+
+import numpy as np
+import pytest
+
+from core_kernels.calculus import gauss_legendre_rule
+from core_kernels.spectral import fft_frequency_bins, wavelet_family, window_function
+
+
+def test_keyword_arguments():
+    assert np.array_equal(window_function(8, "kaiser", beta=5.0), window_function(8, "kaiser", 5.0))
+    assert np.array_equal(window_function(length=8), window_function(8))
+    assert np.array_equal(fft_frequency_bins(16, sample_rate=2.0), fft_frequency_bins(16, 2.0))
+    assert np.array_equal(gauss_legendre_rule(n=5)[0], gauss_legendre_rule(5)[0])
+    decomposition = wavelet_family("haar", filter_type="decomposition")
+    assert decomposition.keys() == wavelet_family("haar").keys()
+
+
+def test_equivalent_calls_share_an_entry():
+    window_function.cache_clear()
+    first = window_function(16)
+    assert window_function(length=16) is first
+    assert window_function(16, "hanning") is first
+    assert window_function(16, window_type="hanning", beta=None) is first
+    assert window_function.cache_info().misses == 1
+
+
+def test_cached_arrays_are_read_only():
+    with pytest.raises(ValueError):
+        window_function(8)[0] = 1.0
+
+
+def test_bad_arguments_still_raise_type_error():
+    with pytest.raises(TypeError):
+        window_function(8, size=3)
@@ -0,0 +1,131 @@
+"""Kernels against NumPy references and closed forms, one result per row of a [batch, n] input"""
+
+import math
+
+import numpy as np
+import pytest
+
+from core_kernels import OPERATIONS, kernel
+from core_kernels.calculus import (integrate_from_samples, integrate_gauss_legendre, integrate_simpson,
+                                   integrate_simpson38, integrate_trapezoidal)
+from core_kernels.spectral import fft_frequency_bins, window_function
+from core_kernels.statistics import (correlation, covariance, exponential_smoothing, kurtosis, mean, median, mode,
+                                     moving_average, normal_cdf, normal_ppf, skewness, standard_deviation, variance)
+
+
+@pytest.fixture
+def batch():
+    return np.random.default_rng(11).standard_normal((6, 101))
+
+
+@pytest.mark.parametrize("length", [1, 2, 7, 64, 255])
+def test_windows_match_numpy(length):
+    assert np.allclose(window_function(length, "hamming"), np.hamming(length))
+    assert np.allclose(window_function(length, "hanning"), np.hanning(length))
+    assert np.allclose(window_function(length, "blackman"), np.blackman(length), atol=1e-15)
+    assert np.allclose(window_function(length, "kaiser", 5.0), np.kaiser(length, 5.0))
+    assert np.array_equal(window_function(length, "rectangular"), np.ones(length))
+    with pytest.raises(ValueError, match="Unknown window type"):
+        window_function(length, "triangle")
+
+
+@pytest.mark.parametrize("n, sample_rate", [(1, 1.0), (8, 1.0), (9, 2.0), (1024, 44100.0)])
+def test_fft_bins_match_the_transform(n, sample_rate):
+    bins = fft_frequency_bins(n, sample_rate)
+    assert np.array_equal(bins, np.fft.fftfreq(n, d=1.0 / sample_rate))
+    # A pure tone at bin k peaks at bins[k]
+    k = n // 3
+    tone = np.cos(2 * np.pi * bins[k] * np.arange(n) / sample_rate)
+    assert np.argmax(np.abs(np.fft.fft(tone))[:n // 2 + 1]) == k
+
+
+def test_quadrature_rules():
+    a, b = np.array([0.0, -1.0, 1.0]), np.array([np.pi, 2.0, 3.0])
+    exact = -np.cos(b) + np.cos(a)
+    assert np.allclose(integrate_trapezoidal(np.sin, a, b, 2000), exact, atol=1e-6)
+    assert np.allclose(integrate_simpson(np.sin, a, b, 100), exact, atol=1e-7)
+    assert np.allclose(integrate_simpson38(np.sin, a, b, 99), exact, atol=1e-7)
+    assert np.allclose(integrate_gauss_legendre(np.sin, a, b, 12), exact, atol=1e-12)
+
+    cubic = lambda x: 4 * x ** 3 - x + 2  # noqa: E731
+    antiderivative = lambda x: x ** 4 - x ** 2 / 2 + 2 * x  # noqa: E731
+    assert np.allclose(integrate_gauss_legendre(cubic, a, b, 2), antiderivative(b) - antiderivative(a))
+    assert integrate_simpson(cubic, 0.0, 1.0, 2) == pytest.approx(2.5)
+    with pytest.raises(ValueError):
+        integrate_simpson(np.sin, 0.0, 1.0, 3)
+    with pytest.raises(ValueError):
+        integrate_simpson38(np.sin, 0.0, 1.0, 4)
+
+
+@pytest.mark.parametrize("intervals", [2, 5, 10])
+def test_integrate_uneven_samples(intervals):
+    x = np.sort(np.random.default_rng(intervals).uniform(0.0, 2.0, intervals + 1))
+    y = np.stack([3 * x ** 2 - x, np.exp(x)])
+    exact = x[-1] ** 3 - x[-1] ** 2 / 2 - (x[0] ** 3 - x[0] ** 2 / 2)
+    assert np.allclose(integrate_from_samples(x, y[0], "simpson"), exact)
+    assert np.allclose(integrate_from_samples(x, y, "trapezoidal"), np.trapezoid(y, x))
+
+
+def test_statistics_match_numpy(batch):
+    assert np.allclose(mean(batch), batch.mean(axis=1))
+    assert np.allclose(mean(batch, weights=np.arange(101)), np.average(batch, axis=1, weights=np.arange(101)))
+    assert np.allclose(median(batch), np.median(batch, axis=1))
+    assert np.allclose(median(batch[:, :100]), np.median(batch[:, :100], axis=1))
+    assert np.allclose(variance(batch, ddof=1), batch.var(axis=1, ddof=1))
+    assert np.allclose(standard_deviation(batch), batch.std(axis=1))
+    assert np.allclose(covariance(batch[:3], batch[3:]), [np.cov(x, y)[0, 1] for x, y in zip(batch[:3], batch[3:])])
+    assert np.allclose(correlation(batch[:3], batch[3:]),
+                       [np.corrcoef(x, y)[0, 1] for x, y in zip(batch[:3], batch[3:])])
+    assert np.allclose(moving_average(batch, 5)[:, 4:],
+                       np.stack([np.convolve(row, np.ones(5) / 5, mode="valid") for row in batch]))
+    assert np.isnan(moving_average(batch, 5)[:, :4]).all()
+
+
+def test_moments_and_rank_correlations(batch):
+    stats = pytest.importorskip("scipy.stats")
+    assert np.allclose(skewness(batch), stats.skew(batch, axis=1))
+    assert np.allclose(skewness(batch, bias=False), stats.skew(batch, axis=1, bias=False))
+    assert np.allclose(kurtosis(batch), stats.kurtosis(batch, axis=1))
+    assert np.allclose(kurtosis(batch, fisher=False, bias=False),
+                       stats.kurtosis(batch, axis=1, fisher=False, bias=False))
+    ties = np.round(batch * 2)
+    assert np.allclose(correlation(ties[:3], ties[3:], "spearman"),
+                       [stats.spearmanr(x, y)[0] for x, y in zip(ties[:3], ties[3:])])
+    assert np.allclose(correlation(ties[:3, :40], ties[3:, :40], "kendall"),
+                       [stats.kendalltau(x, y)[0] for x, y in zip(ties[:3, :40], ties[3:, :40])])
+
+
+def test_normal_distribution():
+    x = np.linspace(-8.0, 8.0, 33)
+    assert np.allclose(normal_cdf(x), [0.5 * math.erfc(-v / math.sqrt(2)) for v in x], rtol=1e-13, atol=0)
+    p = np.array([1e-300, 1e-10, 0.01, 0.3, 0.5, 0.9, 1 - 1e-10])
+    assert np.allclose(normal_cdf(normal_ppf(p)), p, rtol=1e-9)
+    assert normal_ppf(0.0) == -np.inf and normal_ppf(1.0) == np.inf
+
+
+def test_smoothing_and_mode(batch):
+    alpha = 0.3
+    expected = np.empty(batch.shape)
+    expected[:, 0] = batch[:, 0]
+    for t in range(1, batch.shape[1]):
+        expected[:, t] = alpha * batch[:, t] + (1 - alpha) * expected[:, t - 1]
+    assert np.allclose(exponential_smoothing(batch, alpha), expected)
+    assert np.allclose(exponential_smoothing(np.ones((2, 5000)), 0.001), 1.0)  # long blocks do not overflow
+
+    values, counts = mode([[1, 2, 2, 3], [4, 4, 5, 5]], return_counts=True)
+    assert [list(v) for v in values] == [[2], [4, 5]] and list(counts) == [2, 2]
+
+
+@pytest.mark.parametrize("name", ["mean", "median", "variance", "standard_deviation", "skewness", "kurtosis"])
+def test_batches_give_one_result_per_row(name, batch):
+    function = kernel(name)
+    rows = function(batch)
+    assert rows.shape == (len(batch),)
+    assert np.allclose(rows, [function(row) for row in batch])
+    assert function(batch.reshape(2, 3, 101)).shape == (2, 3)
+
+
+def test_kernel_lookup():
+    assert kernel("window_function") is window_function and "gauss_legendre_rule" not in OPERATIONS
+    with pytest.raises(KeyError, match="No reference kernel"):
+        kernel("fft_frobnicate")
@@ -0,0 +1,310 @@
+"""
+Checkpointed Aggregates - Incremental report state for append-only analysis logs
+
+Each component keeps `analysis/aggregates.json` holding the usage and feedback
+aggregates together with the byte offset consumed in every log and the closed
+usage segments already folded in. Later reports read only the bytes appended
+since, and fall back to a full rebuild of a log when it was truncated or
+rotated (detected by inode, size and a digest of its head).
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Iterator, List
+
+from stats import UsageStats
+from usage_store import UsageStore, UsageSegment, SegmentWriter
+
+AGGREGATES_FILE = "aggregates.json"
+AGGREGATES_VERSION = 2
+RECENT_FEEDBACK = 5
+
+
+class LogCursor:
+    """Byte offset into an append-only log, with truncation/rotation detection"""
+    
+    HEAD_BYTES = 4096
+    
+    __slots__ = ("offset", "head_len", "head_digest", "inode")
+    
+    def __init__(self, offset: int = 0, head_len: int = 0, head_digest: str = None, inode: int = None):
+        self.offset = offset
+        self.head_len = head_len
+        self.head_digest = head_digest
+        self.inode = inode
+    
+    def continues(self, path: Path) -> bool:
+        """Whether the file is the one this cursor read and still starts with the bytes it consumed"""
+        try:
+            st = os.stat(path)
+            if st.st_size < self.offset or self.inode not in (None, st.st_ino):
+                return False
+            if not self.head_len:
+                return True
+            with open(path, "rb") as f:
+                head = f.read(self.head_len)
+        except OSError:
+            return False
+        return hashlib.sha256(head).hexdigest() == self.head_digest
+    
+    def read_lines(self, path: Path) -> Iterator[bytes]:
+        """Yield complete lines appended since the last read, advancing the offset.
+
+        A trailing line without a newline is left for the next read, so a
+        writer caught mid-append is never half-consumed.
+        """
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                yield line
+                
+            if self.head_len < min(self.offset, self.HEAD_BYTES):
+                self.head_len = min(self.offset, self.HEAD_BYTES)
+                f.seek(0)
+                self.head_digest = hashlib.sha256(f.read(self.head_len)).hexdigest()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"offset": self.offset, "head_len": self.head_len, "head_digest": self.head_digest,
+                "inode": self.inode}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogCursor":
+        return cls(data["offset"], data["head_len"], data["head_digest"], data["inode"])
+
+
+class FeedbackStats:
+    """Counts and most recent messages from one feedback log"""
+    
+    def __init__(self):
+        self.cursor = LogCursor()
+        self.counts = {"issue": 0, "suggestion": 0}
+        self.recent = {"issue": [], "suggestion": []}
+    
+    def add_lines(self, lines: Iterator[bytes]):
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                kind = entry["type"]
+                message = entry["message"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            if kind in self.counts:
+                self.counts[kind] += 1
+                recent = self.recent[kind]
+                recent.append(message)
+                if len(recent) > RECENT_FEEDBACK:
+                    del recent[0]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"cursor": self.cursor.to_dict(), "counts": self.counts, "recent": self.recent}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeedbackStats":
+        stats = cls()
+        stats.cursor = LogCursor.from_dict(data["cursor"])
+        stats.counts = data["counts"]
+        stats.recent = data["recent"]
+        return stats
+
+
+class ComponentAggregates:
+    """Persistent usage/feedback aggregates for one component's analysis directory"""
+    
+    def __init__(self, analysis_dir: Path):
+        self.analysis_dir = Path(analysis_dir)
+        self.path = self.analysis_dir / AGGREGATES_FILE
+        self.usage = UsageStats()
+        self.usage_cursor = LogCursor()
+        self.usage_segments: List[str] = []
+        self.feedback: Dict[str, FeedbackStats] = {}
+        self.has_usage = False
+        self.bytes_read = 0
+        self.segments_read = 0
+        self.rolled: List[str] = []
+        self.rebuilt: List[str] = []
+    
+    @classmethod
+    def load(cls, analysis_dir: Path, rebuild: bool = False) -> "ComponentAggregates":
+        """Load the checkpoint, or start empty if missing, unreadable or rebuild is requested"""
+        aggregates = cls(analysis_dir)
+        if rebuild or not aggregates.path.exists():
+            return aggregates
+        try:
+            with open(aggregates.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") != AGGREGATES_VERSION:
+                return aggregates
+            aggregates.usage = UsageStats.from_dict(data["usage"])
+            aggregates.usage_cursor = LogCursor.from_dict(data["usage_cursor"])
+            aggregates.usage_segments = data["usage_segments"]
+            aggregates.feedback = {name: FeedbackStats.from_dict(f) for name, f in data["feedback"].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls(analysis_dir)
+        return aggregates
+    
+    def update_usage(self, store: UsageStore, roll: bool = False) -> bool:
+        """Fold new segments and newly appended log entries into the aggregate.
+
+        With `roll`, an active log that is due for rolling (or any active log,
+        if `roll` is "force") is then closed into a columnar segment. Returns
+        False if there is no usage data.
+        """
+        rolling = store.rolling_file.exists()
+        if rolling and self.usage_cursor.offset and self.usage_cursor.continues(store.rolling_file):
+            self._finish_roll(store)
+            rolling = False
+            
+        segments = store.segment_names()
+        if not set(self.usage_segments) <= set(segments):
+            self._reset_usage("segments")
+        if store.active_file.exists():
+            if not self.usage_cursor.continues(store.active_file):
+                self._reset_usage(store.active_file.name)
+        elif self.usage_cursor.offset:
+            self._reset_usage(store.active_file.name)
+            
+        folded = set(self.usage_segments)
+        for name in segments:
+            if name not in folded:
+                with UsageSegment(store.segment_path(name)) as segment:
+                    self.usage.add_columns(segment.names, segment.function_ids,
+                                           segment.timestamps_us(), segment.durations)
+                self.usage_segments.append(name)
+                self.segments_read += 1
+        if rolling:
+            self._finish_roll(store)
+            
+        if store.active_file.exists():
+            start = self.usage_cursor.offset
+            self.usage.add_lines(self.usage_cursor.read_lines(store.active_file))
+            self.bytes_read += self.usage_cursor.offset - start
+            if roll == "force" or (roll and store.roll_due()):
+                if store.rolling_file.exists():
+                    self._finish_roll(store, final=True)
+                store.begin_roll()
+                self._finish_roll(store)
+                
+        self.has_usage = store.exists()
+        return self.has_usage
+    
+    def _reset_usage(self, reason: str):
+        self.usage = UsageStats()
+        self.usage_cursor = LogCursor()
+        self.usage_segments = []
+        self.rebuilt.append(reason)
+    
+    def _finish_roll(self, store: UsageStore, final: bool = False):
+        """Fold the rolled log past what earlier segments took from it into a segment, then checkpoint.
+
+        Appenders do not take the store lock, so one that opened the log just
+        before it was renamed may still write to it. The rolled log is therefore
+        kept and re-read on every update, and only removed (`final`) when the
+        next roll needs its place. Safe to resume after a crash at any step: a
+        segment written from the rolled log (matched by source inode) but not
+        yet checkpointed is rewritten.
+        """
+        rolling = store.rolling_file
+        st = os.stat(rolling)
+        start = 0
+        segmented = False
+        segment_path = None
+        names = store.segment_names()
+        if names:
+            with UsageSegment(store.segment_path(names[-1])) as segment:
+                source_inode, source_bytes = segment.source_inode, segment.source_bytes
+            if source_inode == st.st_ino:
+                if names[-1] in self.usage_segments:
+                    start, segmented = source_bytes, True
+                else:
+                    segment_path = store.segment_path(names[-1])
+                    
+        resumed = not segmented and self.usage_cursor.continues(rolling)
+        cursor = self.usage_cursor if resumed else LogCursor()
+        writer = SegmentWriter()
+        position = start
+        with open(rolling, "rb") as f:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n") and not final:
+                    break  # a writer caught mid-append: read on the next update
+                fold = position >= cursor.offset
+                position += len(line)
+                try:
+                    entry = json.loads(line)
+                    timestamp = entry["timestamp"]
+                    function_name = entry["function"]
+                    duration_ms = float(entry.get("duration_ms") or 0.0)
+                    writer.add(timestamp, function_name, duration_ms)
+                except (ValueError, KeyError, TypeError):
+                    if fold and line.strip():
+                        self.usage.skipped_lines += 1
+                    continue
+                if fold:
+                    self.usage.add(timestamp, function_name, duration_ms)
+        self.bytes_read += max(position - max(cursor.offset, start), 0)
+        
+        if position > start or not segmented:
+            segment_path = segment_path or store.next_segment_path()
+            writer.write(segment_path, st.st_ino, position)
+            self.usage_segments.append(segment_path.name)
+            if resumed:
+                self.usage_cursor = LogCursor()
+            self.rolled.append(segment_path.name)
+            self.save()
+        if final:
+            rolling.unlink()
+    
+    def update_feedback(self, feedback_dir: Path) -> bool:
+        """Fold newly appended feedback into per-file aggregates; False if there is no feedback dir"""
+        if not feedback_dir.exists():
+            self.feedback = {}
+            return False
+            
+        current = {}
+        for feedback_file in sorted(feedback_dir.glob("*.jsonl")):
+            stats = self.feedback.get(feedback_file.name)
+            if stats is None or not stats.cursor.continues(feedback_file):
+                if stats is not None:
+                    self.rebuilt.append(feedback_file.name)
+                stats = FeedbackStats()
+            start = stats.cursor.offset
+            stats.add_lines(stats.cursor.read_lines(feedback_file))
+            self.bytes_read += stats.cursor.offset - start
+            current[feedback_file.name] = stats
+        self.feedback = current
+        return True
+    
+    def feedback_summary(self) -> Dict[str, Any]:
+        recent = {"issue": [], "suggestion": []}
+        counts = {"issue": 0, "suggestion": 0}
+        for name in sorted(self.feedback):
+            stats = self.feedback[name]
+            for kind in counts:
+                counts[kind] += stats.counts[kind]
+                recent[kind].extend(stats.recent[kind])
+        return {
+            "issues_count": counts["issue"],
+            "suggestions_count": counts["suggestion"],
+            "recent_issues": recent["issue"][-RECENT_FEEDBACK:],
+            "recent_suggestions": recent["suggestion"][-RECENT_FEEDBACK:]
+        }
+    
+    def save(self):
+        """Atomically persist the checkpoint"""
+        self.analysis_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "version": AGGREGATES_VERSION,
+                "usage": self.usage.to_dict(),
+                "usage_cursor": self.usage_cursor.to_dict(),
+                "usage_segments": self.usage_segments,
+                "feedback": {name: stats.to_dict() for name, stats in self.feedback.items()}
+            }, f)
+        os.replace(tmp_path, self.path)
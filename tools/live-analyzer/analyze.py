@@ -6,18 +6,59 @@ This tool monitors component usage, tracks performance metrics, and collects
 feedback for the live development cycle: Build → Assemble → Use → Analyze → Iterate
 """
 
+import os
+import sys
 import json
 import time
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+
+SPEC_STORE_DIR = str(Path(__file__).resolve().parent.parent / "spec-store")
+if SPEC_STORE_DIR not in sys.path:
+    sys.path.insert(0, SPEC_STORE_DIR)
+
+from spec_store import SpecStore
+from stats import UsageStats, QuantileSketch
+from aggregates import ComponentAggregates
+from usage_store import UsageStore
+from bench import BENCHMARK_FILE, DEFAULT_WARMUP, DEFAULT_REPEAT, run_benchmarks, environment
+from cost_model import CostModel
+from profiler import DEFAULT_RATE_HZ, MODES as PROFILE_MODES, hot_paths, run_script
+from metrics import DEFAULT_HOST, DEFAULT_PORT, DEFAULT_REFRESH_INTERVAL, MetricsExporter, serve
+from compare import (DEFAULT_THRESHOLD, DEFAULT_QUANTILE, DEFAULT_ALPHA, compare_benchmarks, compare_usage,
+                     quantile_label)
+
+DEFAULT_TOP_FUNCTIONS = 10
+FLEET_REPORT_DIR = Path("workspace") / "analysis" / "component-analysis"
+
+
+class PhaseTimer:
+    """Wall time of consecutive phases, in ms"""
+    
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+    
+    def lap(self, phase: str):
+        now = time.perf_counter()
+        self.timings[f"{phase}_ms"] = round((now - self._last) * 1000, 3)
+        self._last = now
+    
+    def done(self) -> Dict[str, float]:
+        self.timings["total_ms"] = round((time.perf_counter() - self._start) * 1000, 3)
+        return self.timings
+
 
 class LiveAnalyzer:
     def __init__(self, project_root: Path):
         self.project_root = project_root
         self.components_dir = project_root / "components"
         self.workspace_dir = project_root / "workspace"
+        self.specs = SpecStore(project_root)
+        self._usage_files = {}
         
     def analyze_build(self, build_id: str, component_name: str = None) -> Dict[str, Any]:
         """Analyze a specific build in workspace/assembly"""
@@ -36,20 +77,262 @@ class LiveAnalyzer:
         }
         
         if component_name:
-            comp_analysis = self._analyze_component(component_name, build_path)
+            component_names = [component_name]
+        else:
+            component_names = sorted(d.name for d in build_path.iterdir()
+                                     if d.is_dir() and (d / BENCHMARK_FILE).exists())
+                                     
+        benchmarks_run = 0
+        for name in component_names:
+            comp_analysis = self._analyze_component(name, build_path)
             analysis["components_analyzed"].append(comp_analysis)
+            performance = comp_analysis["performance"]
+            if performance["status"] == "no_benchmarks":
+                analysis["suggestions"].append(
+                    f"No benchmark results for {name}. Run: analyze.py bench --build {build_id} --component {name}"
+                )
+                continue
+            benchmarks_run += performance["benchmarks_run"]
+            for bench_name, error in performance["failed"].items():
+                analysis["issues"].append(f"{name}.{bench_name}: {error}")
         
+        analysis["metrics"] = {
+            "components": len(component_names),
+            "benchmarks_run": benchmarks_run,
+            "benchmarks_failed": len(analysis["issues"])
+        }
         return analysis
     
+    def run_benchmarks(self, build_id: str, component_name: str, warmup: int = DEFAULT_WARMUP,
+                       repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+        """Run a component's registered benchmarks in an assembly build and store the results"""
+        build_path = self.workspace_dir / "assembly" / build_id
+        if not build_path.exists():
+            return {"error": f"Build {build_id} not found"}
+            
+        component_path = self._find_component(component_name)
+        if not component_path:
+            return {"error": f"Component {component_name} not found"}
+            
+        benchmarks_file = build_path / component_name / BENCHMARK_FILE
+        if not benchmarks_file.exists():
+            return {"error": f"No {BENCHMARK_FILE} for {component_name} in build {build_id}"}
+            
+        results = {
+            "build_id": build_id,
+            "component": component_name,
+            "timestamp": datetime.now().isoformat(),
+            "environment": environment(),
+            "benchmarks": run_benchmarks(benchmarks_file, warmup, repeat)
+        }
+        
+        results_file = component_path / "analysis" / "benchmarks" / f"{build_id}.json"
+        results_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(results_file, "w") as f:
+            json.dump(results, f, indent=2)
+            
+        print(f"Benchmark results: {results_file}")
+        return results
+    
+    def select_operations(self, n: int, budget_ms: float = None, category: str = None, match: str = None,
+                          top: int = 10) -> Dict[str, Any]:
+        """Rank core spec operations by predicted latency at input size n, those within budget first"""
+        model = CostModel.for_project(self.project_root, self.specs)
+        self.specs.flush()
+        if category and category not in model.categories:
+            return {"error": f"Unknown category {category}; expected one of {sorted(model.categories)}"}
+        ranked = model.rank(category, n, budget_ms, match)
+        best = ranked[0] if ranked and ranked[0].fits else None
+        return {
+            "n": n,
+            "budget_ms": budget_ms,
+            "category": category,
+            "calibrated_operations": len(model.fits),
+            "selected": best.operation.name if best else None,
+            "candidates": [estimate.to_dict() for estimate in ranked[:top]]
+        }
+    
+    def _load_benchmark_results(self, component_path: Path, build_id: str = None) -> Optional[Dict[str, Any]]:
+        """Stored results for a build, or the most recent results if build_id is None"""
+        if build_id:
+            results_file = component_path / "analysis" / "benchmarks" / f"{build_id}.json"
+        else:
+            candidates = self._benchmark_result_files(component_path)
+            results_file = candidates[-1] if candidates else None
+            
+        if not results_file or not results_file.exists():
+            return None
+        with open(results_file, "r") as f:
+            return json.load(f)
+    
+    def _benchmark_result_files(self, component_path: Path) -> List[Path]:
+        """Stored benchmark results, oldest first"""
+        benchmarks_dir = component_path / "analysis" / "benchmarks"
+        if not benchmarks_dir.exists():
+            return []
+        return sorted(benchmarks_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    
+    def snapshot_usage(self, component_name: str, build_id: str) -> Dict[str, Any]:
+        """Record the usage seen since the previous snapshot as the usage window of build_id.
+
+        Run it when a build is promoted; `compare` then contrasts the latency
+        of the windows recorded for two builds.
+        """
+        component_path = self._find_component(component_name)
+        if not component_path:
+            return {"error": f"Component {component_name} not found"}
+            
+        aggregates = self._update_aggregates(component_path)
+        builds_dir = component_path / "analysis" / "usage-patterns" / "builds"
+        previous = None
+        for window_file in sorted(builds_dir.glob("*.json")) if builds_dir.exists() else []:
+            if window_file.stem == build_id:
+                continue
+            with open(window_file, "r") as f:
+                window = json.load(f)
+            if previous is None or window["timestamp"] > previous["timestamp"]:
+                previous = window
+                
+        cumulative = {name: stats.sketch.to_dict() for name, stats in aggregates.usage.functions.items()}
+        functions = {}
+        for name, sketch_data in cumulative.items():
+            sketch = QuantileSketch.from_dict(sketch_data)
+            if previous and name in previous["cumulative"]:
+                sketch = sketch.difference(QuantileSketch.from_dict(previous["cumulative"][name]))
+            if sketch.count:
+                functions[name] = sketch.to_dict()
+                
+        snapshot = {
+            "build_id": build_id,
+            "component": component_name,
+            "timestamp": datetime.now().isoformat(),
+            "previous_build": previous["build_id"] if previous else None,
+            "calls": sum(sketch["count"] for sketch in functions.values()),
+            "functions": functions,
+            "cumulative": cumulative
+        }
+        builds_dir.mkdir(parents=True, exist_ok=True)
+        with open(builds_dir / f"{build_id}.json", "w") as f:
+            json.dump(snapshot, f)
+        return {key: snapshot[key] for key in ("build_id", "component", "timestamp", "previous_build", "calls")}
+    
+    def _load_usage_window(self, component_path: Path, build_id: str) -> Optional[Dict[str, Any]]:
+        window_file = component_path / "analysis" / "usage-patterns" / "builds" / f"{build_id}.json"
+        if not window_file.exists():
+            return None
+        with open(window_file, "r") as f:
+            return json.load(f)
+    
+    def compare_builds(self, base_build: str, head_build: str, component_name: str = None,
+                       threshold: float = DEFAULT_THRESHOLD, quantile: float = DEFAULT_QUANTILE,
+                       alpha: float = DEFAULT_ALPHA) -> Dict[str, Any]:
+        """Compare benchmark samples and usage windows of two builds, per function"""
+        if component_name:
+            component_path = self._find_component(component_name)
+            if not component_path:
+                return {"error": f"Component {component_name} not found"}
+            components = [(component_name, component_path)]
+        else:
+            components = [(path.name, path) for stage in ["production", "stable", "experimental"]
+                          if (self.components_dir / stage).exists()
+                          for path in sorted((self.components_dir / stage).iterdir()) if path.is_dir()]
+                          
+        comparison = {
+            "base": base_build,
+            "head": head_build,
+            "threshold": threshold,
+            "quantile": quantile_label(quantile),
+            "alpha": alpha,
+            "components": {},
+            "regressions": [],
+            "improvements": []
+        }
+        options = {"threshold": threshold, "quantile": quantile, "alpha": alpha}
+        
+        for name, component_path in components:
+            findings = None
+            base_results = self._load_benchmark_results(component_path, base_build)
+            head_results = self._load_benchmark_results(component_path, head_build)
+            if base_results and head_results:
+                findings = compare_benchmarks(base_results, head_results, **options)
+            base_window = self._load_usage_window(component_path, base_build)
+            head_window = self._load_usage_window(component_path, head_build)
+            if base_window and head_window:
+                findings = (findings or []) + compare_usage(base_window, head_window, **options)
+                
+            if findings is None:
+                if component_name:
+                    comparison["components"][name] = {"status": "no_data"}
+                continue
+            for finding in findings:
+                finding["component"] = name
+            comparison["components"][name] = {"status": "compared", "findings": findings}
+            comparison["regressions"].extend(f for f in findings if f["status"] == "regression")
+            comparison["improvements"].extend(f for f in findings if f["status"] == "improvement")
+            
+        comparison["recommendations"] = [f"{f['component']}: {f['message']}" for f in comparison["regressions"]]
+        return comparison
+    
+    def _recent_regressions(self, component_path: Path) -> Optional[Dict[str, Any]]:
+        """Benchmark regressions/improvements between the two most recently benchmarked builds"""
+        result_files = self._benchmark_result_files(component_path)
+        if len(result_files) < 2:
+            return None
+        with open(result_files[-2], "r") as f:
+            base = json.load(f)
+        with open(result_files[-1], "r") as f:
+            head = json.load(f)
+        findings = compare_benchmarks(base, head)
+        return {
+            "base": base["build_id"],
+            "head": head["build_id"],
+            "findings": [f for f in findings if f["status"] != "unchanged"]
+        }
+    
+    def _benchmark_performance(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Condense stored benchmark results into per-benchmark and overall numbers"""
+        benchmarks = {}
+        failed = {}
+        for name, result in results["benchmarks"].items():
+            if "error" in result:
+                failed[name] = result["error"]
+                continue
+            benchmarks[name] = {
+                "mean_ms": result["wall_ms"]["mean"],
+                "median_ms": result["wall_ms"]["median"],
+                "stdev_ms": result["wall_ms"]["stdev"],
+                "cpu_ms": result["cpu_ms"]["mean"],
+                "cpu_utilization": result["cpu_utilization"],
+                "peak_rss_bytes": result["peak_rss_bytes"],
+                "tracemalloc_peak_bytes": result["tracemalloc_peak_bytes"],
+                "repeat": result["repeat"]
+            }
+            
+        values = lambda key: [b[key] for b in benchmarks.values() if b[key] is not None]
+        mean = lambda items: round(sum(items) / len(items), 6) if items else None
+        return {
+            "status": "analyzed",
+            "source": "benchmarks",
+            "build_id": results["build_id"],
+            "measured": results["timestamp"],
+            "benchmarks_run": len(benchmarks),
+            "avg_execution_time_ms": mean(values("mean_ms")),
+            "avg_cpu_time_ms": mean(values("cpu_ms")),
+            "cpu_usage": mean(values("cpu_utilization")),
+            "peak_rss_bytes": max(values("peak_rss_bytes"), default=None),
+            "tracemalloc_peak_bytes": max(values("tracemalloc_peak_bytes"), default=None),
+            "benchmarks": benchmarks,
+            "failed": failed
+        }
+    
     def _analyze_component(self, component_name: str, build_path: Path) -> Dict[str, Any]:
         """Analyze a specific component's performance and usage"""
+        component_path = self._find_component(component_name)
+        results = self._load_benchmark_results(component_path, build_path.name) if component_path else None
+        
         return {
             "component": component_name,
-            "performance": {
-                "avg_execution_time": "N/A",
-                "memory_usage": "N/A",
-                "cpu_usage": "N/A"
-            },
+            "performance": self._benchmark_performance(results) if results else {"status": "no_benchmarks"},
             "usage_patterns": {
                 "most_called_functions": [],
                 "error_rate": 0.0
@@ -62,16 +345,11 @@ class LiveAnalyzer:
     
     def track_usage(self, component_name: str, function_name: str, duration_ms: float):
         """Track function usage and performance"""
-        component_path = self._find_component(component_name)
-        if not component_path:
+        usage_file = self.usage_log_path(component_name)
+        if not usage_file:
             print(f"Component {component_name} not found")
             return
         
-        analysis_dir = component_path / "analysis" / "usage-patterns"
-        analysis_dir.mkdir(parents=True, exist_ok=True)
-        
-        usage_file = analysis_dir / "usage_log.jsonl"
-        
         entry = {
             "timestamp": datetime.now().isoformat(),
             "function": function_name,
@@ -81,6 +359,21 @@ class LiveAnalyzer:
         with open(usage_file, "a") as f:
             f.write(json.dumps(entry) + "\n")
     
+    def usage_log_path(self, component_name: str) -> Path:
+        """Resolve (and create the directory for) a component's usage log, once per component"""
+        usage_file = self._usage_files.get(component_name)
+        if usage_file:
+            return usage_file
+        
+        component_path = self._find_component(component_name)
+        if not component_path:
+            return None
+        
+        analysis_dir = component_path / "analysis" / "usage-patterns"
+        analysis_dir.mkdir(parents=True, exist_ok=True)
+        usage_file = self._usage_files[component_name] = analysis_dir / "usage_log.jsonl"
+        return usage_file
+    
     def collect_feedback(self, component_name: str, feedback_type: str, message: str):
         """Collect AI model feedback or issues"""
         component_path = self._find_component(component_name)
@@ -102,111 +395,294 @@ class LiveAnalyzer:
         with open(feedback_file, "a") as f:
             f.write(json.dumps(entry) + "\n")
     
-    def generate_report(self, component_name: str) -> Dict[str, Any]:
-        """Generate analysis report for a component"""
+    def generate_report(self, component_name: str, rebuild: bool = False) -> Dict[str, Any]:
+        """Generate analysis report for a component.
+        
+        Usage and feedback aggregates are checkpointed in analysis/aggregates.json,
+        so only log entries appended since the previous report are read. The
+        report's `timings` show how long each phase took.
+        """
+        report, _ = self._build_report(component_name, rebuild)
+        if "report_file" in report:
+            print(f"Report generated: {report['report_file']}")
+        return report
+    
+    def _build_report(self, component_name: str, rebuild: bool = False) -> Tuple[Dict[str, Any],
+                                                                                   Optional[UsageStats]]:
+        """Write a component's report; returns it with the usage aggregates it was built from"""
+        timer = PhaseTimer()
         component_path = self._find_component(component_name)
         if not component_path:
-            return {"error": f"Component {component_name} not found"}
+            return {"error": f"Component {component_name} not found"}, None
+        
+        aggregates = self._update_aggregates(component_path, rebuild)
+        usage_stats = aggregates.usage if aggregates.has_usage else None
+        timer.lap("aggregate")
         
         report = {
             "component": component_name,
             "generated": datetime.now().isoformat(),
-            "performance": self._analyze_performance(component_path),
-            "usage": self._analyze_usage_patterns(component_path),
-            "feedback": self._analyze_feedback(component_path),
+            "performance": self._analyze_performance(component_path, usage_stats),
+            "usage": self._analyze_usage_patterns(usage_stats),
+            "feedback": self._analyze_feedback(component_path, aggregates),
+            "hot_paths": hot_paths(component_path / "analysis" / "usage-patterns"),
+            "aggregates": {
+                "bytes_read": aggregates.bytes_read,
+                "segments_read": aggregates.segments_read,
+                "rolled": aggregates.rolled,
+                "rebuilt": aggregates.rebuilt
+            },
             "recommendations": []
         }
+        regressions = self._recent_regressions(component_path)
+        if regressions:
+            report["regressions"] = regressions
         
         report["recommendations"] = self._generate_recommendations(report)
+        timer.lap("analyze")
         
         analysis_dir = component_path / "analysis"
+        analysis_dir.mkdir(parents=True, exist_ok=True)
         report_file = analysis_dir / f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        # Written last, so the timings cover everything but the final write
+        report["timings"] = timer.done()
         
         with open(report_file, "w") as f:
             json.dump(report, f, indent=2)
         
-        print(f"Report generated: {report_file}")
-        return report
+        report["report_file"] = str(report_file)
+        return report, usage_stats
+    
+    def _fleet_entry(self, component_name: str, rebuild: bool) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """One component's report and serialized usage aggregates; failures become an error report"""
+        try:
+            report, usage_stats = self._build_report(component_name, rebuild)
+        except Exception as e:
+            return {"component": component_name, "error": f"{type(e).__name__}: {e}"}, None
+        report.setdefault("component", component_name)
+        return report, usage_stats.to_dict() if usage_stats else None
+    
+    def generate_fleet_report(self, component_names: List[str] = None, rebuild: bool = False, jobs: int = 0,
+                              top: int = DEFAULT_TOP_FUNCTIONS, output_file: Path = None) -> Dict[str, Any]:
+        """Report on many components (default: every production component) concurrently, then merge
+        their usage aggregates into one fleet report with the slowest functions across components.
+        
+        Each component still gets its own report. Components are spread over `jobs` processes
+        (0 = one per CPU, 1 = in this process), since aggregating logs is CPU-bound.
+        """
+        timer = PhaseTimer()
+        if component_names is None:
+            component_names = [component.name for component in self.specs.components("production")]
+        timer.lap("discover")
+        
+        jobs = min(jobs or os.cpu_count() or 1, len(component_names))
+        if jobs <= 1:
+            entries = [self._fleet_entry(name, rebuild) for name in component_names]
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                entries = list(pool.map(_fleet_entry, [self.project_root] * len(component_names),
+                                        component_names, [rebuild] * len(component_names)))
+        timer.lap("components")
+        
+        fleet = self._merge_fleet(entries, top)
+        timer.lap("merge")
+        
+        component_ms = sum(report.get("timings", {}).get("total_ms", 0.0) for report, _ in entries)
+        fleet_report = {
+            "generated": datetime.now().isoformat(),
+            "jobs": jobs,
+            **fleet,
+            "timings": {**timer.timings, "component_total_ms": round(component_ms, 3)}
+        }
+        output_file = Path(output_file) if output_file else \
+            self.project_root / FLEET_REPORT_DIR / f"fleet_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        fleet_report["timings"]["total_ms"] = timer.done()["total_ms"]
+        with open(output_file, "w") as f:
+            json.dump(fleet_report, f, indent=2)
+        
+        fleet_report["report_file"] = str(output_file)
+        print(f"Fleet report generated: {output_file}")
+        return fleet_report
+    
+    def _merge_fleet(self, entries: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]],
+                     top: int) -> Dict[str, Any]:
+        """Fleet totals, per-component rows and the slowest functions across components"""
+        overall = None
+        functions = []
+        components = {}
+        recommendations = []
+        for report, usage in entries:
+            if "error" in report:
+                components[report["component"]] = {"status": "error", "error": report["error"]}
+                continue
+            stats = UsageStats.from_dict(usage) if usage else None
+            row = {
+                "status": report["usage"]["status"],
+                "total_calls": stats.total_calls if stats else 0,
+                "latency": stats.throughput.sketch.summary() if stats else None,
+                "issues": report["feedback"].get("issues_count", 0),
+                "recommendations": len(report["recommendations"]),
+                "report_file": report["report_file"],
+                "timings": report["timings"]
+            }
+            if "regressions" in report:
+                row["regressions"] = sum(finding["status"] == "regression"
+                                         for finding in report["regressions"]["findings"])
+            components[report["component"]] = row
+            recommendations.extend(f"{report['component']}: {text}" for text in report["recommendations"])
+            if not stats:
+                continue
+            if overall is None:
+                overall = QuantileSketch(stats.relative_accuracy)
+            overall.merge(stats.throughput.sketch)
+            functions.extend((report["component"], function, function_stats)
+                             for function, function_stats in stats.functions.items())
+        
+        # Slowest by p99 (the tail users notice); ties broken by call count
+        functions.sort(key=lambda entry: (entry[2].sketch.quantile(0.99), entry[2].count), reverse=True)
+        slowest = [{"component": component, "function": function, **function_stats.sketch.summary()}
+                   for component, function, function_stats in functions[:top]]
+        return {
+            "components": components,
+            "totals": {
+                "components": len(components),
+                "with_usage": sum(row.get("total_calls", 0) > 0 for row in components.values()),
+                "errors": sum(row["status"] == "error" for row in components.values()),
+                "total_calls": overall.count if overall else 0,
+                "latency": overall.summary() if overall else None
+            },
+            "slowest_functions": slowest,
+            "recommendations": recommendations
+        }
     
     def _find_component(self, component_name: str) -> Path:
         """Find component in production, stable, or experimental"""
-        for stage in ["production", "stable", "experimental"]:
-            comp_path = self.components_dir / stage / component_name
-            if comp_path.exists():
-                return comp_path
-        return None
+        return self.specs.find_component(component_name)
+    
+    def rotate_usage(self, component_name: str, force: bool = False, **limits) -> Optional[List[str]]:
+        """Roll the component's usage log into a columnar segment if it is due (or if forced).
+        
+        Returns the names of segments written, or None if the component is unknown.
+        `limits` (max_bytes, max_age) override the UsageStore defaults.
+        """
+        component_path = self._find_component(component_name)
+        if not component_path:
+            return None
+        
+        aggregates = self._update_aggregates(component_path, roll="force" if force else True,
+                                             feedback=False, **limits)
+        return aggregates.rolled
+    
+    def metrics_exporter(self, component_names: List[str] = None,
+                         refresh_interval: float = DEFAULT_REFRESH_INTERVAL) -> MetricsExporter:
+        """In-memory metrics of the components (default: every production component) for `serve`"""
+        if component_names is None:
+            return MetricsExporter({component.name: component.path
+                                    for component in self.specs.components("production")}, refresh_interval)
+        components = {}
+        for name in component_names:
+            component_path = self._find_component(name)
+            if not component_path:
+                raise ValueError(f"Component {name} not found")
+            components[name] = component_path
+        return MetricsExporter(components, refresh_interval)
+    
+    def _update_aggregates(self, component_path: Path, rebuild: bool = False, roll=True,
+                           feedback: bool = True, **limits) -> ComponentAggregates:
+        """Fold new usage segments and log entries (rolling the log if due) into the checkpoint"""
+        analysis_dir = component_path / "analysis"
+        store = UsageStore(analysis_dir / "usage-patterns", **limits)
+        with store.lock():
+            aggregates = ComponentAggregates.load(analysis_dir, rebuild)
+            aggregates.update_usage(store, roll)
+            if feedback:
+                aggregates.update_feedback(analysis_dir / "feedback")
+            aggregates.save()
+        return aggregates
     
-    def _analyze_performance(self, component_path: Path) -> Dict[str, Any]:
+    def _analyze_performance(self, component_path: Path, usage_stats: Optional[UsageStats] = None) -> Dict[str, Any]:
         """Analyze performance metrics"""
-        benchmarks_dir = component_path / "analysis" / "benchmarks"
-        if not benchmarks_dir.exists():
+        if usage_stats and usage_stats.total_calls:
+            return {
+                "status": "analyzed",
+                "source": "usage_log",
+                "overall": usage_stats.throughput.sketch.summary(),
+                "metrics": usage_stats.latency_summary()
+            }
+        
+        results = self._load_benchmark_results(component_path)
+        if not results:
             return {"status": "no_data"}
         
-        return {"status": "analyzed", "metrics": {}}
+        return self._benchmark_performance(results)
     
-    def _analyze_usage_patterns(self, component_path: Path) -> Dict[str, Any]:
+    def _analyze_usage_patterns(self, usage_stats: Optional[UsageStats]) -> Dict[str, Any]:
         """Analyze usage patterns from logs"""
-        usage_dir = component_path / "analysis" / "usage-patterns"
-        usage_file = usage_dir / "usage_log.jsonl"
-        
-        if not usage_file.exists():
+        if usage_stats is None:
             return {"status": "no_data"}
         
-        usage_data = []
-        with open(usage_file, "r") as f:
-            for line in f:
-                usage_data.append(json.loads(line))
-        
-        function_counts = {}
-        for entry in usage_data:
-            func = entry["function"]
-            function_counts[func] = function_counts.get(func, 0) + 1
-        
-        return {
+        usage = {
             "status": "analyzed",
-            "total_calls": len(usage_data),
-            "most_called": sorted(function_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+            "total_calls": usage_stats.total_calls,
+            "most_called": usage_stats.most_called(5),
+            "throughput": usage_stats.throughput_summary()
         }
+        if usage_stats.skipped_lines:
+            usage["skipped_lines"] = usage_stats.skipped_lines
+        return usage
     
-    def _analyze_feedback(self, component_path: Path) -> Dict[str, Any]:
+    def _analyze_feedback(self, component_path: Path, aggregates: ComponentAggregates) -> Dict[str, Any]:
         """Analyze feedback from AI models"""
         feedback_dir = component_path / "analysis" / "feedback"
         if not feedback_dir.exists():
             return {"status": "no_data"}
         
-        feedback_data = {"issues": [], "suggestions": []}
-        
-        for feedback_file in feedback_dir.glob("*.jsonl"):
-            with open(feedback_file, "r") as f:
-                for line in f:
-                    entry = json.loads(line)
-                    if entry["type"] == "issue":
-                        feedback_data["issues"].append(entry["message"])
-                    elif entry["type"] == "suggestion":
-                        feedback_data["suggestions"].append(entry["message"])
-        
-        return {
-            "status": "analyzed",
-            "issues_count": len(feedback_data["issues"]),
-            "suggestions_count": len(feedback_data["suggestions"]),
-            "recent_issues": feedback_data["issues"][-5:],
-            "recent_suggestions": feedback_data["suggestions"][-5:]
-        }
+        return {"status": "analyzed", **aggregates.feedback_summary()}
     
     def _generate_recommendations(self, report: Dict[str, Any]) -> List[str]:
         """Generate recommendations based on analysis"""
         recommendations = []
         
+        component = report["component"]
+        
+        for finding in report.get("regressions", {}).get("findings", []):
+            if finding["status"] == "regression":
+                recommendations.append(f"{finding['message']} in build {report['regressions']['head']} "
+                                       f"(vs {report['regressions']['base']})")
+                                       
+        if report["performance"].get("source") == "usage_log":
+            for name, metrics in report["performance"]["metrics"].items():
+                p50, p99 = metrics.get("p50_ms"), metrics.get("p99_ms")
+                if metrics["count"] >= 100 and p50 and p99 / p50 >= 10:
+                    recommendations.append(f"function {name} has a long latency tail: p99 is {p99 / p50:.0f}x "
+                                           f"its p50 ({p99:.3f} ms vs {p50:.3f} ms)")
+                                           
+        hot = report.get("hot_paths", {})
+        if hot.get("status") == "analyzed":
+            leaf = hot["top_self"][0]
+            if leaf["self_pct"] >= 25:
+                recommendations.append(f"{leaf['function']} spends {leaf['self_pct']:.0f}% of sampled time in its "
+                                       f"own code ({leaf['self_ms']:.0f} ms of {hot['sampled_ms']:.0f} ms); "
+                                       f"it is the hottest path to optimize")
+
         if report["usage"]["status"] == "no_data":
-            recommendations.append("No usage data collected. Start tracking component usage.")
+            recommendations.append(f"No usage data collected for {component}. Instrument it with "
+                                   f"tracker.get_tracker(\"{component}\") or record calls with `analyze.py track`.")
         
         if report["feedback"]["status"] == "analyzed":
             if report["feedback"]["issues_count"] > 5:
-                recommendations.append("Multiple issues reported. Review and address feedback.")
+                recommendations.append(f"{report['feedback']['issues_count']} issues reported; most recent: "
+                                       f"\"{report['feedback']['recent_issues'][-1]}\". Review and address feedback.")
         
         return recommendations
 
 
+def _fleet_entry(project_root: Path, component_name: str, rebuild: bool):
+    """Process-pool worker for generate_fleet_report"""
+    return LiveAnalyzer(project_root)._fleet_entry(component_name, rebuild)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Live Analyzer for HyperSync Components")
     parser.add_argument("--project-root", type=Path, default=Path.cwd(), help="Project root directory")
@@ -217,6 +693,12 @@ def main():
     analyze_parser.add_argument("--build", required=True, help="Build ID")
     analyze_parser.add_argument("--component", help="Component name")
     
+    bench_parser = subparsers.add_parser("bench", help="Run a component's benchmarks in a build")
+    bench_parser.add_argument("--build", required=True, help="Build ID")
+    bench_parser.add_argument("--component", required=True, help="Component name")
+    bench_parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Untimed runs per benchmark")
+    bench_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per benchmark")
+    
     track_parser = subparsers.add_parser("track", help="Track usage")
     track_parser.add_argument("--component", required=True, help="Component name")
     track_parser.add_argument("--function", required=True, help="Function name")
@@ -228,7 +710,64 @@ def main():
     feedback_parser.add_argument("--message", required=True, help="Feedback message")
     
     report_parser = subparsers.add_parser("report", help="Generate report")
-    report_parser.add_argument("--component", required=True, help="Component name")
+    report_target = report_parser.add_mutually_exclusive_group(required=True)
+    report_target.add_argument("--component", help="Component name")
+    report_target.add_argument("--all", action="store_true",
+                               help="Report on every production component and write one fleet report")
+    report_target.add_argument("--components", help="Comma-separated components for one fleet report")
+    report_parser.add_argument("--rebuild", action="store_true",
+                               help="Ignore checkpointed aggregates and rescan all logs")
+    report_parser.add_argument("--jobs", type=int, default=0,
+                               help="Worker processes for --all/--components (0 = one per CPU)")
+    report_parser.add_argument("--top", type=int, default=DEFAULT_TOP_FUNCTIONS,
+                               help="Slowest functions to list in the fleet report")
+    report_parser.add_argument("--output", type=Path, help=f"Fleet report file (default: {FLEET_REPORT_DIR}/"
+                                                           "fleet_report_<timestamp>.json)")
+    
+    serve_parser = subparsers.add_parser("serve", help="Serve component aggregates as OpenMetrics over HTTP")
+    serve_target = serve_parser.add_mutually_exclusive_group()
+    serve_target.add_argument("--component", help="Component name")
+    serve_target.add_argument("--all", action="store_true", help="Every production component (default)")
+    serve_target.add_argument("--components", help="Comma-separated components")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+    serve_parser.add_argument("--interval", type=float, default=DEFAULT_REFRESH_INTERVAL,
+                              help="Seconds between folding new log entries into the aggregates")
+    
+    snapshot_parser = subparsers.add_parser("snapshot", help="Record usage since the last snapshot for a build")
+    snapshot_parser.add_argument("--build", required=True, help="Build ID")
+    snapshot_parser.add_argument("--component", required=True, help="Component name")
+    
+    compare_parser = subparsers.add_parser("compare", help="Detect performance regressions between builds")
+    compare_parser.add_argument("--base", required=True, help="Baseline build ID")
+    compare_parser.add_argument("--head", required=True, help="Build ID to check")
+    compare_parser.add_argument("--component", help="Component name (default: all with data for both builds)")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD * 100,
+                                help="Regression threshold in percent")
+    compare_parser.add_argument("--quantile", type=float, default=DEFAULT_QUANTILE * 100,
+                                help="Latency quantile to compare, in percent")
+    compare_parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Significance level")
+    
+    select_parser = subparsers.add_parser("select", help="Rank spec operations that fit a latency budget")
+    select_parser.add_argument("--n", type=int, required=True, help="Input size")
+    select_parser.add_argument("--budget-ms", type=float, help="Latency budget in ms")
+    select_parser.add_argument("--category", help="Operation category, e.g. numerical or curves")
+    select_parser.add_argument("--match", help="Only operations whose name contains this, e.g. interpolate")
+    select_parser.add_argument("--top", type=int, default=10, help="Candidates to list")
+    
+    profile_parser = subparsers.add_parser("profile", help="Run a Python script under the sampling profiler")
+    profile_parser.add_argument("--component", required=True, help="Component the samples are recorded for")
+    profile_parser.add_argument("--rate", type=float, default=DEFAULT_RATE_HZ, help="Samples per second")
+    profile_parser.add_argument("--mode", default="signal", choices=PROFILE_MODES,
+                                help="signal: SIGPROF CPU-time sampling of the main thread; "
+                                     "thread: wall-time sampling of every thread")
+    profile_parser.add_argument("script", nargs=argparse.REMAINDER, help="Script and its arguments")
+    
+    rotate_parser = subparsers.add_parser("rotate", help="Roll the usage log into a columnar segment")
+    rotate_parser.add_argument("--component", required=True, help="Component name")
+    rotate_parser.add_argument("--force", action="store_true", help="Roll even if the size/age limits are not reached")
+    rotate_parser.add_argument("--max-mb", type=float, help="Roll once the active log reaches this size")
+    rotate_parser.add_argument("--max-age-hours", type=float, help="Roll once the oldest active entry reaches this age")
     
     args = parser.parse_args()
     
@@ -237,6 +776,10 @@ def main():
     if args.command == "analyze":
         result = analyzer.analyze_build(args.build, args.component)
         print(json.dumps(result, indent=2))
+        
+    elif args.command == "bench":
+        result = analyzer.run_benchmarks(args.build, args.component, args.warmup, args.repeat)
+        print(json.dumps(result, indent=2))
     
     elif args.command == "track":
         analyzer.track_usage(args.component, args.function, args.duration)
@@ -247,9 +790,65 @@ def main():
         print(f"Feedback collected for {args.component}")
     
     elif args.command == "report":
-        report = analyzer.generate_report(args.component)
+        if args.component:
+            report = analyzer.generate_report(args.component, args.rebuild)
+        else:
+            names = [name.strip() for name in args.components.split(",") if name.strip()] if args.components else None
+            report = analyzer.generate_fleet_report(names, args.rebuild, args.jobs, args.top, args.output)
         print(json.dumps(report, indent=2))
 
+    elif args.command == "serve":
+        names = None
+        if args.component:
+            names = [args.component]
+        elif args.components:
+            names = [name.strip() for name in args.components.split(",") if name.strip()]
+        try:
+            exporter = analyzer.metrics_exporter(names, args.interval)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        serve(exporter, args.host, args.port)
+        
+    elif args.command == "snapshot":
+        result = analyzer.snapshot_usage(args.component, args.build)
+        print(json.dumps(result, indent=2))
+        
+    elif args.command == "compare":
+        comparison = analyzer.compare_builds(args.base, args.head, args.component, args.threshold / 100,
+                                             args.quantile / 100, args.alpha)
+        print(json.dumps(comparison, indent=2))
+        if "error" in comparison or comparison["regressions"]:
+            sys.exit(1)
+            
+    elif args.command == "select":
+        selection = analyzer.select_operations(args.n, args.budget_ms, args.category, args.match, args.top)
+        print(json.dumps(selection, indent=2))
+        if "error" in selection or (args.budget_ms is not None and selection["selected"] is None):
+            sys.exit(1)
+            
+    elif args.command == "profile":
+        if args.script[:1] == ["--"]:
+            args.script = args.script[1:]
+        if not args.script:
+            profile_parser.error("a script to run is required")
+        result = run_script(args.component, args.project_root, args.script, rate_hz=args.rate, mode=args.mode)
+        print(json.dumps(result, indent=2))
+        
+    elif args.command == "rotate":
+        limits = {}
+        if args.max_mb is not None:
+            limits["max_bytes"] = int(args.max_mb * 1024 * 1024)
+        if args.max_age_hours is not None:
+            limits["max_age"] = args.max_age_hours * 3600
+        rolled = analyzer.rotate_usage(args.component, args.force, **limits)
+        if rolled is None:
+            print(f"Component {args.component} not found")
+        elif rolled:
+            print(f"Rolled usage log for {args.component} into {', '.join(rolled)}")
+        else:
+            print(f"Usage log for {args.component} is not due for rotation")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,194 @@
+"""
+Benchmark Harness - Measure registered benchmarks of an assembled build
+
+A component in an assembly build registers benchmarks in
+`workspace/assembly/<build_id>/<component>/benchmarks.py`, either by naming
+them `bench_*` or with the `benchmark` decorator:
+
+    from bench import benchmark
+
+    @benchmark(repeat=20, setup=lambda: make_points(10_000))
+    def geodesic_batch(points):
+        geodesic_distances(points)
+
+A benchmark that times one spec operation at a known input size can say so
+with `@benchmark(operation="cubic_spline_interpolate", size=10_000)`; the cost
+model (cost_model.py) calibrates its per-operation constants from those.
+
+Each benchmark runs in a fresh interpreter so peak RSS is its own: warmup runs,
+then `repeat` timed runs (wall and CPU time, GC disabled), then one run under
+tracemalloc for the Python allocation peak.
+"""
+
+import gc
+import sys
+import time
+import platform
+import statistics
+import tracemalloc
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+BENCHMARK_FILE = "benchmarks.py"
+DEFAULT_WARMUP = 1
+DEFAULT_REPEAT = 5
+
+
+def benchmark(func: Callable = None, *, name: str = None, warmup: int = None, repeat: int = None,
+              setup: Callable[[], Any] = None, operation: str = None, size: int = None):
+    """Register a benchmark; `setup()` runs once, untimed, and its result is passed to the benchmark"""
+    def register(f):
+        f.__benchmark__ = {"name": name or f.__name__, "warmup": warmup, "repeat": repeat, "setup": setup,
+                           "operation": operation, "size": size}
+        return f
+    return register(func) if func else register
+
+
+def load_benchmarks(benchmarks_file: Path) -> Dict[str, Callable]:
+    """Import a benchmarks.py and return its benchmarks by name, in definition order"""
+    benchmarks_file = Path(benchmarks_file)
+    component_dir = str(benchmarks_file.parent)
+    if component_dir not in sys.path:
+        sys.path.insert(0, component_dir)
+
+    spec = importlib.util.spec_from_file_location(f"_benchmarks_{benchmarks_file.parent.name}", benchmarks_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    benchmarks = {}
+    for attr, value in vars(module).items():
+        if not callable(value) or getattr(value, "__module__", None) != module.__name__:
+            continue
+        if hasattr(value, "__benchmark__"):
+            benchmarks[value.__benchmark__["name"]] = value
+        elif attr.startswith("bench_"):
+            benchmarks[attr[len("bench_"):]] = value
+    return benchmarks
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident set size of this process in bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(statistics.fmean(samples), 6),
+        "median": round(statistics.median(samples), 6),
+        "min": round(min(samples), 6),
+        "max": round(max(samples), 6),
+        "stdev": round(statistics.stdev(samples), 6) if len(samples) > 1 else 0.0,
+    }
+
+
+def measure(func: Callable, warmup: int = DEFAULT_WARMUP, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    """Run one benchmark callable in this process and return its measurements"""
+    options = getattr(func, "__benchmark__", {})
+    warmup = options.get("warmup") if options.get("warmup") is not None else warmup
+    repeat = max(1, options.get("repeat") or repeat)
+    baseline_rss = _peak_rss()
+
+    if options.get("setup"):
+        state = options["setup"]()
+        call = lambda: func(state)
+    else:
+        call = func
+
+    for _ in range(warmup):
+        call()
+
+    wall_ms = []
+    cpu_ms = []
+    perf_counter = time.perf_counter
+    process_time = time.process_time
+    gc.collect()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            cpu_start = process_time()
+            wall_start = perf_counter()
+            call()
+            wall_end = perf_counter()
+            cpu_end = process_time()
+            wall_ms.append((wall_end - wall_start) * 1000)
+            cpu_ms.append((cpu_end - cpu_start) * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        call()
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total_wall = sum(wall_ms)
+    measured = {
+        "warmup": warmup,
+        "repeat": repeat,
+        "wall_ms": _summary(wall_ms),
+        "cpu_ms": _summary(cpu_ms),
+        "cpu_utilization": round(sum(cpu_ms) / total_wall, 4) if total_wall else None,
+        "peak_rss_bytes": _peak_rss(),
+        "baseline_rss_bytes": baseline_rss,
+        "tracemalloc_peak_bytes": traced_peak,
+        "samples": {"wall_ms": [round(x, 6) for x in wall_ms], "cpu_ms": [round(x, 6) for x in cpu_ms]},
+    }
+    for key in ("operation", "size"):
+        if options.get(key) is not None:
+            measured[key] = options[key]
+    return measured
+
+
+def _measure_isolated(benchmarks_file: str, name: str, warmup: int, repeat: int) -> Dict[str, Any]:
+    return measure(load_benchmarks(Path(benchmarks_file))[name], warmup, repeat)
+
+
+def run_benchmarks(benchmarks_file: Path, warmup: int = DEFAULT_WARMUP, repeat: int = DEFAULT_REPEAT,
+                   only: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Run every benchmark in benchmarks_file, one fresh process each, sequentially"""
+    names = [name for name in load_benchmarks(benchmarks_file) if not only or name in only]
+    context = multiprocessing.get_context("spawn")
+    results = {}
+
+    for name in names:
+        print(f"[Bench] {name}...")
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results[name] = pool.submit(_measure_isolated, str(benchmarks_file), name, warmup, repeat).result()
+        except BrokenProcessPool:
+            results[name] = {"error": "benchmark process crashed"}
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+
+        if "error" in results[name]:
+            print(f"  ✗ {results[name]['error']}")
+        else:
+            print(f"  ✓ {results[name]['wall_ms']['median']:.3f} ms median over {results[name]['repeat']} runs")
+
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    """Host details recorded alongside results, so runs on different machines are not compared blindly"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": multiprocessing.cpu_count(),
+    }
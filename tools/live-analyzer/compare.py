@@ -0,0 +1,93 @@
+"""
+Build Comparison - Performance regression detection between two builds
+
+Benchmark samples (from bench.py results) and per-build usage windows (latency
+sketches recorded by `analyze.py snapshot`) are compared per function: the
+change at a chosen quantile must exceed the threshold *and* a one-sided
+Mann-Whitney U test must find the shift significant before it is reported.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+from stats import QuantileSketch, as_histogram, mann_whitney_u, weighted_quantile
+
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_QUANTILE = 0.95
+DEFAULT_ALPHA = 0.05
+
+
+def quantile_label(quantile: float) -> str:
+    return f"p{quantile * 100:g}"
+
+
+def compare_distributions(name: str, kind: str, base: List[Tuple[float, int]], head: List[Tuple[float, int]],
+                          threshold: float = DEFAULT_THRESHOLD, quantile: float = DEFAULT_QUANTILE,
+                          alpha: float = DEFAULT_ALPHA) -> Dict[str, Any]:
+    """Classify one function's latency change as regression, improvement or unchanged"""
+    label = quantile_label(quantile)
+    base_value = weighted_quantile(base, quantile)
+    head_value = weighted_quantile(head, quantile)
+    change = (head_value - base_value) / base_value if base_value else None
+    slower = mann_whitney_u(base, head)
+    faster = mann_whitney_u(head, base)
+    
+    status = "unchanged"
+    p_value = slower["p_value"]
+    if change is not None and change >= threshold and slower["p_value"] is not None and slower["p_value"] < alpha:
+        status = "regression"
+    elif change is not None and change <= -threshold and faster["p_value"] is not None and faster["p_value"] < alpha:
+        status = "improvement"
+        p_value = faster["p_value"]
+        
+    finding = {
+        "name": name,
+        "kind": kind,
+        "status": status,
+        "quantile": label,
+        "base_ms": _round(base_value),
+        "head_ms": _round(head_value),
+        "change": round(change, 4) if change is not None else None,
+        "base_median_ms": _round(weighted_quantile(base, 0.5)),
+        "head_median_ms": _round(weighted_quantile(head, 0.5)),
+        "p_value": float(f"{p_value:.4g}") if p_value is not None else None,
+        "samples": {"base": sum(c for _, c in base), "head": sum(c for _, c in head)},
+    }
+    if status != "unchanged":
+        direction = "slower" if status == "regression" else "faster"
+        significance = "p<0.0001" if p_value < 1e-4 else f"p={p_value:.2g}"
+        finding["message"] = (f"{kind} {name} got {abs(change):.0%} {direction} at {label} "
+                              f"({base_value:.3f} ms -> {head_value:.3f} ms, {significance})")
+    return finding
+
+
+def compare_benchmarks(base_results: Dict[str, Any], head_results: Dict[str, Any],
+                       **options) -> List[Dict[str, Any]]:
+    """Compare benchmarks present and successful in both result files, by raw wall-time samples"""
+    findings = []
+    base_benchmarks = base_results.get("benchmarks", {})
+    head_benchmarks = head_results.get("benchmarks", {})
+    for name in sorted(set(base_benchmarks) & set(head_benchmarks)):
+        base, head = base_benchmarks[name], head_benchmarks[name]
+        if "error" in base or "error" in head:
+            continue
+        findings.append(compare_distributions(name, "benchmark", as_histogram(base["samples"]["wall_ms"]),
+                                              as_histogram(head["samples"]["wall_ms"]), **options))
+    return findings
+
+
+def compare_usage(base_window: Dict[str, Any], head_window: Dict[str, Any],
+                  **options) -> List[Dict[str, Any]]:
+    """Compare per-function latency sketches of two usage windows"""
+    findings = []
+    base_functions = base_window.get("functions", {})
+    head_functions = head_window.get("functions", {})
+    for name in sorted(set(base_functions) & set(head_functions)):
+        base = QuantileSketch.from_dict(base_functions[name])
+        head = QuantileSketch.from_dict(head_functions[name])
+        if base.count and head.count:
+            findings.append(compare_distributions(name, "function", base.histogram(), head.histogram(), **options))
+    return findings
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 4) if value is not None else None
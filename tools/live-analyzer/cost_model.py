@@ -0,0 +1,253 @@
+"""
+Operation Cost Model - Pick spec operations that fit a latency budget
+
+The core operation specs declare a complexity for every operation
+(`core_efficient_math_ops.json`, `core_efficient_trajectory_ops.json` and the
+sections of `adaptive_granularity_heuristics.json`). Each is reduced to one of
+a few growth classes and held in a flat table of slotted records. A predicted
+latency is `overhead + constant * growth(n)`, with the constants fitted to
+benchmark results that name the operation and input size they measured
+(`@benchmark(operation=..., size=...)`); operations without measurements borrow
+the median constant of their growth class.
+"""
+
+import re
+import sys
+import json
+import math
+import statistics
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+SPEC_STORE_DIR = str(Path(__file__).resolve().parent.parent / "spec-store")
+if SPEC_STORE_DIR not in sys.path:
+    sys.path.insert(0, SPEC_STORE_DIR)
+from spec_store import SpecStore
+
+SPEC_DIR = Path("specifications") / "core"
+SPEC_FILES = ("core_efficient_math_ops.json", "core_efficient_trajectory_ops.json",
+              "adaptive_granularity_heuristics.json")
+
+GROWTH_CLASSES = ("O(1)", "O(log n)", "O(n)", "O(n log n)", "O(n^2)", "O(n^3)")
+# Cost of one growth unit when nothing of that class was benchmarked: roughly one
+# interpreted loop iteration
+DEFAULT_UNIT_MS = 1e-4
+
+_TERM = re.compile(r"O\(((?:[^()]|\([^()]*\))*)\)")
+_LOG_N = re.compile(r"log\(?n\)?")
+_LOG_OTHER = re.compile(r"log\([^)]*\)")  # log(1/ε) and the like do not grow with n
+_POWER = re.compile(r"n\^?(\d)")
+
+
+def _class_of_term(term: str) -> int:
+    term = term.replace("²", "^2").replace("³", "^3").replace("N", "n").replace(" ", "")
+    logarithmic = bool(_LOG_N.search(term))
+    term = _LOG_OTHER.sub("", _LOG_N.sub("", term))
+    power = _POWER.search(term)
+    exponent = int(power.group(1)) if power else (1 if "n" in term else 0)
+    if exponent == 0:
+        return 1 if logarithmic else 0
+    if exponent == 1:
+        return 3 if logarithmic else 2
+    return min(exponent + 2, len(GROWTH_CLASSES) - 1)
+
+
+def growth_class(complexity: Any) -> int:
+    """Index into GROWTH_CLASSES for a complexity annotation; the costliest term of 'O(n) to O(n²)'"""
+    if not isinstance(complexity, str):
+        return GROWTH_CLASSES.index("O(n)")
+    terms = _TERM.findall(complexity)
+    if not terms:
+        return GROWTH_CLASSES.index("O(n)")
+    return max(_class_of_term(term) for term in terms)
+
+
+@lru_cache(maxsize=4096)
+def growth(cls: int, n: int) -> float:
+    """Growth units of class `cls` at input size n"""
+    n = max(n, 1)
+    log_n = math.log2(n) if n > 1 else 1.0
+    return (1.0, log_n, float(n), n * log_n, float(n) ** 2, float(n) ** 3)[cls]
+
+
+class Operation:
+    """One spec operation in the cost table"""
+
+    __slots__ = ("name", "category", "spec", "complexity", "growth_class")
+
+    def __init__(self, name: str, category: str, spec: str, complexity: str, growth_class: int):
+        self.name = name
+        self.category = category
+        self.spec = spec
+        self.complexity = complexity
+        self.growth_class = growth_class
+
+    def __repr__(self):
+        return f"Operation({self.name!r}, {self.category!r}, {GROWTH_CLASSES[self.growth_class]})"
+
+
+class Estimate:
+    """Predicted latency of an operation at one input size"""
+
+    __slots__ = ("operation", "ms", "source", "fits")
+
+    def __init__(self, operation: Operation, ms: float, source: str, fits: bool):
+        self.operation = operation
+        self.ms = ms
+        self.source = source
+        self.fits = fits
+
+    def to_dict(self) -> Dict[str, Any]:
+        op = self.operation
+        return {"operation": op.name, "category": op.category, "spec": op.spec, "complexity": op.complexity,
+                "growth": GROWTH_CLASSES[op.growth_class], "predicted_ms": round(self.ms, 6),
+                "calibration": self.source, "fits_budget": self.fits}
+
+
+def _spec_operations(spec: Dict[str, Any]) -> Iterable[Tuple[str, str, str, Any]]:
+    """(name, category, complexity, declared class) from either spec layout"""
+    if isinstance(spec.get("operations"), list):
+        for op in spec["operations"]:
+            # Names are unique across the specs; many math ops share the placeholder id "no_id"
+            yield op.get("name") or op.get("id"), op.get("category") or spec.get("category"), \
+                op.get("complexity"), op.get("complexity_class")
+    for section, body in (spec.get("sections") or {}).items():
+        for op in body.get("operations", []):
+            yield op.get("name"), section, op.get("complexity"), None
+
+
+class CostModel:
+    """Operations of the core specs, their growth classes and calibrated constants.
+
+    Predictions and rankings are memoized per (operation, n) and per query;
+    calibrating again clears them.
+    """
+
+    def __init__(self, operations: Iterable[Operation] = ()):
+        self.operations: Tuple[Operation, ...] = tuple(operations)
+        self.by_name: Dict[str, int] = {op.name: i for i, op in enumerate(self.operations)}
+        self.categories: Dict[str, Tuple[int, ...]] = {}
+        for i, op in enumerate(self.operations):
+            self.categories[op.category] = self.categories.get(op.category, ()) + (i,)
+        self.fits: Dict[str, Tuple[float, float, int]] = {}  # name -> (overhead ms, ms per unit, samples)
+        self._class_fits: Dict[int, Tuple[float, float]] = {}
+        self._predict = lru_cache(maxsize=65536)(self._predict_uncached)
+        self._rank = lru_cache(maxsize=1024)(self._rank_uncached)
+
+    @classmethod
+    def from_specs(cls, spec_files: Iterable[Path], store: Optional[SpecStore] = None) -> "CostModel":
+        store = store or SpecStore(cache_file=None)
+        operations = []
+        seen = set()
+        for spec_file in spec_files:
+            spec_file = Path(spec_file)
+            if not spec_file.exists():
+                continue
+            spec = store.read(spec_file)
+            for name, category, complexity, declared in _spec_operations(spec):
+                if not name or name in seen:
+                    continue
+                seen.add(name)
+                # The declared class is the spec's own summary of a free-form complexity note
+                growth_cls = growth_class(declared or complexity)
+                operations.append(Operation(name, category or "uncategorized", spec_file.name,
+                                            complexity or declared or "", growth_cls))
+        return cls(operations)
+
+    @classmethod
+    def for_project(cls, project_root: Path, store: Optional[SpecStore] = None) -> "CostModel":
+        """Model over the core specs of a project, calibrated from its stored benchmark results"""
+        model = cls.from_specs((Path(project_root) / SPEC_DIR / name for name in SPEC_FILES), store)
+        results = []
+        for component_dir in sorted((Path(project_root) / "components").glob("*/*")):
+            # Latest results only: older builds measured older code
+            result_files = sorted((component_dir / "analysis" / "benchmarks").glob("*.json"),
+                                  key=lambda p: p.stat().st_mtime)
+            if result_files:
+                with open(result_files[-1], "r") as f:
+                    results.append(json.load(f))
+        model.calibrate(results)
+        return model
+
+    def calibrate(self, results: Iterable[Dict[str, Any]]):
+        """Fit per-operation constants to bench.py results (median wall time against growth at `size`)"""
+        points: Dict[str, List[Tuple[float, float]]] = {}
+        for result in results:
+            for bench_name, bench in result.get("benchmarks", {}).items():
+                if "error" in bench:
+                    continue
+                name = bench.get("operation") or bench_name
+                if name not in self.by_name:
+                    continue
+                op = self.operations[self.by_name[name]]
+                size = bench.get("size")
+                if size is None and op.growth_class != 0:
+                    continue  # time without an input size says nothing about the constant
+                points.setdefault(name, []).append((growth(op.growth_class, size or 1),
+                                                    bench["wall_ms"]["median"]))
+
+        self.fits = {name: (*_fit(samples), len(samples)) for name, samples in points.items()}
+        by_class: Dict[int, List[Tuple[float, float, int]]] = {}
+        for name, fit in self.fits.items():
+            by_class.setdefault(self.operations[self.by_name[name]].growth_class, []).append(fit)
+        self._class_fits = {cls: (statistics.median(fit[0] for fit in fits), statistics.median(fit[1] for fit in fits))
+                            for cls, fits in by_class.items()}
+        self._predict.cache_clear()
+        self._rank.cache_clear()
+
+    def _predict_uncached(self, index: int, n: int) -> Tuple[float, str]:
+        op = self.operations[index]
+        if op.name in self.fits:
+            overhead, unit_ms, _ = self.fits[op.name]
+            source = "measured"
+        elif op.growth_class in self._class_fits:
+            overhead, unit_ms = self._class_fits[op.growth_class]
+            source = "class"
+        else:
+            overhead, unit_ms = 0.0, DEFAULT_UNIT_MS
+            source = "default"
+        return overhead + unit_ms * growth(op.growth_class, n), source
+
+    def predict(self, name: str, n: int) -> Estimate:
+        """Predicted latency of one operation at input size n"""
+        ms, source = self._predict(self.by_name[name], n)
+        return Estimate(self.operations[self.by_name[name]], ms, source, True)
+
+    def _rank_uncached(self, category: Optional[str], n: int, budget_ms: Optional[float],
+                       match: Optional[str]) -> Tuple[Estimate, ...]:
+        indices = self.categories.get(category, ()) if category else range(len(self.operations))
+        estimates = []
+        for i in indices:
+            if match and match not in self.operations[i].name:
+                continue
+            ms, source = self._predict(i, n)
+            estimates.append(Estimate(self.operations[i], ms, source, budget_ms is None or ms <= budget_ms))
+        estimates.sort(key=lambda e: (not e.fits, e.ms, e.operation.name))
+        return tuple(estimates)
+
+    def rank(self, category: Optional[str], n: int, budget_ms: Optional[float] = None,
+             match: Optional[str] = None) -> Tuple[Estimate, ...]:
+        """Operations of a category (optionally only names containing `match`), those within budget first,
+        cheapest first"""
+        return self._rank(category, n, budget_ms, match)
+
+    def select(self, category: Optional[str], n: int, budget_ms: float,
+               match: Optional[str] = None) -> Optional[Estimate]:
+        """Cheapest operation that fits the budget, or None"""
+        ranked = self.rank(category, n, budget_ms, match)
+        return ranked[0] if ranked and ranked[0].fits else None
+
+
+def _fit(samples: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """(overhead, ms per growth unit) by least squares; through the origin unless sizes differ"""
+    units = [u for u, _ in samples]
+    times = [t for _, t in samples]
+    if len(set(units)) > 1:
+        mean_u, mean_t = statistics.fmean(units), statistics.fmean(times)
+        spread = sum((u - mean_u) ** 2 for u in units)
+        slope = sum((u - mean_u) * (t - mean_t) for u, t in samples) / spread
+        overhead = mean_t - slope * mean_u
+        if slope > 0 and overhead >= 0:
+            return overhead, slope
+    return 0.0, sum(u * t for u, t in samples) / sum(u * u for u in units)
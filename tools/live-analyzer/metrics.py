@@ -0,0 +1,271 @@
+"""
+Metrics Export - Live analyzer aggregates as OpenMetrics text over local HTTP
+
+`MetricsExporter` keeps each component's usage and feedback aggregates in
+memory. A background thread folds what was appended to the usage and
+feedback logs (and any new usage segments) into them every
+`refresh_interval` seconds, the same incremental update reports use, and
+re-renders the exposition only for components that changed. A scrape just
+writes the last rendered body, so it does not touch the logs:
+
+    python analyze.py serve --all --port 9464
+    curl -s localhost:9464/metrics
+
+The aggregates stay in sync with `analysis/aggregates.json`: updates are
+checkpointed under the usage store lock, and a checkpoint advanced by another
+process (a report, or a tracker rolling its log) is reloaded before the next
+update, so nothing is counted twice.
+"""
+
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from aggregates import ComponentAggregates
+from stats import QuantileSketch
+from usage_store import UsageStore
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9464
+DEFAULT_REFRESH_INTERVAL = 5.0
+METRICS_PATH = "/metrics"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Histogram bucket bounds in milliseconds (exported in seconds)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+SUMMARY_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# name: (type, unit, help), in exposition order
+FAMILIES = {
+    "hypersync_calls": ("counter", "", "Tracked function calls"),
+    "hypersync_call_duration_seconds": ("histogram", "seconds", "Tracked call duration"),
+    "hypersync_call_latency_seconds": ("summary", "seconds", "Tracked call duration quantiles (1% relative accuracy)"),
+    "hypersync_calls_per_minute": ("gauge", "", "Mean calls per active minute"),
+    "hypersync_peak_calls_per_minute": ("gauge", "", "Calls in the busiest minute"),
+    "hypersync_usage_skipped_lines": ("counter", "", "Malformed usage log lines"),
+    "hypersync_feedback": ("counter", "", "Feedback entries by kind"),
+    "hypersync_exporter_read_bytes": ("counter", "bytes", "Log bytes folded into the aggregates"),
+    "hypersync_exporter_refresh_errors": ("counter", "", "Failed aggregate refreshes"),
+    "hypersync_exporter_last_refresh_timestamp_seconds": ("gauge", "seconds", "When the aggregates were last refreshed"),
+    "hypersync_exporter_refresh_duration_seconds": ("gauge", "seconds", "Duration of the last refresh of all components"),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f"{key}=\"{_escape(str(value))}\"" for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram(sketch: QuantileSketch) -> List[Tuple[str, int]]:
+    """Cumulative counts at BUCKETS_MS (then +Inf), from the sketch's buckets"""
+    buckets = []
+    cumulative = 0
+    histogram = sketch.histogram()
+    position = 0
+    for bound in BUCKETS_MS:
+        while position < len(histogram) and histogram[position][0] <= bound:
+            cumulative += histogram[position][1]
+            position += 1
+        buckets.append((_number(bound / 1000), cumulative))
+    buckets.append(("+Inf", sketch.count))
+    return buckets
+
+
+class ComponentMetrics:
+    """One component's in-memory aggregates and its rendered samples per family"""
+
+    def __init__(self, name: str, component_path: Path):
+        self.name = name
+        self.analysis_dir = Path(component_path) / "analysis"
+        self.store = UsageStore(self.analysis_dir / "usage-patterns")
+        self.aggregates = ComponentAggregates.load(self.analysis_dir)
+        self.checkpoint = self._checkpoint_state()
+        self.bytes_read = 0
+        self.errors = 0
+        self.samples: Dict[str, List[str]] = {}
+
+    def _checkpoint_state(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.aggregates.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def refresh(self) -> bool:
+        """Fold new log data into the aggregates; True if anything changed"""
+        aggregates = self.aggregates
+        with self.store.lock():
+            reloaded = self._checkpoint_state() != self.checkpoint
+            if reloaded:
+                aggregates = self.aggregates = ComponentAggregates.load(self.analysis_dir)
+            aggregates.bytes_read = aggregates.segments_read = 0
+            aggregates.rolled, aggregates.rebuilt = [], []
+            aggregates.update_usage(self.store, roll=True)
+            aggregates.update_feedback(self.analysis_dir / "feedback")
+            changed = reloaded or bool(aggregates.bytes_read or aggregates.segments_read or aggregates.rolled
+                                       or aggregates.rebuilt)
+            if changed:
+                aggregates.save()
+                self.checkpoint = self._checkpoint_state()
+        self.bytes_read += aggregates.bytes_read
+        if changed or not self.samples:
+            self.render()
+        return changed
+
+    def render(self):
+        """Samples for every family, from the current aggregates"""
+        usage = self.aggregates.usage
+        samples: Dict[str, List[str]] = {name: [] for name in FAMILIES}
+        for function_name in sorted(usage.functions):
+            stats = usage.functions[function_name]
+            sketch = stats.sketch
+            labels = _labels(component=self.name, function=function_name)
+            samples["hypersync_calls"].append(f"hypersync_calls_total{labels} {sketch.count}")
+            family = "hypersync_call_duration_seconds"
+            for bound, count in _histogram(sketch):
+                bucket_labels = _labels(component=self.name, function=function_name, le=bound)
+                samples[family].append(f"{family}_bucket{bucket_labels} {count}")
+            samples[family].append(f"{family}_count{labels} {sketch.count}")
+            samples[family].append(f"{family}_sum{labels} {_number(sketch.total / 1000)}")
+            family = "hypersync_call_latency_seconds"
+            if sketch.count:
+                for q in SUMMARY_QUANTILES:
+                    quantile_labels = _labels(component=self.name, function=function_name, quantile=_number(q))
+                    samples[family].append(f"{family}{quantile_labels} {_number(sketch.quantile(q) / 1000)}")
+            samples[family].append(f"{family}_count{labels} {sketch.count}")
+            samples[family].append(f"{family}_sum{labels} {_number(sketch.total / 1000)}")
+
+        labels = _labels(component=self.name)
+        if usage.total_calls:
+            throughput = usage.throughput_summary()
+            if throughput["calls_per_minute"] is not None:
+                samples["hypersync_calls_per_minute"].append(
+                    f"hypersync_calls_per_minute{labels} {_number(float(throughput['calls_per_minute']))}")
+            samples["hypersync_peak_calls_per_minute"].append(
+                f"hypersync_peak_calls_per_minute{labels} {throughput['peak_calls_per_minute']}")
+        samples["hypersync_usage_skipped_lines"].append(f"hypersync_usage_skipped_lines_total{labels} "
+                                                        f"{usage.skipped_lines}")
+        feedback = self.aggregates.feedback_summary()
+        for kind in ("issue", "suggestion"):
+            samples["hypersync_feedback"].append(
+                f"hypersync_feedback_total{_labels(component=self.name, kind=kind)} {feedback[kind + 's_count']}")
+        self.samples = samples
+
+
+class MetricsExporter:
+    """Components' aggregates kept current in memory, rendered as one OpenMetrics exposition"""
+
+    def __init__(self, components: Dict[str, Path], refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.components = {name: ComponentMetrics(name, path) for name, path in sorted(components.items())}
+        self.refresh_interval = refresh_interval
+        self.body = b""
+        self.stats = {"refreshes": 0, "scrapes": 0, "last_refresh_ms": 0.0}
+        self._last_refresh = 0.0
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self):
+        """Update every component, re-rendering the exposition if any changed"""
+        start = time.perf_counter()
+        changed = not self.body
+        for component in self.components.values():
+            try:
+                changed = component.refresh() or changed
+            except (OSError, ValueError) as e:
+                component.errors += 1
+                changed = True
+                print(f"❌ Could not refresh metrics for {component.name}: {e}")
+        self._last_refresh = time.time()
+        self.stats["refreshes"] += 1
+        self.stats["last_refresh_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        # The exporter's own gauges change every refresh, so the body is always rebuilt;
+        # component samples are only re-rendered when their aggregates changed
+        self.body = self.render().encode("utf-8")
+        return changed
+
+    def render(self) -> str:
+        lines = []
+        for family, (kind, unit, help_text) in FAMILIES.items():
+            lines.append(f"# TYPE {family} {kind}")
+            if unit:
+                lines.append(f"# UNIT {family} {unit}")
+            lines.append(f"# HELP {family} {help_text}")
+            for component in self.components.values():
+                lines.extend(component.samples.get(family, ()))
+                labels = _labels(component=component.name)
+                if family == "hypersync_exporter_read_bytes":
+                    lines.append(f"{family}_total{labels} {component.bytes_read}")
+                elif family == "hypersync_exporter_refresh_errors":
+                    lines.append(f"{family}_total{labels} {component.errors}")
+            if family == "hypersync_exporter_last_refresh_timestamp_seconds":
+                lines.append(f"{family} {_number(round(self._last_refresh, 3))}")
+            elif family == "hypersync_exporter_refresh_duration_seconds":
+                lines.append(f"{family} {_number(round(self.stats['last_refresh_ms'] / 1000, 6))}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _run(self):
+        while not self._stopped.wait(self.refresh_interval):
+            self.refresh()
+
+    def start(self) -> "MetricsExporter":
+        """Refresh now, then keep refreshing in a background thread"""
+        self.refresh()
+        self._thread = threading.Thread(target=self._run, name="metrics-refresh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    exporter: MetricsExporter = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != METRICS_PATH:
+            self.send_error(404, f"Metrics are served at {METRICS_PATH}")
+            return
+        body = self.exporter.body
+        self.exporter.stats["scrapes"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def metrics_server(exporter: MetricsExporter, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """An HTTP server (not yet serving) for the exporter's metrics; port 0 picks a free port"""
+    handler = type("Handler", (MetricsHandler,), {"exporter": exporter})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(exporter: MetricsExporter, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Serve the exporter's metrics until interrupted"""
+    server = metrics_server(exporter, host, port)
+    exporter.start()
+    print(f"✓ Serving metrics for {len(exporter.components)} components at "
+          f"http://{host}:{server.server_port}{METRICS_PATH} (refresh every {exporter.refresh_interval:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        exporter.stop()
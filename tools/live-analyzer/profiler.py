@@ -0,0 +1,352 @@
+"""
+Sampling Profiler - Statistical hot-path profiling for HyperSync Components
+
+Samples the call stacks of a running component at a fixed rate instead of
+timing instrumented calls, so every function shows up, instrumented or not:
+
+    from profiler import get_profiler
+
+    profiler = get_profiler("agua", project_root, rate_hz=100)
+    profiler.start()
+    ...
+    profiler.stop()          # or `with profiler:`; also flushed periodically and at exit
+
+Two samplers are available:
+
+    signal   SIGPROF interval timer (CPU time, main thread): the handler walks
+             the interrupted frame. Unix only; must start on the main thread.
+    thread   a daemon thread reads sys._current_frames() (wall time, every
+             thread). Works anywhere, including idle and blocked threads.
+
+A sample only walks the frame chain and appends the tuple of code objects to
+a buffer, so it costs a few microseconds; the flush thread drains the buffer
+into per-stack weights, so the sampler never shares a dict with it. The time spent sampling is
+measured; if it exceeds `max_overhead` of the elapsed time, the sampling
+interval is doubled.
+
+Samples are folded into analysis/usage-patterns/profile.folded in the collapsed
+stack format used by flamegraph.pl and speedscope (`root;...;leaf weight`, the
+weight being sampled microseconds, so runs at different rates add up), with
+run metadata in profile.json. Reports read both (see `hot_paths`).
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import signal
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from usage_store import UsageStore
+
+PROFILE_FILE = "profile.folded"
+PROFILE_META_FILE = "profile.json"
+PROFILE_VERSION = 1
+MODES = ("signal", "thread")
+DEFAULT_RATE_HZ = 100
+DEFAULT_FLUSH_INTERVAL = 10.0
+DEFAULT_MAX_OVERHEAD = 0.02
+MAX_DEPTH = 128
+MAX_RUNS = 100  # run entries kept in profile.json
+# Overhead is checked (and the rate backed off) at most this often
+_OVERHEAD_CHECK_S = 1.0
+
+
+def frame_label(code) -> str:
+    """`qualname (file.py:line)`, with the separators of the collapsed format removed"""
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class SamplingProfiler:
+    def __init__(self, component_name: str, project_root: Path = None, rate_hz: float = DEFAULT_RATE_HZ,
+                 mode: str = "signal", flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_overhead: float = DEFAULT_MAX_OVERHEAD):
+        if mode not in MODES:
+            raise ValueError(f"Unknown sampling mode {mode}; expected one of {MODES}")
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive, got {rate_hz}")
+        if mode == "signal" and not hasattr(signal, "setitimer"):
+            raise ValueError("Signal sampling needs setitimer (Unix); use mode='thread'")
+        from analyze import LiveAnalyzer  # analyze imports this module for reports
+        self.component_name = component_name
+        usage_file = LiveAnalyzer(Path(project_root) if project_root else Path.cwd()).usage_log_path(component_name)
+        if not usage_file:
+            raise ValueError(f"Component {component_name} not found")
+        self.usage_dir = usage_file.parent
+        self.mode = mode
+        self.rate_hz = rate_hz
+        self.interval = 1.0 / rate_hz
+        self.flush_interval = flush_interval
+        self.max_overhead = max_overhead
+        self.stats = {"samples": 0, "sampled_ms": 0.0, "sampling_ms": 0.0, "backoffs": 0, "flushed": 0}
+
+        # Samples are appended by the sampler and only popped by flush (deque append/popleft are atomic),
+        # so a signal handler can record while another thread flushes; _stacks is owned by _flush_lock
+        self._samples: Deque[Tuple[Tuple, float]] = deque()
+        self._stacks: Dict[Tuple, float] = {}
+        self._labels: Dict[Any, str] = {}
+        self._started = None
+        self._run_id = None
+        self._flush_at = float("inf")
+        self._check_at = 0.0
+        self._checked_sampling_s = 0.0
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._previous_handler = None
+        self._flush_lock = threading.Lock()
+
+    # Sampling
+
+    def _record(self, frame, weight_us: float):
+        stack = []
+        depth = 0
+        while frame is not None and depth < MAX_DEPTH:
+            stack.append(frame.f_code)
+            frame = frame.f_back
+            depth += 1
+        self._samples.append((tuple(stack), weight_us))
+
+    def _on_signal(self, signum, frame):
+        start = time.perf_counter()
+        self._record(frame, self.interval * 1e6)
+        self._account(start)
+
+    def _sample_threads(self):
+        own = threading.get_ident()
+        while self._running.is_set():
+            start = time.perf_counter()
+            weight_us = self.interval * 1e6
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own:
+                    self._record(frame, weight_us)
+            self._account(start)
+            if start >= self._flush_at:
+                self.flush()
+            time.sleep(self.interval)
+
+    def _account(self, start: float):
+        now = time.perf_counter()
+        self.stats["samples"] += 1
+        self.stats["sampled_ms"] += self.interval * 1000
+        self._checked_sampling_s += now - start
+        if now >= self._check_at:
+            window = now - (self._check_at - _OVERHEAD_CHECK_S)
+            if self._checked_sampling_s > self.max_overhead * window:
+                self._set_interval(self.interval * 2)
+                self.stats["backoffs"] += 1
+            self.stats["sampling_ms"] += self._checked_sampling_s * 1000
+            self._checked_sampling_s = 0.0
+            self._check_at = now + _OVERHEAD_CHECK_S
+
+    def _set_interval(self, interval: float):
+        self.interval = interval
+        if self.mode == "signal" and self._running.is_set():
+            signal.setitimer(signal.ITIMER_PROF, interval, interval)
+
+    # Lifecycle
+
+    def start(self) -> "SamplingProfiler":
+        if self._running.is_set():
+            return self
+        self._started = time.perf_counter()
+        self._run_id = f"{os.getpid()}@{datetime.now().isoformat(timespec='seconds')}"
+        self._check_at = self._started + _OVERHEAD_CHECK_S
+        self._flush_at = self._started + self.flush_interval
+        self._running.set()
+        if self.mode == "signal":
+            self._previous_handler = signal.signal(signal.SIGPROF, self._on_signal)
+            signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+            self._thread = threading.Thread(target=self._flush_periodically, daemon=True,
+                                            name=f"profiler-flush-{self.component_name}")
+        else:
+            self._thread = threading.Thread(target=self._sample_threads, daemon=True,
+                                            name=f"profiler-{self.component_name}")
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def _flush_periodically(self):
+        while self._running.is_set():
+            time.sleep(min(self.flush_interval, 0.5))
+            if time.perf_counter() >= self._flush_at:
+                self.flush()
+            else:
+                with self._flush_lock:
+                    self._drain()
+
+    def stop(self):
+        """Stop sampling and write what was collected"""
+        if not self._running.is_set():
+            return
+        self._running.clear()
+        if self.mode == "signal":
+            signal.setitimer(signal.ITIMER_PROF, 0, 0)
+            signal.signal(signal.SIGPROF, self._previous_handler or signal.SIG_DFL)
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.stats["sampling_ms"] += self._checked_sampling_s * 1000
+        self._checked_sampling_s = 0.0
+        self.flush()
+        atexit.unregister(self.stop)
+
+    def __enter__(self) -> "SamplingProfiler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Output
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = frame_label(code)
+        return label
+
+    def _drain(self):
+        """Fold buffered samples into per-stack weights (called with _flush_lock held)"""
+        samples = self._samples
+        stacks = self._stacks
+        while samples:
+            key, weight_us = samples.popleft()
+            stacks[key] = stacks.get(key, 0.0) + weight_us
+
+    def flush(self) -> int:
+        """Fold the samples so far into profile.folded; returns the number of distinct stacks written"""
+        with self._flush_lock:
+            self._drain()
+            stacks, self._stacks = self._stacks, {}
+            self._flush_at = time.perf_counter() + self.flush_interval
+            folded: Dict[str, float] = {}
+            for key, weight_us in stacks.items():
+                line = ";".join(self._label(code) for code in reversed(key))
+                folded[line] = folded.get(line, 0.0) + weight_us
+            elapsed_s = time.perf_counter() - self._started if self._started else 0.0
+            with UsageStore(self.usage_dir).lock():
+                existing = read_folded(self.usage_dir / PROFILE_FILE)
+                for line, weight_us in folded.items():
+                    existing[line] = existing.get(line, 0) + int(round(weight_us))
+                _write_atomic(self.usage_dir / PROFILE_FILE,
+                              "".join(f"{line} {weight}\n" for line, weight in existing.items() if weight > 0))
+                meta = read_profile_meta(self.usage_dir) or {"version": PROFILE_VERSION, "runs": {}}
+                meta["runs"].pop(self._run_id, None)
+                while len(meta["runs"]) >= MAX_RUNS:
+                    del meta["runs"][next(iter(meta["runs"]))]
+                meta["runs"][self._run_id] = {
+                    "mode": self.mode,
+                    "rate_hz": round(1.0 / self.interval, 3),
+                    "samples": self.stats["samples"],
+                    "sampled_ms": round(self.stats["sampled_ms"], 3),
+                    "elapsed_ms": round(elapsed_s * 1000, 3),
+                    "overhead_pct": round(100 * self.stats["sampling_ms"] / (elapsed_s * 1000), 3)
+                    if elapsed_s else None,
+                    "backoffs": self.stats["backoffs"],
+                    "updated": datetime.now().isoformat()
+                }
+                _write_atomic(self.usage_dir / PROFILE_META_FILE, json.dumps(meta, indent=1))
+            self.stats["flushed"] += len(folded)
+            return len(folded)
+
+
+def _write_atomic(path: Path, text: str):
+    tmp_file = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_file, "w") as f:
+        f.write(text)
+    os.replace(tmp_file, path)
+
+
+def read_folded(path: Path) -> Dict[str, int]:
+    """Collapsed stacks -> weight; a missing file is empty"""
+    folded: Dict[str, int] = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                stack, _, weight = line.rstrip("\n").rpartition(" ")
+                if stack and weight.isdigit():
+                    folded[stack] = folded.get(stack, 0) + int(weight)
+    except FileNotFoundError:
+        pass
+    return folded
+
+
+def read_profile_meta(usage_dir: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(Path(usage_dir) / PROFILE_META_FILE, "r") as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == PROFILE_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def hot_paths(usage_dir: Path, top: int = 10) -> Dict[str, Any]:
+    """Per-function self and total sampled time and the heaviest stacks, from profile.folded"""
+    folded = read_folded(Path(usage_dir) / PROFILE_FILE)
+    if not folded:
+        return {"status": "no_data"}
+    total_us = sum(folded.values())
+    self_us: Dict[str, int] = {}
+    inclusive_us: Dict[str, int] = {}
+    for stack, weight in folded.items():
+        frames = stack.split(";")
+        self_us[frames[-1]] = self_us.get(frames[-1], 0) + weight
+        for frame in set(frames):  # recursion counts once per stack
+            inclusive_us[frame] = inclusive_us.get(frame, 0) + weight
+
+    def row(function: str) -> Dict[str, Any]:
+        return {"function": function,
+                "self_ms": round(self_us.get(function, 0) / 1000, 3),
+                "self_pct": round(100 * self_us.get(function, 0) / total_us, 2),
+                "total_ms": round(inclusive_us[function] / 1000, 3),
+                "total_pct": round(100 * inclusive_us[function] / total_us, 2)}
+
+    runs = (read_profile_meta(usage_dir) or {}).get("runs", {})
+    overheads = [run["overhead_pct"] for run in runs.values() if run.get("overhead_pct") is not None]
+    heaviest = sorted(folded.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        "status": "analyzed",
+        "sampled_ms": round(total_us / 1000, 3),
+        "stacks": len(folded),
+        "runs": len(runs),
+        "max_overhead_pct": max(overheads) if overheads else None,
+        "top_self": [row(f) for f in sorted(self_us, key=self_us.get, reverse=True)[:top]],
+        "top_total": [row(f) for f in sorted(inclusive_us, key=inclusive_us.get, reverse=True)[:top]],
+        "heaviest_stacks": [{"stack": stack, "ms": round(weight / 1000, 3),
+                             "pct": round(100 * weight / total_us, 2)} for stack, weight in heaviest]
+    }
+
+
+_profilers: Dict[str, SamplingProfiler] = {}
+_profilers_lock = threading.Lock()
+
+
+def get_profiler(component_name: str, project_root: Path = None, **options) -> SamplingProfiler:
+    """Shared profiler per component, created on first use (not started)"""
+    with _profilers_lock:
+        profiler = _profilers.get(component_name)
+        if profiler is None:
+            profiler = _profilers[component_name] = SamplingProfiler(component_name, project_root, **options)
+        return profiler
+
+
+def run_script(component_name: str, project_root: Path, argv: List[str], **options) -> Dict[str, Any]:
+    """Run a Python script under the profiler, like `python -m cProfile script.py args`"""
+    import runpy
+    profiler = SamplingProfiler(component_name, project_root, **options)
+    saved_argv = sys.argv
+    sys.argv = list(argv)
+    sys.path.insert(0, str(Path(argv[0]).resolve().parent))
+    try:
+        with profiler:
+            runpy.run_path(argv[0], run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        sys.argv = saved_argv
+    return {"component": component_name, "script": argv[0], **profiler.stats,
+            "profile": str(profiler.usage_dir / PROFILE_FILE)}
@@ -0,0 +1,367 @@
+"""
+Streaming Statistics - Constant-memory latency and throughput aggregates
+
+QuantileSketch is a DDSketch-style log-bucketed histogram: every quantile it
+reports is within `relative_accuracy` of the true value, it uses a bounded
+number of buckets regardless of sample count, and two sketches built with the
+same accuracy merge exactly by adding bucket counts.
+"""
+
+import json
+import math
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MIN_TRACKED_VALUE = 1e-9
+REPORT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "bins", "zero_count",
+                 "count", "total", "min", "max")
+    
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def add(self, value: float, count: int = 1):
+        """Add a sample (negative values are clamped to zero)"""
+        if value > MIN_TRACKED_VALUE:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[index] = self.bins.get(index, 0) + count
+        else:
+            value = max(value, 0.0)
+            self.zero_count += count
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch (same accuracy) into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def difference(self, earlier: "QuantileSketch") -> "QuantileSketch":
+        """Samples added since `earlier`, a previous state of this same sketch.
+
+        min/max of the difference are not known exactly and are bounded by
+        the outermost non-empty buckets.
+        """
+        if earlier.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot subtract sketches with different relative accuracy")
+        diff = QuantileSketch(self.relative_accuracy)
+        for index, count in self.bins.items():
+            remaining = count - earlier.bins.get(index, 0)
+            if remaining > 0:
+                diff.bins[index] = remaining
+        diff.zero_count = max(self.zero_count - earlier.zero_count, 0)
+        diff.count = diff.zero_count + sum(diff.bins.values())
+        diff.total = max(self.total - earlier.total, 0.0)
+        if diff.count:
+            diff.min = 0.0 if diff.zero_count else self._bucket_value(min(diff.bins))
+            diff.max = self._bucket_value(max(diff.bins)) if diff.bins else 0.0
+        return diff
+    
+    def _bucket_value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+    
+    def histogram(self) -> List[Tuple[float, int]]:
+        """(representative value, count) per non-empty bucket, ascending"""
+        buckets = [(0.0, self.zero_count)] if self.zero_count else []
+        buckets.extend((self._bucket_value(index), self.bins[index]) for index in sorted(self.bins))
+        return buckets
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q in [0, 1]"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+    
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+    
+    def summary(self) -> Dict[str, Any]:
+        """count/mean/min/max and report quantiles, rounded for reports"""
+        if not self.count:
+            return {"count": 0}
+        summary = {
+            "count": self.count,
+            "mean_ms": round(self.mean, 4),
+            "min_ms": round(self.min, 4),
+            "max_ms": round(self.max, 4),
+        }
+        for q in REPORT_QUANTILES:
+            summary[f"p{int(q * 100)}_ms"] = round(self.quantile(q), 4)
+        return summary
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(index): count for index, count in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data["relative_accuracy"])
+        sketch.bins = {int(index): count for index, count in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["total"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+
+class FunctionStats:
+    """Latency sketch plus per-minute throughput for one function.
+
+    Throughput is tracked with a single open minute bucket, which assumes the
+    samples arrive roughly in time order (as appended usage logs do).
+    """
+    
+    __slots__ = ("sketch", "minute", "minute_count", "peak_per_minute", "peak_minute",
+                 "active_minutes", "first_minute")
+    
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.sketch = QuantileSketch(relative_accuracy)
+        self.minute = None
+        self.minute_count = 0
+        self.peak_per_minute = 0
+        self.peak_minute = None
+        self.active_minutes = 0
+        self.first_minute = None
+    
+    def add(self, minute: str, duration_ms: float):
+        """Add one call; `minute` is the timestamp truncated to minutes (YYYY-mm-ddTHH:MM)"""
+        self.sketch.add(duration_ms)
+        if minute != self.minute:
+            if self.first_minute is None:
+                self.first_minute = minute
+            self.minute = minute
+            self.minute_count = 0
+            self.active_minutes += 1
+        self.minute_count += 1
+        if self.minute_count > self.peak_per_minute:
+            self.peak_per_minute = self.minute_count
+            self.peak_minute = minute
+    
+    @property
+    def count(self) -> int:
+        return self.sketch.count
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sketch": self.sketch.to_dict(),
+            "minute": self.minute,
+            "minute_count": self.minute_count,
+            "peak_per_minute": self.peak_per_minute,
+            "peak_minute": self.peak_minute,
+            "active_minutes": self.active_minutes,
+            "first_minute": self.first_minute,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FunctionStats":
+        stats = cls.__new__(cls)
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        for field in cls.__slots__[1:]:
+            setattr(stats, field, data[field])
+        return stats
+    
+    def summary(self) -> Dict[str, Any]:
+        summary = self.sketch.summary()
+        span = _span_minutes(self.first_minute, self.minute)
+        summary["calls_per_minute"] = round(self.count / span, 2) if span else None
+        summary["peak_calls_per_minute"] = self.peak_per_minute
+        summary["peak_minute"] = self.peak_minute
+        return summary
+
+
+class UsageStats:
+    """Streaming aggregate of a usage log: per-function stats and component throughput"""
+    
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.functions: Dict[str, FunctionStats] = {}
+        self.throughput = FunctionStats(relative_accuracy)
+        self.skipped_lines = 0
+    
+    @property
+    def total_calls(self) -> int:
+        return self.throughput.count
+    
+    def add(self, timestamp: str, function_name: str, duration_ms: float):
+        minute = timestamp[:16]
+        self._function(function_name).add(minute, duration_ms)
+        self.throughput.add(minute, duration_ms)
+    
+    def _function(self, function_name: str) -> FunctionStats:
+        stats = self.functions.get(function_name)
+        if stats is None:
+            stats = self.functions[function_name] = FunctionStats(self.relative_accuracy)
+        return stats
+    
+    def add_columns(self, names, function_ids: Iterable[int], timestamps_us: Iterable[int],
+                    durations: Iterable[float]):
+        """Consume dictionary-encoded columns (e.g. a memory-mapped usage segment)"""
+        functions = [self._function(name) for name in names]
+        throughput = self.throughput
+        minute_index = None
+        minute = None
+        for function_id, timestamp, duration_ms in zip(function_ids, timestamps_us, durations):
+            index = timestamp // 60_000_000
+            if index != minute_index:
+                minute_index = index
+                minute = datetime.fromtimestamp(index * 60).isoformat()[:16]
+            functions[function_id].add(minute, duration_ms)
+            throughput.add(minute, duration_ms)
+    
+    def add_lines(self, lines: Iterable[str]):
+        """Consume JSONL usage entries one at a time"""
+        loads = json.loads
+        add = self.add
+        for line in lines:
+            try:
+                entry = loads(line)
+                add(entry["timestamp"], entry["function"], float(entry.get("duration_ms") or 0.0))
+            except (ValueError, KeyError, TypeError):
+                if line.strip():
+                    self.skipped_lines += 1
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "functions": {name: stats.to_dict() for name, stats in self.functions.items()},
+            "throughput": self.throughput.to_dict(),
+            "skipped_lines": self.skipped_lines,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "UsageStats":
+        stats = cls(data["relative_accuracy"])
+        stats.functions = {name: FunctionStats.from_dict(f) for name, f in data["functions"].items()}
+        stats.throughput = FunctionStats.from_dict(data["throughput"])
+        stats.skipped_lines = data["skipped_lines"]
+        return stats
+    
+    def most_called(self, limit: int = 5):
+        return sorted(((name, stats.count) for name, stats in self.functions.items()),
+                      key=lambda x: x[1], reverse=True)[:limit]
+    
+    def latency_summary(self) -> Dict[str, Any]:
+        return {name: self.functions[name].summary() for name in sorted(self.functions)}
+    
+    def throughput_summary(self) -> Dict[str, Any]:
+        summary = self.throughput.summary()
+        return {
+            "active_minutes": self.throughput.active_minutes,
+            "calls_per_minute": summary["calls_per_minute"],
+            "peak_calls_per_minute": summary["peak_calls_per_minute"],
+            "peak_minute": summary["peak_minute"],
+        }
+
+
+def weighted_quantile(histogram: List[Tuple[float, int]], q: float) -> Optional[float]:
+    """Quantile of ascending (value, count) pairs, ranked like QuantileSketch.quantile"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for value, count in histogram:
+        seen += count
+        if rank < seen:
+            return value
+    return histogram[-1][0]
+
+
+def as_histogram(samples: Iterable[float]) -> List[Tuple[float, int]]:
+    """Ascending (value, count) pairs from raw samples"""
+    counts: Dict[float, int] = {}
+    for value in samples:
+        counts[value] = counts.get(value, 0) + 1
+    return sorted(counts.items())
+
+
+def mann_whitney_u(base: List[Tuple[float, int]], head: List[Tuple[float, int]]) -> Dict[str, Any]:
+    """One-sided Mann-Whitney U test that `head` tends to be larger than `base`.
+
+    Inputs are ascending (value, count) histograms, so raw samples and sketch
+    buckets are handled alike (samples sharing a bucket count as ties). Uses
+    the normal approximation with tie and continuity corrections.
+    """
+    n_base = sum(count for _, count in base)
+    n_head = sum(count for _, count in head)
+    if not n_base or not n_head:
+        return {"u": None, "p_value": None, "superiority": None}
+        
+    merged: Dict[float, List[int]] = {}
+    for value, count in base:
+        merged.setdefault(value, [0, 0])[0] += count
+    for value, count in head:
+        merged.setdefault(value, [0, 0])[1] += count
+        
+    rank_sum = 0.0
+    ties = 0.0
+    below = 0
+    for value in sorted(merged):
+        base_count, head_count = merged[value]
+        tied = base_count + head_count
+        rank_sum += head_count * (below + (tied + 1) / 2)
+        ties += tied ** 3 - tied
+        below += tied
+        
+    n = n_base + n_head
+    u = rank_sum - n_head * (n_head + 1) / 2
+    mean = n_base * n_head / 2
+    variance = n_base * n_head / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance > 0:
+        z = (u - mean - 0.5) / math.sqrt(variance)
+        p_value = 0.5 * math.erfc(z / math.sqrt(2))
+    else:
+        p_value = 1.0
+    return {"u": u, "p_value": p_value, "superiority": u / (n_base * n_head)}
+
+
+def _span_minutes(first: Optional[str], last: Optional[str]) -> Optional[int]:
+    """Inclusive number of minutes between two minute keys"""
+    if not first or not last:
+        return None
+    try:
+        delta = datetime.fromisoformat(last) - datetime.fromisoformat(first)
+    except ValueError:
+        return None
+    return max(1, int(delta.total_seconds() // 60) + 1)
@@ -0,0 +1,159 @@
+"""
+Usage Tracker - In-process, buffered usage tracking for HyperSync Components
+
+Records calls into a bounded in-memory ring buffer and writes them to the
+component's usage_log.jsonl in batches from a background thread, so running
+components can be instrumented without a CLI invocation (or file open) per call.
+The same thread rolls the log into a columnar segment once it is due.
+
+    from tracker import get_tracker
+
+    tracker = get_tracker("agua", project_root)
+
+    @tracker.instrument()
+    def geodesic_computation(...):
+        ...
+
+    with tracker.track("parallel_transport"):
+        ...
+"""
+
+import json
+import time
+import atexit
+import functools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict
+
+from analyze import LiveAnalyzer
+from usage_store import UsageStore
+
+
+class UsageTracker:
+    def __init__(self, component_name: str, project_root: Path = None, capacity: int = 100_000,
+                 batch_size: int = 5_000, flush_interval: float = 1.0, rotate: bool = True):
+        self.component_name = component_name
+        self.analyzer = LiveAnalyzer(Path(project_root) if project_root else Path.cwd())
+        self.usage_file = self.analyzer.usage_log_path(component_name)
+        if not self.usage_file:
+            raise ValueError(f"Component {component_name} not found")
+            
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.store = UsageStore(self.usage_file.parent) if rotate else None
+        self.dropped = 0
+        self.written = 0
+        
+        self._buffer = deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"usage-tracker-{component_name}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def record(self, function_name: str, duration_ms: float):
+        """Record one call; O(1) and never touches the filesystem"""
+        buffer = self._buffer
+        if len(buffer) >= self.capacity:
+            self.dropped += 1
+        buffer.append((time.time(), function_name, duration_ms))
+        if len(buffer) >= self.batch_size:
+            self._wakeup.set()
+    
+    @contextmanager
+    def track(self, function_name: str):
+        """Time the enclosed block and record it under function_name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(function_name, (time.perf_counter() - start) * 1000)
+    
+    def instrument(self, function_name: str = None) -> Callable:
+        """Decorator recording every call of the wrapped function"""
+        def decorator(func):
+            name = function_name or func.__name__
+            record = self.record
+            perf_counter = time.perf_counter
+            
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    record(name, (perf_counter() - start) * 1000)
+            return wrapper
+        return decorator
+    
+    def flush(self) -> int:
+        """Write everything buffered so far to the usage log, returning the entry count"""
+        with self._write_lock:
+            buffer = self._buffer
+            count = len(buffer)
+            if not count:
+                return 0
+                
+            lines = []
+            names = {}
+            popleft = buffer.popleft
+            second = None
+            for _ in range(count):
+                timestamp, function_name, duration_ms = popleft()
+                if int(timestamp) != second:
+                    second = int(timestamp)
+                    prefix = datetime.fromtimestamp(second).isoformat()
+                name = names.get(function_name)
+                if name is None:
+                    name = names[function_name] = json.dumps(function_name)
+                micros = int((timestamp - second) * 1e6)
+                lines.append(f'{{"timestamp": "{prefix}.{micros:06d}", "function": {name}, '
+                             f'"duration_ms": {float(duration_ms)!r}}}\n')
+            
+            with open(self.usage_file, "a") as f:
+                f.write("".join(lines))
+            self.written += count
+            return count
+    
+    def close(self):
+        """Stop the flusher thread and write any remaining entries"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+    
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self.store and self.store.roll_due():
+                self.analyzer.rotate_usage(self.component_name)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+_trackers: Dict[str, UsageTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_tracker(component_name: str, project_root: Path = None, **options) -> UsageTracker:
+    """Shared tracker per component, created on first use"""
+    with _trackers_lock:
+        tracker = _trackers.get(component_name)
+        if tracker is None or tracker._stopped.is_set():
+            tracker = _trackers[component_name] = UsageTracker(component_name, project_root, **options)
+        return tracker
@@ -0,0 +1,250 @@
+"""
+Usage Store - Rolling, columnar storage for usage-patterns data
+
+New calls are appended to the active `usage_log.jsonl`. Once it exceeds
+`max_bytes` or its first entry is older than `max_age`, the log is rolled:
+renamed aside and rewritten as a closed columnar segment under `segments/`:
+
+    header   magic, version, row count, base timestamp, column typecodes,
+             source inode and bytes read (the log and extent the segment was built from)
+    names    JSON list of function names (the dictionary)
+    deltas   timestamp deltas in microseconds (int32, int64 if a gap overflows)
+    ids      dictionary-encoded function ids (uint8/16/32 by dictionary size)
+    durations float32 milliseconds
+
+Columns are 8-byte aligned and little-endian so closed segments are read back
+through a memory map without copying. Rolling is coordinated with the report
+aggregates (see aggregates.py), so only the analyzer performs it.
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms roll without a lock
+    fcntl = None
+
+SEGMENT_MAGIC = b"HSUSEG\x00\x00"
+SEGMENT_VERSION = 1
+SEGMENT_SUFFIX = ".useg"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 24 * 3600.0
+
+# magic, version, rows, base_us, ts/id/duration typecodes + pad, names_len, source inode, source bytes
+_HEADER = struct.Struct("<8sIQq4sIQQ")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _padding(length: int) -> bytes:
+    return b"\x00" * (-length % 8)
+
+
+def _id_typecode(names: int) -> str:
+    if names <= 0xFF:
+        return "B"
+    if names <= 0xFFFF:
+        return "H"
+    return "I"
+
+
+def _column_bytes(column: array) -> bytes:
+    if not _LITTLE_ENDIAN:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+class SegmentWriter:
+    """Accumulates usage rows in columnar buffers and writes them as one segment"""
+    
+    def __init__(self):
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.timestamps = array("q")
+        self.function_ids = array("I")
+        self.durations = array("f")
+        self._seconds: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def add(self, timestamp: str, function_name: str, duration_ms: float):
+        """Add one legacy-format row (ISO timestamp string)"""
+        self.add_epoch(self._epoch_us(timestamp), function_name, duration_ms)
+    
+    def add_epoch(self, timestamp_us: int, function_name: str, duration_ms: float):
+        function_id = self._ids.get(function_name)
+        if function_id is None:
+            function_id = self._ids[function_name] = len(self.names)
+            self.names.append(function_name)
+        self.timestamps.append(timestamp_us)
+        self.function_ids.append(function_id)
+        self.durations.append(duration_ms)
+    
+    def _epoch_us(self, timestamp: str) -> int:
+        """Microseconds since the epoch, caching the (slow) per-second parse"""
+        if len(timestamp) in (19, 26) and (len(timestamp) == 19 or timestamp[19] == "."):
+            second = self._seconds.get(timestamp[:19])
+            if second is None:
+                second = self._seconds[timestamp[:19]] = int(datetime.fromisoformat(timestamp[:19]).timestamp())
+            return second * 1_000_000 + (int(timestamp[20:]) if len(timestamp) == 26 else 0)
+        return round(datetime.fromisoformat(timestamp).timestamp() * 1_000_000)
+    
+    def write(self, path: Path, source_inode: int = 0, source_bytes: int = 0):
+        """Write the segment atomically"""
+        rows = len(self.timestamps)
+        base = self.timestamps[0] if rows else 0
+        deltas = [0] + [b - a for a, b in zip(self.timestamps, self.timestamps[1:])]
+        ts_code = "i" if all(-0x80000000 <= d <= 0x7FFFFFFF for d in deltas) else "q"
+        id_code = _id_typecode(len(self.names))
+        names = json.dumps(self.names).encode("utf-8")
+        
+        header = _HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, rows, base,
+                              f"{ts_code}{id_code}f\x00".encode("ascii"), len(names),
+                              source_inode, source_bytes)
+        tmp_path = Path(path).with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(names + _padding(len(names)))
+            for column in (array(ts_code, deltas), array(id_code, self.function_ids), self.durations):
+                data = _column_bytes(column)
+                f.write(data + _padding(len(data)))
+        os.replace(tmp_path, path)
+
+
+class UsageSegment:
+    """Read-only, memory-mapped view of a closed segment"""
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise ValueError(f"Empty usage segment: {self.path}")
+        self._views = []
+        
+        (magic, version, self.rows, self.base_us, codes, names_len,
+         self.source_inode, self.source_bytes) = _HEADER.unpack_from(self._map, 0)
+        if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+            self.close()
+            raise ValueError(f"Not a usage segment: {self.path}")
+            
+        offset = _HEADER.size
+        self.names = json.loads(self._map[offset:offset + names_len])
+        offset += names_len + len(_padding(names_len))
+        
+        ts_code, id_code, duration_code = codes[:3].decode("ascii")
+        self.deltas, offset = self._column(offset, ts_code)
+        self.function_ids, offset = self._column(offset, id_code)
+        self.durations, offset = self._column(offset, duration_code)
+    
+    def _column(self, offset: int, typecode: str):
+        size = array(typecode).itemsize * self.rows
+        if _LITTLE_ENDIAN:
+            view = memoryview(self._map)[offset:offset + size].cast(typecode)
+            self._views.append(view)
+        else:
+            view = array(typecode, self._map[offset:offset + size])
+            view.byteswap()
+        return view, offset + size + len(_padding(size))
+    
+    def timestamps_us(self):
+        """Absolute timestamps (microseconds since the epoch), decoded lazily"""
+        base = self.base_us
+        return (base + t for t in accumulate(self.deltas))
+    
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+class UsageStore:
+    """The usage-patterns directory: active JSONL log, rolling file and closed segments"""
+    
+    def __init__(self, usage_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES, max_age: float = DEFAULT_MAX_AGE):
+        self.usage_dir = Path(usage_dir)
+        self.active_file = self.usage_dir / "usage_log.jsonl"
+        self.rolling_file = self.usage_dir / "usage_log.rolling.jsonl"
+        self.segments_dir = self.usage_dir / "segments"
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+    
+    def exists(self) -> bool:
+        return self.active_file.exists() or self.rolling_file.exists() or bool(self.segment_names())
+    
+    def segment_names(self) -> List[str]:
+        """Closed segments, oldest first"""
+        if not self.segments_dir.exists():
+            return []
+        return sorted(name for name in os.listdir(self.segments_dir) if name.endswith(SEGMENT_SUFFIX))
+    
+    def segment_path(self, name: str) -> Path:
+        return self.segments_dir / name
+    
+    def next_segment_path(self) -> Path:
+        names = self.segment_names()
+        sequence = int(names[-1].split(".")[0]) + 1 if names else 1
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        return self.segments_dir / f"{sequence:08d}{SEGMENT_SUFFIX}"
+    
+    def roll_due(self) -> bool:
+        """Whether the active log is over the size limit or its first entry over the age limit"""
+        try:
+            size = os.stat(self.active_file).st_size
+        except OSError:
+            return False
+        if size >= self.max_bytes:
+            return True
+        if not size:
+            return False
+        first = self._first_timestamp()
+        return first is not None and time.time() - first >= self.max_age
+    
+    def _first_timestamp(self) -> Optional[float]:
+        try:
+            with open(self.active_file, "rb") as f:
+                return datetime.fromisoformat(json.loads(f.readline())["timestamp"]).timestamp()
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def begin_roll(self):
+        """Move the active log aside; writers start a fresh log on their next append.
+
+        The rolled log replaces the one kept from the previous roll, so finish that one first.
+        """
+        os.replace(self.active_file, self.rolling_file)
+    
+    @contextmanager
+    def lock(self):
+        """Exclusive lock serialising rolls and aggregate updates across processes"""
+        self.usage_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.usage_dir / ".lock", "w") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
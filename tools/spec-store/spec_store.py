@@ -0,0 +1,338 @@
+"""
+HyperSync Spec Store
+Shared, lazily parsed access to spec and config JSON with a persistent parse cache
+
+Specs are opened as `Spec` mappings that read nothing until their first key
+access, and components are resolved by name across the production, stable and
+experimental stages. A parsed document is kept in memory for the life of the
+store and, across runs, in one cache file of marshalled documents:
+
+    header   magic, format version, Python major/minor (marshal's format is
+             version specific)
+    records  key length, value length, file size, file mtime (ns), resolved
+             path, marshal.dumps((ok, document or parse error))
+
+The cache is append-only and memory-mapped on open; only the record headers are
+scanned, and a document is unmarshalled (about twice as fast as json.loads) the
+first time it is asked for. A record is used only while the file's size and
+mtime match it, so an edited spec is re-parsed and its new record supersedes the
+old one. Parse errors are cached too and re-raised as ValueError. New records are
+appended under an exclusive lock by flush(); once superseded records make up
+more than half of the file it is rewritten with only the live ones.
+"""
+
+import os
+import sys
+import json
+import mmap
+import marshal
+import struct
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms write the cache without a lock
+    fcntl = None
+
+CACHE_MAGIC = b"HSSPECS\x00"
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "hypersync" / "spec-store.pack"
+STAGES = ("production", "stable", "experimental")
+
+# The cache file is rewritten once superseded records exceed this fraction of it
+COMPACT_RATIO = 0.5
+
+_HEADER = struct.Struct("<8sIHH")    # magic, version, Python major, minor
+_RECORD = struct.Struct("<IIqq")     # key length, value length, file size, file mtime ns
+_PYTHON = sys.version_info[:2]
+_UNSET = object()
+
+
+def _file_key(path: Path) -> Tuple[str, os.stat_result]:
+    key = os.path.realpath(path)
+    return key, os.stat(key)
+
+
+def _parse(path: str) -> Tuple[bool, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return True, json.load(f)
+    except (ValueError, UnicodeDecodeError) as e:
+        return False, f"{type(e).__name__}: {e}"
+
+
+class ParseCache:
+    """Parsed documents by (path, size, mtime) in a memory-mapped append-only file"""
+
+    def __init__(self, cache_file: Path = DEFAULT_CACHE_FILE):
+        self.cache_file = Path(cache_file)
+        self._map: Optional[mmap.mmap] = None
+        self._index: Dict[str, Tuple[int, int, int, int]] = {}  # path -> (size, mtime_ns, offset, value length)
+        self._pending: List[bytes] = []
+        self._dead = 0
+        self.stats = {"hits": 0, "misses": 0, "records": 0, "appended": 0, "compactions": 0}
+        self.warnings: List[str] = []
+        self._open()
+
+    def _open(self):
+        try:
+            with open(self.cache_file, "rb") as f:
+                if os.fstat(f.fileno()).st_size < _HEADER.size:
+                    return
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return
+        magic, version, major, minor = _HEADER.unpack_from(self._map, 0)
+        if (magic, version, (major, minor)) != (CACHE_MAGIC, CACHE_VERSION, _PYTHON):
+            self.warnings.append(f"Ignoring spec cache {self.cache_file} from another format or Python version")
+            self.close()
+            return
+        self._index, self._dead = self._scan(self._map)
+        self.stats["records"] = len(self._index)
+
+    @staticmethod
+    def _scan(buf) -> Tuple[Dict[str, Tuple[int, int, int, int]], int]:
+        """Latest record per path, and the bytes taken by superseded ones; a truncated tail is ignored"""
+        index = {}
+        dead = 0
+        pos = _HEADER.size
+        end = len(buf)
+        while pos + _RECORD.size <= end:
+            key_len, value_len, size, mtime_ns = _RECORD.unpack_from(buf, pos)
+            value_at = pos + _RECORD.size + key_len
+            if value_at + value_len > end:
+                break
+            key = bytes(buf[pos + _RECORD.size:value_at]).decode("utf-8")
+            previous = index.get(key)
+            if previous:
+                dead += _RECORD.size + len(key.encode("utf-8")) + previous[3]
+            index[key] = (size, mtime_ns, value_at, value_len)
+            pos = value_at + value_len
+        return index, dead
+
+    def get(self, key: str, st: os.stat_result) -> Optional[Tuple[bool, Any]]:
+        """(ok, document or error) cached for this version of the file, or None"""
+        entry = self._index.get(key)
+        if entry is None or entry[0] != st.st_size or entry[1] != st.st_mtime_ns or self._map is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        with memoryview(self._map) as view:
+            return marshal.loads(view[entry[2]:entry[2] + entry[3]])
+
+    def put(self, key: str, st: os.stat_result, result: Tuple[bool, Any]):
+        """Queue a record for the next flush()"""
+        try:
+            value = marshal.dumps(result)
+        except ValueError:
+            return
+        encoded = key.encode("utf-8")
+        if key in self._index:
+            self._dead += _RECORD.size + len(encoded) + self._index[key][3]
+        self._pending.append(_RECORD.pack(len(encoded), len(value), st.st_size, st.st_mtime_ns) + encoded + value)
+
+    def flush(self):
+        """Append queued records, compacting the file if it is mostly superseded records"""
+        if not self._pending:
+            return
+        records = b"".join(self._pending)
+        self._pending = []
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, "ab+") as f:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                f.seek(0)
+                header = _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, *_PYTHON)
+                if f.read(_HEADER.size) != header:
+                    # Replaced rather than truncated: other processes may have the old file mapped
+                    tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+                    with open(tmp_file, "wb") as out:
+                        out.write(header + records)
+                    os.replace(tmp_file, self.cache_file)
+                    self.stats["appended"] += len(records)
+                    return
+                f.write(records)
+                f.flush()
+                self.stats["appended"] += len(records)
+                total = f.tell()
+                if self._dead > COMPACT_RATIO * total:
+                    f.seek(0)
+                    self._compact(f.read())
+        except OSError as e:
+            self.warnings.append(f"Could not write spec cache {self.cache_file}: {e}")
+
+    def _compact(self, data: bytes):
+        """Rewrite the cache with only the latest record per path (called with the file locked)"""
+        index, _ = self._scan(data)
+        tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, *_PYTHON))
+            for key, (_, _, value_at, value_len) in index.items():
+                start = value_at - len(key.encode("utf-8")) - _RECORD.size
+                f.write(data[start:value_at + value_len])
+        os.replace(tmp_file, self.cache_file)
+        self._dead = 0
+        self.stats["compactions"] += 1
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._index = {}
+
+
+class Spec(Mapping):
+    """A JSON document that is parsed on first access. Parse errors surface then, as ValueError.
+
+    A Spec keeps the document it parsed; open the path again to see later edits.
+    """
+
+    __slots__ = ("path", "_store", "_data")
+
+    def __init__(self, store: "SpecStore", path: Path):
+        self.path = Path(path)
+        self._store = store
+        self._data = _UNSET
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not _UNSET
+
+    @property
+    def data(self) -> Any:
+        """The parsed document"""
+        if self._data is _UNSET:
+            self._data = self._store.read(self.path)
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"Spec({str(self.path)!r}{', loaded' if self.loaded else ''})"
+
+
+class Component:
+    """A component directory, with its meta.json and specs opened lazily"""
+
+    def __init__(self, store: "SpecStore", path: Path):
+        self.path = Path(path)
+        self.name = self.path.name
+        self.stage = self.path.parent.name
+        self._store = store
+        self._spec_files: Optional[Dict[str, Path]] = None
+        self.meta = store.open(self.path / "meta.json")
+
+    def spec_files(self) -> Dict[str, Path]:
+        """Spec files under specs/, by path relative to it"""
+        if self._spec_files is None:
+            specs_dir = self.path / "specs"
+            self._spec_files = {path.relative_to(specs_dir).as_posix(): path
+                                for path in sorted(specs_dir.rglob("*.json"))} if specs_dir.is_dir() else {}
+        return self._spec_files
+
+    def spec(self, name: str) -> Optional[Spec]:
+        """A spec by relative path or by file name, with or without .json"""
+        files = self.spec_files()
+        name = name if name.endswith(".json") else f"{name}.json"
+        path = files.get(name) or next((p for rel, p in files.items() if rel.rsplit("/", 1)[-1] == name), None)
+        return self._store.open(path) if path else None
+
+    def specs(self) -> Dict[str, Spec]:
+        return {rel: self._store.open(path) for rel, path in self.spec_files().items()}
+
+
+class SpecStore:
+    """Spec access shared by the tools: components by name, documents parsed once and cached across runs.
+
+    cache_file=None keeps parsed documents in memory only. Call flush() (or use
+    the store as a context manager) to persist what was parsed.
+    """
+
+    def __init__(self, project_root: Optional[Path] = None, cache_file: Optional[Path] = DEFAULT_CACHE_FILE):
+        self.project_root = Path(project_root) if project_root else None
+        self.cache = ParseCache(cache_file) if cache_file else None
+        self._documents: Dict[str, Tuple[int, int, Tuple[bool, Any]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"parsed": 0, "cached": 0, "memory": 0}
+
+    def __enter__(self) -> "SpecStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def find_component(self, name: str) -> Optional[Path]:
+        """Component directory in production, stable, or experimental"""
+        if self.project_root is None:
+            return None
+        for stage in STAGES:
+            path = self.project_root / "components" / stage / name
+            if path.exists():
+                return path
+        return None
+
+    def component(self, name: str) -> Optional[Component]:
+        path = self.find_component(name)
+        return Component(self, path) if path else None
+
+    def components(self, stage: Optional[str] = None) -> List[Component]:
+        """Every component of one stage (or all stages), in name order"""
+        if self.project_root is None:
+            return []
+        components = []
+        for stage_name in ([stage] if stage else STAGES):
+            stage_dir = self.project_root / "components" / stage_name
+            if stage_dir.is_dir():
+                components.extend(Component(self, path) for path in sorted(stage_dir.iterdir()) if path.is_dir())
+        return components
+
+    def open(self, path: Path) -> Spec:
+        """A lazily parsed document"""
+        return Spec(self, path)
+
+    def read(self, path: Path) -> Any:
+        """The parsed document; raises OSError if it cannot be read and ValueError if it is not JSON.
+
+        The result is shared between callers, so treat it as read-only.
+        """
+        key, st = _file_key(path)
+        with self._lock:
+            known = self._documents.get(key)
+            if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+                self.stats["memory"] += 1
+                result = known[2]
+            else:
+                result = self.cache.get(key, st) if self.cache else None
+                if result is None:
+                    result = _parse(key)
+                    self.stats["parsed"] += 1
+                    if self.cache:
+                        self.cache.put(key, st, result)
+                else:
+                    self.stats["cached"] += 1
+                self._documents[key] = (st.st_size, st.st_mtime_ns, result)
+        ok, value = result
+        if not ok:
+            raise ValueError(f"Could not parse {path}: {value}")
+        return value
+
+    def flush(self):
+        """Persist newly parsed documents to the cache file"""
+        if self.cache:
+            with self._lock:
+                self.cache.flush()
+
+    def info(self) -> Dict[str, Any]:
+        return {**self.stats, "documents": len(self._documents),
+                "cache": {**self.cache.stats, "file": str(self.cache.cache_file)} if self.cache else None}
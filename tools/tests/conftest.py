@@ -0,0 +1,10 @@
+import sys
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent
+
+# The tools are scripts importing their sibling modules, not packages
+for tool in ("live-analyzer", "spec-store", "tier-filter"):
+    path = str(TOOLS_DIR / tool)
+    if path not in sys.path:
+        sys.path.insert(0, path)
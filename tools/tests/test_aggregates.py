@@ -0,0 +1,74 @@
+"""Checkpointed aggregates: later updates read only appended bytes, and a rewritten log is rebuilt"""
+
+import json
+
+import pytest
+
+from aggregates import ComponentAggregates
+from usage_store import UsageStore
+
+
+def _append(path, count, function="geodesic", duration_ms=2.0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for i in range(count):
+            f.write(json.dumps({"timestamp": f"2026-02-19T22:{i % 60:02d}:00", "function": function,
+                                "duration_ms": duration_ms}) + "\n")
+
+
+@pytest.fixture
+def analysis_dir(tmp_path):
+    return tmp_path / "analysis"
+
+
+def _update(analysis_dir, rebuild=False):
+    aggregates = ComponentAggregates.load(analysis_dir, rebuild)
+    aggregates.update_usage(UsageStore(analysis_dir / "usage-patterns"))
+    aggregates.update_feedback(analysis_dir / "feedback")
+    aggregates.save()
+    return aggregates
+
+
+def test_checkpoint_reads_only_appended_lines(analysis_dir):
+    log = analysis_dir / "usage-patterns" / "usage_log.jsonl"
+    _append(log, 100)
+    first = _update(analysis_dir)
+    assert first.usage.total_calls == 100 and first.bytes_read == log.stat().st_size
+
+    size = log.stat().st_size
+    _append(log, 10, function="transport")
+    appended = log.stat().st_size - size
+    with open(log, "a") as f:
+        f.write('{"timestamp": "2026-02-19T23:00:00", "function": "partial"')  # writer caught mid-append
+    second = _update(analysis_dir)
+    assert second.usage.total_calls == 110
+    assert second.usage.functions["transport"].count == 10
+    assert second.bytes_read == appended
+    assert "partial" not in second.usage.functions
+
+
+def test_rewritten_log_is_rebuilt(analysis_dir):
+    log = analysis_dir / "usage-patterns" / "usage_log.jsonl"
+    _append(log, 50)
+    _update(analysis_dir)
+    log.unlink()
+    _append(log, 60, function="other")
+
+    aggregates = _update(analysis_dir)
+    assert aggregates.rebuilt == ["usage_log.jsonl"]
+    assert aggregates.usage.total_calls == 60
+    assert set(aggregates.usage.functions) == {"other"}
+
+
+def test_feedback_counts_and_rebuild_flag(analysis_dir):
+    feedback = analysis_dir / "feedback" / "issue_feedback.jsonl"
+    feedback.parent.mkdir(parents=True)
+    feedback.write_text("".join(json.dumps({"type": "issue", "message": f"issue {i}"}) + "\n" for i in range(7)))
+    _append(analysis_dir / "usage-patterns" / "usage_log.jsonl", 5)
+
+    aggregates = _update(analysis_dir)
+    summary = aggregates.feedback_summary()
+    assert summary["issues_count"] == 7
+    assert summary["recent_issues"][-1] == "issue 6"
+    assert _update(analysis_dir).bytes_read == 0
+    assert _update(analysis_dir, rebuild=True).usage.total_calls == 5
@@ -0,0 +1,51 @@
+"""Benchmark harness: discovery of registered benchmarks and in-process measurement"""
+
+import textwrap
+
+from bench import load_benchmarks, measure, run_benchmarks
+
+BENCHMARKS = textwrap.dedent('''
+    from bench import benchmark
+
+    def helper():
+        return 1
+
+    def bench_sum():
+        sum(range(1000))
+
+    @benchmark(name="sorted_points", repeat=3, setup=lambda: list(range(500, 0, -1)),
+               operation="sort", size=500)
+    def sort_points(points):
+        sorted(points)
+
+    def bench_broken():
+        raise RuntimeError("boom")
+''')
+
+
+def _benchmarks_file(tmp_path):
+    path = tmp_path / "component" / "benchmarks.py"
+    path.parent.mkdir()
+    path.write_text(BENCHMARKS)
+    return path
+
+
+def test_load_benchmarks_finds_prefixed_and_decorated(tmp_path):
+    assert list(load_benchmarks(_benchmarks_file(tmp_path))) == ["sum", "sorted_points", "broken"]
+
+
+def test_measure_uses_benchmark_options(tmp_path):
+    benchmarks = load_benchmarks(_benchmarks_file(tmp_path))
+    result = measure(benchmarks["sorted_points"], warmup=0, repeat=10)
+    assert result["repeat"] == 3 and len(result["samples"]["wall_ms"]) == 3
+    assert (result["operation"], result["size"]) == ("sort", 500)
+    assert result["wall_ms"]["min"] <= result["wall_ms"]["median"] <= result["wall_ms"]["max"]
+
+    result = measure(benchmarks["sum"], warmup=0, repeat=4)
+    assert len(result["samples"]["cpu_ms"]) == 4 and "operation" not in result
+
+
+def test_failing_benchmark_is_reported_not_raised(tmp_path):
+    results = run_benchmarks(_benchmarks_file(tmp_path), warmup=0, repeat=1, only=["sum", "broken"])
+    assert results["broken"] == {"error": "RuntimeError: boom"}
+    assert len(results["sum"]["samples"]["wall_ms"]) == 1
@@ -0,0 +1,74 @@
+"""Content-addressed blob store: each content stored once, placed by link or copy, hashed once"""
+
+import json
+import os
+import stat
+
+import pytest
+
+from blob_store import BlobStore
+from filter import TierFilter
+
+
+@pytest.fixture
+def files(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    for name, text in (("a.json", '{"x": 1}'), ("b.json", '{"x": 1}'), ("c.json", '{"x": 2}')):
+        (source / name).write_text(text)
+    return source
+
+
+@pytest.mark.parametrize("link_mode", ["hardlink", "copy"])
+def test_identical_content_is_stored_once(files, tmp_path, link_mode):
+    store = BlobStore(tmp_path / "store", link_mode)
+    digests = {name: store.add(files / name) for name in ("a.json", "b.json", "c.json")}
+    assert digests["a.json"] == digests["b.json"] != digests["c.json"]
+    assert store.stats["stored"] == 2
+
+    obj = store.object_path(digests["a.json"])
+    assert not os.stat(obj).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+    for name, digest in digests.items():
+        dst = tmp_path / "out" / name
+        assert store.materialize(digest, dst) == link_mode
+        assert dst.read_text() == (files / name).read_text()
+    assert os.path.samefile(obj, tmp_path / "out" / "a.json") == (link_mode == "hardlink")
+
+    summary = store.summary()
+    assert (summary["placed"], summary["unique"], summary["duplicate_files"]) == (3, 2, 1)
+    assert summary["deduplicated_bytes"] == len('{"x": 1}')
+
+
+def test_hash_cache_survives_save(files, tmp_path):
+    store = BlobStore(tmp_path / "store")
+    store.digest(files / "a.json")
+    store.save()
+
+    store = BlobStore(tmp_path / "store")
+    store.digest(files / "a.json")
+    assert (store.stats["hashed"], store.stats["hash_cached"]) == (0, 1)
+    (files / "a.json").write_text('{"x": 10}')
+    store.digest(files / "a.json")
+    assert store.stats["hashed"] == 1
+
+
+def test_unknown_link_mode(tmp_path):
+    with pytest.raises(ValueError, match="Unknown link mode symlink"):
+        BlobStore(tmp_path / "store", "symlink")
+
+
+def test_export_through_store(tmp_path):
+    specs = tmp_path / "source" / "specifications" / "core"
+    specs.mkdir(parents=True)
+    spec = json.dumps({"metadata": {"tier": "core"}, "operations": []})
+    for name in ("ops.json", "copy_of_ops.json"):
+        (specs / name).write_text(spec)
+
+    source = tmp_path / "source"
+    tier_filter = TierFilter(source, source / "config", store_dir=tmp_path / "store", link_mode="copy",
+                             spec_cache=None, ref_graph_dir=tmp_path / "graph",
+                             validator_cache=tmp_path / "validators")
+    assert tier_filter.filter_and_export(tmp_path / "core", "core", validate=False)
+    for name in ("ops.json", "copy_of_ops.json"):
+        assert (tmp_path / "core" / "specifications" / "core" / name).read_text() == spec
+    assert tier_filter.blob_store.summary()["duplicate_files"] == 1
@@ -0,0 +1,64 @@
+"""Operation catalog index: extraction, glob queries and incremental updates"""
+
+import json
+import os
+
+import pytest
+
+from catalog_index import CatalogIndex
+
+GEOMETRY = {
+    "metadata": {"tier": "core"},
+    "category": "geometry",
+    "operations": [
+        {"name": "geodesic_distance", "complexity_class": "O(n)", "returns": "float",
+         "parameters": [{"name": "points", "type": "array<float>"}]},
+        {"name": "parallel_transport", "complexity": "O(log n)", "returns": "array<float>"},
+    ],
+}
+NUMERICS = {"categories": {"interpolation": {"operations": {"lerp": {"complexity_class": "O(1)"}}}}}
+
+
+@pytest.fixture
+def export_dir(tmp_path):
+    specs = tmp_path / "export" / "specifications" / "core"
+    specs.mkdir(parents=True)
+    (specs / "geometry.json").write_text(json.dumps(GEOMETRY))
+    (specs / "numerics.json").write_text(json.dumps(NUMERICS))
+    return tmp_path / "export"
+
+
+@pytest.fixture
+def index(tmp_path):
+    with CatalogIndex(tmp_path / "catalog.sqlite") as index:
+        yield index
+
+
+def test_operations_are_indexed_and_queried(export_dir, index):
+    stats = index.update(export_dir)
+    assert stats["indexed"] == 2 and stats["operations"] == 3
+
+    [geodesic] = index.query(param_type="array<float>")
+    assert geodesic["name"] == "geodesic_distance"
+    assert geodesic["category"] == "geometry"
+    assert geodesic["tier"] == "core"
+    assert geodesic["parameters"] == [{"name": "points", "type": "array<float>"}]
+    assert [op["name"] for op in index.query(complexity="O(log n)")] == ["parallel_transport"]
+    assert [op["name"] for op in index.query(category="interp*")] == ["lerp"]
+    assert [op["name"] for op in index.query(name="*_*", limit=1)] == ["geodesic_distance"]
+
+
+def test_update_reindexes_only_changed_files(export_dir, index):
+    index.update(export_dir)
+    assert index.update(export_dir)["unchanged"] == 2
+
+    geometry_file = export_dir / "specifications" / "core" / "geometry.json"
+    os.utime(geometry_file, ns=(0, 0))
+    stats = index.update(export_dir)
+    assert (stats["indexed"], stats["unchanged"]) == (0, 2)  # same content, only the mtime moved
+
+    geometry_file.write_text(json.dumps(dict(GEOMETRY, operations=GEOMETRY["operations"][:1])))
+    (export_dir / "specifications" / "core" / "numerics.json").unlink()
+    stats = index.update(export_dir)
+    assert (stats["indexed"], stats["removed"]) == (1, 1)
+    assert index.total_operations() == 1
@@ -0,0 +1,54 @@
+"""Build comparison: only shifts past the threshold and significant under Mann-Whitney U are flagged"""
+
+import random
+
+from compare import compare_benchmarks, compare_usage
+from stats import QuantileSketch
+
+
+def _results(**samples):
+    return {"benchmarks": {name: {"samples": {"wall_ms": values}} for name, values in samples.items()}}
+
+
+def _samples(seed, scale, n=40):
+    rng = random.Random(seed)
+    return [scale * (1 + rng.random() * 0.05) for _ in range(n)]
+
+
+def _window(**functions):
+    window = {}
+    for name, values in functions.items():
+        sketch = QuantileSketch()
+        for value in values:
+            sketch.add(value)
+        window[name] = sketch.to_dict()
+    return {"functions": window}
+
+
+def test_benchmark_regression_improvement_and_noise():
+    base = _results(slower=_samples(1, 10.0), faster=_samples(2, 10.0), steady=_samples(3, 10.0),
+                    broken=_samples(4, 10.0), base_only=_samples(5, 1.0))
+    head = _results(slower=_samples(6, 13.0), faster=_samples(7, 7.0), steady=_samples(8, 10.2))
+    head["benchmarks"]["broken"] = {"error": "benchmark process crashed"}
+
+    findings = {f["name"]: f for f in compare_benchmarks(base, head)}
+    assert set(findings) == {"faster", "slower", "steady"}
+    assert findings["slower"]["status"] == "regression" and "slower at p95" in findings["slower"]["message"]
+    assert findings["faster"]["status"] == "improvement"
+    assert findings["steady"]["status"] == "unchanged" and "message" not in findings["steady"]
+
+
+def test_large_change_on_few_samples_is_not_significant():
+    [finding] = compare_benchmarks(_results(op=[10.0, 10.5]), _results(op=[20.0, 21.0]))
+    assert finding["change"] > 0.9
+    assert finding["status"] == "unchanged"
+
+
+def test_usage_windows_compare_sketches():
+    base = _window(geodesic=_samples(1, 2.0, 200), transport=_samples(2, 5.0, 200))
+    head = _window(geodesic=_samples(3, 3.0, 200), transport=_samples(4, 5.0, 200), new=[1.0])
+    findings = {f["name"]: f for f in compare_usage(base, head, threshold=0.2)}
+    assert set(findings) == {"geodesic", "transport"}
+    assert findings["geodesic"]["status"] == "regression"
+    assert findings["geodesic"]["samples"] == {"base": 200, "head": 200}
+    assert findings["transport"]["status"] == "unchanged"
@@ -0,0 +1,80 @@
+"""Cost model: growth classes of complexity notes, calibration against benchmarks, budgeted selection"""
+
+import pytest
+
+from cost_model import DEFAULT_UNIT_MS, GROWTH_CLASSES, CostModel, Operation, _fit, growth, growth_class
+
+
+@pytest.mark.parametrize("complexity, expected", [
+    ("O(1)", "O(1)"),
+    ("O(log n)", "O(log n)"),
+    ("O(log(n))", "O(log n)"),
+    ("O(N)", "O(n)"),
+    ("O(n·log(1/ε))", "O(n)"),
+    ("O(n log n)", "O(n log n)"),
+    ("O(n) to O(n²)", "O(n^2)"),
+    ("O(n^2) amortized, O(1) per query", "O(n^2)"),
+    ("O(n³)", "O(n^3)"),
+    ("O(n^4)", "O(n^3)"),
+    ("linear in the number of points", "O(n)"),
+    (None, "O(n)"),
+])
+def test_growth_class(complexity, expected):
+    assert GROWTH_CLASSES[growth_class(complexity)] == expected
+
+
+def _model():
+    return CostModel([
+        Operation("scan", "search", "ops.json", "O(n)", growth_class("O(n)")),
+        Operation("bisect", "search", "ops.json", "O(log n)", growth_class("O(log n)")),
+        Operation("pairwise", "search", "ops.json", "O(n²)", growth_class("O(n²)")),
+        Operation("hash_scan", "search", "ops.json", "O(n)", growth_class("O(n)")),
+        Operation("lookup", "index", "ops.json", "O(1)", growth_class("O(1)")),
+    ])
+
+
+def _result(*benchmarks):
+    return {"benchmarks": {f"bench_{i}": {"operation": name, "size": size, "wall_ms": {"median": ms}}
+                           for i, (name, size, ms) in enumerate(benchmarks)}}
+
+
+def test_fit_least_squares_and_through_origin():
+    overhead, slope = _fit([(10, 0.6), (100, 1.5), (1000, 10.5)])
+    assert overhead == pytest.approx(0.5) and slope == pytest.approx(0.01)
+    assert _fit([(100, 2.0), (100, 4.0)]) == (0.0, pytest.approx(0.03))  # one size: through the origin
+    overhead, slope = _fit([(10, 0.0), (100, 1.0), (1000, 11.0)])  # negative intercept
+    assert overhead == 0.0 and slope == pytest.approx(11_100 / 1_010_100)
+
+
+def test_calibration_from_bench_results():
+    model = _model()
+    model.calibrate([
+        _result(("scan", 10, 0.6), ("scan", 100, 1.5), ("bisect", 1024, 0.2)),
+        _result(("scan", 1000, 10.5), ("pairwise", None, 3.0), ("lookup", None, 0.05)),
+        {"benchmarks": {"bench_error": {"operation": "scan", "error": "boom"}}},
+    ])
+    assert set(model.fits) == {"scan", "bisect", "lookup"}  # pairwise had no size
+    overhead, unit_ms, samples = model.fits["scan"]
+    assert (overhead, unit_ms, samples) == (pytest.approx(0.5), pytest.approx(0.01), 3)
+    assert model.fits["bisect"][:2] == (0.0, pytest.approx(0.02))
+    assert model.fits["lookup"][:2] == (0.0, pytest.approx(0.05))
+
+    estimate = model.predict("scan", 500)
+    assert estimate.ms == pytest.approx(5.5) and estimate.source == "measured"
+    estimate = model.predict("hash_scan", 500)  # borrows the O(n) class constants
+    assert estimate.ms == pytest.approx(5.5) and estimate.source == "class"
+    estimate = model.predict("pairwise", 10)
+    assert estimate.ms == pytest.approx(DEFAULT_UNIT_MS * growth(4, 10)) and estimate.source == "default"
+
+
+def test_select_within_budget():
+    model = _model()
+    model.calibrate([_result(("scan", 10, 0.2), ("scan", 1000, 2.1), ("hash_scan", 1000, 0.5))])
+    assert model.select("search", 1000, budget_ms=1.0).operation.name == "bisect"
+    assert model.select("search", 1000, budget_ms=1.0, match="scan").operation.name == "hash_scan"
+    assert model.select("search", 1000, budget_ms=0.2, match="scan") is None
+    assert model.select("index", 1000, budget_ms=1.0).operation.name == "lookup"
+
+    ranked = model.rank("search", 1000, budget_ms=1.0)
+    assert [estimate.fits for estimate in ranked] == [True, True, False, False]
+    assert ranked[-1].operation.name == "pairwise"
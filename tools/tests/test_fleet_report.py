@@ -0,0 +1,47 @@
+"""Fleet report: per-component reports merged into fleet totals, in process or across workers"""
+
+import json
+
+import pytest
+
+from analyze import LiveAnalyzer
+
+
+def _component(project, name, calls):
+    usage_dir = project / "components" / "production" / name / "analysis" / "usage-patterns"
+    usage_dir.mkdir(parents=True)
+    with open(usage_dir / "usage_log.jsonl", "w") as f:
+        for function, duration_ms, count in calls:
+            for i in range(count):
+                f.write(json.dumps({"timestamp": f"2026-02-19T22:{i % 60:02d}:00", "function": function,
+                                    "duration_ms": duration_ms}) + "\n")
+
+
+@pytest.fixture
+def project(tmp_path):
+    _component(tmp_path, "alpha", [("geodesic", 2.0, 30), ("transport", 50.0, 5)])
+    _component(tmp_path, "beta", [("lerp", 0.5, 20)])
+    (tmp_path / "components" / "production" / "idle").mkdir()
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_fleet_totals_are_the_sum_of_components(project, jobs):
+    report = LiveAnalyzer(project).generate_fleet_report(jobs=jobs, top=2, output_file=project / "fleet.json")
+    components = report["components"]
+    assert sorted(components) == ["alpha", "beta", "idle"]
+    assert (components["alpha"]["total_calls"], components["beta"]["total_calls"]) == (35, 20)
+    assert components["idle"]["total_calls"] == 0
+    assert report["totals"]["total_calls"] == 55
+    assert (report["totals"]["components"], report["totals"]["with_usage"], report["totals"]["errors"]) == (3, 2, 0)
+    assert [(row["component"], row["function"]) for row in report["slowest_functions"]] == [
+        ("alpha", "transport"), ("alpha", "geodesic")]
+    assert json.loads((project / "fleet.json").read_text())["totals"] == report["totals"]
+
+
+def test_unknown_component_is_reported_as_an_error(project):
+    report = LiveAnalyzer(project).generate_fleet_report(["alpha", "missing"], jobs=1,
+                                                         output_file=project / "fleet.json")
+    assert report["components"]["missing"] == {"status": "error", "error": "Component missing not found"}
+    assert report["totals"]["errors"] == 1
+    assert report["totals"]["total_calls"] == 35
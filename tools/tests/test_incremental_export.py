@@ -0,0 +1,63 @@
+"""Incremental export: the manifest lets a re-export copy only added or changed files and drop removed ones"""
+
+import json
+
+import pytest
+
+from filter import TierFilter
+
+SPECS = {
+    "ops.json": {"metadata": {"tier": "core"}, "operations": [{"name": "add", "complexity_class": "O(1)"}]},
+    "curves.json": {"metadata": {"tier": "core"}, "operations": [{"name": "bezier", "complexity_class": "O(n)"}]},
+}
+
+
+@pytest.fixture
+def source(tmp_path):
+    specs = tmp_path / "source" / "specifications" / "core"
+    specs.mkdir(parents=True)
+    for name, spec in SPECS.items():
+        (specs / name).write_text(json.dumps(spec))
+    return tmp_path / "source"
+
+
+def _export(source, output, **options):
+    tier_filter = TierFilter(source, source / "config", spec_cache=None, ref_graph_dir=source.parent / "graph",
+                             validator_cache=source.parent / "validators", **options)
+    assert tier_filter.filter_and_export(output, "core", validate=False, incremental=True)
+    return tier_filter.export_delta
+
+
+def test_unchanged_export_copies_nothing(source, tmp_path):
+    output = tmp_path / "core"
+    first = _export(source, output)
+    assert sorted(first["added"]) == ["specifications/core/curves.json", "specifications/core/ops.json"]
+
+    second = _export(source, output)
+    assert second["added"] == second["changed"] == second["removed"] == []
+    assert second["unchanged"] == 2
+
+
+def test_changed_and_removed_files(source, tmp_path):
+    output = tmp_path / "core"
+    _export(source, output)
+    spec = dict(SPECS["ops.json"], operations=[{"name": "add", "complexity_class": "O(n)"}])
+    (source / "specifications" / "core" / "ops.json").write_text(json.dumps(spec, indent=2))
+    (source / "specifications" / "core" / "curves.json").unlink()
+
+    delta = _export(source, output)
+    assert delta["changed"] == ["specifications/core/ops.json"]
+    assert delta["removed"] == ["specifications/core/curves.json"]
+    assert json.loads((output / "specifications" / "core" / "ops.json").read_text()) == spec
+    assert not (output / "specifications" / "core" / "curves.json").exists()
+
+
+def test_manifest_from_another_tier_is_ignored(source, tmp_path):
+    output = tmp_path / "core"
+    _export(source, output)
+    manifest_file = output / TierFilter.STATE_DIR / TierFilter.MANIFEST_FILE
+    manifest = json.loads(manifest_file.read_text())
+    manifest_file.write_text(json.dumps(dict(manifest, tier="pro")))
+
+    delta = _export(source, output)
+    assert sorted(delta["added"]) == ["specifications/core/curves.json", "specifications/core/ops.json"]
@@ -0,0 +1,99 @@
+"""analyze.py serve: the /metrics body is valid OpenMetrics and tracks the logs incrementally"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from metrics import CONTENT_TYPE, METRICS_PATH, MetricsExporter, metrics_server
+
+parser = pytest.importorskip("prometheus_client.openmetrics.parser")
+
+FUNCTION = "geodesic \"batch\"\\n"
+
+
+def _append(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for entry in entries:
+            f.write((entry if isinstance(entry, str) else json.dumps(entry)) + "\n")
+
+
+def _calls(function, durations):
+    return [{"timestamp": "2026-02-19T22:30:00", "function": function, "duration_ms": d} for d in durations]
+
+
+@pytest.fixture
+def component(tmp_path):
+    path = tmp_path / "components" / "production" / "demo"
+    _append(path / "analysis" / "usage-patterns" / "usage_log.jsonl",
+            _calls(FUNCTION, [0.2, 3.0, 40.0]) + _calls("curvature", [1.5]) + ["not json"])
+    _append(path / "analysis" / "feedback" / "issue_feedback.jsonl",
+            [{"timestamp": "2026-02-19T22:30:00", "type": "issue", "message": "Memory spike"}])
+    return path
+
+
+def _families(body: bytes):
+    return {family.name: family for family in parser.text_string_to_metric_families(body.decode("utf-8"))}
+
+
+def _value(family, suffix="", **labels):
+    return next(sample.value for sample in family.samples
+                if sample.name == family.name + suffix and all(sample.labels.get(k) == v for k, v in labels.items()))
+
+
+def test_body_parses_as_openmetrics(component):
+    exporter = MetricsExporter({"demo": component})
+    exporter.refresh()
+    families = _families(exporter.body)
+
+    assert families["hypersync_calls"].type == "counter"
+    assert _value(families["hypersync_calls"], "_total", component="demo", function=FUNCTION) == 3
+    histogram = families["hypersync_call_duration_seconds"]
+    assert histogram.type == "histogram"
+    assert _value(histogram, "_bucket", function=FUNCTION, le="0.001") == 1
+    assert _value(histogram, "_bucket", function=FUNCTION, le="+Inf") == 3
+    assert _value(histogram, "_sum", function=FUNCTION) == pytest.approx(0.0432)
+    summary = families["hypersync_call_latency_seconds"]
+    assert _value(summary, function="curvature", quantile="0.99") == pytest.approx(0.0015, rel=0.02)
+    assert _value(families["hypersync_usage_skipped_lines"], "_total", component="demo") == 1
+    assert _value(families["hypersync_feedback"], "_total", component="demo", kind="issue") == 1
+    assert families["hypersync_exporter_read_bytes"].unit == "bytes"
+
+
+def test_refresh_folds_only_new_entries(component):
+    exporter = MetricsExporter({"demo": component})
+    exporter.refresh()
+    assert not exporter.refresh()
+
+    _append(component / "analysis" / "usage-patterns" / "usage_log.jsonl", _calls("curvature", [2.0, 2.5]))
+    assert exporter.refresh()
+    families = _families(exporter.body)
+    assert _value(families["hypersync_calls"], "_total", function="curvature") == 3
+    assert _value(families["hypersync_calls"], "_total", function=FUNCTION) == 3
+
+    # A second exporter (another process) resumes from the shared checkpoint instead of re-counting
+    other = MetricsExporter({"demo": component})
+    other.refresh()
+    assert _value(_families(other.body)["hypersync_calls"], "_total", function="curvature") == 3
+
+
+def test_served_over_http(component):
+    exporter = MetricsExporter({"demo": component})
+    exporter.refresh()
+    server = metrics_server(exporter, "127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        with urllib.request.urlopen(url + METRICS_PATH) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert "hypersync_calls" in _families(response.read())
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + "/other")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,47 @@
+"""Sampling profiler: every sample taken reaches profile.folded, including samples taken mid-flush"""
+
+import signal
+import time
+
+import pytest
+
+from profiler import PROFILE_FILE, SamplingProfiler, hot_paths, read_folded
+
+
+def _spin(seconds: float) -> float:
+    total = 0.0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for i in range(500):
+            total += i * 0.5
+    return total
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "components" / "production" / "demo").mkdir(parents=True)
+    return tmp_path
+
+
+def _usage_dir(project):
+    return project / "components" / "production" / "demo" / "analysis" / "usage-patterns"
+
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="signal sampling needs setitimer")
+def test_signal_samples_survive_concurrent_flushes(project):
+    # Flushing every few milliseconds makes the flush thread drain while the SIGPROF handler records
+    profiler = SamplingProfiler("demo", project, rate_hz=1000, mode="signal", flush_interval=0.002,
+                                max_overhead=1.0)
+    with profiler:
+        _spin(1.5)
+    folded = read_folded(_usage_dir(project) / PROFILE_FILE)
+    assert profiler.stats["samples"] > 100
+    assert sum(folded.values()) == pytest.approx(profiler.stats["sampled_ms"] * 1000, abs=len(folded))
+
+
+def test_thread_mode_finds_the_hot_function(project):
+    with SamplingProfiler("demo", project, rate_hz=200, mode="thread", flush_interval=0.2):
+        _spin(1.0)
+    paths = hot_paths(_usage_dir(project))
+    assert paths["status"] == "analyzed"
+    assert any(row["function"].startswith("_spin ") for row in paths["top_self"][:2])
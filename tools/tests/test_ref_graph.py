@@ -0,0 +1,97 @@
+"""Spec reference graph: name resolution, incremental re-indexing, reachability and dangling references"""
+
+import json
+import os
+
+import pytest
+
+from filter import TierFilter
+from ref_graph import ReferenceGraph
+
+
+def _write(root, label, doc):
+    path = root / label
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(doc))
+    return path
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "source"
+    _write(root, "specs/a.json", {"name": "alpha", "dependencies": ["beta_spec", "./c.json"]})
+    _write(root, "specs/beta_spec.json", {"requires": "gamma@2.0"})
+    _write(root, "specs/c.json", {"extends": "specs/a.json"})
+    _write(root, "other/gamma.json", {"metadata": {"id": "Gamma"}, "base_spec": "missing_spec"})
+    return root
+
+
+def _graph(tmp_path, root):
+    graph = ReferenceGraph(tmp_path / "graph.json")
+    graph.update(root)
+    return graph
+
+
+def test_references_resolve_by_path_stem_and_declared_name(tmp_path, tree):
+    graph = _graph(tmp_path, tree)
+    assert graph.edges == {
+        "specs/a.json": ["specs/beta_spec.json", "specs/c.json"],
+        "specs/beta_spec.json": ["other/gamma.json"],
+        "specs/c.json": ["specs/a.json"],
+        "other/gamma.json": [],
+    }
+    assert graph.unresolved("other/gamma.json") == ["missing_spec"]
+    assert graph.resolve("specs/a.json", "../nowhere/a.json") is None
+
+
+def test_reachability_and_cycles(tmp_path, tree):
+    graph = _graph(tmp_path, tree)
+    assert graph.reachable("specs/c.json") == ["other/gamma.json", "specs/a.json", "specs/beta_spec.json",
+                                               "specs/c.json"]
+    assert graph.reachable("specs/beta_spec.json") == ["other/gamma.json"]
+    assert graph.reaches("specs/a.json", "specs/a.json") and not graph.reaches("other/gamma.json", "other/gamma.json")
+    assert graph.dependents("other/gamma.json") == ["specs/beta_spec.json"]
+    assert graph.dependents("other/gamma.json", transitive=True) == ["specs/a.json", "specs/beta_spec.json",
+                                                                     "specs/c.json"]
+    assert graph.cycles() == [["specs/a.json", "specs/c.json"]]
+
+
+def test_update_rereads_only_changed_files(tmp_path, tree):
+    graph = _graph(tmp_path, tree)
+    graph.save()
+
+    graph = ReferenceGraph(tmp_path / "graph.json")
+    assert graph.update(tree) == set()
+    assert (graph.stats["read"], graph.stats["cached"]) == (0, 4)
+
+    path = _write(tree, "specs/c.json", {"extends": "gamma"})
+    os.utime(path, ns=(1, 1))
+    assert graph.update(tree) == {"specs/c.json"}
+    assert graph.stats["read"] == 1 and graph.stats["resolved"] == 1
+    assert graph.edges["specs/c.json"] == ["other/gamma.json"]
+    assert graph.cycles() == []
+
+    (tree / "other" / "gamma.json").unlink()
+    assert graph.update(tree) == {"other/gamma.json"}
+    assert "other/gamma.json" not in graph.edges
+    assert graph.edges["specs/beta_spec.json"] == [] and graph.edges["specs/c.json"] == []
+
+
+def test_partial_components_under_export_validation(tmp_path):
+    source = tmp_path / "source"
+    components = "components/production"
+    _write(source, f"{components}/geo/meta.json", {"resources": {"index": "./reference/index.json"}})
+    _write(source, f"{components}/geo/reference/index.json", {"entries": []})
+    _write(source, f"{components}/geo/specs/core/lines.json", {"name": "lines"})
+    _write(source, f"{components}/geo/specs/geometry_spec.json", {"name": "geometry"})
+    _write(source, f"{components}/net/specs/routing.json", {"depends_on": ["geometry_spec", "lines"]})
+    _write(source, "config/component_mapping.json", {"geo": {"tier": "partial", "core_subdirs": ["specs/core"]},
+                                                     "net": {"tier": "full"}})
+
+    tier_filter = TierFilter(source, source / "config", spec_cache=None, ref_graph_dir=tmp_path / "graph",
+                             validator_cache=tmp_path / "validators")
+    assert not tier_filter.filter_and_export(tmp_path / "core", "core")
+    assert tier_filter.errors == [f"Dangling reference: {components}/net/specs/routing.json -> "
+                                  f"{components}/geo/specs/geometry_spec.json (not in the core export)"]
+    assert tier_filter.warnings == [f"Reference into a subdirectory left out of the core export: "
+                                    f"{components}/geo/meta.json -> {components}/geo/reference/index.json"]
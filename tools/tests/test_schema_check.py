@@ -0,0 +1,154 @@
+"""Schema checks: compiled validators, their on-disk cache, and which specs each schema governs"""
+
+import json
+import importlib.util
+
+import pytest
+
+import schema_check
+from filter import TierFilter
+from schema_check import SchemaError, compile_schema, load_schema, load_validator, match_schemas, schema_digest
+
+
+def _validate(schema, data):
+    namespace = {}
+    exec(compile_schema(schema), namespace)
+    errors = []
+    namespace["validate"](data, "", errors)
+    return errors
+
+
+@pytest.mark.parametrize("schema, valid, invalid", [
+    ({"type": "integer"}, [1, 2.0], [1.5, True, "1"]),
+    ({"type": ["string", "null"]}, ["a", None], [0, []]),
+    ({"enum": [1, "a", [1]]}, [1, 1.0, "a", [1]], [True, "b", [2]]),
+    ({"const": False}, [False], [0, None]),
+    ({"allOf": [{"minimum": 1}, {"maximum": 3}]}, [1, 3], [0, 4]),
+    ({"anyOf": [{"type": "string"}, {"minimum": 0}]}, ["x", 5], [-1]),
+    ({"oneOf": [{"type": "integer"}, {"minimum": 0}]}, [-1, 0.5], [1]),
+    ({"not": {"type": "null"}}, [0], [None]),
+    ({"if": {"type": "integer"}, "then": {"minimum": 0}, "else": {"type": "string"}}, [0, "a"], [-1, 0.5]),
+    ({"pattern": r"^v\d+$", "minLength": 2, "maxLength": 3}, ["v1", "v12", 7], ["v", "x1", "v123"]),
+    ({"exclusiveMinimum": 0, "multipleOf": 0.5}, [0.5, 2], [0, 0.7]),
+    ({"$defs": {"name": {"type": "string"}}, "items": {"$ref": "#/$defs/name"}}, [["a"], []], [["a", 1]]),
+    ({"type": "array", "prefixItems": [{"type": "string"}], "items": False}, [["a"]], [[1], ["a", "b"]]),
+    ({"type": "array", "minItems": 1, "uniqueItems": True, "contains": {"const": 1}}, [[1, 2]], [[], [2], [1, 1]]),
+])
+def test_compiled_keywords(schema, valid, invalid):
+    for value in valid:
+        assert _validate(schema, value) == [], value
+    for value in invalid:
+        assert _validate(schema, value), value
+
+
+def test_object_keywords_report_paths():
+    schema = {
+        "type": "object",
+        "required": ["name"],
+        "properties": {"name": {"type": "string"}, "a/b": {"type": "integer"}},
+        "patternProperties": {"^x-": {"type": "boolean"}},
+        "additionalProperties": False,
+        "dependentRequired": {"min": ["max"]},
+        "maxProperties": 4,
+    }
+    assert _validate(schema, {"name": "n", "x-debug": True}) == []
+    errors = dict(_validate(schema, {"name": 1, "a/b": "2", "x-debug": 0, "min": 1, "other": 0}))
+    assert errors["/name"] == "expected string, got integer"
+    assert errors["/a~1b"] == "expected integer, got string"
+    assert errors["/x-debug"] == "expected boolean, got integer"
+    assert "unexpected property 'other'" in [message for path, message in _validate(schema, {"other": 0})]
+    assert "property 'max' is required by 'min'" in [message for _, message in
+                                                      _validate(schema, {"name": "n", "min": 1})]
+
+
+def test_recursive_ref():
+    schema = {"type": "object", "properties": {"children": {"type": "array", "items": {"$ref": "#"}}}}
+    errors = _validate(schema, {"children": [{"children": [{"children": 1}]}]})
+    assert errors == [("/children/0/children/0/children", "expected array, got integer")]
+
+
+@pytest.mark.parametrize("schema, message", [
+    ({"$ref": "other.json#/a"}, "non-local"),
+    ({"$ref": "#/missing"}, "unresolvable"),
+    ({"pattern": "("}, "invalid pattern"),
+    ({"type": "float"}, "unknown type"),
+    ({"items": 3}, "is not a schema"),
+])
+def test_uncompilable_schemas(schema, message):
+    with pytest.raises(SchemaError, match=message):
+        compile_schema(schema)
+
+
+def test_lenient_schema_backslashes(tmp_path):
+    path = tmp_path / "version.schema.json"
+    path.write_text('{"pattern": "^v[0-9]+(\\.[0-9]+)*$"}')
+    schema, strict = load_schema(path)
+    assert not strict and schema["pattern"] == r"^v[0-9]+(\.[0-9]+)*$"
+
+
+def test_validator_memory_disk_and_compiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema_check, "_VALIDATORS", {})
+    schema_path = tmp_path / "count.schema.json"
+    schema_path.write_text(json.dumps({"type": "integer"}))
+    digest = schema_digest(schema_path)
+    cache_dir = tmp_path / "validators"
+
+    validate, origin, _ = load_validator(str(schema_path), digest, str(cache_dir))
+    assert origin == "compiled"
+    cache_file = cache_dir / digest[:2] / f"{digest}.bin"
+    assert cache_file.read_bytes().startswith(importlib.util.MAGIC_NUMBER)
+    assert load_validator(str(schema_path), digest, str(cache_dir))[:2] == (validate, "memory")
+
+    schema_check._VALIDATORS.clear()
+    validate, origin, _ = load_validator(str(schema_path), digest, str(cache_dir))
+    errors = []
+    validate("1", "", errors)
+    assert origin == "disk" and errors == [("", "expected integer, got string")]
+
+    schema_check._VALIDATORS.clear()
+    cache_file.write_bytes(b"\x00\x00\x00\x00" + cache_file.read_bytes()[4:])  # another interpreter's magic
+    assert load_validator(str(schema_path), digest, str(cache_dir))[1] == "compiled"
+
+
+def test_match_by_schema_id_and_rules(tmp_path):
+    files = {
+        "schemas/item.schema.json": {"$id": "https://hypersync.dev/item", "type": "object"},
+        "schemas/relative.schema.json": {"type": "object"},
+        "specs/by_id.json": {"$schema": "https://hypersync.dev/item"},
+        "specs/by_path.json": {"$schema": "../schemas/relative.schema.json"},
+        "specs/meta.json": {"$schema": "http://json-schema.org/draft-07/schema#"},
+        "capsules/manifest.schema.json": {"type": "object"},
+        "capsules/a.capsule.json": {},
+        "capsules/nested/b.capsule.json": {},
+        "specs/c.capsule.json": {},
+    }
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(json.dumps(content))
+
+    matches = {path[len(str(tmp_path)) + 1:]: [target[len(str(tmp_path)) + 1:] for target in targets]
+               for path, targets in match_schemas(tmp_path, {"manifest.schema.json": ["*.capsule.json"]}).items()}
+    assert matches == {
+        "specs/by_id.json": ["schemas/item.schema.json"],
+        "specs/by_path.json": ["schemas/relative.schema.json"],
+        "capsules/a.capsule.json": ["capsules/manifest.schema.json"],
+        "capsules/nested/b.capsule.json": ["capsules/manifest.schema.json"],
+    }
+
+
+def test_lenient_schema_is_reported_for_every_tier(tmp_path):
+    source = tmp_path / "source"
+    protocols = source / "shared" / "protocols"
+    protocols.mkdir(parents=True)
+    (protocols / "version.schema.json").write_text('{"type": "object", "properties": '
+                                                   '{"version": {"pattern": "^v[0-9]+(\\.[0-9]+)*$"}}}')
+    (protocols / "release.json").write_text(json.dumps({"$schema": "version.schema.json", "version": "v1.2"}))
+    (source / "config").mkdir()
+    (source / "config" / "tier_rules.json").write_text(json.dumps({"core": {}, "basic": {}}))
+
+    tier_filter = TierFilter(source, source / "config", spec_cache=None, ref_graph_dir=tmp_path / "graph",
+                             validator_cache=tmp_path / "validators")
+    assert tier_filter.export_tiers({"core": tmp_path / "core", "basic": tmp_path / "basic"})
+    lenient = [warning for warning in tier_filter.warnings if "is not strict JSON" in warning]
+    assert len(lenient) == 2
+    assert any(str(tmp_path / "basic") in warning for warning in lenient)
@@ -0,0 +1,100 @@
+"""Structural spec diff: operation and key changes between two exports, from cached streaming parses"""
+
+import json
+
+import pytest
+
+from spec_diff import SpecParseCache, diff_exports, has_changes, summarize_document
+
+BEFORE = {
+    "geometry.json": {"metadata": {"tier": "core"}, "category": "geometry", "operations": [
+        {"name": "geodesic", "complexity_class": "O(n)", "returns": "float"},
+        {"name": "transport", "complexity_class": "O(n^2)"},
+    ]},
+    "numerics.json": {"metadata": {"tier": "core"}, "operations": [{"name": "lerp", "complexity_class": "O(1)"}]},
+}
+
+
+def _export(root, specs):
+    specs_dir = root / "specifications" / "core"
+    specs_dir.mkdir(parents=True)
+    for name, spec in specs.items():
+        (specs_dir / name).write_text(json.dumps(spec))
+    return root
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SpecParseCache(tmp_path / "parse-cache")
+
+
+def test_identical_exports_have_no_changes(tmp_path, cache):
+    before = cache.load_export(_export(tmp_path / "before", BEFORE))
+    after = cache.load_export(_export(tmp_path / "after", BEFORE))
+    assert not has_changes(diff_exports(before, after))
+    assert (cache.stats["parsed"], cache.stats["cached"]) == (2, 2)  # same content, parsed once
+
+
+def test_operation_and_key_changes(tmp_path, cache):
+    geometry = json.loads(json.dumps(BEFORE["geometry.json"]))
+    geometry["operations"][0]["complexity_class"] = "O(n log n)"
+    geometry["operations"].append({"name": "lerp", "complexity_class": "O(1)"})
+    geometry["metadata"]["version"] = "2"
+    after_specs = {"geometry.json": geometry, "extra.json": {"operations": [{"name": "slerp"}]}}
+
+    diff = diff_exports(cache.load_export(_export(tmp_path / "before", BEFORE)),
+                        cache.load_export(_export(tmp_path / "after", after_specs)))
+    label = "specifications/core/geometry.json"
+    assert diff["documents"] == {"added": ["specifications/core/extra.json"],
+                                 "removed": ["specifications/core/numerics.json"], "modified": [label]}
+    assert [op["name"] for op in diff["operations"]["added"]] == ["slerp"]
+    assert diff["operations"]["removed"] == []
+    [modified] = diff["operations"]["modified"]
+    assert modified["name"] == "geodesic"
+    assert modified["changes"]["complexity_class"] == ["O(n)", "O(n log n)"]
+    [moved] = diff["operations"]["moved"]
+    assert moved["source"] == ["specifications/core/numerics.json", label]
+    assert f"{label}#metadata.version" in diff["keys"]["added"]
+
+
+def test_unchanged_files_are_not_reread(tmp_path):
+    export = _export(tmp_path / "export", BEFORE)
+    cache = SpecParseCache(tmp_path / "parse-cache")
+    first = cache.load_export(export)
+    cache.save()
+
+    cache = SpecParseCache(tmp_path / "parse-cache")
+    assert cache.load_export(export) == first
+    assert (cache.stats["hashed"], cache.stats["parsed"], cache.stats["cached"]) == (0, 0, 2)
+
+
+def test_malformed_document_warns_and_is_not_cached(tmp_path, cache):
+    export = _export(tmp_path / "export", {})
+    (export / "specifications" / "core" / "bad.json").write_text('{"operations": [')
+    assert cache.load_export(export) == {}
+    assert cache.warnings[0].startswith("Could not parse specifications/core/bad.json: ")
+    cache.load_export(export)
+    assert cache.stats["parsed"] == 2
+
+
+def test_streaming_summary_reads_in_small_chunks():
+    data = json.dumps(BEFORE["geometry.json"]).encode("utf-8")
+    chunks = iter(data[i:i + 3] for i in range(0, len(data), 3))
+    summary = summarize_document(lambda size: next(chunks, b""))
+    assert summary["tier"] == "core"
+    assert [op["name"] for op in summary["operations"]] == ["geodesic", "transport"]
+    assert summary["operations"][0]["category"] == "geometry"
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 16])
+@pytest.mark.parametrize("old, new", [('"O(1)"', '"O(1)",,'), ('"geometry",', '"geometry"')])
+def test_parse_errors_report_document_positions(chunk_size, old, new):
+    text = json.dumps(BEFORE["geometry.json"] | BEFORE["numerics.json"], indent=2).replace(old, new, 1)
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    data = text.encode("utf-8")
+    chunks = iter(data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+    with pytest.raises(ValueError) as found:
+        summarize_document(lambda size: next(chunks, b""))
+    error = expected.value
+    assert str(found.value).endswith(f"line {error.lineno} column {error.colno} (char {error.pos})")
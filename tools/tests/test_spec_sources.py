@@ -0,0 +1,87 @@
+"""Tar spec bundles: JSON members are streamed and validated in memory, nested bundles included"""
+
+import io
+import json
+import tarfile
+
+import pytest
+
+from filter import TierFilter, compile_exclude_matcher, compile_keyword_matcher, validate_archive
+from spec_sources import iter_spec_documents
+
+
+def _tar_bytes(members, mode="w:gz"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as tar:
+        for name, data in members.items():
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    inner = _tar_bytes({"inner.json": json.dumps({"metadata": {"tier": "pro"}})}, mode="w")
+    path = tmp_path / "specs" / "bundle.tar.gz"
+    path.parent.mkdir()
+    path.write_bytes(_tar_bytes({
+        "./ok.json": json.dumps({"metadata": {"tier": "core"}, "ops": ["add"]}),
+        "quantum/notes.txt": "not json",
+        "quantum/bad.json": '{"ops": [1,,]}',
+        "nested.tar": inner,
+    }))
+    return path
+
+
+def _checks(tier="core"):
+    return [(tier, compile_keyword_matcher(["quantum"]), compile_exclude_matcher(["*/quantum/*"]))]
+
+
+def test_members_are_streamed_without_extraction(bundle, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("bundle members must not be extracted to disk")
+    monkeypatch.setattr(tarfile.TarFile, "extract", refuse)
+    monkeypatch.setattr(tarfile.TarFile, "extractall", refuse)
+
+    documents = {label: read() for label, _, read in iter_spec_documents(bundle.parent)}
+    assert sorted(documents) == ["bundle.tar.gz!nested.tar!inner.json", "bundle.tar.gz!ok.json",
+                                 "bundle.tar.gz!quantum/bad.json"]
+    assert json.loads(documents["bundle.tar.gz!ok.json"])["ops"] == ["add"]
+    assert sorted(path.name for path in bundle.parent.iterdir()) == ["bundle.tar.gz"]
+
+
+def test_archive_members_are_validated(bundle):
+    [(errors, warnings)] = validate_archive(str(bundle), _checks())
+    assert sorted(label for label, _ in errors) == ["<archive>!nested.tar!inner.json", "<archive>!quantum"]
+    assert "has tier 'pro', expected 'core'" in dict(errors)["<archive>!nested.tar!inner.json"]
+    assert [label for label, _ in warnings] == ["<archive>!quantum/bad.json"]
+    assert warnings[0][1].startswith("Could not validate <archive>!quantum/bad.json: ")
+
+
+def test_corrupt_bundle_is_a_warning(tmp_path):
+    path = tmp_path / "broken.tar.gz"
+    path.write_bytes(_tar_bytes({"a.json": "{}"})[:40])
+    [(errors, warnings)] = validate_archive(str(path), _checks())
+    assert errors == []
+    assert warnings[0][1].startswith("Could not validate <archive>: ")
+
+
+def test_export_validation_labels_members_and_caches_bundles(bundle, tmp_path, capsys):
+    export = tmp_path / "export"
+    export.mkdir()
+    bundle.rename(export / "bundle.tar.gz")
+    tier_filter = TierFilter(tmp_path, tmp_path / "config", spec_cache=None, ref_graph_dir=tmp_path / "graph",
+                             validator_cache=tmp_path / "validators")
+    assert not tier_filter.validate_tier_export(export, "core")
+    label = f"{export / 'bundle.tar.gz'}!quantum/bad.json"
+    assert tier_filter.warnings == [f"Could not validate {label}: Expecting value: line 1 column 12 (char 11)"]
+    assert "Scanned 1 core archives (0 unchanged, cached)" in capsys.readouterr().out
+
+    tier_filter = TierFilter(tmp_path, tmp_path / "config", spec_cache=None, ref_graph_dir=tmp_path / "graph",
+                             validator_cache=tmp_path / "validators")
+    assert not tier_filter.validate_tier_export(export, "core")
+    assert "Scanned 0 core archives (1 unchanged, cached)" in capsys.readouterr().out
+    assert tier_filter.warnings == [f"Could not validate {label}: Expecting value: line 1 column 12 (char 11)"]
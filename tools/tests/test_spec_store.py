@@ -0,0 +1,114 @@
+"""Spec store: parsed documents survive a reopen only while the file is unchanged"""
+
+import json
+import os
+
+import pytest
+
+import spec_store
+from spec_store import CACHE_MAGIC, CACHE_VERSION, SpecStore
+
+
+@pytest.fixture
+def spec_file(tmp_path):
+    path = tmp_path / "spec.json"
+    path.write_text(json.dumps({"name": "geodesic", "version": 1}))
+    return path
+
+
+def _read(path, cache_file):
+    with SpecStore(cache_file=cache_file) as store:
+        try:
+            return store.read(path), store
+        except ValueError as e:
+            return e, store
+
+
+def test_cache_hit_after_flush_and_reopen(spec_file, tmp_path):
+    cache_file = tmp_path / "cache" / "specs.pack"
+    document, store = _read(spec_file, cache_file)
+    assert document == {"name": "geodesic", "version": 1} and store.stats["parsed"] == 1
+    assert cache_file.read_bytes().startswith(CACHE_MAGIC)
+
+    document, store = _read(spec_file, cache_file)
+    assert document == {"name": "geodesic", "version": 1}
+    assert (store.stats["parsed"], store.stats["cached"]) == (0, 1)
+    assert store.read(spec_file) is document and store.stats["memory"] == 1
+
+
+def test_changed_mtime_or_size_is_reparsed(spec_file, tmp_path):
+    cache_file = tmp_path / "specs.pack"
+    _read(spec_file, cache_file)
+
+    st = os.stat(spec_file)
+    os.utime(spec_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    document, store = _read(spec_file, cache_file)
+    assert store.stats["parsed"] == 1 and store.cache.stats["misses"] == 1
+
+    spec_file.write_text(json.dumps({"name": "geodesic", "version": 22}))
+    os.utime(spec_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))  # same mtime, new size
+    document, store = _read(spec_file, cache_file)
+    assert document["version"] == 22 and store.stats["parsed"] == 1
+
+    document, store = _read(spec_file, cache_file)
+    assert document["version"] == 22 and store.stats["cached"] == 1
+
+
+def test_parse_errors_are_cached(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('{"name": ')
+    cache_file = tmp_path / "specs.pack"
+    error, store = _read(path, cache_file)
+    assert isinstance(error, ValueError) and store.stats["parsed"] == 1
+
+    error, store = _read(path, cache_file)
+    assert isinstance(error, ValueError) and "JSONDecodeError" in str(error)
+    assert (store.stats["parsed"], store.stats["cached"]) == (0, 1)
+    spec = store.open(path)
+    with pytest.raises(ValueError, match="Could not parse"):
+        spec["name"]
+
+
+def test_cache_from_another_python_is_ignored(spec_file, tmp_path):
+    cache_file = tmp_path / "specs.pack"
+    _read(spec_file, cache_file)
+    data = bytearray(cache_file.read_bytes())
+    data[:spec_store._HEADER.size] = spec_store._HEADER.pack(CACHE_MAGIC, CACHE_VERSION, 2, 7)
+    cache_file.write_bytes(bytes(data))
+
+    document, store = _read(spec_file, cache_file)
+    assert document["name"] == "geodesic" and store.stats["parsed"] == 1
+    assert store.cache.warnings and "another format or Python version" in store.cache.warnings[0]
+    assert cache_file.read_bytes()[:spec_store._HEADER.size] == spec_store._HEADER.pack(
+        CACHE_MAGIC, CACHE_VERSION, *spec_store._PYTHON)
+
+    document, store = _read(spec_file, cache_file)
+    assert store.stats["cached"] == 1 and not store.cache.warnings
+
+
+def test_superseded_records_are_compacted(spec_file, tmp_path):
+    cache_file = tmp_path / "specs.pack"
+    other = tmp_path / "other.json"
+    other.write_text(json.dumps({"name": "transport"}))
+    st = os.stat(spec_file)
+    sizes = []
+    compactions = 0
+    for edit in range(4):
+        os.utime(spec_file, ns=(st.st_atime_ns, st.st_mtime_ns + edit * 1_000_000))
+        with SpecStore(cache_file=cache_file) as store:
+            store.read(spec_file)
+            store.read(other)
+        compactions += store.cache.stats["compactions"]
+        sizes.append(cache_file.stat().st_size)
+        if store.cache.stats["compactions"]:
+            break
+    assert compactions == 1
+    assert store.cache._dead == 0
+    assert sizes[-1] < sizes[-2]
+
+    _, index_dead = spec_store.ParseCache._scan(cache_file.read_bytes())
+    assert index_dead == 0
+    document, store = _read(spec_file, cache_file)
+    assert document["name"] == "geodesic" and store.stats["cached"] == 1
+    _, store = _read(other, cache_file)
+    assert store.stats["cached"] == 1
@@ -0,0 +1,75 @@
+"""Exported tiers ship runnable tools: every import a tool needs is exported with it"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+FILTER = PROJECT_ROOT / "tools" / "tier-filter" / "filter.py"
+
+
+def _run(args, cwd):
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    return subprocess.run([sys.executable, *map(str, args)], cwd=cwd, env=env, capture_output=True, text=True)
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["full", "incremental"])
+def core_export(request, tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("export")
+    args = [FILTER, "--source", PROJECT_ROOT, "--output", tmp / "core", "--tier", "core",
+            "--spec-cache", tmp / "spec-store.pack"]
+    if request.param:
+        args.append("--incremental")
+    result = _run(args, tmp)
+    assert result.returncode == 0, result.stdout + result.stderr
+    return tmp / "core"
+
+
+@pytest.mark.parametrize("tool", ["tier-filter/filter.py", "live-analyzer/analyze.py"])
+def test_exported_tool_starts(core_export, tool):
+    result = _run([core_export / "tools" / tool, "--help"], core_export.parent)
+    assert result.returncode == 0, result.stderr
+    assert "usage:" in result.stdout
+
+
+def test_exported_tools_include_spec_store(core_export):
+    assert (core_export / "tools" / "spec-store" / "spec_store.py").is_file()
+    with open(core_export / "tools" / "index.json") as f:
+        assert "spec-store" in json.load(f)["available_tools"]
+
+
+def test_exported_analyzer_reads_specs(core_export):
+    """The exported live analyzer resolves components through the exported spec store"""
+    component = next(path.name for path in (core_export / "components" / "production").iterdir() if path.is_dir())
+    result = _run([core_export / "tools" / "live-analyzer" / "analyze.py", "--project-root", core_export,
+                   "report", "--component", component], core_export.parent)
+    assert result.returncode == 0, result.stderr
+    assert "Report generated" in result.stdout
+
+
+def _tree(root):
+    files = {}
+    for dirpath, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if d != ".tier-filter"]
+        for name in names:
+            path = Path(dirpath) / name
+            files[path.relative_to(root).as_posix()] = path.read_bytes()
+    return files
+
+
+def test_one_pass_export_matches_single_tier_exports(tmp_path):
+    spec_cache = ["--spec-cache", tmp_path / "spec-store.pack"]
+    result = _run([FILTER, "--source", PROJECT_ROOT, "--output", tmp_path / "multi", "--tiers", "core,basic",
+                   *spec_cache], tmp_path)
+    assert result.returncode == 0, result.stdout + result.stderr
+    for tier in ("core", "basic"):
+        result = _run([FILTER, "--source", PROJECT_ROOT, "--output", tmp_path / tier, "--tier", tier, *spec_cache],
+                      tmp_path)
+        assert result.returncode == 0, result.stdout + result.stderr
+        single = _tree(tmp_path / tier)
+        assert single
+        assert _tree(tmp_path / "multi" / tier) == single
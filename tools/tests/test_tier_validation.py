@@ -0,0 +1,50 @@
+"""Per-file tier validation: tier and keyword errors, and warnings for files that cannot be checked"""
+
+import io
+import json
+import tarfile
+
+from filter import compile_keyword_matcher, validate_file_tiers
+
+
+def _checks(*tiers, keywords=("enterprise_only",)):
+    return [(tier, compile_keyword_matcher(list(keywords)), None) for tier in tiers]
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_malformed_json_is_reported(tmp_path):
+    path = _write(tmp_path / "broken.json", '{"metadata": {"tier": "core"}, "a": [1, 2,]}')
+    for errors, warnings in validate_file_tiers(path, _checks("core", "pro")):
+        assert errors == []
+        assert len(warnings) == 1 and warnings[0][1].startswith(f"Could not validate {path}: ")
+
+
+def test_tier_and_keyword_errors(tmp_path):
+    path = _write(tmp_path / "spec.json", json.dumps({"metadata": {"tier": "pro"}, "ops": ["enterprise_only"]}))
+    (core_errors, _), (pro_errors, _) = validate_file_tiers(path, _checks("core", "pro"))
+    assert "has tier 'pro', expected 'core'" in core_errors[0][1]
+    assert "forbidden keyword: enterprise_only" in pro_errors[0][1]
+
+
+def test_nested_and_non_object_metadata(tmp_path):
+    nested = _write(tmp_path / "nested.json", json.dumps({"items": [{"metadata": {"tier": "pro"}}]}))
+    listed = _write(tmp_path / "list.json", json.dumps([{"metadata": {"tier": "pro"}}]))
+    for path in (nested, listed):
+        assert validate_file_tiers(path, _checks("core")) == [([], [])]
+
+
+def test_malformed_archive_member_is_reported(tmp_path):
+    path = tmp_path / "bundle.tar.gz"
+    with tarfile.open(path, "w:gz") as tar:
+        for name, text in (("ok.json", '{"a": 1}'), ("specs/bad.json", '{"a": }')):
+            data = text.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    [(errors, warnings)] = validate_file_tiers(str(path), _checks("core"))
+    assert errors == []
+    assert [label for label, _ in warnings] == ["<archive>!specs/bad.json"]
@@ -0,0 +1,111 @@
+"""Usage segments: rolling the active log into a columnar segment keeps every call counted"""
+
+import json
+from datetime import datetime
+
+from aggregates import ComponentAggregates
+from usage_store import SegmentWriter, UsageSegment, UsageStore
+
+
+def _write_log(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for timestamp, function, duration_ms in rows:
+            f.write(json.dumps({"timestamp": timestamp, "function": function, "duration_ms": duration_ms}) + "\n")
+
+
+ROWS = [("2026-02-19T22:00:00.250000", "geodesic", 1.5),
+        ("2026-02-19T22:00:01", "transport", 4.0),
+        ("2026-02-19T22:05:00", "geodesic", 2.5)]
+
+
+def test_segment_round_trip(tmp_path):
+    writer = SegmentWriter()
+    for row in ROWS:
+        writer.add(*row)
+    path = tmp_path / "00000001.useg"
+    writer.write(path, source_inode=7, source_bytes=123)
+
+    with UsageSegment(path) as segment:
+        assert segment.names == ["geodesic", "transport"]
+        assert list(segment.function_ids) == [0, 1, 0]
+        assert list(segment.durations) == [1.5, 4.0, 2.5]
+        assert list(segment.timestamps_us()) == [
+            round(datetime.fromisoformat(timestamp).timestamp() * 1_000_000) for timestamp, _, _ in ROWS]
+        assert (segment.source_inode, segment.source_bytes) == (7, 123)
+
+
+def test_forced_roll_preserves_counts(tmp_path):
+    analysis_dir = tmp_path / "analysis"
+    store = UsageStore(analysis_dir / "usage-patterns")
+    _write_log(store.active_file, ROWS)
+
+    aggregates = ComponentAggregates.load(analysis_dir)
+    aggregates.update_usage(store, roll="force")
+    aggregates.save()
+    assert store.segment_names() == ["00000001.useg"]
+    assert not store.active_file.exists() and store.rolling_file.exists()  # kept until the next roll
+
+    _write_log(store.active_file, ROWS[:1])
+    aggregates = ComponentAggregates.load(analysis_dir)
+    aggregates.update_usage(store)
+    assert aggregates.segments_read == 0 and aggregates.usage.total_calls == 4
+
+    rebuilt = ComponentAggregates.load(analysis_dir, rebuild=True)
+    rebuilt.update_usage(store)
+    assert rebuilt.segments_read == 1
+    assert rebuilt.usage.total_calls == 4
+    assert rebuilt.usage.functions["geodesic"].count == 3
+
+
+def test_interrupted_roll_is_finished_once(tmp_path):
+    analysis_dir = tmp_path / "analysis"
+    store = UsageStore(analysis_dir / "usage-patterns")
+    _write_log(store.active_file, ROWS)
+    aggregates = ComponentAggregates.load(analysis_dir)
+    aggregates.update_usage(store)
+    aggregates.save()
+
+    store.begin_roll()  # a roll that crashed before writing its segment
+    _write_log(store.active_file, ROWS[1:2])
+    aggregates = ComponentAggregates.load(analysis_dir)
+    aggregates.update_usage(store)
+    aggregates.save()
+    assert store.segment_names() == ["00000001.useg"]
+    assert aggregates.usage.total_calls == 4
+    assert aggregates.usage.functions["transport"].count == 2
+
+    aggregates = ComponentAggregates.load(analysis_dir)
+    aggregates.update_usage(store)
+    assert store.segment_names() == ["00000001.useg"] and aggregates.usage.total_calls == 4
+
+
+def test_appends_to_the_rolled_log_are_kept(tmp_path):
+    analysis_dir = tmp_path / "analysis"
+    store = UsageStore(analysis_dir / "usage-patterns")
+    _write_log(store.active_file, ROWS)
+    with open(store.active_file, "a") as late_writer:  # opened before the roll renames the log
+        aggregates = ComponentAggregates.load(analysis_dir)
+        aggregates.update_usage(store, roll="force")
+        aggregates.save()
+        late_writer.write(json.dumps({"timestamp": ROWS[0][0], "function": "late", "duration_ms": 1.0}) + "\n")
+        late_writer.write('{"timestamp": "2026-02-19T22:06:00", "function": "late", "dur')
+        late_writer.flush()
+
+        aggregates = ComponentAggregates.load(analysis_dir)
+        aggregates.update_usage(store)
+        aggregates.save()
+        assert store.segment_names() == ["00000001.useg", "00000002.useg"]
+        assert aggregates.usage.functions["late"].count == 1
+
+        late_writer.write('ation_ms": 3.0}\n')
+    _write_log(store.active_file, ROWS[:1])
+    aggregates = ComponentAggregates.load(analysis_dir)
+    aggregates.update_usage(store, roll="force")
+    aggregates.save()
+    assert aggregates.usage.functions["late"].count == 2
+    assert aggregates.usage.total_calls == 6
+
+    rebuilt = ComponentAggregates.load(analysis_dir, rebuild=True)
+    rebuilt.update_usage(store)
+    assert rebuilt.usage.total_calls == 6 and rebuilt.usage.skipped_lines == 0
@@ -0,0 +1,103 @@
+"""Watch mode: source changes are detected, debounced, re-exported and re-validated file by file"""
+
+import json
+import time
+
+import pytest
+
+from filter import TierFilter
+from watcher import InotifyWatcher, PollingWatcher
+
+SPEC = {"metadata": {"tier": "core"}, "operations": [{"name": "add"}]}
+
+
+@pytest.fixture
+def source(tmp_path):
+    specs = tmp_path / "source" / "specifications" / "core"
+    specs.mkdir(parents=True)
+    for name in ("ops.json", "curves.json"):
+        (specs / name).write_text(json.dumps(SPEC))
+    return tmp_path / "source"
+
+
+def _touch(path, text):
+    path.write_text(text)
+    time.sleep(0.01)  # keep mtimes of successive writes apart on coarse-grained filesystems
+
+
+def test_polling_watcher_reports_edits_adds_and_deletes(source):
+    specs = source / "specifications" / "core"
+    ignored = source / "specifications" / "build"
+    ignored.mkdir()
+    watcher = PollingWatcher([source], ignore=[ignored], interval=0.01)
+    _touch(specs / "ops.json", json.dumps(SPEC, indent=2))
+    (specs / "new").mkdir()
+    _touch(specs / "new" / "lines.json", "{}")
+    (specs / "curves.json").unlink()
+    _touch(ignored / "out.json", "{}")
+
+    assert watcher.wait(0.05) == {specs / "ops.json", specs / "new", specs / "new" / "lines.json",
+                                  specs / "curves.json"}
+    assert watcher._changes(0) == set()
+
+
+def test_debounce_merges_a_burst_of_changes(source):
+    specs = source / "specifications" / "core"
+    watcher = PollingWatcher([source], interval=0.01)
+    _touch(specs / "a.json", "{}")
+    _touch(specs / "b.json", "{}")
+    assert watcher.wait(0.2) == {specs / "a.json", specs / "b.json"}
+
+
+def test_inotify_watches_new_directories(source):
+    try:
+        watcher = InotifyWatcher([source])
+    except OSError as e:
+        pytest.skip(f"inotify unavailable: {e}")
+    specs = source / "specifications" / "core"
+    try:
+        (specs / "nested").mkdir()
+        assert specs / "nested" in watcher.wait(0.05)
+        _touch(specs / "nested" / "deep.json", "{}")
+        (specs / "ops.json").unlink()
+        assert {specs / "nested" / "deep.json", specs / "ops.json"} <= watcher.wait(0.05)
+    finally:
+        watcher.close()
+
+
+def test_changes_reach_the_export_and_the_validation_results(source, tmp_path, monkeypatch):
+    tier_filter = TierFilter(source, source / "config", spec_cache=None, ref_graph_dir=tmp_path / "graph",
+                             validator_cache=tmp_path / "validators")
+    outputs = {"core": tmp_path / "core"}
+    assert tier_filter.export_tiers(outputs, incremental=True)
+    watcher = tier_filter._open_watcher(outputs, poll_interval=0.01)
+
+    validated = []
+    run_validation = tier_filter._run_validation
+    monkeypatch.setattr(tier_filter, "_run_validation",
+                        lambda worker, paths, *args: validated.append(paths) or run_validation(worker, paths, *args))
+    specs = source / "specifications" / "core"
+    exported = outputs["core"] / "specifications" / "core"
+
+    def sync():
+        validated.clear()
+        tier_filter._sync_changes(outputs, watcher.wait(0.05), validate=True)
+        return sorted(path for paths in validated[:1] for path in paths)
+
+    _touch(specs / "ops.json", json.dumps(dict(SPEC, operations=[])))
+    assert sync() == [str(specs / "ops.json")]
+    assert json.loads((exported / "ops.json").read_text())["operations"] == []
+
+    _touch(specs / "quantum.json", json.dumps({"uses": "quantum"}))
+    assert sync() == [str(specs / "quantum.json")]
+    assert (exported / "quantum.json").exists()
+    errors, _ = tier_filter.validation_results["core"][str(exported / "quantum.json")]
+    assert "forbidden keyword: quantum" in errors[0][1]
+    assert str(exported / "curves.json") in tier_filter.validation_results["core"]
+
+    (specs / "quantum.json").unlink()
+    sync()
+    assert not (exported / "quantum.json").exists()
+    assert str(exported / "quantum.json") not in tier_filter.validation_results["core"]
+    assert tier_filter.errors == []
+    watcher.close()
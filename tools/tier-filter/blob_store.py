@@ -0,0 +1,183 @@
+"""
+HyperSync Export Blob Store
+Content-addressed file store that tier exports are materialized from
+"""
+
+import os
+import json
+import errno
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - reflinks are Linux-only
+    fcntl = None
+
+LINK_MODES = ["auto", "reflink", "hardlink", "copy"]
+FICLONE = 0x40049409  # linux/fs.h _IOW(0x94, 9, int)
+HASH_CACHE_FILE = "hash_cache.json"
+HASH_CACHE_VERSION = 1
+
+# Errors meaning "this kind of link is not possible here", as opposed to real I/O failures
+_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL,
+                errno.ENOSYS}
+
+
+class BlobStore:
+    """Stores each distinct file content once, under objects/<sha[:2]>/<sha[2:]>.
+
+    Source digests are cached by (path, size, mtime) so unchanged files are
+    hashed once across exports. Objects are made read-only because hardlinked
+    exports share them. Safe to use from several threads.
+    """
+
+    def __init__(self, root: Path, link_mode: str = "auto"):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode {link_mode}; expected one of {LINK_MODES}")
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.link_mode = link_mode
+        self._methods = ["reflink", "hardlink", "copy"] if link_mode == "auto" else [link_mode]
+        self._hash_cache = self._load_hash_cache()
+        self._hash_cache_dirty = False
+        self.stats = {"hashed": 0, "hash_cached": 0, "stored": 0, "stored_bytes": 0,
+                      "reflink": 0, "hardlink": 0, "copy": 0}
+        self.placements: Dict[str, List[str]] = {}
+        self.sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _load_hash_cache(self) -> Dict[str, Any]:
+        cache_file = self.root / HASH_CACHE_FILE
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+            if cache.get("version") == HASH_CACHE_VERSION:
+                return cache["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def save(self):
+        """Persist the source hash cache"""
+        if not self._hash_cache_dirty:
+            return
+        cache_file = self.root / HASH_CACHE_FILE
+        tmp_file = cache_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump({"version": HASH_CACHE_VERSION, "files": self._hash_cache}, f)
+        os.replace(tmp_file, cache_file)
+        self._hash_cache_dirty = False
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def digest(self, src: Path, st: Optional[os.stat_result] = None) -> str:
+        """SHA-256 of a source file, from the cache when size and mtime are unchanged"""
+        st = st or os.stat(src)
+        key = str(Path(src).resolve())
+        cached = self._hash_cache.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            with self._lock:
+                self.stats["hash_cached"] += 1
+            return cached[2]
+
+        h = hashlib.sha256()
+        with open(src, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self._hash_cache[key] = [st.st_size, st.st_mtime_ns, digest]
+            self._hash_cache_dirty = True
+            self.stats["hashed"] += 1
+        return digest
+
+    def add(self, src: Path, digest: Optional[str] = None) -> str:
+        """Store a file's content if it is not stored yet, returning its digest"""
+        st = os.stat(src)
+        digest = digest or self.digest(src, st)
+        self.sizes[digest] = st.st_size
+        obj = self.object_path(digest)
+        if obj.exists():
+            return digest
+
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_name(f"{obj.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copy2(src, tmp)
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, obj)
+        with self._lock:
+            self.stats["stored"] += 1
+            self.stats["stored_bytes"] += st.st_size
+        return digest
+
+    def materialize(self, digest: str, dst: Path, label: Optional[str] = None) -> str:
+        """Place a stored object at dst, returning the method used (reflink, hardlink or copy)"""
+        obj = self.object_path(digest)
+        dst = Path(dst)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if dst.is_symlink() or dst.exists():
+            dst.unlink()
+
+        for method in list(self._methods):
+            try:
+                if method == "reflink":
+                    self._reflink(obj, dst)
+                elif method == "hardlink":
+                    os.link(obj, dst)
+                else:
+                    shutil.copy2(obj, dst)
+                    os.chmod(dst, 0o644)
+            except OSError as e:
+                if method == "copy" or e.errno not in _UNSUPPORTED or self.link_mode != "auto":
+                    raise
+                # Not supported between these paths/filesystems: stop trying it for this store
+                with self._lock:
+                    if method in self._methods:
+                        self._methods.remove(method)
+                continue
+            with self._lock:
+                self.stats[method] += 1
+                self.placements.setdefault(digest, []).append(label or str(dst))
+            return method
+        raise OSError(f"Could not materialize {digest} at {dst}")
+
+    @staticmethod
+    def _reflink(src: Path, dst: Path):
+        if fcntl is None:
+            raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            try:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            except OSError:
+                d.close()
+                os.unlink(dst)
+                raise
+        shutil.copystat(src, dst)
+        os.chmod(dst, 0o644)
+
+    def duplicate_groups(self) -> List[Dict[str, Any]]:
+        """Contents placed at more than one path in this run, largest savings first"""
+        groups = [
+            {"sha256": digest, "size": self.sizes.get(digest, 0), "paths": sorted(paths)}
+            for digest, paths in self.placements.items() if len(paths) > 1
+        ]
+        groups.sort(key=lambda g: (-g["size"] * (len(g["paths"]) - 1), g["sha256"]))
+        return groups
+
+    def summary(self) -> Dict[str, Any]:
+        groups = self.duplicate_groups()
+        placed = sum(len(paths) for paths in self.placements.values())
+        return {
+            **self.stats,
+            "placed": placed,
+            "unique": len(self.placements),
+            "duplicate_groups": len(groups),
+            "duplicate_files": sum(len(g["paths"]) - 1 for g in groups),
+            "deduplicated_bytes": sum(g["size"] * (len(g["paths"]) - 1) for g in groups),
+        }
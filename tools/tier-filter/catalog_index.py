@@ -0,0 +1,362 @@
+"""
+HyperSync Operation Catalog Index
+Build and query a SQLite index of operations declared across spec files
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+from spec_sources import iter_spec_containers, iter_container_documents
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS containers (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT,
+    complexity_class TEXT,
+    complexity TEXT,
+    returns TEXT,
+    tier TEXT,
+    source TEXT NOT NULL,
+    container TEXT NOT NULL,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    operation_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    type TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_operations_name ON operations(name);
+CREATE INDEX IF NOT EXISTS idx_operations_category ON operations(category, complexity_class);
+CREATE INDEX IF NOT EXISTS idx_operations_complexity ON operations(complexity_class);
+CREATE INDEX IF NOT EXISTS idx_operations_container ON operations(container);
+CREATE INDEX IF NOT EXISTS idx_operations_source ON operations(source);
+CREATE INDEX IF NOT EXISTS idx_parameters_type ON parameters(type, operation_id);
+CREATE INDEX IF NOT EXISTS idx_parameters_operation ON parameters(operation_id);
+"""
+
+_COMPLEXITY = re.compile(r"O\((?:[^()]|\([^()]*\))*\)")
+_TYPE_WORD = re.compile(r"[a-z_]+")
+_TYPE_ALIASES = {
+    "list": "array",
+    "int": "integer",
+    "double": "float",
+    "number": "float",
+    "numeric": "float",
+    "str": "string",
+    "bool": "boolean",
+}
+_GROUPING_KEYS = {"categories", "sections"}
+_MAX_DEPTH = 6
+
+
+def normalize_complexity(value: Any) -> Optional[str]:
+    """Reduce a complexity annotation to its big-O term, e.g. 'O(n) where n is ...' -> 'O(n)'"""
+    if isinstance(value, dict):
+        value = value.get("time") or value.get("complexity")
+    if not isinstance(value, str) or not value.strip():
+        return None
+    match = _COMPLEXITY.search(value)
+    return " ".join((match.group(0) if match else value).split())
+
+
+def normalize_type(value: Any) -> Optional[str]:
+    """Canonical parameter type: lowercase, `<>` generics, common aliases folded"""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip().lower().replace(" ", "").rstrip("?")
+    value = value.replace("[", "<").replace("]", ">")
+    return _TYPE_WORD.sub(lambda m: _TYPE_ALIASES.get(m.group(0), m.group(0)), value)
+
+
+def _described_type(value: Any) -> Optional[str]:
+    """Type from a `{"type": ...}` dict or a `"type - description"` string"""
+    if isinstance(value, dict):
+        return value.get("type") if isinstance(value.get("type"), str) else None
+    if isinstance(value, str) and " - " in value:
+        return value.split(" - ", 1)[0]
+    return None
+
+
+def _parameters(op: Dict[str, Any]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """(name, normalized type) pairs from the several parameter layouts used by specs"""
+    params = op.get("parameters", op.get("params", op.get("input")))
+    result = []
+    if isinstance(params, list):
+        for param in params:
+            if isinstance(param, dict):
+                result.append((param.get("name"), normalize_type(param.get("type"))))
+    elif isinstance(params, dict):
+        for name, spec in params.items():
+            result.append((name, normalize_type(_described_type(spec))))
+    return result
+
+
+def _returns(op: Dict[str, Any]) -> Optional[str]:
+    """Normalized return type(s), comma-joined for multi-valued returns"""
+    returns = op.get("returns", op.get("output"))
+    single = _described_type(returns)
+    if single or isinstance(returns, str):
+        return normalize_type(single or returns)
+    if isinstance(returns, dict):
+        types = [normalize_type(_described_type(spec)) for spec in returns.values()]
+        return ",".join(t for t in types if t) or None
+    return None
+
+
+def _operation_records(value: Any, category: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """Yield operations from a list of op dicts or a name -> op dict mapping"""
+    if isinstance(value, list):
+        items = [(None, op) for op in value]
+    elif isinstance(value, dict):
+        items = list(value.items())
+    else:
+        return
+        
+    for key, op in items:
+        record = operation_record(key, op, category)
+        if record:
+            yield record
+
+
+def operation_record(key: Optional[str], op: Any, category: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Normalized record for one operation entry (keyed by name in a map, or key=None in a list)"""
+    if not isinstance(op, dict):
+        return None
+    name = op.get("name") or key or op.get("id")
+    if not isinstance(name, str):
+        return None
+    return {
+        "name": name,
+        "category": op.get("category") if isinstance(op.get("category"), str) else category,
+        "complexity_class": normalize_complexity(op.get("complexity_class") or op.get("complexity")),
+        "complexity": json.dumps(op["complexity"]) if isinstance(op.get("complexity"), dict)
+        else op.get("complexity"),
+        "returns": _returns(op),
+        "description": op.get("description") if isinstance(op.get("description"), str) else None,
+        "parameters": _parameters(op),
+    }
+
+
+def extract_operations(doc: Any) -> Iterator[Dict[str, Any]]:
+    """Find operation records anywhere in a spec document.
+    
+    Handles top-level `operations` lists, name-keyed operation maps, and
+    operations grouped under `categories`/`sections` or named heuristic
+    groups; the enclosing group name is used as the category when an
+    operation does not declare one.
+    """
+    if not isinstance(doc, dict):
+        return
+    category = doc.get("category") if isinstance(doc.get("category"), str) else None
+    yield from _walk(doc, category, 0)
+
+
+def _walk(node: Dict[str, Any], category: Optional[str], depth: int) -> Iterator[Dict[str, Any]]:
+    for key, value in node.items():
+        if key == "operations":
+            yield from _operation_records(value, category)
+        elif isinstance(value, dict) and depth < _MAX_DEPTH:
+            yield from _walk(value, category if key in _GROUPING_KEYS else key, depth + 1)
+
+
+def _document_tier(doc: Any) -> Optional[str]:
+    """Declared tier, from the top level or the metadata block"""
+    if not isinstance(doc, dict):
+        return None
+    for holder in (doc, doc.get("metadata"), doc.get("specification")):
+        if isinstance(holder, dict) and isinstance(holder.get("tier"), str):
+            return holder["tier"].lower()
+    return None
+
+
+def _match_clause(column: str, value: str) -> Tuple[str, str]:
+    """Exact match, or GLOB when the value contains wildcards"""
+    if any(ch in value for ch in "*?["):
+        return f"{column} GLOB ?", value
+    return f"{column} = ?", value
+
+
+class CatalogIndex:
+    """SQLite-backed operation index, updated incrementally per spec file/bundle"""
+    
+    def __init__(self, index_file: Path):
+        self.index_file = Path(index_file)
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.index_file))
+        self.conn.row_factory = sqlite3.Row
+        self._ensure_schema()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self.conn.close()
+    
+    def _ensure_schema(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS containers; DROP TABLE IF EXISTS operations; DROP TABLE IF EXISTS parameters;"
+            )
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def update(self, export_dir: Path, skip_dirs: Tuple[str, ...] = (),
+               skip_files: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """Re-index spec files and bundles that changed since the last update.
+        
+        Unchanged containers are recognised by size and mtime (then by
+        SHA-256), so only added or modified files are parsed.
+        """
+        known = {row["path"]: row for row in self.conn.execute("SELECT * FROM containers")}
+        stats = {"indexed": 0, "unchanged": 0, "removed": 0, "operations": 0, "warnings": []}
+        seen = set()
+        
+        with self.conn:
+            for label, path in iter_spec_containers(export_dir, skip_dirs):
+                if label in skip_files:
+                    continue
+                seen.add(label)
+                st = os.stat(path)
+                row = known.get(label)
+                if row and row["size"] == st.st_size and row["mtime_ns"] == st.st_mtime_ns:
+                    stats["unchanged"] += 1
+                    continue
+                    
+                digest = _hash_file(path)
+                if row and row["sha256"] == digest:
+                    self.conn.execute("UPDATE containers SET size = ?, mtime_ns = ? WHERE path = ?",
+                                      (st.st_size, st.st_mtime_ns, label))
+                    stats["unchanged"] += 1
+                    continue
+                    
+                self._delete_container(label)
+                stats["operations"] += self._index_container(path, label, stats["warnings"])
+                self.conn.execute("INSERT OR REPLACE INTO containers VALUES (?, ?, ?, ?)",
+                                  (label, st.st_size, st.st_mtime_ns, digest))
+                stats["indexed"] += 1
+                
+            for label in set(known) - seen:
+                self._delete_container(label)
+                self.conn.execute("DELETE FROM containers WHERE path = ?", (label,))
+                stats["removed"] += 1
+                
+        return stats
+    
+    def _delete_container(self, label: str):
+        self.conn.execute(
+            "DELETE FROM parameters WHERE operation_id IN (SELECT id FROM operations WHERE container = ?)", (label,)
+        )
+        self.conn.execute("DELETE FROM operations WHERE container = ?", (label,))
+    
+    def _index_container(self, path: Path, label: str, warnings: List[str]) -> int:
+        """Stream one file or bundle into the index, returning the operation count"""
+        count = 0
+        on_error = lambda doc_label, e: warnings.append(f"Could not index {doc_label}: {e}")
+        for doc_label, read in iter_container_documents(path, label, on_error):
+            try:
+                doc = json.loads(read())
+            except ValueError as e:
+                warnings.append(f"Could not index {doc_label}: {e}")
+                continue
+                
+            tier = _document_tier(doc)
+            for op in extract_operations(doc):
+                cursor = self.conn.execute(
+                    "INSERT INTO operations (name, category, complexity_class, complexity, returns, tier, "
+                    "source, container, description) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (op["name"], op["category"], op["complexity_class"], op["complexity"], op["returns"],
+                     tier, doc_label, label, op["description"])
+                )
+                self.conn.executemany(
+                    "INSERT INTO parameters VALUES (?, ?, ?, ?)",
+                    [(cursor.lastrowid, position, name, ptype)
+                     for position, (name, ptype) in enumerate(op["parameters"])]
+                )
+                count += 1
+        return count
+    
+    def query(self, name: Optional[str] = None, category: Optional[str] = None,
+              complexity: Optional[str] = None, param_type: Optional[str] = None,
+              returns: Optional[str] = None, source: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Look up operations; string filters accept `*`/`?` glob wildcards.
+        
+        Example: query(category="*geometr*", complexity="O(log n)", param_type="array<float>")
+        """
+        clauses = []
+        args = []
+        for column, value in [("o.name", name), ("o.category", category), ("o.source", source)]:
+            if value:
+                clause, arg = _match_clause(column, value)
+                clauses.append(clause)
+                args.append(arg)
+        if complexity:
+            clause, arg = _match_clause("o.complexity_class", normalize_complexity(complexity) or complexity)
+            clauses.append(clause)
+            args.append(arg)
+        if returns:
+            clause, arg = _match_clause("o.returns", normalize_type(returns) or returns)
+            clauses.append(clause)
+            args.append(arg)
+        if param_type:
+            clause, arg = _match_clause("p.type", normalize_type(param_type) or param_type)
+            clauses.append(f"o.id IN (SELECT p.operation_id FROM parameters p WHERE {clause})")
+            args.append(arg)
+            
+        sql = "SELECT o.* FROM operations o"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY o.name, o.source"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+            
+        rows = [dict(row) for row in self.conn.execute(sql, args)]
+        if rows:
+            params = {}
+            ids = [row["id"] for row in rows]
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                for p in self.conn.execute(
+                    f"SELECT * FROM parameters WHERE operation_id IN ({','.join('?' * len(chunk))}) "
+                    "ORDER BY operation_id, position", chunk
+                ):
+                    params.setdefault(p["operation_id"], []).append({"name": p["name"], "type": p["type"]})
+            for row in rows:
+                row["parameters"] = params.get(row.pop("id"), [])
+        return rows
+    
+    def source_counts(self) -> Dict[str, int]:
+        """Operation count per spec document"""
+        return {row[0]: row[1] for row in self.conn.execute(
+            "SELECT source, COUNT(*) FROM operations GROUP BY source ORDER BY source"
+        )}
+    
+    def total_operations(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -8,42 +8,99 @@ import os
 import sys
 import json
 import shutil
+import hashlib
+import posixpath
 import argparse
+import time
+import atexit
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, List, Optional, Any, Pattern
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
 import re
 
+from spec_sources import ARCHIVE_ERRORS, is_archive, iter_archive_members, iter_spec_containers
+from catalog_index import CatalogIndex
+from blob_store import BlobStore, LINK_MODES
+from watcher import open_watcher
+from spec_diff import SpecParseCache, DEFAULT_PARSE_CACHE, diff_exports, has_changes
+from ref_graph import ReferenceGraph, DEFAULT_GRAPH_DIR
+from schema_check import DEFAULT_VALIDATOR_CACHE, load_schema, match_schemas, schema_digest, validate_against_schemas
+
+SPEC_STORE_DIR = str(Path(__file__).resolve().parent.parent / "spec-store")
+if SPEC_STORE_DIR not in sys.path:
+    sys.path.insert(0, SPEC_STORE_DIR)
+from spec_store import DEFAULT_CACHE_FILE as DEFAULT_SPEC_CACHE, SpecStore
+
 
 class TierFilter:
     """Main tier filtering and extraction logic"""
     
     CORE_TIER = "core"
     VALID_TIERS = ["core", "basic", "pro", "advanced", "enterprise"]
+    STATE_DIR = ".tier-filter"
+    MANIFEST_FILE = "manifest.json"
+    MANIFEST_VERSION = 1
+    VALIDATION_CACHE_FILE = "validation_cache.json"
+    VALIDATION_CACHE_VERSION = 2
+    CATALOG_INDEX_FILE = "catalog.sqlite"
+    DUPLICATES_FILE = "duplicates.json"
+    SCHEMA_TIMINGS_FILE = "schema_timings.json"
+    # Per-export state swapped in and out while several tiers are planned in one pass
+    EXPORT_STATE = ("_output_dir", "_label_prefix", "_manifest", "_previous_manifest", "export_delta", "_routes")
     
-    def __init__(self, source_dir: Path, config_dir: Path):
+    def __init__(self, source_dir: Path, config_dir: Path, jobs: int = 1, store_dir: Optional[Path] = None,
+                 link_mode: str = "auto", ref_graph_dir: Path = DEFAULT_GRAPH_DIR,
+                 validator_cache: Path = DEFAULT_VALIDATOR_CACHE, spec_cache: Optional[Path] = DEFAULT_SPEC_CACHE):
         self.source_dir = Path(source_dir)
         self.config_dir = Path(config_dir)
+        self.jobs = jobs
+        self.specs = SpecStore(self.source_dir, spec_cache)
+        self.blob_store = BlobStore(store_dir, link_mode) if store_dir else None
         self.tier_rules = self._load_tier_rules()
         self.component_mapping = self._load_component_mapping()
+        self.schema_rules = self._load_schema_rules()
         self.errors = []
         self.warnings = []
+        self.incremental = False
+        self.export_delta = {}
+        self._output_dir = None
+        self._label_prefix = ""
+        self._previous_manifest = {}
+        self._manifest = {}
+        self._routes = []
+        self._states = {}
+        self.validation_results: Dict[str, Dict[str, Any]] = {}
+        self.reference_results: Dict[str, Any] = {}
+        self.ref_graph_dir = Path(ref_graph_dir)
+        self._ref_graph = None
+        self.schema_results: Dict[str, Any] = {}
+        self.validator_cache = Path(validator_cache)
+        self._schema_memo: Dict[Any, Dict[str, Any]] = {}
+        self._strict_schemas: Dict[str, bool] = {}
+        self._begin_pass()
         
     def _load_tier_rules(self) -> Dict[str, Any]:
         """Load tier boundary rules from config"""
         rules_file = self.config_dir / "tier_rules.json"
         if rules_file.exists():
-            with open(rules_file, 'r') as f:
-                return json.load(f)
+            return self.specs.open(rules_file)
         return self._default_tier_rules()
     
     def _load_component_mapping(self) -> Dict[str, Any]:
         """Load component tier assignments from config"""
         mapping_file = self.config_dir / "component_mapping.json"
         if mapping_file.exists():
-            with open(mapping_file, 'r') as f:
-                return json.load(f)
+            return self.specs.open(mapping_file)
         return self._default_component_mapping()
     
+    def _load_schema_rules(self) -> Dict[str, List[str]]:
+        """Load which spec files each schema governs from config"""
+        rules_file = self.config_dir / "schema_rules.json"
+        if rules_file.exists():
+            return self.specs.open(rules_file)
+        return self._default_schema_rules()
+    
     def _default_tier_rules(self) -> Dict[str, Any]:
         """Default tier filtering rules"""
         return {
@@ -63,6 +120,10 @@ class TierFilter:
             }
         }
     
+    def _default_schema_rules(self) -> Dict[str, List[str]]:
+        """Default schema file name -> spec file globs it governs within its directory"""
+        return {"manifest.schema.json": ["*.capsule.json"], "receipt.schema.json": ["*.receipt.json"]}
+    
     def _default_component_mapping(self) -> Dict[str, Any]:
         """Default component tier assignments"""
         return {
@@ -77,7 +138,8 @@ class TierFilter:
             "mxfy": {"tier": "none"}
         }
     
-    def filter_and_export(self, output_dir: Path, target_tier: str = "core", validate: bool = True) -> bool:
+    def filter_and_export(self, output_dir: Path, target_tier: str = "core", validate: bool = True,
+                          incremental: bool = False) -> bool:
         """Filter and export files for target tier"""
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -85,6 +147,9 @@ class TierFilter:
         print(f"[TierFilter] Filtering {target_tier} tier from {self.source_dir}")
         print(f"[TierFilter] Output directory: {output_dir}")
         
+        self._begin_pass()
+        self._begin_export(output_dir, target_tier, incremental)
+        
         self._export_specifications(output_dir, target_tier)
         self._export_components(output_dir, target_tier)
         self._export_tools(output_dir, target_tier)
@@ -92,6 +157,9 @@ class TierFilter:
         self._export_shared(output_dir, target_tier)
         self._export_docs(output_dir, target_tier)
         
+        self._finish_export(output_dir, target_tier)
+        self._report_store(output_dir)
+        
         if validate:
             print(f"\n[TierFilter] Validating {target_tier} tier export...")
             is_valid = self.validate_tier_export(output_dir, target_tier)
@@ -102,12 +170,436 @@ class TierFilter:
                 return False
         
         print(f"\n[TierFilter] ✅ Export complete: {output_dir}")
+        self._print_warnings()
+        return True
+    
+    def export_tiers(self, outputs: Dict[str, Path], validate: bool = True, incremental: bool = False) -> bool:
+        """Export several tiers in one pass over the source tree.
+
+        Every tier is planned first against one shared walk and stat of the source;
+        then each source file is read once and written to all tiers that include it.
+        """
+        outputs = {tier: Path(output_dir) for tier, output_dir in outputs.items()}
+        print(f"[TierFilter] Filtering {', '.join(outputs)} tiers from {self.source_dir}")
+        
+        start = time.perf_counter()
+        self._begin_pass(defer=True)
+        self._states = {}
+        for tier, output_dir in outputs.items():
+            output_dir.mkdir(parents=True, exist_ok=True)
+            print(f"\n[TierFilter] Planning {tier} tier -> {output_dir}")
+            self._begin_export(output_dir, tier, incremental)
+            self._label_prefix = f"{tier}/"
+            self._export_specifications(output_dir, tier)
+            self._export_components(output_dir, tier)
+            self._export_tools(output_dir, tier)
+            self._export_workspace(output_dir, tier)
+            self._export_shared(output_dir, tier)
+            self._export_docs(output_dir, tier)
+            self._save_state(tier)
+            
+        sources, placements = self._flush_placements()
+        print(f"\n[TierFilter] Wrote {placements} files from {sources} source files "
+              f"({len(self._trees)} source trees walked once) in {time.perf_counter() - start:.2f}s")
+              
+        for tier, output_dir in outputs.items():
+            self._restore_state(tier)
+            self._finish_export(output_dir, tier)
+            self._save_state(tier)
+        self._report_store(*outputs.values())
+        
+        if validate:
+            print(f"\n[TierFilter] Validating {', '.join(outputs)} tier exports...")
+            results = self.validate_exports(outputs, self._sources)
+            failed = [tier for tier, is_valid in results.items() if not is_valid]
+            if failed:
+                print(f"[TierFilter] ❌ Validation failed for {', '.join(failed)} with {len(self.errors)} errors")
+                for error in self.errors:
+                    print(f"  ERROR: {error}")
+                return False
+                
+        for tier, output_dir in outputs.items():
+            print(f"\n[TierFilter] ✅ Export complete: {output_dir} ({tier})")
+        self._print_warnings()
+        return True
+    
+    def watch(self, outputs: Dict[str, Path], validate: bool = True, debounce: float = 0.2,
+              poll_interval: Optional[float] = None):
+        """Export the tiers, then stay resident re-exporting and re-validating only what changes"""
+        self.source_dir = Path(os.path.abspath(self.source_dir))
+        outputs = {tier: Path(os.path.abspath(output_dir)) for tier, output_dir in outputs.items()}
+        self.export_tiers(outputs, validate, incremental=True)
+        
+        watcher = self._open_watcher(outputs, poll_interval)
+        try:
+            while True:
+                changed = watcher.wait(debounce)
+                if any(path == self.config_dir or self.config_dir in path.parents for path in changed):
+                    print(f"\n[Watch] Tier configuration changed, re-exporting everything")
+                    self.tier_rules = self._load_tier_rules()
+                    self.component_mapping = self._load_component_mapping()
+                    self.schema_rules = self._load_schema_rules()
+                    self.errors = []
+                    self.warnings = []
+                    self.export_tiers(outputs, validate, incremental=True)
+                    watcher.close()
+                    watcher = self._open_watcher(outputs, poll_interval)
+                    continue
+                self._sync_changes(outputs, changed, validate)
+        except KeyboardInterrupt:
+            print("\n[Watch] Stopped")
+        finally:
+            watcher.close()
+    
+    def _open_watcher(self, outputs: Dict[str, Path], poll_interval: Optional[float]):
+        roots = {Path(os.path.abspath(src)) for state in self._states.values() for src, _ in state["_routes"]}
+        roots.add(Path(os.path.abspath(self.config_dir)))
+        roots = sorted(root for root in roots if not any(parent in roots for parent in root.parents))
+        watcher = open_watcher(roots, ignore=outputs.values(), poll_interval=poll_interval)
+        print(f"\n[Watch] Watching {len(roots)} source paths with {watcher.kind} (Ctrl-C to stop)")
+        return watcher
+    
+    def _sync_changes(self, outputs: Dict[str, Path], paths, validate: bool):
+        """Re-apply each tier's routes to just the changed source paths and revalidate what they touched"""
+        start = time.perf_counter()
+        self.errors = []
+        self.warnings = []
+        self._begin_pass()
+        changed = {}
+        for tier, output_dir in outputs.items():
+            self._restore_state(tier)
+            self._previous_manifest = self._manifest
+            self.export_delta = {"added": [], "changed": [], "removed": [], "unchanged": 0}
+            for src, dst in sorted(self._affected(paths)):
+                self._sync_path(src, dst)
+            delta = self.export_delta
+            touched = delta["added"] + delta["changed"] + delta["removed"]
+            if touched:
+                self._save_manifest(output_dir, tier)
+            changed[tier] = [output_dir / rel_path for rel_path in touched]
+            self._save_state(tier)
+        if self.blob_store:
+            self.blob_store.save()
+        export_ms = (time.perf_counter() - start) * 1000
+        
+        summary = ", ".join(f"{tier}: {len(files)}" for tier, files in changed.items() if files) or "no exported files"
+        print(f"\n[Watch] {len(paths)} source changes -> {summary} updated in {export_ms:.1f} ms")
+        if not validate or not any(changed.values()):
+            return
+            
+        start = time.perf_counter()
+        results = self.validate_exports(outputs, self._sources, only=changed)
+        validate_ms = (time.perf_counter() - start) * 1000
+        checked = sum(len(files) for files in changed.values())
+        if all(results.values()):
+            print(f"  ✅ {checked} exported files revalidated in {validate_ms:.1f} ms: "
+                  f"{', '.join(results)} valid")
+        else:
+            failed = [tier for tier, is_valid in results.items() if not is_valid]
+            print(f"  ❌ {checked} exported files revalidated in {validate_ms:.1f} ms: "
+                  f"{len(self.errors)} errors in {', '.join(failed)}")
+            for error in self.errors[:10]:
+                print(f"  ERROR: {error}")
+    
+    def _affected(self, paths):
+        """(source, export) pairs of the current tier's routes that the changed source paths fall under"""
+        affected = set()
+        for path in paths:
+            for src, dst in self._routes:
+                if path == src or src in path.parents:
+                    affected.add((path, dst / path.relative_to(src)))
+                elif path in src.parents:
+                    affected.add((src, dst))
+        return affected
+    
+    def _sync_path(self, src: Path, dst: Path):
+        """Bring an exported file or tree in line with its source, removing what no longer exists"""
+        rel_path = Path(os.path.relpath(dst, self._output_dir)).as_posix()
+        present = set()
+        if src.is_dir():
+            for rel_file in self._list_tree(src):
+                try:
+                    self._sync_file(src / rel_file, dst / rel_file)
+                except FileNotFoundError:
+                    continue
+                present.add(f"{rel_path}/{Path(rel_file).as_posix()}")
+        elif src.is_file():
+            try:
+                self._sync_file(src, dst)
+                present.add(rel_path)
+            except FileNotFoundError:
+                pass
+                
+        prefix = rel_path + "/"
+        for key in [key for key in self._manifest if key == rel_path or key.startswith(prefix)]:
+            if key not in present:
+                self._remove_exported(key)
+    
+    def _save_state(self, tier: str):
+        self._states[tier] = {name: getattr(self, name) for name in self.EXPORT_STATE}
+    
+    def _restore_state(self, tier: str):
+        for name, value in self._states[tier].items():
+            setattr(self, name, value)
+    
+    def _print_warnings(self):
         if self.warnings:
             print(f"[TierFilter] ⚠️  {len(self.warnings)} warnings:")
             for warning in self.warnings[:10]:
                 print(f"  WARNING: {warning}")
         
-        return True
+    def _begin_pass(self, defer: bool = False):
+        """Reset the per-run source caches; with defer, placements are queued for _flush_placements"""
+        self._trees: Dict[Path, List[str]] = {}
+        self._stats: Dict[Path, os.stat_result] = {}
+        self._digests: Dict[Path, str] = {}
+        self._sources: Dict[str, str] = {}
+        self._pending: Optional[Dict[Path, List]] = {} if defer else None
+        if self.blob_store:
+            self.blob_store.placements = {}
+    
+    def _begin_export(self, output_dir: Path, tier: str, incremental: bool):
+        """Reset export state and load the previous manifest for incremental runs"""
+        self.incremental = incremental
+        self._output_dir = output_dir
+        self._manifest = {}
+        self._previous_manifest = {}
+        self._routes = []
+        self.export_delta = {"added": [], "changed": [], "removed": [], "unchanged": 0}
+        
+        if not incremental:
+            return
+            
+        manifest_file = output_dir / self.STATE_DIR / self.MANIFEST_FILE
+        if manifest_file.exists():
+            try:
+                with open(manifest_file, 'r') as f:
+                    manifest = json.load(f)
+                if manifest.get("version") == self.MANIFEST_VERSION and manifest.get("tier") == tier:
+                    self._previous_manifest = manifest.get("files", {})
+                else:
+                    self.warnings.append(f"Ignoring stale export manifest {manifest_file}")
+            except (OSError, ValueError) as e:
+                self.warnings.append(f"Could not read export manifest {manifest_file}: {e}")
+    
+    def _finish_export(self, output_dir: Path, tier: str):
+        """Remove files that disappeared from the source and persist the manifest"""
+        if not self.incremental:
+            return
+            
+        for rel_path in sorted(set(self._previous_manifest) - set(self._manifest)):
+            self._remove_exported(rel_path)
+            
+        self._save_manifest(output_dir, tier)
+        self._print_delta(tier)
+    
+    def _save_manifest(self, output_dir: Path, tier: str):
+        state_dir = output_dir / self.STATE_DIR
+        state_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = state_dir / self.MANIFEST_FILE
+        tmp_file = manifest_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump({
+                "version": self.MANIFEST_VERSION,
+                "tier": tier,
+                "source": str(self.source_dir.resolve()),
+                "files": self._manifest
+            }, f, indent=1, sort_keys=True)
+        os.replace(tmp_file, manifest_file)
+        
+    def _print_delta(self, tier: str):
+        delta = self.export_delta
+        print(f"\n[Incremental] {tier}: {len(delta['added'])} added, {len(delta['changed'])} changed, "
+              f"{len(delta['removed'])} removed, {delta['unchanged']} unchanged")
+        for kind in ["added", "changed", "removed"]:
+            for rel_path in delta[kind][:10]:
+                print(f"  {kind.upper():8} {rel_path}")
+            if len(delta[kind]) > 10:
+                print(f"  ... {len(delta[kind]) - 10} more {kind}")
+    
+    def _report_store(self, *output_dirs: Path):
+        """Persist the blob store's hash cache and report duplicate content in this export"""
+        if not self.blob_store:
+            return
+            
+        self.blob_store.save()
+        summary = self.blob_store.summary()
+        groups = self.blob_store.duplicate_groups()
+        for output_dir in output_dirs:
+            state_dir = output_dir / self.STATE_DIR
+            state_dir.mkdir(parents=True, exist_ok=True)
+            with open(state_dir / self.DUPLICATES_FILE, 'w') as f:
+                json.dump({"summary": summary, "groups": groups}, f, indent=1)
+            
+        print(f"\n[Store] {summary['placed']} files placed from {summary['unique']} distinct blobs "
+              f"({summary['stored']} new, {summary['stored_bytes']:,} bytes stored)")
+        print(f"  reflink: {summary['reflink']}, hardlink: {summary['hardlink']}, copy: {summary['copy']}; "
+              f"hashed {summary['hashed']}, {summary['hash_cached']} from cache")
+        print(f"  {summary['duplicate_files']} duplicate files in {summary['duplicate_groups']} groups "
+              f"({summary['deduplicated_bytes']:,} bytes deduplicated)")
+        for group in groups[:5]:
+            print(f"  {len(group['paths'])}x {group['size']:,} bytes: {', '.join(group['paths'][:3])}"
+                  f"{' ...' if len(group['paths']) > 3 else ''}")
+    
+    def _remove_exported(self, rel_path: str):
+        """Delete a file that is no longer exported and drop it from the manifest"""
+        dst = self._output_dir / rel_path
+        if dst.is_file():
+            dst.unlink()
+            self._prune_empty_dirs(dst.parent, self._output_dir)
+        self._manifest.pop(rel_path, None)
+        self.export_delta["removed"].append(rel_path)
+    
+    def _prune_empty_dirs(self, directory: Path, stop_at: Path):
+        """Remove now-empty parent directories up to (not including) stop_at"""
+        while directory != stop_at and stop_at in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
+    
+    def _copy_tree(self, src: Path, dst: Path):
+        """Copy a directory tree, skipping unchanged files in incremental mode"""
+        self._routes.append((src, dst))
+        if not self.incremental and not self.blob_store and self._pending is None:
+            shutil.copytree(src, dst, dirs_exist_ok=True, copy_function=self._replace_file)
+            return
+            
+        for rel_path in self._list_tree(src):
+            self._sync_file(src / rel_path, dst / rel_path)
+    
+    def _list_tree(self, src: Path) -> List[str]:
+        """Relative paths of all files under src, walked once per run"""
+        files = self._trees.get(src)
+        if files is None:
+            files = []
+            for root, dirs, names in os.walk(src):
+                dirs.sort()
+                rel_root = os.path.relpath(root, src)
+                files.extend(os.path.normpath(os.path.join(rel_root, name)) for name in sorted(names))
+            self._trees[src] = files
+        return files
+    
+    def _stat(self, path: Path) -> os.stat_result:
+        st = self._stats.get(path)
+        if st is None:
+            st = self._stats[path] = os.stat(path)
+        return st
+    
+    def _file_digest(self, path: Path, st: Optional[os.stat_result] = None) -> str:
+        """SHA-256 of a file, computed at most once per run (and cached across runs by the blob store)"""
+        digest = self._digests.get(path)
+        if digest is None:
+            digest = self.blob_store.digest(path, st) if self.blob_store else self._hash_file(path)
+            self._digests[path] = digest
+        return digest
+    
+    def _copy_file(self, src: Path, dst: Path):
+        """Copy a single file, consulting the manifest in incremental mode"""
+        self._routes.append((src, dst))
+        self._sync_file(src, dst)
+    
+    def _sync_file(self, src: Path, dst: Path):
+        self._sources[str(dst)] = str(src)
+        if not self.incremental:
+            self._place_file(src, dst)
+            return
+            
+        rel_path = Path(os.path.relpath(dst, self._output_dir)).as_posix()
+        st = self._stat(src)
+        previous = self._previous_manifest.get(rel_path)
+        
+        try:
+            dst_size = os.stat(dst).st_size
+        except FileNotFoundError:
+            dst_size = None
+            
+        if previous and dst_size == st.st_size == previous["size"] and previous["mtime_ns"] == st.st_mtime_ns:
+            self._manifest[rel_path] = previous
+            self.export_delta["unchanged"] += 1
+            return
+            
+        digest = self._file_digest(src, st)
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+        self._manifest[rel_path] = entry
+        
+        if previous and dst_size == st.st_size and previous["sha256"] == digest:
+            self.export_delta["unchanged"] += 1
+            return
+            
+        self._place_file(src, dst, digest)
+        self.export_delta["changed" if previous else "added"].append(rel_path)
+    
+    def _place_file(self, src: Path, dst: Path, digest: Optional[str] = None):
+        """Write one export file: linked from the blob store if enabled, copied otherwise"""
+        label = self._label_prefix + Path(os.path.relpath(dst, self._output_dir)).as_posix()
+        if self._pending is not None:
+            self._pending.setdefault(src, []).append((dst, label, digest))
+            return
+            
+        self._place_copies(src, [(dst, label, digest)])
+    
+    def _place_copies(self, src: Path, targets: List):
+        """Write one source file to every (dst, label, digest) target, reading it once"""
+        if self.blob_store:
+            digest = self.blob_store.add(src, next((d for _, _, d in targets if d), None))
+            for dst, label, _ in targets:
+                self.blob_store.materialize(digest, dst, label)
+            return
+            
+        for dst, _, _ in targets:
+            dst.parent.mkdir(parents=True, exist_ok=True)
+        if len(targets) == 1:
+            self._replace_file(src, targets[0][0])
+            return
+            
+        with ExitStack() as stack:
+            source = stack.enter_context(open(src, 'rb'))
+            outputs = []
+            for dst, _, _ in targets:
+                self._unlink_shared(dst)
+                outputs.append(stack.enter_context(open(dst, 'wb')))
+            for chunk in iter(lambda: source.read(1 << 20), b""):
+                for output in outputs:
+                    output.write(chunk)
+        for dst, _, _ in targets:
+            shutil.copystat(src, dst)
+    
+    def _flush_placements(self):
+        """Write all deferred placements on a thread pool, returning (source files, placements)"""
+        pending, self._pending = self._pending or {}, None
+        jobs = self.jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(pending) < 2:
+            for src, targets in pending.items():
+                self._place_copies(src, targets)
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                list(pool.map(self._place_copies, pending.keys(), pending.values()))
+        return len(pending), sum(len(targets) for targets in pending.values())
+    
+    @staticmethod
+    def _replace_file(src, dst):
+        """copy2 that never writes through a hardlink shared with a blob store or another export"""
+        TierFilter._unlink_shared(dst)
+        return shutil.copy2(src, dst)
+    
+    @staticmethod
+    def _unlink_shared(path):
+        try:
+            if os.lstat(path).st_nlink > 1:
+                os.unlink(path)
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """SHA-256 of a file's content"""
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
     
     def _export_specifications(self, output_dir: Path, tier: str):
         """Export specifications for target tier"""
@@ -116,13 +608,13 @@ class TierFilter:
         specs_dst = output_dir / "specifications" / tier
         
         if specs_src.exists():
-            shutil.copytree(specs_src, specs_dst, dirs_exist_ok=True)
+            self._copy_tree(specs_src, specs_dst)
             print(f"  ✓ Copied {tier} specifications")
         
         for doc in ["CORE_TIER_PROMOTIONS.md", "HYPERSYNC_COMPLETE_TIER_HIERARCHY.md"]:
             doc_src = self.source_dir / "specifications" / doc
             if doc_src.exists():
-                shutil.copy2(doc_src, output_dir / "specifications" / doc)
+                self._copy_file(doc_src, output_dir / "specifications" / doc)
                 print(f"  ✓ Copied {doc}")
     
     def _export_components(self, output_dir: Path, tier: str):
@@ -147,7 +639,7 @@ class TierFilter:
                 continue
             
             if comp_tier == "full":
-                shutil.copytree(comp_src, comp_dst, dirs_exist_ok=True)
+                self._copy_tree(comp_src, comp_dst)
                 print(f"  ✓ Copied {component_name} (full)")
             
             elif comp_tier == "partial":
@@ -158,18 +650,18 @@ class TierFilter:
                     subdir_src = comp_src / subdir
                     subdir_dst = comp_dst / subdir
                     if subdir_src.exists():
-                        shutil.copytree(subdir_src, subdir_dst, dirs_exist_ok=True)
+                        self._copy_tree(subdir_src, subdir_dst)
                         print(f"  ✓ Copied {component_name}/{subdir}")
                 
                 meta_src = comp_src / "meta.json"
                 if meta_src.exists():
-                    shutil.copy2(meta_src, comp_dst / "meta.json")
+                    self._copy_file(meta_src, comp_dst / "meta.json")
                     print(f"  ✓ Copied {component_name}/meta.json")
         
         template_src = self.source_dir / "components" / "experimental" / "_template"
         template_dst = output_dir / "components" / "experimental" / "_template"
         if template_src.exists():
-            shutil.copytree(template_src, template_dst, dirs_exist_ok=True)
+            self._copy_tree(template_src, template_dst)
             print(f"  ✓ Copied experimental template")
     
     def _export_tools(self, output_dir: Path, tier: str):
@@ -178,18 +670,18 @@ class TierFilter:
         tools_src = self.source_dir / "tools"
         tools_dst = output_dir / "tools"
         
-        core_tools = ["component-creator", "live-analyzer", "stunir", "validators", "tier-filter"]
+        core_tools = ["component-creator", "live-analyzer", "spec-store", "stunir", "validators", "tier-filter"]
         
         for tool in core_tools:
             tool_src = tools_src / tool
             tool_dst = tools_dst / tool
             if tool_src.exists():
-                shutil.copytree(tool_src, tool_dst, dirs_exist_ok=True)
+                self._copy_tree(tool_src, tool_dst)
                 print(f"  ✓ Copied {tool}")
         
         index_src = tools_src / "index.json"
         if index_src.exists():
-            shutil.copy2(index_src, tools_dst / "index.json")
+            self._copy_file(index_src, tools_dst / "index.json")
             print(f"  ✓ Copied tools/index.json")
     
     def _export_workspace(self, output_dir: Path, tier: str):
@@ -199,7 +691,7 @@ class TierFilter:
         workspace_dst = output_dir / "workspace"
         
         if workspace_src.exists():
-            shutil.copytree(workspace_src, workspace_dst, dirs_exist_ok=True)
+            self._copy_tree(workspace_src, workspace_dst)
             print(f"  ✓ Copied workspace")
     
     def _export_shared(self, output_dir: Path, tier: str):
@@ -212,14 +704,14 @@ class TierFilter:
             subdir_src = shared_src / subdir
             subdir_dst = shared_dst / subdir
             if subdir_src.exists():
-                shutil.copytree(subdir_src, subdir_dst, dirs_exist_ok=True)
+                self._copy_tree(subdir_src, subdir_dst)
                 print(f"  ✓ Copied shared/{subdir}")
         
         for partial_subdir in ["specs", "libraries"]:
             core_src = shared_src / partial_subdir / tier
             core_dst = shared_dst / partial_subdir / tier
             if core_src.exists():
-                shutil.copytree(core_src, core_dst, dirs_exist_ok=True)
+                self._copy_tree(core_src, core_dst)
                 print(f"  ✓ Copied shared/{partial_subdir}/{tier}")
     
     def _export_docs(self, output_dir: Path, tier: str):
@@ -229,67 +721,338 @@ class TierFilter:
         docs_dst = output_dir / "docs" / tier
         
         if docs_src.exists():
-            shutil.copytree(docs_src, docs_dst, dirs_exist_ok=True)
+            self._copy_tree(docs_src, docs_dst)
             print(f"  ✓ Copied docs/{tier}")
     
     def validate_tier_export(self, export_dir: Path, tier: str) -> bool:
         """Validate that export contains only target tier files"""
-        print(f"\n[Validation] Checking {tier} tier boundaries...")
-        is_valid = True
+        return self.validate_exports({tier: Path(export_dir)})[tier]
         
-        rules = self.tier_rules.get(tier, {})
-        exclude_patterns = rules.get("exclude_patterns", [])
-        forbidden_keywords = rules.get("forbidden_keywords", [])
+    def validate_exports(self, exports: Dict[str, Path], sources: Optional[Dict[str, str]] = None,
+                         only: Optional[Dict[str, List[Path]]] = None) -> Dict[str, bool]:
+        """Validate several tier exports, reading and parsing each distinct file once.
         
-        for root, dirs, files in os.walk(export_dir):
-            root_path = Path(root)
+        `sources` maps exported paths to the source file they were written from, so
+        a file exported to several tiers is checked against all their rules in one scan.
+        With `only`, just those exported paths are re-checked and merged into the
+        per-file results kept from earlier calls (as watch mode does after each edit).
+        """
+        sources = sources or {}
+        checks = {}
+        issues = {tier: {} for tier in exports}
+        contents = {}
+        for tier, export_dir in exports.items():
+            export_dir = Path(export_dir)
+            rules = self.tier_rules.get(tier, {})
+            exclude_matcher = compile_exclude_matcher(rules.get("exclude_patterns", []))
+            keyword_matcher = compile_keyword_matcher(rules.get("forbidden_keywords", []))
+            checks[tier] = (tier, keyword_matcher, exclude_matcher)
             
-            for exclude_pattern in exclude_patterns:
-                if self._matches_pattern(root_path, exclude_pattern):
-                    self.errors.append(f"Found excluded path: {root_path}")
-                    is_valid = False
+            def check_dir(directory: Path):
+                if exclude_matcher and exclude_matcher.search(_match_key(directory, export_dir)):
+                    issues[tier][str(directory)] = ([(str(directory), f"Found excluded path: {directory}")], [])
             
-            for file in files:
-                file_path = root_path / file
+            def scan(top: Path):
+                for root, dirs, files in os.walk(top):
+                    dirs[:] = sorted(d for d in dirs if d != self.STATE_DIR)
+                    root_path = Path(root)
+                    check_dir(root_path)
+                    for file in sorted(files):
+                        if file.endswith('.json') or is_archive(file):
+                            path = str(root_path / file)
+                            contents.setdefault(sources.get(path, path), []).append((tier, path))
+        
+            if only is None:
+                print(f"\n[Validation] Checking {tier} tier boundaries...")
+                scan(export_dir)
+                continue
                 
-                if file.endswith('.json'):
-                    is_valid = self._validate_json_file(file_path, tier, forbidden_keywords) and is_valid
+            for path in only.get(tier, []):
+                for directory in Path(path).parents:
+                    if directory == export_dir or export_dir not in directory.parents:
+                        break
+                    if directory.is_dir():
+                        check_dir(directory)
+                if os.path.isdir(path):
+                    scan(Path(path))
+                elif os.path.isfile(path) and (str(path).endswith('.json') or is_archive(str(path))):
+                    contents.setdefault(sources.get(str(path), str(path)), []).append((tier, str(path)))
+        
+        caches = {}
+        archive_keys = {tier: {} for tier in exports}
+        scanned = {tier: 0 for tier in exports}
+        tasks = []
+        for content, targets in contents.items():
+            if not is_archive(content):
+                tasks.append((content, targets))
+                continue
         
-        return is_valid
+            digest = self._file_digest(Path(content))
+            pending = []
+            for tier, path in targets:
+                if tier not in caches:
+                    caches[tier] = self._load_validation_cache(exports[tier])
+                cache_key = f"{digest}:{self._rules_fingerprint(tier, self.tier_rules.get(tier, {}))}"
+                archive_keys[tier][path] = cache_key
+                cached = caches[tier].get(cache_key)
+                if cached is None:
+                    pending.append((tier, path))
+                    continue
+                issues[tier][path] = (_relabel(cached["errors"], _ARCHIVE_LABEL, path),
+                                      _relabel(cached["warnings"], _ARCHIVE_LABEL, path))
+            if pending:
+                tasks.append((content, pending))
+        
+        results = self._run_validation(validate_file_tiers, [content for content, _ in tasks],
+                                       [[checks[tier] for tier, _ in targets] for _, targets in tasks])
+        for (content, targets), tier_results in zip(tasks, results):
+            label = _ARCHIVE_LABEL if is_archive(content) else content
+            for (tier, path), (file_errors, file_warnings) in zip(targets, tier_results):
+                if path in archive_keys[tier]:
+                    caches[tier][archive_keys[tier][path]] = {"errors": file_errors, "warnings": file_warnings}
+                    scanned[tier] += 1
+                issues[tier][path] = (_relabel(file_errors, label, path), _relabel(file_warnings, label, path))
+        
+        self._check_references(exports, verbose=only is None)
+        self._check_schemas(exports, sources, verbose=only is None)
+        valid = {}
+        for tier, export_dir in exports.items():
+            if only is None:
+                self.validation_results[tier] = issues[tier]
+                if archive_keys[tier]:
+                    print(f"  ✓ Scanned {scanned[tier]} {tier} archives "
+                          f"({len(archive_keys[tier]) - scanned[tier]} unchanged, cached)")
+                    self._save_validation_cache(export_dir, {key: caches[tier][key]
+                                                             for key in archive_keys[tier].values()})
+            else:
+                current = self.validation_results.setdefault(tier, {})
+                for path in only.get(tier, []):
+                    prefix = os.path.join(str(path), "")
+                    for key in [key for key in current if key == str(path) or key.startswith(prefix)]:
+                        del current[key]
+                    for directory in Path(path).parents:
+                        if directory == export_dir or directory.is_dir():
+                            break
+                        current.pop(str(directory), None)
+                current.update(issues[tier])
+                if scanned[tier]:
+                    self._save_validation_cache(export_dir, caches[tier])
+    
+            schema_errors, schema_warnings = self.schema_results[tier]
+            reference_errors, reference_warnings = self.reference_results[tier]
+            errors = sorted([error for file_errors, _ in self.validation_results[tier].values() for error in file_errors]
+                            + reference_errors + schema_errors)
+            warnings = sorted([warning for _, file_warnings in self.validation_results[tier].values()
+                               for warning in file_warnings] + reference_warnings + schema_warnings)
+            self.errors.extend(message for _, message in errors)
+            self.warnings.extend(message for _, message in warnings)
+            valid[tier] = not errors
+        return valid
+    
+    def reference_graph(self) -> ReferenceGraph:
+        """Cross-reference graph of the source tree, brought up to date with it"""
+        if self._ref_graph is None:
+            self._ref_graph = ReferenceGraph.for_source(self.source_dir, self.ref_graph_dir)
+        self._ref_graph.update(self.source_dir, (self.STATE_DIR, ".git"))
+        self._ref_graph.save()
+        return self._ref_graph
+    
+    def _check_references(self, exports: Dict[str, Path], verbose: bool = True):
+        """Flag exported specs that reference specs of the source tree missing from the same export.
+
+        References into a partial component's own subdirectories that the mapping
+        leaves out (e.g. agua/meta.json -> agua/reference/index.json) are omitted
+        on purpose, so they are reported as warnings rather than errors.
+        """
+        graph = self.reference_graph()
+        for tier, export_dir in exports.items():
+            exported = set()
+            for label, _ in iter_spec_containers(export_dir, (self.STATE_DIR,)):
+                exported.update(graph.files.get(label, {}).get("documents", ()))
+            dangling = graph.dangling(exported)
+            errors, warnings = [], []
+            for label, targets in dangling.items():
+                path = str(export_dir / label.split("!", 1)[0])
+                for target in targets:
+                    if self._withheld_by_mapping(label, target):
+                        warnings.append((path, f"Reference into a subdirectory left out of the {tier} export: "
+                                               f"{label} -> {target}"))
+                    else:
+                        errors.append((path, f"Dangling reference: {label} -> {target} (not in the {tier} export)"))
+            self.reference_results[tier] = (errors, warnings)
+            if not verbose:
+                continue
+            if errors:
+                print(f"  ❌ {len(errors)} dangling cross-references in {len({path for path, _ in errors})} "
+                      f"{tier} specs")
+            else:
+                print(f"  ✓ All cross-references of {len(exported)} {tier} specs resolve within the export "
+                      f"({graph.stats['read']} spec files re-indexed)")
+    
+    def _withheld_by_mapping(self, label: str, target: str) -> bool:
+        """Whether target lies in label's own partial component, outside the subdirectories it exports"""
+        parts = label.split("/")
+        if len(parts) < 4 or parts[:2] != ["components", "production"]:
+            return False
+        config = self.component_mapping.get(parts[2], {})
+        component_dir = "/".join(parts[:3]) + "/"
+        return config.get("tier") == "partial" and target.startswith(component_dir)
     
-    def _validate_json_file(self, file_path: Path, tier: str, forbidden_keywords: List[str]) -> bool:
-        """Validate JSON file for tier compliance"""
+    def _check_schemas(self, exports: Dict[str, Path], sources: Dict[str, str], verbose: bool = True):
+        """Validate specs against the schemas governing them, with per-file timings.
+
+        Results are kept per (spec digest, schema digest), so only new or changed
+        pairs are validated again; distinct specs fan out across the worker pool.
+        """
+        start = time.perf_counter()
+        schema_digests = {}
+        pairs = {tier: [] for tier in exports}
+        tasks = {}
+        for tier, export_dir in exports.items():
+            for doc_path, schema_paths in match_schemas(export_dir, self.schema_rules, (self.STATE_DIR,)).items():
+                content = sources.get(doc_path, doc_path)
+                for schema_path in schema_paths:
+                    if schema_path not in schema_digests:
+                        schema_digests[schema_path] = schema_digest(Path(schema_path))
+                    key = (self._file_digest(Path(content)), schema_digests[schema_path])
+                    pairs[tier].append((doc_path, schema_path, key))
+                    if key not in self._schema_memo:
+                        tasks.setdefault(content, {})[schema_path] = key
+                        
+        contents = list(tasks)
+        results = self._run_validation(validate_against_schemas, contents,
+                                       [[(schema_path, key[1]) for schema_path, key in tasks[content].items()]
+                                        for content in contents],
+                                       [str(self.validator_cache)] * len(contents))
+        validated = set()
+        for content, content_results in zip(contents, results):
+            for key, result in zip(tasks[content].values(), content_results):
+                self._schema_memo[key] = result
+                validated.add(key)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        for tier, export_dir in exports.items():
+            errors, warnings, timings = [], [], []
+            lenient = set()
+            for doc_path, schema_path, key in pairs[tier]:
+                result = self._schema_memo[key]
+                schema_label = Path(os.path.relpath(schema_path, export_dir)).as_posix()
+                digest = key[1]
+                if digest not in self._strict_schemas:
+                    try:
+                        self._strict_schemas[digest] = load_schema(Path(schema_path))[1]
+                    except (OSError, ValueError):
+                        self._strict_schemas[digest] = True  # unreadable: reported as skipped below
+                if not self._strict_schemas[digest] and schema_path not in lenient:
+                    lenient.add(schema_path)
+                    warnings.append((schema_path, f"Schema {schema_path} is not strict JSON "
+                                                  "(unescaped backslashes were read literally)"))
+                if result["skipped"]:
+                    warnings.append((doc_path, result["skipped"]))
+                    continue
+                errors.extend((doc_path, f"Schema violation in {doc_path} at {pointer or '/'}: {message} "
+                                         f"({schema_label})")
+                              for pointer, message in result["errors"])
+                if key in validated:
+                    timings.append({"spec": Path(os.path.relpath(doc_path, export_dir)).as_posix(),
+                                    "schema": schema_label, "ms": round(result["ms"], 3),
+                                    "validator_ms": round(result["load_ms"], 3), "validator": result["origin"],
+                                    "errors": len(result["errors"])})
+            self.schema_results[tier] = (errors, warnings)
+            if timings:
+                self._save_schema_timings(export_dir, timings)
+            if verbose:
+                self._report_schemas(tier, pairs[tier], errors, timings, elapsed_ms)
+    
+    def _report_schemas(self, tier: str, pairs: List, errors: List, timings: List[Dict[str, Any]], elapsed_ms: float):
+        specs = {doc_path for doc_path, _, _ in pairs}
+        schemas = {schema_path for _, schema_path, _ in pairs}
+        origins = [row["validator"] for row in timings]
+        summary = (f"{len(specs)} {tier} specs against {len(schemas)} schemas in {elapsed_ms:.1f} ms "
+                   f"({origins.count('compiled')} validators compiled, {origins.count('disk')} loaded from cache, "
+                   f"{len(pairs) - len(timings)} results reused)")
+        if errors:
+            print(f"  ❌ {len(errors)} schema violations: {summary}")
+        else:
+            print(f"  ✓ Schema-checked {summary}")
+        for row in sorted(timings, key=lambda row: -(row["ms"] + row["validator_ms"]))[:5]:
+            print(f"      {row['ms'] + row['validator_ms']:8.2f} ms  {row['spec']} ({posixpath.basename(row['schema'])}, "
+                  f"validator {row['validator']} {row['validator_ms']:.2f} ms)")
+    
+    def _save_schema_timings(self, export_dir: Path, timings: List[Dict[str, Any]]):
+        """Write per-spec and per-schema validation timings, slowest first"""
+        by_schema = {}
+        for row in timings:
+            totals = by_schema.setdefault(row["schema"], {"specs": 0, "ms": 0.0, "validator_ms": 0.0})
+            totals["specs"] += 1
+            totals["ms"] = round(totals["ms"] + row["ms"], 3)
+            totals["validator_ms"] = round(totals["validator_ms"] + row["validator_ms"], 3)
+        report = {
+            "specs": sorted(timings, key=lambda row: -(row["ms"] + row["validator_ms"])),
+            "schemas": dict(sorted(by_schema.items(), key=lambda item: -(item[1]["ms"] + item[1]["validator_ms"]))),
+        }
+        state_dir = export_dir / self.STATE_DIR
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                data = json.loads(content)
-            
-            if "metadata" in data and "tier" in data["metadata"]:
-                file_tier = data["metadata"]["tier"]
-                if file_tier != tier:
-                    self.errors.append(f"File {file_path} has tier '{file_tier}', expected '{tier}'")
-                    return False
-            
-            for keyword in forbidden_keywords:
-                if keyword in content.lower():
-                    self.errors.append(f"File {file_path} contains forbidden keyword: {keyword}")
-                    return False
-            
-            return True
+            state_dir.mkdir(parents=True, exist_ok=True)
+            timings_file = state_dir / self.SCHEMA_TIMINGS_FILE
+            tmp_file = timings_file.with_suffix(".tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump(report, f, indent=2)
+            os.replace(tmp_file, timings_file)
+        except OSError as e:
+            self.warnings.append(f"Could not write schema timings in {state_dir}: {e}")
+    
+    def _run_validation(self, worker, paths: List[str], *args):
+        """Validate files in-process or across a process pool depending on self.jobs"""
+        jobs = self.jobs or os.cpu_count() or 1
+        if jobs <= 1 or len(paths) < 2:
+            return map(worker, paths, *args)
         
-        except Exception as e:
-            self.warnings.append(f"Could not validate {file_path}: {e}")
-            return True
+        chunksize = max(1, len(paths) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(worker, paths, *args, chunksize=chunksize))
+    
+    @staticmethod
+    def _rules_fingerprint(tier: str, rules: Dict[str, Any]) -> str:
+        """Short digest of the rules that affect validation results"""
+        payload = json.dumps([tier, sorted(rules.get("exclude_patterns", [])),
+                              sorted(rules.get("forbidden_keywords", []))])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def _load_validation_cache(self, export_dir: Path) -> Dict[str, Any]:
+        """Load cached archive validation results keyed by archive digest"""
+        cache_file = export_dir / self.STATE_DIR / self.VALIDATION_CACHE_FILE
+        if not cache_file.exists():
+            return {}
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+            if cache.get("version") == self.VALIDATION_CACHE_VERSION:
+                return {key: {"errors": [tuple(e) for e in entry["errors"]],
+                              "warnings": [tuple(w) for w in entry["warnings"]]}
+                        for key, entry in cache.get("archives", {}).items()}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.warnings.append(f"Ignoring unreadable validation cache {cache_file}: {e}")
+        return {}
     
-    def _matches_pattern(self, path: Path, pattern: str) -> bool:
-        """Check if path matches exclude pattern"""
-        path_str = str(path)
-        pattern_regex = pattern.replace("*", ".*").replace("/", os.sep)
-        return re.search(pattern_regex, path_str) is not None
+    def _save_validation_cache(self, export_dir: Path, entries: Dict[str, Any]):
+        """Persist archive validation results for the next run"""
+        state_dir = export_dir / self.STATE_DIR
+        try:
+            state_dir.mkdir(parents=True, exist_ok=True)
+            cache_file = state_dir / self.VALIDATION_CACHE_FILE
+            tmp_file = cache_file.with_suffix(".tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump({"version": self.VALIDATION_CACHE_VERSION, "archives": entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            self.warnings.append(f"Could not write validation cache in {state_dir}: {e}")
     
-    def generate_catalog(self, export_dir: Path, output_file: Path):
-        """Generate catalog of Core tier operations"""
+    def generate_catalog(self, export_dir: Path, output_file: Path, index_file: Optional[Path] = None):
+        """Generate catalog of Core tier operations and refresh the operation index"""
         print(f"\n[Catalog] Generating {output_file}...")
+        export_dir = Path(export_dir)
+        index_file = Path(index_file) if index_file else export_dir / self.STATE_DIR / self.CATALOG_INDEX_FILE
         
         catalog = {
             "core_tier": {
@@ -305,37 +1068,357 @@ class TierFilter:
                 if comp_dir.is_dir():
                     meta_file = comp_dir / "meta.json"
                     if meta_file.exists():
-                        with open(meta_file, 'r') as f:
-                            meta = json.load(f)
-                            catalog["core_tier"]["components"][comp_dir.name] = meta
+                        catalog["core_tier"]["components"][comp_dir.name] = self.specs.read(meta_file)
+        
+        skip_file = os.path.relpath(output_file, export_dir).replace(os.sep, "/")
+        with CatalogIndex(index_file) as index:
+            stats = index.update(export_dir, skip_dirs=(self.STATE_DIR,), skip_files=(skip_file,))
+            catalog["core_tier"]["specifications"] = index.source_counts()
+            catalog["core_tier"]["total_operations"] = index.total_operations()
+        self.warnings.extend(stats["warnings"])
+        print(f"  ✓ Indexed {stats['indexed']} spec files ({stats['operations']} operations), "
+              f"{stats['unchanged']} unchanged, {stats['removed']} removed")
         
         with open(output_file, 'w') as f:
             json.dump(catalog, f, indent=2)
         
-        print(f"  ✓ Catalog written to {output_file}")
+        print(f"  ✓ Catalog written to {output_file} ({catalog['core_tier']['total_operations']} operations)")
+        print(f"  ✓ Operation index: {index_file}")
+
+
+def compile_exclude_matcher(patterns: List[str]) -> Optional[Pattern]:
+    """Compile tier exclude globs (`*` wildcards) into one combined regex"""
+    if not patterns:
+        return None
+    return re.compile("|".join(
+        "(?:" + ".*".join(re.escape(part) for part in pattern.strip("*").split("*")) + ")"
+        for pattern in patterns
+    ))
+
+
+def compile_keyword_matcher(keywords: List[str]) -> Optional[Pattern]:
+    """Compile forbidden keywords into one alternation regex, longest first"""
+    if not keywords:
+        return None
+    ordered = sorted(set(keywords), key=lambda k: (-len(k), k))
+    return re.compile("|".join(re.escape(keyword) for keyword in ordered))
+
+
+def _match_key(path: Path, root: Path) -> str:
+    """Export-relative posix path wrapped in slashes, the form exclude globs match against"""
+    rel_path = Path(os.path.relpath(path, root)).as_posix()
+    return "/" if rel_path == "." else f"/{rel_path}/"
+
+
+def find_metadata_tier(data: Any):
+    """Return (found, tier) for the top-level metadata.tier field of a parsed document"""
+    metadata = data.get("metadata") if isinstance(data, dict) else None
+    if isinstance(metadata, dict) and "tier" in metadata:
+        return True, metadata["tier"]
+    return False, None
+
+
+def check_json_content_tiers(label: str, content: str, checks: List):
+    """Check one JSON document against several (tier, keyword_matcher, exclude_matcher) checks.
+
+    The document is parsed and lower-cased once for all checks. A document that
+    is not well-formed JSON cannot be checked and gets a warning per check.
+    """
+    try:
+        data = json.loads(content)
+    except ValueError as e:
+        return [([], [(label, f"Could not validate {label}: {e}")]) for _ in checks]
+    found, file_tier = find_metadata_tier(data)
+    lowered = None
+    results = []
+    for tier, keyword_matcher, _ in checks:
+        if found and file_tier != tier:
+            results.append(([(label, f"File {label} has tier '{file_tier}', expected '{tier}'")], []))
+            continue
+            
+        if keyword_matcher:
+            if lowered is None:
+                lowered = content.lower()
+            match = keyword_matcher.search(lowered)
+            if match:
+                results.append(([(label, f"File {label} contains forbidden keyword: {match.group(0)}")], []))
+                continue
+                
+        results.append(([], []))
+    return results
+
+
+def validate_json_file(file_path: str, checks: List):
+    """Validate a JSON file against each tier check, reading it once"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return check_json_content_tiers(file_path, content, checks)
+    except Exception as e:
+        return [([], [(file_path, f"Could not validate {file_path}: {e}")]) for _ in checks]
+
+
+_ARCHIVE_LABEL = "<archive>"
+
+
+def _relabel(issues, label: str, path: str):
+    """Substitute the real path for the label issues were recorded under"""
+    if label == path:
+        return issues
+    return [(key.replace(label, path, 1), message.replace(label, path, 1)) for key, message in issues]
+
+
+def _scan_archive(fileobj, label: str, checks: List, results: List):
+    """Stream tar members in order, validating JSON members in memory (nested bundles included)"""
+    def on_error(member_label, e):
+        for _, warnings in results:
+            warnings.append((member_label, f"Could not validate {member_label}: {e}"))
+    
+    flagged_dirs = [set() for _ in checks]
+    for member_label, name, read in iter_archive_members(fileobj, label, on_error):
+        member_dir = posixpath.dirname(name)
+        if member_dir:
+            dir_label = member_label[:-len(name)] + member_dir
+            for (_, _, exclude_matcher), flagged, (errors, _) in zip(checks, flagged_dirs, results):
+                if exclude_matcher and dir_label not in flagged and exclude_matcher.search(f"/{member_dir}/"):
+                    flagged.add(dir_label)
+                    errors.append((dir_label, f"Found excluded path: {dir_label}"))
+        
+        if name.endswith('.json'):
+            try:
+                member_results = check_json_content_tiers(member_label, read().decode('utf-8'), checks)
+            except Exception as e:
+                member_results = [([], [(member_label, f"Could not validate {member_label}: {e}")])
+                                  for _ in checks]
+            for (errors, warnings), (member_errors, member_warnings) in zip(results, member_results):
+                errors.extend(member_errors)
+                warnings.extend(member_warnings)
+
+
+def validate_archive(archive_path: str, checks: List):
+    """Validate every JSON member of a tar bundle against each tier check without extracting it.
+    
+    Issues are labelled with a placeholder instead of the archive path so the
+    result can be cached by archive digest and reused wherever the bundle lives.
+    """
+    results = [([], []) for _ in checks]
+    try:
+        with open(archive_path, 'rb') as f:
+            _scan_archive(f, _ARCHIVE_LABEL, checks, results)
+    except ARCHIVE_ERRORS as e:
+        for _, warnings in results:
+            warnings.append((_ARCHIVE_LABEL, f"Could not validate {_ARCHIVE_LABEL}: {e}"))
+    return results
+
+
+def validate_file_tiers(file_path: str, checks: List):
+    """Validate one file against several tiers' checks in a single read (process-pool worker)"""
+    if is_archive(file_path):
+        return validate_archive(file_path, checks)
+    return validate_json_file(file_path, checks)
+
+
+def query_catalog(index_file: Path, args) -> int:
+    """Print operations from the catalog index matching the --op-* filters"""
+    if not index_file.exists():
+        print(f"❌ Catalog index not found: {index_file} (run --generate-catalog first)")
+        return 1
+    
+    start = time.perf_counter()
+    with CatalogIndex(index_file) as index:
+        results = index.query(name=args.op_name, category=args.op_category, complexity=args.op_complexity,
+                              param_type=args.op_param_type, returns=args.op_returns, source=args.op_source,
+                              limit=args.limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    
+    for op in results:
+        params = ", ".join(f"{p['name']}: {p['type'] or '?'}" for p in op["parameters"])
+        print(f"{op['name']}({params}) -> {op['returns'] or '?'}")
+        print(f"    {op['category'] or '-'} | {op['complexity_class'] or '-'} | {op['source']}")
+    print(f"\n{len(results)} operations ({elapsed_ms:.1f} ms)")
+    return 0
+
+
+def query_references(tier_filter: TierFilter, args) -> int:
+    """Print transitive references, referrers or reference cycles of the source tree's specs"""
+    start = time.perf_counter()
+    graph = tier_filter.reference_graph()
+    results = {}
+    for option, spec in (("references", args.references), ("referenced_by", args.referenced_by)):
+        if not spec:
+            continue
+        label = spec if spec in graph.edges else graph.resolve("", spec)
+        if label is None:
+            print(f"❌ No spec named {spec} under {tier_filter.source_dir}")
+            return 1
+        related = graph.reachable(label) if option == "references" else graph.dependents(label, transitive=True)
+        results[option] = {"spec": label, "direct": graph.edges[label] if option == "references"
+                           else graph.dependents(label), "transitive": related}
+    if args.ref_cycles:
+        results["cycles"] = graph.cycles()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+        
+    for option, heading in (("references", "references"), ("referenced_by", "is referenced by")):
+        if option in results:
+            result = results[option]
+            direct = set(result["direct"])
+            print(f"{result['spec']} {heading} {len(result['transitive'])} specs ({len(direct)} directly):")
+            for label in result["transitive"]:
+                print(f"  {'*' if label in direct else ' '} {label}")
+    if "cycles" in results:
+        print(f"{len(results['cycles'])} reference cycles:")
+        for members in results["cycles"]:
+            print(f"  {', '.join(members)}")
+    stats = graph.stats
+    print(f"\n{len(graph.edges)} specs, {sum(len(targets) for targets in graph.edges.values())} references "
+          f"({stats['read']} files re-indexed, {elapsed_ms:.1f} ms)")
+    return 0
+
+
+def diff_specs(before_dir: Path, after_dir: Path, args) -> int:
+    """Print the structural spec diff between two exports; 1 when they differ"""
+    for export_dir in (before_dir, after_dir):
+        if not export_dir.is_dir():
+            print(f"❌ Export not found: {export_dir}")
+            return 2
+            
+    start = time.perf_counter()
+    cache = SpecParseCache(Path(args.parse_cache) if args.parse_cache else DEFAULT_PARSE_CACHE)
+    skip_dirs = (TierFilter.STATE_DIR,)
+    diff = diff_exports(cache.load_export(before_dir, skip_dirs), cache.load_export(after_dir, skip_dirs))
+    cache.save()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    changed = has_changes(diff)
+    
+    if args.json:
+        print(json.dumps(dict(diff, parse_cache=cache.stats, warnings=cache.warnings), indent=2))
+        return 1 if changed else 0
+        
+    for warning in dict.fromkeys(cache.warnings):
+        print(f"⚠️  {warning}")
+    print(f"[Diff] {before_dir} -> {after_dir}")
+    documents = diff["documents"]
+    print(f"  Documents: +{len(documents['added'])} -{len(documents['removed'])} ~{len(documents['modified'])}")
+    for label in documents["added"]:
+        print(f"    + {label}")
+    for label in documents["removed"]:
+        print(f"    - {label}")
+        
+    operations = diff["operations"]
+    print(f"  Operations: +{len(operations['added'])} -{len(operations['removed'])} "
+          f"~{len(operations['modified'])} moved {len(operations['moved'])}")
+    for op in operations["added"]:
+        print(f"    + {op['name']} ({op['source']})")
+    for op in operations["removed"]:
+        print(f"    - {op['name']} ({op['source']})")
+    for op in operations["modified"]:
+        print(f"    ~ {op['name']}: {', '.join(sorted(op['changes']))} ({op['source'][1]})")
+    for op in operations["moved"]:
+        print(f"    > {op['name']}: {op['source'][0]} -> {op['source'][1]}")
+        
+    keys = diff["keys"]
+    print(f"  Spec keys: +{len(keys['added'])} -{len(keys['removed'])} ~{len(keys['modified'])}")
+    for prefix, section in (("+", "added"), ("-", "removed"), ("~", "modified")):
+        for key in keys[section]:
+            print(f"    {prefix} {key}")
+            
+    stats = cache.stats
+    print(f"\n{'Differences found' if changed else 'No differences'} "
+          f"({stats['parsed']} files parsed, {stats['cached']} from cache, {elapsed_ms:.1f} ms)")
+    return 1 if changed else 0
 
 
 def main():
     parser = argparse.ArgumentParser(description="HyperSync Tier Filter Tool")
-    parser.add_argument("--source", required=True, help="Source directory (build/current)")
-    parser.add_argument("--output", required=True, help="Output directory for filtered tier")
+    parser.add_argument("--source", help="Source directory (build/current)")
+    parser.add_argument("--output", help="Output directory for filtered tier")
     parser.add_argument("--tier", default="core", choices=["core", "basic", "pro", "advanced", "enterprise"])
+    parser.add_argument("--tiers", help="Comma-separated tiers to export in one pass, each to <output>/<tier>")
     parser.add_argument("--validate", action="store_true", help="Validate tier boundaries")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only copy added/changed files and remove deleted ones (uses .tier-filter/manifest.json)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Worker processes for validation and copy threads for --tiers (0 = one per CPU)")
+    parser.add_argument("--store", help="Content-addressed blob store to deduplicate exports through "
+                                        "(share it between tier exports)")
+    parser.add_argument("--link", default="auto", choices=LINK_MODES,
+                        help="How to materialize files from --store (auto: reflink, then hardlink, then copy)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Stay resident, re-exporting (and with --validate re-validating) changed files")
+    parser.add_argument("--debounce", type=float, default=200,
+                        help="Milliseconds without further changes before --watch acts on them")
+    parser.add_argument("--poll", type=float,
+                        help="Poll the source tree every N seconds instead of using inotify")
     parser.add_argument("--verify-tier", help="Verify existing export is tier-compliant")
     parser.add_argument("--generate-catalog", action="store_true", help="Generate operation catalog")
     parser.add_argument("--output-catalog", help="Catalog output file")
+    parser.add_argument("--catalog-index", help="Operation index file (default: <output>/.tier-filter/catalog.sqlite)")
+    parser.add_argument("--diff", nargs=2, metavar=("EXPORT_A", "EXPORT_B"),
+                        help="Report added/removed/modified operations and spec keys between two exports")
+    parser.add_argument("--parse-cache", help=f"Spec parse cache for --diff (default: {DEFAULT_PARSE_CACHE})")
+    parser.add_argument("--ref-graph-dir", default=str(DEFAULT_GRAPH_DIR),
+                        help="Where the spec cross-reference graph of each source tree is kept")
+    parser.add_argument("--schema-cache", default=str(DEFAULT_VALIDATOR_CACHE),
+                        help="Where compiled schema validators are cached, by schema hash")
+    parser.add_argument("--spec-cache", default=str(DEFAULT_SPEC_CACHE),
+                        help="Parse cache for spec and config JSON shared with the other tools ('' to disable)")
+    
+    query = parser.add_argument_group("catalog queries", "Filters accept * and ? wildcards")
+    query.add_argument("--query-catalog", action="store_true", help="Query the operation index")
+    query.add_argument("--op-name", help="Operation name")
+    query.add_argument("--op-category", help="Operation category, e.g. '*geometr*'")
+    query.add_argument("--op-complexity", help="Complexity class, e.g. 'O(log n)'")
+    query.add_argument("--op-param-type", help="Type of any parameter, e.g. 'array<float>'")
+    query.add_argument("--op-returns", help="Return type")
+    query.add_argument("--op-source", help="Source spec file, e.g. 'specifications/core/*'")
+    query.add_argument("--limit", type=int, help="Maximum number of results")
+    query.add_argument("--json", action="store_true", help="Print results (or --diff, reference queries) as JSON")
+    
+    refs = parser.add_argument_group("reference queries", "Specs are given by path under --source or by name")
+    refs.add_argument("--references", metavar="SPEC", help="Specs SPEC references, directly or transitively")
+    refs.add_argument("--referenced-by", metavar="SPEC", help="Specs referencing SPEC, directly or transitively")
+    refs.add_argument("--ref-cycles", action="store_true", help="List groups of specs that reference each other")
     
     args = parser.parse_args()
     
+    if args.diff:
+        sys.exit(diff_specs(Path(args.diff[0]), Path(args.diff[1]), args))
+    
+    if args.query_catalog:
+        if not (args.catalog_index or args.output):
+            parser.error("--query-catalog needs --catalog-index or --output")
+        index_file = Path(args.catalog_index) if args.catalog_index else \
+            Path(args.output) / TierFilter.STATE_DIR / TierFilter.CATALOG_INDEX_FILE
+        sys.exit(query_catalog(index_file, args))
+    
+    reference_query = args.references or args.referenced_by or args.ref_cycles
+    if not (args.source and (args.output or reference_query)):
+        parser.error("--source and --output are required")
+    
     source_dir = Path(args.source)
-    output_dir = Path(args.output)
+    output_dir = Path(args.output or ".")
     config_dir = Path(__file__).parent / "config"
     
     if not source_dir.exists():
         print(f"❌ Source directory not found: {source_dir}")
         sys.exit(1)
     
-    tier_filter = TierFilter(source_dir, config_dir)
+    tier_filter = TierFilter(source_dir, config_dir, jobs=args.jobs,
+                             store_dir=Path(args.store) if args.store else None, link_mode=args.link,
+                             ref_graph_dir=Path(args.ref_graph_dir), validator_cache=Path(args.schema_cache),
+                             spec_cache=Path(args.spec_cache) if args.spec_cache else None)
+    atexit.register(tier_filter.specs.flush)
+                             
+    if reference_query:
+        sys.exit(query_references(tier_filter, args))
     
     if args.verify_tier:
         print(f"Verifying tier compliance for: {args.verify_tier}")
@@ -344,10 +1427,26 @@ def main():
     
     if args.generate_catalog:
         catalog_file = Path(args.output_catalog) if args.output_catalog else output_dir / "CORE_TIER_CATALOG.json"
-        tier_filter.generate_catalog(output_dir, catalog_file)
+        index_file = Path(args.catalog_index) if args.catalog_index else None
+        tier_filter.generate_catalog(output_dir, catalog_file, index_file)
         sys.exit(0)
     
-    success = tier_filter.filter_and_export(output_dir, args.tier, args.validate)
+    if args.tiers:
+        tiers = [tier.strip() for tier in args.tiers.split(",") if tier.strip()]
+        unknown = [tier for tier in tiers if tier not in TierFilter.VALID_TIERS]
+        if unknown or not tiers:
+            parser.error(f"--tiers: unknown tiers {unknown}; expected some of {TierFilter.VALID_TIERS}")
+        outputs = {tier: output_dir / tier for tier in dict.fromkeys(tiers)}
+    else:
+        outputs = {args.tier: output_dir}
+        
+    if args.watch:
+        tier_filter.watch(outputs, args.validate, args.debounce / 1000, args.poll)
+        sys.exit(0)
+    if args.tiers:
+        success = tier_filter.export_tiers(outputs, args.validate, args.incremental)
+    else:
+        success = tier_filter.filter_and_export(output_dir, args.tier, args.validate, args.incremental)
     sys.exit(0 if success else 1)
 
 
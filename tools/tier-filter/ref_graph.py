@@ -0,0 +1,330 @@
+"""
+HyperSync Spec Reference Graph
+Cross-references between spec documents, indexed once and updated incrementally
+"""
+
+import os
+import re
+import json
+import hashlib
+import posixpath
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from spec_sources import iter_spec_containers, iter_container_documents
+
+REF_GRAPH_VERSION = 1
+DEFAULT_GRAPH_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "hypersync" / "ref-graph"
+
+# Keys whose string values (or lists of them) name other specs; any "*.json" string is a reference too
+REFERENCE_KEYS = {"dependencies", "depends_on", "requires", "extends", "base_spec", "target_spec", "$ref"}
+# Fields that give a document a name other specs can use for it
+IDENTITY_KEYS = (("name",), ("id",), ("spec_id",), ("meta", "id"), ("metadata", "name"), ("metadata", "id"),
+                 ("specification", "name"), ("specification", "id"))
+STEM_SUFFIXES = (".spec", ".capsule", ".schema", "_spec")
+_REFERENCE = re.compile(r"^[\w.@:#/$-]+$")
+
+
+def _identity(value: str) -> str:
+    """Lookup form of a spec name: lowercased, without @version or :member"""
+    return value.strip().lower().split("@", 1)[0].split(":", 1)[0]
+
+
+def document_names(label: str, doc: Any) -> List[str]:
+    """Names a document can be referenced by, besides its path"""
+    base = posixpath.basename(label.rsplit("!", 1)[-1]).lower()
+    stem = base[:-5] if base.endswith(".json") else base
+    names = {base, stem}
+    for suffix in STEM_SUFFIXES:
+        if stem.endswith(suffix):
+            names.add(stem[:-len(suffix)])
+    for path in IDENTITY_KEYS:
+        value = doc
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if isinstance(value, str) and _REFERENCE.match(value.strip()):
+            names.add(_identity(value))
+    names.discard("")
+    return sorted(names)
+
+
+def _reference_values(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, dict):
+                name = next((item[key] for key in ("spec", "name", "id", "$ref", "path", "file")
+                             if isinstance(item.get(key), str)), None)
+                if name:
+                    yield name
+
+
+def document_references(doc: Any) -> List[str]:
+    """Raw outbound references of a document, in document order without duplicates"""
+    refs = {}
+    stack = [doc]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key in REFERENCE_KEYS or key.endswith("_ref"):
+                    refs.update(dict.fromkeys(_reference_values(item)))
+                if isinstance(item, (dict, list)):
+                    stack.append(item)
+                elif isinstance(item, str) and item.endswith(".json"):
+                    refs[item] = None
+        elif isinstance(value, list):
+            stack.extend(item for item in value if isinstance(item, (dict, list)))
+            refs.update(dict.fromkeys(item for item in value if isinstance(item, str) and item.endswith(".json")))
+    return [ref for ref in refs if _REFERENCE.match(ref) and "://" not in ref]
+
+
+class ReferenceGraph:
+    """Adjacency of spec documents (keyed by root-relative label) to the documents they reference.
+
+    Each file's names and raw references are cached by (size, mtime), so an
+    update only re-reads changed files; resolved edges are kept too and only
+    re-resolved for changed files unless the set of spec names itself changed.
+    Reachability is answered from a transitive closure over strongly connected
+    components, held as integer bitsets and rebuilt lazily after updates.
+    """
+
+    def __init__(self, graph_file: Path):
+        self.graph_file = Path(graph_file)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.edges: Dict[str, List[str]] = {}
+        self.names_fingerprint = ""
+        self.stats = {"read": 0, "cached": 0, "resolved": 0}
+        self._load()
+        self._dirty = False
+        self._paths: Set[str] = set()
+        self._names: Dict[str, List[str]] = {}
+        self._index_names()
+        self._closure = None
+
+    @classmethod
+    def for_source(cls, source_dir: Path, graph_dir: Path = DEFAULT_GRAPH_DIR) -> "ReferenceGraph":
+        """Graph persisted per source tree under graph_dir"""
+        key = hashlib.sha256(str(Path(source_dir).resolve()).encode("utf-8")).hexdigest()[:16]
+        return cls(Path(graph_dir) / f"{key}.json")
+
+    def _load(self):
+        try:
+            with open(self.graph_file, "r") as f:
+                data = json.load(f)
+            if data.get("version") == REF_GRAPH_VERSION:
+                self.files = data["files"]
+                self.edges = data["edges"]
+                self.names_fingerprint = data["names_fingerprint"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.graph_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.graph_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"version": REF_GRAPH_VERSION, "names_fingerprint": self.names_fingerprint,
+                       "files": self.files, "edges": self.edges}, f, separators=(",", ":"))
+        os.replace(tmp_file, self.graph_file)
+        self._dirty = False
+
+    @property
+    def documents(self) -> Dict[str, Dict[str, Any]]:
+        return {label: doc for entry in self.files.values() for label, doc in entry["documents"].items()}
+
+    def update(self, root: Path, skip_dirs: Tuple[str, ...] = ()) -> Set[str]:
+        """Re-index files under root that changed since the last update; returns changed document labels"""
+        self.stats = {"read": 0, "cached": 0, "resolved": 0}
+        changed = set()
+        seen = set()
+        for label, path in iter_spec_containers(root, skip_dirs):
+            seen.add(label)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = self.files.get(label)
+            if entry and entry["stat"] == [st.st_size, st.st_mtime_ns]:
+                self.stats["cached"] += 1
+                continue
+            documents = {}
+            for doc_label, read in iter_container_documents(path, label, lambda *_: None):
+                if not doc_label.endswith(".json"):
+                    continue
+                try:
+                    doc = json.loads(read())
+                except (ValueError, UnicodeDecodeError):
+                    doc = None
+                documents[doc_label] = {"names": document_names(doc_label, doc),
+                                        "refs": document_references(doc)}
+            old = entry["documents"] if entry else {}
+            changed.update(label for label in set(old) | set(documents) if old.get(label) != documents.get(label))
+            self.files[label] = {"stat": [st.st_size, st.st_mtime_ns], "documents": documents}
+            self.stats["read"] += 1
+            self._dirty = True
+
+        for label in set(self.files) - seen:
+            changed.update(self.files.pop(label)["documents"])
+            self._dirty = True
+        if changed:
+            self._resolve(changed)
+        return changed
+
+    def _index_names(self):
+        self._paths = set()
+        self._names = {}
+        for label, doc in sorted(self.documents.items()):
+            self._paths.add(label)
+            for name in doc["names"]:
+                self._names.setdefault(name, []).append(label)
+
+    def _resolve(self, changed: Set[str]):
+        self._index_names()
+        fingerprint = hashlib.sha256(json.dumps(sorted(self._names.items())).encode("utf-8")).hexdigest()[:16]
+        documents = self.documents
+        if fingerprint != self.names_fingerprint:
+            # A spec was added, removed or renamed: any existing reference may now resolve differently
+            self.names_fingerprint = fingerprint
+            changed = changed | set(documents)
+        for label in changed:
+            if label in documents:
+                self.edges[label] = self.resolve_all(label, documents[label]["refs"])
+                self.stats["resolved"] += 1
+            else:
+                self.edges.pop(label, None)
+        self._closure = None
+
+    def resolve_all(self, label: str, refs: Iterable[str]) -> List[str]:
+        targets = {}
+        for ref in refs:
+            target = self.resolve(label, ref)
+            if target and target != label:
+                targets[target] = None
+        return sorted(targets)
+
+    def resolve(self, label: str, ref: str) -> Optional[str]:
+        """Document a raw reference points at, or None if it names nothing in the tree"""
+        ref = ref.split("#", 1)[0].strip()
+        if not ref:
+            return None
+        if "/" in ref or ref.endswith(".json"):
+            directory = posixpath.dirname(label.split("!", 1)[0])
+            for candidate in (posixpath.join(directory, ref), ref):
+                candidate = posixpath.normpath(candidate).lstrip("/")
+                if candidate in self._paths:
+                    return candidate
+            if ref.startswith(("./", "../")):
+                return None  # explicitly relative: a missing file, not a name to look up elsewhere
+            ref = posixpath.basename(ref)
+        candidates = self._names.get(_identity(ref))
+        if not candidates:
+            return None
+        # Same-named specs in several components: prefer the one nearest the referencing spec
+        return min(candidates, key=lambda other: (-len(os.path.commonprefix([label, other]).rsplit("/", 1)[0]),
+                                                  other))
+
+    def unresolved(self, label: str) -> List[str]:
+        doc = self.documents.get(label)
+        return [ref for ref in doc["refs"] if not self.resolve(label, ref)] if doc else []
+
+    def dependents(self, label: str, transitive: bool = False) -> List[str]:
+        """Documents referencing label directly, or with transitive=True through any chain of references"""
+        if transitive:
+            return sorted(source for source in self.edges if source != label and self.reaches(source, label))
+        return sorted(source for source, targets in self.edges.items() if label in targets)
+
+    def _components(self) -> Tuple[Dict[str, int], List[List[str]]]:
+        """Strongly connected components (iterative Tarjan), in reverse topological order"""
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        component_of: Dict[str, int] = {}
+        components: List[List[str]] = []
+        for start in sorted(self.edges):
+            if start in index:
+                continue
+            work = [(start, iter(self.edges.get(start, ())))]
+            index[start] = low[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, targets = work[-1]
+                for target in targets:
+                    if target not in index:
+                        index[target] = low[target] = len(index)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self.edges.get(target, ()))))
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component_of[member] = len(components)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(sorted(component))
+        return component_of, components
+
+    def _build_closure(self):
+        component_of, components = self._components()
+        bit = {label: 1 << i for i, label in enumerate(sorted(component_of))}
+        reach = []
+        # Reverse topological order: every component a component points at is already done
+        for members in components:
+            bits = 0
+            for member in members:
+                bits |= bit[member]
+                for target in self.edges.get(member, ()):
+                    if component_of[target] < len(reach):
+                        bits |= reach[component_of[target]]
+            reach.append(bits)
+        self._closure = (component_of, components, bit, reach)
+
+    def reachable(self, label: str) -> List[str]:
+        """Every document label transitively references (excluding itself unless on a cycle)"""
+        if self._closure is None:
+            self._build_closure()
+        component_of, components, bit, reach = self._closure
+        if label not in component_of:
+            return []
+        bits = reach[component_of[label]]
+        if len(components[component_of[label]]) == 1:
+            bits &= ~bit[label]  # self-references are not edges, so a lone component is not a cycle
+        return [other for other, mask in bit.items() if bits & mask]
+
+    def reaches(self, source: str, target: str) -> bool:
+        if self._closure is None:
+            self._build_closure()
+        component_of, components, bit, reach = self._closure
+        if source not in component_of or target not in bit:
+            return False
+        if source == target:
+            return len(components[component_of[source]]) > 1
+        return bool(reach[component_of[source]] & bit[target])
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of documents that reference each other, directly or transitively"""
+        if self._closure is None:
+            self._build_closure()
+        return [members for members in self._closure[1] if len(members) > 1]
+
+    def dangling(self, exported: Set[str]) -> Dict[str, List[str]]:
+        """For each exported document, the documents it references that exist in the tree but were not exported"""
+        return {label: missing for label in sorted(exported & set(self.edges))
+                if (missing := [target for target in self.edges[label] if target not in exported])}
@@ -0,0 +1,509 @@
+"""
+HyperSync Spec Schema Checks
+JSON Schema validation of exported specs with compiled validators cached on disk
+"""
+
+import os
+import re
+import json
+import time
+import fnmatch
+import marshal
+import hashlib
+import posixpath
+import importlib.util
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SCHEMA_CACHE_VERSION = 1
+DEFAULT_VALIDATOR_CACHE = (Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "hypersync" /
+                           "schema-validators")
+MAX_ERRORS = 20  # per spec and schema; further violations are counted, not listed
+HEAD_SIZE = 4096  # `$schema`/`$id` are looked for among the leading members of a document
+META_SCHEMA_HOSTS = ("json-schema.org",)
+
+_HEAD_MEMBER = re.compile(r'\A\s*\{(?:\s*"[^"\\]*"\s*:\s*(?:"(?:[^"\\]|\\.)*"|[-\w.]+)\s*,)*?'
+                          r'\s*"\$KEY"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_SCHEMA_MEMBER = re.compile(_HEAD_MEMBER.pattern.replace("KEY", "schema"))
+_ID_MEMBER = re.compile(_HEAD_MEMBER.pattern.replace("KEY", "id"))
+_INVALID_ESCAPE = re.compile(r'\\(?!["\\/bfnrtu])')
+
+
+class SchemaError(ValueError):
+    """A schema that cannot be compiled (unsupported reference, bad pattern, not a schema)"""
+
+
+def load_schema(path: Path) -> Tuple[Any, bool]:
+    """Parse a schema file; returns (schema, strict) where strict=False means stray backslashes were escaped"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        return json.loads(text), True
+    except ValueError:
+        # Regex patterns like "^v[0-9]+(\.[0-9]+)*$" are often written unescaped
+        return json.loads(_INVALID_ESCAPE.sub(r"\\\\", text)), False
+
+
+_PRELUDE = '''
+import re
+
+
+def _type_name(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "integer" if isinstance(value, int) else "number"
+    return {dict: "object", list: "array", str: "string"}.get(type(value), type(value).__name__)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_integer(value):
+    return _is_number(value) and (isinstance(value, int) or value.is_integer())
+
+
+def _equal(a, b):
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if _is_number(a) and _is_number(b):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_equal(a[key], b[key]) for key in a)
+    return a == b
+
+
+def _unique(items):
+    return not any(_equal(items[i], items[j]) for i in range(len(items)) for j in range(i))
+
+
+def _brief(value):
+    text = repr(value)
+    return text if len(text) <= 60 else text[:57] + "..."
+'''
+
+_TYPE_CHECKS = {
+    "object": "isinstance(data, dict)",
+    "array": "isinstance(data, list)",
+    "string": "isinstance(data, str)",
+    "boolean": "isinstance(data, bool)",
+    "null": "data is None",
+    "number": "_is_number(data)",
+    "integer": "_is_integer(data)",
+}
+
+
+def _is_limit(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _escape_pointer(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+class _Compiler:
+    """Translates one schema into Python source: a function per subschema, entry point `validate`"""
+
+    def __init__(self, root: Any):
+        self.root = root
+        self.constants: List[str] = []
+        self.functions: Dict[str, str] = {}
+        self.pending: List[Tuple[str, Any, str]] = []
+        self.output: List[str] = []
+
+    def source(self) -> str:
+        entry = self.function("#", self.root)
+        while self.pending:
+            self._emit(*self.pending.pop())
+        return "\n".join([_PRELUDE, *self.constants, "", *self.output, f"validate = {entry}", ""])
+
+    def constant(self, value_source: str) -> str:
+        name = f"_C{len(self.constants)}"
+        self.constants.append(f"{name} = {value_source}")
+        return name
+
+    def function(self, pointer: str, schema: Any) -> str:
+        """Name of the function validating the subschema at pointer, queued for emission on first use"""
+        if pointer not in self.functions:
+            self.functions[pointer] = f"_v{len(self.functions)}"
+            self.pending.append((self.functions[pointer], schema, pointer))
+        return self.functions[pointer]
+
+    def _resolve(self, ref: str) -> Tuple[str, Any]:
+        if not ref.startswith("#"):
+            raise SchemaError(f"unsupported non-local $ref {ref!r}")
+        target = self.root
+        for part in ref[1:].split("/")[1:]:
+            part = part.replace("~1", "/").replace("~0", "~")
+            if isinstance(target, dict) and part in target:
+                target = target[part]
+            elif isinstance(target, list) and part.isdigit() and int(part) < len(target):
+                target = target[int(part)]
+            else:
+                raise SchemaError(f"unresolvable $ref {ref!r}")
+        return ref if ref != "#/" else "#", target
+
+    def _emit(self, name: str, schema: Any, pointer: str):
+        lines = []
+        if schema is False:
+            lines.append('errors.append((path, "no value is allowed here"))')
+        elif isinstance(schema, dict):
+            self._body(schema, pointer, lines)
+        elif schema is not True:
+            raise SchemaError(f"{pointer} is not a schema")
+        self.output.append(f"def {name}(data, path, errors):")
+        self.output.extend(f"    {line}" for line in lines or ["pass"])
+        self.output.append("")
+
+    def _sub(self, schema: Dict[str, Any], pointer: str, *keys) -> str:
+        value = schema
+        for key in keys:
+            value = value[key]
+        return self.function(pointer + "".join(f"/{_escape_pointer(str(key))}" for key in keys), value)
+
+    def _body(self, schema: Dict[str, Any], pointer: str, out: List[str]):
+        if "$ref" in schema:
+            ref_pointer, target = self._resolve(schema["$ref"])
+            out.append(f"{self.function(ref_pointer, target)}(data, path, errors)")
+
+        types = schema.get("type")
+        if types is not None:
+            types = [types] if isinstance(types, str) else list(types)
+            unknown = [t for t in types if t not in _TYPE_CHECKS]
+            if unknown:
+                raise SchemaError(f"{pointer}: unknown type {unknown[0]!r}")
+            condition = " or ".join(_TYPE_CHECKS[t] for t in types)
+            expected = " or ".join(types)
+            out.append(f"if not ({condition}):")
+            out.append(f'    errors.append((path, "expected {expected}, got " + _type_name(data)))')
+            out.append("    return")
+
+        if "enum" in schema:
+            values = self.constant(repr(schema["enum"]))
+            out.append(f"if not any(_equal(data, value) for value in {values}):")
+            out.append(f'    errors.append((path, _brief(data) + " is not one of " + _brief({values})))')
+        if "const" in schema:
+            value = self.constant(repr(schema["const"]))
+            out.append(f"if not _equal(data, {value}):")
+            out.append(f'    errors.append((path, "expected " + _brief({value})))')
+
+        for i in range(len(schema.get("allOf", ()))):
+            out.append(f"{self._sub(schema, pointer, 'allOf', i)}(data, path, errors)")
+        for keyword, rule in (("anyOf", "matched == 0"), ("oneOf", "matched != 1")):
+            if keyword in schema:
+                functions = ", ".join(self._sub(schema, pointer, keyword, i) for i in range(len(schema[keyword])))
+                out.append(f"matched = sum(1 for check in ({functions},) if _passes(check, data, path))")
+                out.append(f"if {rule}:")
+                out.append(f'    errors.append((path, "matches " + str(matched) + " of the {keyword} schemas"))')
+        if "not" in schema:
+            out.append(f"if _passes({self._sub(schema, pointer, 'not')}, data, path):")
+            out.append('    errors.append((path, "must not match the \\"not\\" schema"))')
+        if "if" in schema:
+            branches = {key: self._sub(schema, pointer, key) for key in ("if", "then", "else") if key in schema}
+            out.append(f"if _passes({branches['if']}, data, path):")
+            out.append(f"    {branches['then']}(data, path, errors)" if "then" in branches else "    pass")
+            if "else" in branches:
+                out.append("else:")
+                out.append(f"    {branches['else']}(data, path, errors)")
+
+        self._strings(schema, out)
+        self._numbers(schema, out)
+        self._objects(schema, pointer, out)
+        self._arrays(schema, pointer, out)
+
+    def _strings(self, schema: Dict[str, Any], out: List[str]):
+        checks = []
+        if "minLength" in schema:
+            checks += [f"if len(data) < {int(schema['minLength'])}:",
+                       f'    errors.append((path, "shorter than {int(schema["minLength"])} characters"))']
+        if "maxLength" in schema:
+            checks += [f"if len(data) > {int(schema['maxLength'])}:",
+                       f'    errors.append((path, "longer than {int(schema["maxLength"])} characters"))']
+        if "pattern" in schema:
+            try:
+                re.compile(schema["pattern"])
+            except re.error as e:
+                raise SchemaError(f"invalid pattern {schema['pattern']!r}: {e}")
+            pattern = self.constant(f"re.compile({schema['pattern']!r})")
+            checks += [f"if not {pattern}.search(data):",
+                       f'    errors.append((path, _brief(data) + " does not match " + {pattern}.pattern))']
+        if checks:
+            out.append("if isinstance(data, str):")
+            out.extend(f"    {line}" for line in checks)
+
+    def _numbers(self, schema: Dict[str, Any], out: List[str]):
+        checks = []
+        for keyword, exclusive, operator, word in (("minimum", "exclusiveMinimum", "<", "below"),
+                                                   ("maximum", "exclusiveMaximum", ">", "above")):
+            limit = schema.get(keyword)
+            if _is_limit(limit):
+                strict = "=" if schema.get(exclusive) is True else ""  # draft-04 boolean form
+                checks += [f"if data {operator}{strict} {limit!r}:",
+                           f'    errors.append((path, _brief(data) + " is {word} the {keyword} {limit!r}"))']
+            limit = schema.get(exclusive)
+            if _is_limit(limit):
+                checks += [f"if data {operator}= {limit!r}:",
+                           f'    errors.append((path, _brief(data) + " must be {"above" if operator == "<" else "below"} '
+                           f'{limit!r}"))']
+        if _is_limit(schema.get("multipleOf")):
+            factor = schema["multipleOf"]
+            checks += [f"if not _is_integer(data / {factor!r}):",
+                       f'    errors.append((path, _brief(data) + " is not a multiple of {factor!r}"))']
+        if checks:
+            out.append("if _is_number(data):")
+            out.extend(f"    {line}" for line in checks)
+
+    def _objects(self, schema: Dict[str, Any], pointer: str, out: List[str]):
+        checks = []
+        if schema.get("required"):
+            required = self.constant(repr(tuple(schema["required"])))
+            checks += [f"for key in {required}:",
+                       "    if key not in data:",
+                       '        errors.append((path, "missing required property " + repr(key)))']
+        for key in sorted(schema.get("properties", {})):
+            checks += [f"if {key!r} in data:",
+                       f"    {self._sub(schema, pointer, 'properties', key)}(data[{key!r}], "
+                       f"path + {'/' + _escape_pointer(key)!r}, errors)"]
+        patterns = []
+        for pattern in sorted(schema.get("patternProperties", {})):
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise SchemaError(f"invalid pattern {pattern!r}: {e}")
+            patterns.append((self.constant(f"re.compile({pattern!r})"),
+                             self._sub(schema, pointer, "patternProperties", pattern)))
+        additional = schema.get("additionalProperties", True)
+        if patterns or additional is not True or "propertyNames" in schema:
+            known = self.constant(repr(frozenset(schema.get("properties", {}))))
+            checks.append("for key, value in data.items():")
+            checks.append('    child = path + "/" + key.replace("~", "~0").replace("/", "~1")')
+            if "propertyNames" in schema:
+                checks.append(f"    {self._sub(schema, pointer, 'propertyNames')}(key, child, errors)")
+            for regex, function in patterns:
+                checks.append(f"    if {regex}.search(key):")
+                checks.append(f"        {function}(value, child, errors)")
+            if additional is not True:
+                matched = " or ".join([f"key in {known}"] + [f"{regex}.search(key)" for regex, _ in patterns])
+                checks.append(f"    if not ({matched}):")
+                if additional is False:
+                    checks.append('        errors.append((path, "unexpected property " + repr(key)))')
+                else:
+                    checks.append(f"        {self._sub(schema, pointer, 'additionalProperties')}(value, child, errors)")
+        for keyword, operator, word in (("minProperties", "<", "fewer"), ("maxProperties", ">", "more")):
+            if keyword in schema:
+                checks += [f"if len(data) {operator} {int(schema[keyword])}:",
+                           f'    errors.append((path, "{word} than {int(schema[keyword])} properties"))']
+        dependent = dict(schema.get("dependentRequired", {}))
+        dependent.update((key, value) for key, value in schema.get("dependencies", {}).items()
+                         if isinstance(value, list))
+        for key in sorted(dependent):
+            needed = self.constant(repr(tuple(dependent[key])))
+            checks += [f"if {key!r} in data:",
+                       f"    for other in {needed}:",
+                       "        if other not in data:",
+                       f'            errors.append((path, "property " + repr(other) + " is required by {key!r}"))']
+        if checks:
+            out.append("if isinstance(data, dict):")
+            out.extend(f"    {line}" for line in checks)
+
+    def _arrays(self, schema: Dict[str, Any], pointer: str, out: List[str]):
+        checks = []
+        prefix_key = "prefixItems" if "prefixItems" in schema else "items" if isinstance(schema.get("items"), list) \
+            else None
+        rest_key = "items" if prefix_key == "prefixItems" or not isinstance(schema.get("items"), list) \
+            else "additionalItems"
+        prefix = schema.get(prefix_key, []) if prefix_key else []
+        for i in range(len(prefix)):
+            checks += [f"if len(data) > {i}:",
+                       f"    {self._sub(schema, pointer, prefix_key, i)}(data[{i}], path + '/{i}', errors)"]
+        rest = schema.get(rest_key, True)
+        if rest is False:
+            checks += [f"if len(data) > {len(prefix)}:",
+                       f'    errors.append((path, "more than {len(prefix)} items"))']
+        elif rest is not True and rest != {}:
+            function = self._sub(schema, pointer, rest_key)
+            checks += [f"for index in range({len(prefix)}, len(data)):",
+                       f'    {function}(data[index], path + "/" + str(index), errors)']
+        for keyword, operator, word in (("minItems", "<", "fewer"), ("maxItems", ">", "more")):
+            if keyword in schema:
+                checks += [f"if len(data) {operator} {int(schema[keyword])}:",
+                           f'    errors.append((path, "{word} than {int(schema[keyword])} items"))']
+        if schema.get("uniqueItems"):
+            checks += ["if not _unique(data):",
+                       '    errors.append((path, "items are not unique"))']
+        if "contains" in schema:
+            function = self._sub(schema, pointer, "contains")
+            minimum = int(schema.get("minContains", 1))
+            checks += [f"if sum(1 for item in data if _passes({function}, item, path)) < {minimum}:",
+                       '    errors.append((path, "no item matches the \\"contains\\" schema"))']
+        if checks:
+            out.append("if isinstance(data, list):")
+            out.extend(f"    {line}" for line in checks)
+
+
+_PASSES = '''
+
+def _passes(check, data, path):
+    errors = []
+    check(data, path, errors)
+    return not errors
+'''
+
+
+def compile_schema(schema: Any, name: str = "<schema>"):
+    """Code object of a module defining `validate(data, path, errors)` for the schema"""
+    return compile(_Compiler(schema).source() + _PASSES, name, "exec")
+
+
+def _validator_from_code(code) -> Callable[[Any, str, List], None]:
+    namespace: Dict[str, Any] = {}
+    exec(code, namespace)
+    return namespace["validate"]
+
+
+_VALIDATORS: Dict[str, Callable] = {}  # per process, by schema digest
+
+
+def load_validator(schema_path: str, digest: str, cache_dir: str) -> Tuple[Callable, str, float]:
+    """Validator for a schema: (validate, origin, ms) with origin memory, disk or compiled.
+
+    Compiled code objects are marshalled to <cache_dir>/<digest[:2]>/<digest>.bin,
+    tagged with the interpreter's bytecode magic, so each schema is compiled
+    once across runs and worker processes.
+    """
+    if digest in _VALIDATORS:
+        return _VALIDATORS[digest], "memory", 0.0
+    start = time.perf_counter()
+    header = importlib.util.MAGIC_NUMBER + bytes([SCHEMA_CACHE_VERSION])
+    cache_file = Path(cache_dir) / digest[:2] / f"{digest}.bin"
+    try:
+        with open(cache_file, "rb") as f:
+            data = f.read()
+        if data.startswith(header):
+            validate = _validator_from_code(marshal.loads(data[len(header):]))
+            _VALIDATORS[digest] = validate
+            return validate, "disk", (time.perf_counter() - start) * 1000
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+
+    schema, _ = load_schema(Path(schema_path))
+    code = compile_schema(schema, f"<schema {posixpath.basename(schema_path)}>")
+    validate = _validator_from_code(code)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as f:
+            f.write(header + marshal.dumps(code))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+    _VALIDATORS[digest] = validate
+    return validate, "compiled", (time.perf_counter() - start) * 1000
+
+
+def validate_against_schemas(doc_path: str, schemas: List[Tuple[str, str]], cache_dir: str) -> List[Dict[str, Any]]:
+    """Validate one spec against each (schema_path, digest); per schema errors, timing and validator origin"""
+    try:
+        with open(doc_path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError) as e:
+        return [{"errors": [], "skipped": f"Could not parse {doc_path}: {e}", "ms": 0.0, "origin": None,
+                 "load_ms": 0.0} for _ in schemas]
+
+    results = []
+    for schema_path, digest in schemas:
+        try:
+            validate, origin, load_ms = load_validator(schema_path, digest, cache_dir)
+        except (OSError, ValueError, SyntaxError, RecursionError) as e:
+            results.append({"errors": [], "skipped": f"Could not compile schema {schema_path}: {e}", "ms": 0.0,
+                            "origin": None, "load_ms": 0.0})
+            continue
+        start = time.perf_counter()
+        errors: List[Tuple[str, str]] = []
+        try:
+            validate(doc, "", errors)
+        except RecursionError:
+            errors.append(("", "schema recursion too deep"))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if len(errors) > MAX_ERRORS:
+            errors = errors[:MAX_ERRORS] + [("", f"... and {len(errors) - MAX_ERRORS} more violations")]
+        results.append({"errors": errors, "skipped": None, "ms": elapsed_ms, "origin": origin, "load_ms": load_ms})
+    return results
+
+
+def _head_member(path: Path, pattern) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            match = pattern.match(f.read(HEAD_SIZE))
+    except OSError:
+        return None
+    return match.group(1) if match else None
+
+
+def _iter_json_files(root: Path, skip_dirs: Tuple[str, ...]) -> Iterator[Path]:
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs)
+        for file in sorted(files):
+            if file.endswith(".json"):
+                yield Path(dirpath) / file
+
+
+def match_schemas(root: Path, rules: Dict[str, List[str]],
+                  skip_dirs: Tuple[str, ...] = ()) -> Dict[str, List[str]]:
+    """Map each spec under root to the schema files it must satisfy.
+
+    Schemas are `*.schema.json` files and documents with a top-level `$id`.
+    A spec is matched by naming one in its top-level `$schema` (by `$id`,
+    relative path or file name; JSON Schema meta-schemas are skipped) and by
+    `rules`, which map a schema file name to globs of spec file names it
+    governs in its own directory tree.
+    """
+    root = Path(root)
+    files = list(_iter_json_files(root, skip_dirs))
+    schemas_by_id: Dict[str, str] = {}
+    schemas_by_name: Dict[str, List[str]] = {}
+    for path in files:
+        schema_id = _head_member(path, _ID_MEMBER)
+        if schema_id:
+            schemas_by_id.setdefault(schema_id, str(path))
+        if path.name.endswith(".schema.json") or schema_id:
+            schemas_by_name.setdefault(path.name, []).append(str(path))
+
+    matches: Dict[str, List[str]] = {}
+    for path in files:
+        declared = _head_member(path, _SCHEMA_MEMBER)
+        if not declared or any(host in declared for host in META_SCHEMA_HOSTS):
+            continue
+        target = schemas_by_id.get(declared)
+        if target is None:
+            relative = os.path.normpath(path.parent / declared.split("#", 1)[0])
+            candidates = schemas_by_name.get(posixpath.basename(declared.split("#", 1)[0]), [])
+            target = relative if relative in candidates else None
+        if target and target != str(path):
+            matches.setdefault(str(path), []).append(target)
+
+    for name, globs in rules.items():
+        for schema_path in schemas_by_name.get(name, []):
+            scope = os.path.dirname(schema_path) + os.sep
+            for path in files:
+                if (str(path).startswith(scope) and str(path) != schema_path
+                        and any(fnmatch.fnmatch(path.name, glob) for glob in globs)):
+                    targets = matches.setdefault(str(path), [])
+                    if schema_path not in targets:
+                        targets.append(schema_path)
+    return matches
+
+
+def schema_digest(path: Path) -> str:
+    """Digest keying compiled validators: schema content and compiler version"""
+    h = hashlib.sha256(f"v{SCHEMA_CACHE_VERSION}:".encode("utf-8"))
+    with open(path, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
@@ -0,0 +1,427 @@
+"""
+HyperSync Spec Diff
+Structural diff of operations and spec keys between two exports
+"""
+
+import os
+import re
+import json
+import codecs
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from spec_sources import iter_spec_containers, iter_archive_members, is_archive, ARCHIVE_ERRORS
+from catalog_index import operation_record, _GROUPING_KEYS, _MAX_DEPTH
+
+PARSE_CACHE_VERSION = 1
+DEFAULT_PARSE_CACHE = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "hypersync" / "spec-parse"
+KEY_DEPTH = 3  # spec keys are reported down to e.g. metadata.limits.max_nodes
+OPERATION_FIELDS = ("category", "complexity_class", "complexity", "returns", "parameters", "description", "tier")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_DECODER = json.JSONDecoder()
+_TOP_LEVEL = object()  # category placeholder until the document's own `category` has been read
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class JsonStream:
+    """Pull parser over a byte stream: structure is walked incrementally and each
+    scalar or operation is decoded on its own by the C decoder, so memory stays
+    at the size of the largest single value rather than the whole document.
+    """
+    
+    def __init__(self, read: Callable[[int], bytes], chunk_size: int = 1 << 16):
+        self._read = read
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # Characters, lines and current-line columns dropped from the front of buf
+        self._dropped = 0
+        self._dropped_lines = 0
+        self._dropped_column = 0
+    
+    def _fill(self, size: int) -> bool:
+        """Append at least one more chunk, dropping what has been consumed"""
+        if self.eof:
+            return False
+        data = self._read(size)
+        self.eof = not data
+        consumed = self.buf[:self.pos]
+        newline = consumed.rfind("\n")
+        if newline < 0:
+            self._dropped_column += len(consumed)
+        else:
+            self._dropped_lines += consumed.count("\n")
+            self._dropped_column = len(consumed) - newline - 1
+        self._dropped += len(consumed)
+        self.buf = self.buf[self.pos:] + self._decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return True
+    
+    def location(self, pos: int = None) -> Tuple[int, int, int]:
+        """(line, column, char) in the whole document of a position in buf, 1-based like json"""
+        pos = self.pos if pos is None else pos
+        line_start = self.buf.rfind("\n", 0, pos) + 1
+        lineno = self._dropped_lines + self.buf.count("\n", 0, pos) + 1
+        colno = pos - line_start + 1 + (self._dropped_column if not line_start else 0)
+        return lineno, colno, self._dropped + pos
+    
+    def _error(self, message: str) -> ValueError:
+        lineno, colno, pos = self.location()
+        return ValueError(f"{message}: line {lineno} column {colno} (char {pos})")
+    
+    def peek(self) -> str:
+        """Next significant character ('' at the end of the stream)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self._chunk_size):
+                return ""
+    
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise self._error(f"Expected {char!r} but found {found or 'end of document'!r}")
+        self.pos += 1
+    
+    def value(self) -> Any:
+        """Decode the next complete value, reading more input while it is truncated"""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill(size):
+                    size *= 2
+                    continue
+                lineno, colno, pos = self.location(e.pos)
+                error = json.JSONDecodeError(e.msg, e.doc, e.pos)
+                error.lineno, error.colno, error.pos = lineno, colno, pos
+                error.args = (f"{e.msg}: line {lineno} column {colno} (char {pos})",)
+                raise error from None
+            if (not self.eof and isinstance(value, (int, float))
+                    and _NUMBER_TAIL.match(self.buf, end).end() == len(self.buf)):
+                self._fill(size)  # the number may continue in the next chunk
+                continue
+            self.pos = end
+            return value
+    
+    def members(self) -> Iterator[str]:
+        """Keys of the object at the cursor; the caller consumes each value before resuming"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                self.pos -= 1
+                raise self._error(f"Expected ',' or '}}' after member {key!r}")
+    
+    def elements(self) -> Iterator[int]:
+        """Indexes of the array at the cursor; the caller consumes each element before resuming"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                self.pos -= 1
+                raise self._error("Expected ',' or ']' in array")
+    
+    def digest_value(self) -> str:
+        """Digest of the next value; arrays are decoded and hashed one element at a time"""
+        if self.peek() != "[":
+            return _digest(_canonical(self.value()))
+        h = hashlib.sha1(b"[")
+        for _ in self.elements():
+            h.update(_canonical(self.value()).encode("utf-8"))
+            h.update(b"\x00")
+        return h.hexdigest()[:16]
+
+
+_EMPTY_OBJECT = _digest("{")
+_TIER_KEYS = (("tier",), ("metadata", "tier"), ("specification", "tier"))
+
+
+class _DocumentSummary:
+    """Operations and spec-key digests of one document, built while streaming it"""
+    
+    def __init__(self):
+        self.operations: List[Dict[str, Any]] = []
+        self.keys: Dict[str, str] = {}
+        self.scalars: Dict[Tuple[str, ...], Any] = {}
+    
+    def walk(self, stream: JsonStream, path: Tuple[str, ...], category: Any, depth: int) -> str:
+        """Stream one object, recording operations and keys; returns the object's digest.
+
+        Descends like catalog_index.extract_operations, so the same operations are found.
+        """
+        members = []
+        for key in stream.members():
+            child = path + (key,)
+            name = ".".join(child)
+            char = stream.peek()
+            if key == "operations" and char in "[{":
+                digest = self._operations(stream, category)
+            elif char == "{" and depth < _MAX_DEPTH:
+                digest = self.walk(stream, child, category if key in _GROUPING_KEYS else key, depth + 1)
+                if len(child) == KEY_DEPTH or (len(child) < KEY_DEPTH and digest == _EMPTY_OBJECT):
+                    self.keys[name] = digest
+            else:
+                if char == '"' and (child in _TIER_KEYS or child == ("category",)):
+                    value = self.scalars[child] = stream.value()
+                    digest = _digest(_canonical(value))
+                else:
+                    digest = stream.digest_value()
+                if len(child) <= KEY_DEPTH:
+                    self.keys[name] = digest
+            members.append((key, digest))
+        members.sort()
+        return _digest("{", *(part for member in members for part in member))
+    
+    def _operations(self, stream: JsonStream, category: Any) -> str:
+        """Decode operations one at a time; returns the digest of the whole collection"""
+        keys = (None for _ in stream.elements()) if stream.peek() == "[" else stream.members()
+        digests = []
+        for key in keys:
+            op = stream.value()
+            fingerprint = _digest(_canonical(op))
+            digests.append(_digest(key or "", fingerprint))
+            record = operation_record(key, op, None if category is _TOP_LEVEL else category)
+            if record:
+                record["fingerprint"] = fingerprint
+                record["default_category"] = category is _TOP_LEVEL and not isinstance(op.get("category"), str)
+                self.operations.append(record)
+        return _digest("[", *digests)
+    
+    def finish(self) -> Dict[str, Any]:
+        tier = next((self.scalars[key].lower() for key in _TIER_KEYS if isinstance(self.scalars.get(key), str)),
+                    None)
+        category = self.scalars.get(("category",))
+        for record in self.operations:
+            if record.pop("default_category"):
+                record["category"] = category
+            record["tier"] = tier
+            record["parameters"] = [list(param) for param in record["parameters"]]  # as read back from the cache
+        return {"tier": tier, "operations": self.operations, "keys": self.keys}
+
+
+def summarize_document(read: Callable[[int], bytes]) -> Dict[str, Any]:
+    """Stream one JSON document into {tier, operations, keys}"""
+    stream = JsonStream(read)
+    if stream.peek() != "{":
+        return {"tier": None, "operations": [], "keys": {"": stream.digest_value()}}
+        
+    summary = _DocumentSummary()
+    summary.walk(stream, (), _TOP_LEVEL, 0)
+    if stream.peek():
+        raise stream._error("Extra data after the top-level object")
+    return summary.finish()
+
+
+def _container_documents(path: Path, on_error: Callable[[str, Exception], None]
+                         ) -> Iterator[Tuple[str, Callable[[int], bytes]]]:
+    """(suffix, read) per document: '' for a JSON file, '!member.json' for bundle members"""
+    if not is_archive(path.name):
+        with open(path, "rb") as f:
+            yield "", f.read
+        return
+    with open(path, "rb") as f:
+        for member_label, name, read in iter_archive_members(f, "", on_error):
+            if name.endswith(".json"):
+                yield member_label, read
+
+
+class SpecParseCache:
+    """Document summaries per spec file or bundle, stored under the content's SHA-256.
+
+    File digests are remembered by (path, size, mtime), so unchanged files are
+    neither re-read nor re-parsed on later diffs.
+    """
+    
+    def __init__(self, cache_dir: Path = DEFAULT_PARSE_CACHE):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._stat_file = self.cache_dir / "stat_index.json"
+        try:
+            with open(self._stat_file, "r") as f:
+                index = json.load(f)
+            self._stat_index = index["files"] if index.get("version") == PARSE_CACHE_VERSION else {}
+        except (OSError, ValueError, KeyError):
+            self._stat_index = {}
+        self._dirty = False
+        self.stats = {"parsed": 0, "cached": 0, "hashed": 0}
+        self.warnings: List[str] = []
+    
+    def _digest(self, path: Path) -> str:
+        st = os.stat(path)
+        key = str(path.resolve())
+        cached = self._stat_index.get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        self._stat_index[key] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        self._dirty = True
+        self.stats["hashed"] += 1
+        return h.hexdigest()
+    
+    def container(self, path: Path, label: str) -> Dict[str, Dict[str, Any]]:
+        """Summaries of the documents in one file or bundle, keyed by label suffix"""
+        digest = self._digest(path)
+        entry_file = self.cache_dir / digest[:2] / f"{digest}.json"
+        try:
+            with open(entry_file, "r") as f:
+                entry = json.load(f)
+            if entry.get("version") == PARSE_CACHE_VERSION:
+                self.stats["cached"] += 1
+                return entry["documents"]
+        except (OSError, ValueError, KeyError):
+            pass
+            
+        documents = {}
+        warnings = []
+        on_error = lambda doc_label, e: warnings.append(f"Could not parse {label}{doc_label}: {e}")
+        try:
+            for suffix, read in _container_documents(path, on_error):
+                try:
+                    documents[suffix] = summarize_document(read)
+                except (ValueError, UnicodeDecodeError) as e:
+                    warnings.append(f"Could not parse {label}{suffix}: {e}")
+        except ARCHIVE_ERRORS as e:
+            warnings.append(f"Could not parse {label}: {e}")
+        self.warnings.extend(warnings)
+        self.stats["parsed"] += 1
+        if warnings:
+            return documents  # not cached, so the problem is reported again next time
+            
+        entry_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = entry_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"version": PARSE_CACHE_VERSION, "documents": documents}, f, separators=(",", ":"))
+        os.replace(tmp_file, entry_file)
+        return documents
+    
+    def load_export(self, export_dir: Path, skip_dirs: Tuple[str, ...] = ()) -> Dict[str, Dict[str, Any]]:
+        """Summaries of every spec document in an export, keyed by document label"""
+        documents = {}
+        for label, path in iter_spec_containers(export_dir, skip_dirs):
+            for suffix, summary in self.container(path, label).items():
+                documents[label + suffix] = summary
+        return documents
+    
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_file = self._stat_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"version": PARSE_CACHE_VERSION, "files": self._stat_index}, f)
+        os.replace(tmp_file, self._stat_file)
+        self._dirty = False
+
+
+def _operations_by_name(documents: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    operations = {}
+    for label, summary in documents.items():
+        for record in summary["operations"]:
+            operations.setdefault(record["name"], []).append(dict(record, source=label))
+    return operations
+
+
+def _pair(before: List[Dict[str, Any]], after: List[Dict[str, Any]]):
+    """Match same-named operations, preferring the same source document"""
+    after = list(after)
+    pairs = []
+    unmatched = []
+    for record in before:
+        match = next((other for other in after if other["source"] == record["source"]), None)
+        if match is None:
+            unmatched.append(record)
+            continue
+        after.remove(match)
+        pairs.append((record, match))
+    for record in unmatched:
+        if after:
+            pairs.append((record, after.pop(0)))
+        else:
+            pairs.append((record, None))
+    pairs.extend((None, record) for record in after)
+    return pairs
+
+
+def _brief(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {"name": record["name"], "source": record["source"], "tier": record["tier"],
+            "complexity_class": record["complexity_class"]}
+
+
+def diff_exports(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Added, removed, modified and moved operations, plus spec-key changes of shared documents"""
+    result = {
+        "documents": {
+            "added": sorted(set(after) - set(before)),
+            "removed": sorted(set(before) - set(after)),
+            "modified": sorted(label for label in set(before) & set(after) if before[label] != after[label]),
+        },
+        "operations": {"added": [], "removed": [], "modified": [], "moved": []},
+        "keys": {"added": [], "removed": [], "modified": []},
+    }
+    
+    ops_before = _operations_by_name(before)
+    ops_after = _operations_by_name(after)
+    operations = result["operations"]
+    for name in sorted(set(ops_before) | set(ops_after)):
+        for old, new in _pair(ops_before.get(name, []), ops_after.get(name, [])):
+            if new is None:
+                operations["removed"].append(_brief(old))
+            elif old is None:
+                operations["added"].append(_brief(new))
+            elif old["fingerprint"] != new["fingerprint"]:
+                changes = {field: [old[field], new[field]] for field in OPERATION_FIELDS if old[field] != new[field]}
+                operations["modified"].append({"name": name, "source": [old["source"], new["source"]],
+                                               "changes": changes or {"definition": "changed"}})
+            elif old["source"] != new["source"]:
+                operations["moved"].append({"name": name, "source": [old["source"], new["source"]],
+                                            "tier": [old["tier"], new["tier"]]})
+                                            
+    keys = result["keys"]
+    for label in result["documents"]["modified"]:
+        keys_before = before[label]["keys"]
+        keys_after = after[label]["keys"]
+        keys["added"].extend(f"{label}#{key}" for key in sorted(set(keys_after) - set(keys_before)))
+        keys["removed"].extend(f"{label}#{key}" for key in sorted(set(keys_before) - set(keys_after)))
+        keys["modified"].extend(f"{label}#{key}" for key in sorted(set(keys_before) & set(keys_after))
+                                if keys_before[key] != keys_after[key])
+    return result
+
+
+def has_changes(diff: Dict[str, Any]) -> bool:
+    return any(items for section in diff.values() for items in section.values())
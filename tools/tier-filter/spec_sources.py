@@ -0,0 +1,93 @@
+"""
+HyperSync Spec Sources
+Stream spec files from an export tree, including members of tar bundles
+"""
+
+import os
+import tarfile
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+ARCHIVE_SUFFIXES = (".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".tar")
+ARCHIVE_ERRORS = (tarfile.TarError, OSError, EOFError)
+
+
+def is_archive(name: str) -> bool:
+    """Whether a file name looks like a tar bundle that can be streamed"""
+    return name.endswith(ARCHIVE_SUFFIXES)
+
+
+def iter_archive_members(fileobj, label: str,
+                         on_error: Optional[Callable[[str, Exception], None]] = None
+                         ) -> Iterator[Tuple[str, str, Callable[[], bytes]]]:
+    """Stream regular members of a tar bundle as (member_label, member_name, read) tuples.
+    
+    The bundle is opened in streaming mode, so `read()` must be called before
+    advancing the iterator. Nested bundles are streamed recursively with labels
+    like `outer.tar.gz!inner.tar.gz!member.json`. If a nested bundle cannot be
+    read, `on_error(member_label, exc)` is called, or the error propagates.
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|*") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            name = member.name[2:] if member.name.startswith("./") else member.name
+            member_label = f"{label}!{name}"
+            
+            if is_archive(name):
+                try:
+                    yield from iter_archive_members(tar.extractfile(member), member_label, on_error)
+                except ARCHIVE_ERRORS as e:
+                    if on_error is None:
+                        raise
+                    on_error(member_label, e)
+                continue
+                
+            yield member_label, name, tar.extractfile(member).read
+
+
+def iter_spec_containers(root: Path, skip_dirs: Tuple[str, ...] = ()) -> Iterator[Tuple[str, Path]]:
+    """Yield (label, path) for every JSON file and tar bundle under root.
+    
+    Labels are root-relative posix paths. Directories are walked in sorted
+    order so output is deterministic.
+    """
+    root = Path(root)
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs)
+        for file in sorted(files):
+            if file.endswith(".json") or is_archive(file):
+                path = Path(dirpath) / file
+                yield path.relative_to(root).as_posix(), path
+
+
+def iter_container_documents(path: Path, label: str,
+                             on_error: Optional[Callable[[str, Exception], None]] = None
+                             ) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """Yield (label, read) for a JSON file, or for each JSON member of a tar bundle"""
+    if not is_archive(path.name):
+        yield label, path.read_bytes
+        return
+    
+    try:
+        with open(path, "rb") as f:
+            for member_label, name, read in iter_archive_members(f, label, on_error):
+                if name.endswith(".json"):
+                    yield member_label, read
+    except ARCHIVE_ERRORS as e:
+        if on_error is None:
+            raise
+        on_error(label, e)
+
+
+def iter_spec_documents(root: Path, skip_dirs: Tuple[str, ...] = (),
+                        on_error: Optional[Callable[[str, Exception], None]] = None
+                        ) -> Iterator[Tuple[str, Path, Callable[[], bytes]]]:
+    """Yield (label, container_path, read) for every JSON spec under root.
+    
+    JSON members of tar bundles are labelled `bundle.tar.gz!member.json` and
+    streamed without extraction.
+    """
+    for label, path in iter_spec_containers(root, skip_dirs):
+        for doc_label, read in iter_container_documents(path, label, on_error):
+            yield doc_label, path, read
@@ -0,0 +1,216 @@
+"""
+HyperSync Tier Filter Source Watcher
+Reports changed paths under a set of source roots, via inotify or stat polling
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+# linux/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+              IN_DELETE_SELF | IN_MOVE_SELF)
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+_DIRECTORY = (0, 0, 0)  # directories only report being created or removed, not their mtime
+
+
+class _Watcher:
+    """Shared root/ignore bookkeeping and debouncing"""
+
+    kind = ""
+
+    def __init__(self, roots: Iterable[Path], ignore: Iterable[Path] = ()):
+        self.trees: List[str] = []
+        self.files: Set[str] = set()
+        for root in roots:
+            root = os.path.abspath(root)
+            if os.path.isdir(root):
+                self.trees.append(root)
+            else:
+                self.files.add(root)
+        self.ignore = [os.path.abspath(path) for path in ignore]
+
+    @staticmethod
+    def _within(path: str, prefixes: List[str]) -> bool:
+        return any(path == prefix or path.startswith(prefix + os.sep) for prefix in prefixes)
+
+    def relevant(self, path: str) -> bool:
+        return (path in self.files or self._within(path, self.trees)) and not self._within(path, self.ignore)
+
+    def wait(self, debounce: float) -> Set[Path]:
+        """Block until something changes, then until nothing has changed for `debounce` seconds"""
+        changed = set()
+        while not changed:
+            changed = self._changes(None)
+        while True:
+            more = self._changes(debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def _changes(self, timeout) -> Set[Path]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(_Watcher):
+    """Recursive inotify watches on every directory under the roots (Linux)"""
+
+    kind = "inotify"
+
+    def __init__(self, roots: Iterable[Path], ignore: Iterable[Path] = ()):
+        super().__init__(roots, ignore)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        try:
+            for tree in self.trees:
+                self._add_tree(tree)
+            for parent in {os.path.dirname(path) for path in self.files}:
+                self._add_watch(parent)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):  # gone again before we got to it
+                return
+            raise OSError(err, f"inotify_add_watch failed: {os.strerror(err)}", directory)
+        self._dirs[wd] = directory
+
+    def _add_tree(self, top: str):
+        for root, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if not self._within(os.path.join(root, d), self.ignore)]
+            self._add_watch(root)
+
+    def _changes(self, timeout) -> Set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\x00")
+                offset += _EVENT.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    # Events were dropped: report every root so the caller resynchronises them
+                    changed.update(Path(path) for path in self.trees + sorted(self.files))
+                    continue
+                if mask & IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if not self.relevant(path):
+                    continue
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add_tree(path)
+                changed.add(Path(path))
+        return changed
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PollingWatcher(_Watcher):
+    """Periodic scandir/stat snapshots of the roots, diffed against the previous one"""
+
+    def __init__(self, roots: Iterable[Path], ignore: Iterable[Path] = (), interval: float = DEFAULT_POLL_INTERVAL):
+        super().__init__(roots, ignore)
+        self.interval = interval
+        self.kind = f"stat polling every {interval:g}s"
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int, int]]:
+        snapshot = {}
+        for path in self.files:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+
+        stack = list(self.trees)
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if self._within(entry.path, self.ignore):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            snapshot[entry.path] = _DIRECTORY
+                            stack.append(entry.path)
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    snapshot[entry.path] = (st.st_mtime_ns, st.st_size, st.st_ino)
+        return snapshot
+
+    def _changes(self, timeout) -> Set[Path]:
+        time.sleep(self.interval if timeout is None else timeout)
+        previous, self._snapshot = self._snapshot, self._scan()
+        changed = {path for path, signature in self._snapshot.items() if previous.get(path) != signature}
+        changed.update(previous.keys() - self._snapshot.keys())
+        return {Path(path) for path in changed}
+
+
+def open_watcher(roots: Iterable[Path], ignore: Iterable[Path] = (), poll_interval: float = None) -> _Watcher:
+    """inotify where available, stat polling otherwise (or when a poll interval is given)"""
+    roots = list(roots)
+    if poll_interval is None:
+        try:
+            return InotifyWatcher(roots, ignore)
+        except (OSError, AttributeError) as e:
+            print(f"[Watch] inotify unavailable ({e}), falling back to stat polling")
+            poll_interval = DEFAULT_POLL_INTERVAL
+    return PollingWatcher(roots, ignore, poll_interval)